@@ -13,6 +13,13 @@ from schemas.analytics import (
     InventoryAnalyticsCreate, ProjectAnalyticsCreate, RevenueAnalyticsCreate,
     AnalyticsFilters, TimePeriodEnum
 )
+from utils.pagination import SortKey, paginate
+
+# Newest first; id breaks ties so the keyset order is total
+USAGE_EVENT_SORT_KEYS = [
+    SortKey.of(UsageEvent.timestamp, descending=True),
+    SortKey(UsageEvent.id, descending=True),
+]
 
 class AnalyticsCRUD:
     def __init__(self, db: Session):
@@ -33,9 +40,10 @@ class AnalyticsCRUD:
         self, 
         makerspace_id: str, 
         filters: AnalyticsFilters,
-        skip: int = 0, 
-        limit: int = 100
-    ) -> List[UsageEvent]:
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[UsageEvent], Optional[str]]:
+        """Page of usage events, newest first; returns ``(events, next_cursor)``"""
         query = self.db.query(UsageEvent).filter(
             UsageEvent.makerspace_id == uuid.UUID(makerspace_id)
         )
@@ -56,7 +64,7 @@ class AnalyticsCRUD:
                 )
             )
         
-        return query.order_by(desc(UsageEvent.timestamp)).offset(skip).limit(limit).all()
+        return paginate(query, USAGE_EVENT_SORT_KEYS, limit, cursor)
 
     # Analytics Overview
     def get_analytics_overview(self, makerspace_id: str) -> Dict[str, Any]:
@@ -440,10 +448,19 @@ class AnalyticsCRUD:
 
     # Report Generation
     def create_report_request(self, makerspace_id: str, requested_by: str, report_data: ReportRequestCreate) -> ReportRequest:
+        # The date range has no column of its own; keep it with the other filters
+        filters = dict(report_data.filters or {})
+        if report_data.start_date:
+            filters['start_date'] = report_data.start_date.isoformat()
+        if report_data.end_date:
+            filters['end_date'] = report_data.end_date.isoformat()
+
         db_request = ReportRequest(
             makerspace_id=uuid.UUID(makerspace_id),
             requested_by=uuid.UUID(requested_by),
-            **report_data.dict()
+            report_type=report_data.report_type,
+            report_format=report_data.report_format.value,
+            filters=filters
         )
         self.db.add(db_request)
         self.db.commit()
@@ -458,6 +475,14 @@ class AnalyticsCRUD:
             )
         ).order_by(desc(ReportRequest.requested_at)).all()
 
+    def get_report_request(self, request_id: str, makerspace_id: str) -> Optional[ReportRequest]:
+        return self.db.query(ReportRequest).filter(
+            and_(
+                ReportRequest.id == uuid.UUID(request_id),
+                ReportRequest.makerspace_id == uuid.UUID(makerspace_id)
+            )
+        ).first()
+
     def update_report_status(self, request_id: str, status: str, file_url: str = None, error_message: str = None) -> ReportRequest:
         db_request = self.db.query(ReportRequest).filter(ReportRequest.id == uuid.UUID(request_id)).first()
         if db_request:
@@ -2,6 +2,8 @@ from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, desc, func, text, case
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta, date
+from concurrent.futures import ThreadPoolExecutor
+import os
 import uuid
 import json
 
@@ -20,6 +22,44 @@ from ..schemas.enhanced_analytics import (
     AnalyticsExportRequest, AnalyticsExportResponse, ComprehensiveDashboardResponse,
     KPIMetric, AnalyticsChart, DashboardSection, ChartDataPoint
 )
+from ..database import get_read_session
+from ..utils.ttl_cache import TTLCache
+
+# Per-section cache lifetimes for the comprehensive dashboard, in seconds
+DASHBOARD_SECTION_TTLS = {
+    "overview": 60,
+    "usage": 300,
+    "equipment": 120,
+    "revenue": 900,
+    "engagement": 900,
+    "performance": 900,
+    "freshness": 60,
+}
+# Sections whose cache entries depend on each metrics table
+_DEPENDENT_SECTIONS = {
+    "usage": ("usage", "overview", "performance", "freshness"),
+    "equipment": ("equipment", "overview", "performance", "freshness"),
+    "revenue": ("revenue", "overview", "performance", "freshness"),
+    "engagement": ("engagement", "overview", "performance", "freshness"),
+}
+
+_dashboard_cache = TTLCache()
+# Each section runs on its own pooled connection, so keep this within the pool size
+_dashboard_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DASHBOARD_SECTION_WORKERS", "5")),
+    thread_name_prefix="dashboard-section"
+)
+
+def _dashboard_cache_key(makerspace_id: str, section: str) -> str:
+    return f"dashboard:{makerspace_id}:{section}"
+
+def invalidate_dashboard_cache(makerspace_id: str, source: Optional[str] = None) -> None:
+    """Drop cached dashboard sections affected by writes to ``source`` (all if None)"""
+    if source is None:
+        _dashboard_cache.invalidate_prefix(f"dashboard:{makerspace_id}:")
+        return
+    for section in _DEPENDENT_SECTIONS.get(source, ()):
+        _dashboard_cache.invalidate(_dashboard_cache_key(makerspace_id, section))
 
 # Enhanced Usage Metrics CRUD
 def create_usage_metrics(db: Session, metrics: EnhancedUsageMetricsCreate, makerspace_id: str) -> EnhancedUsageMetrics:
@@ -31,6 +71,7 @@ def create_usage_metrics(db: Session, metrics: EnhancedUsageMetricsCreate, maker
     db.add(db_metrics)
     db.commit()
     db.refresh(db_metrics)
+    invalidate_dashboard_cache(str(makerspace_id), "usage")
     return db_metrics
 
 def get_usage_metrics(
@@ -109,6 +150,7 @@ def create_equipment_utilization(db: Session, utilization: EquipmentUtilizationM
     db.add(db_utilization)
     db.commit()
     db.refresh(db_utilization)
+    invalidate_dashboard_cache(str(makerspace_id), "equipment")
     return db_utilization
 
 def get_equipment_utilization(
@@ -192,6 +234,7 @@ def create_revenue_analytics(db: Session, revenue: RevenueAnalyticsEnhancedCreat
     db.add(db_revenue)
     db.commit()
     db.refresh(db_revenue)
+    invalidate_dashboard_cache(str(makerspace_id), "revenue")
     return db_revenue
 
 def get_revenue_analytics(
@@ -271,6 +314,7 @@ def create_engagement_metrics(db: Session, engagement: MemberEngagementMetricsCr
     db.add(db_engagement)
     db.commit()
     db.refresh(db_engagement)
+    invalidate_dashboard_cache(str(makerspace_id), "engagement")
     return db_engagement
 
 def get_engagement_metrics(
@@ -459,35 +503,59 @@ def get_benchmarks(
 
 # Comprehensive Dashboard
 def get_comprehensive_dashboard(db: Session, makerspace_id: str, refresh_cache: bool = False) -> ComprehensiveDashboardResponse:
-    """Get comprehensive analytics dashboard"""
-    # Get overview KPIs
-    overview_metrics = _get_overview_kpis(db, makerspace_id)
-    
-    # Get dashboard sections
-    sections = [
-        _get_usage_section(db, makerspace_id),
-        _get_equipment_section(db, makerspace_id),
-        _get_revenue_section(db, makerspace_id),
-        _get_engagement_section(db, makerspace_id)
-    ]
-    
-    # Calculate performance score
-    performance_score = _calculate_performance_score(db, makerspace_id)
-    
-    # Get data freshness info
-    data_freshness = _get_data_freshness(db, makerspace_id)
+    """Get comprehensive analytics dashboard.
+
+    Sections are served from a per-section TTL cache. Misses (or every section
+    when ``refresh_cache`` is set) are computed concurrently, each on its own
+    pooled session, and written back to the cache.
+    """
+    builders = {
+        "overview": _get_overview_kpis,
+        "usage": _get_usage_section,
+        "equipment": _get_equipment_section,
+        "revenue": _get_revenue_section,
+        "engagement": _get_engagement_section,
+        "performance": _calculate_performance_score,
+        "freshness": _get_data_freshness,
+    }
+
+    results: Dict[str, Any] = {}
+    expiries: List[float] = []
+    pending = {}
+    for name, builder in builders.items():
+        key = _dashboard_cache_key(makerspace_id, name)
+        entry = None if refresh_cache else _dashboard_cache.get_entry(key)
+        if entry is not None:
+            expiries.append(entry[0])
+            results[name] = entry[1]
+        else:
+            pending[name] = _dashboard_executor.submit(_build_dashboard_section, builder, makerspace_id)
+
+    for name, future in pending.items():
+        results[name] = future.result()
+        expiries.append(_dashboard_cache.set(
+            _dashboard_cache_key(makerspace_id, name), results[name], DASHBOARD_SECTION_TTLS[name]
+        ))
     
     return ComprehensiveDashboardResponse(
         makerspace_id=makerspace_id,
         dashboard_title="MakrCave Analytics Dashboard",
-        overview_metrics=overview_metrics,
-        sections=sections,
+        overview_metrics=results["overview"],
+        sections=[results["usage"], results["equipment"], results["revenue"], results["engagement"]],
         generated_at=datetime.utcnow(),
-        cache_expires_at=datetime.utcnow() + timedelta(minutes=15),
-        data_freshness=data_freshness,
-        performance_score=performance_score
+        cache_expires_at=datetime.utcfromtimestamp(min(expiries)),
+        data_freshness=results["freshness"],
+        performance_score=results["performance"]
     )
 
+def _build_dashboard_section(builder, makerspace_id: str):
+    """Run one dashboard section builder on its own (replica when fresh) session"""
+    db = get_read_session()
+    try:
+        return builder(db, makerspace_id)
+    finally:
+        db.close()
+
 def _get_overview_kpis(db: Session, makerspace_id: str) -> List[KPIMetric]:
     """Get overview KPI metrics"""
     # This would fetch key metrics from various tables
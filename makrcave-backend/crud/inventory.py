@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc, asc
-from typing import List, Optional, Dict, Any
+from sqlalchemy import and_, or_, func
+from typing import List, Optional, Dict, Any, Iterator
+import enum
 import uuid
 from datetime import datetime, timedelta
 
@@ -12,6 +13,14 @@ from schemas.inventory import (
     InventoryItemCreate, InventoryItemUpdate, InventoryFilter,
     InventoryUsageLogCreate, BulkUpdateRequest, BulkIssueRequest
 )
+from utils.pagination import SortKey, paginate
+from utils.streaming_export import stream_query
+
+# Same header set accepted by utils.inventory_tools.validate_csv_headers
+INVENTORY_EXPORT_COLUMNS = [
+    'name', 'category', 'quantity', 'unit', 'subcategory', 'min_threshold',
+    'location', 'status', 'supplier_type', 'product_code', 'notes', 'image_url'
+]
 
 class InventoryCRUD:
     def __init__(self, db: Session):
@@ -48,8 +57,12 @@ class InventoryCRUD:
             query = query.filter(InventoryItem.linked_makerspace_id == makerspace_id)
         return query.first()
 
-    def get_items(self, filters: InventoryFilter) -> tuple[List[InventoryItem], int]:
-        """Get inventory items with filtering, pagination, and sorting"""
+    def get_items(self, filters: InventoryFilter) -> tuple[List[InventoryItem], int, Optional[str]]:
+        """Get inventory items with filtering, pagination, and sorting.
+
+        Returns ``(items, total, next_cursor)``. ``filters.cursor`` seeks
+        past the previous page; ``filters.skip`` is only used without one.
+        """
         query = self.db.query(InventoryItem)
         
         # Apply filters
@@ -88,22 +101,19 @@ class InventoryCRUD:
         # Get total count before pagination
         total = query.count()
         
-        # Apply sorting
-        if filters.sort_order == "desc":
-            order_func = desc
-        else:
-            order_func = asc
-            
-        if hasattr(InventoryItem, filters.sort_by):
-            query = query.order_by(order_func(getattr(InventoryItem, filters.sort_by)))
+        # Apply sorting; id breaks ties so the keyset order is total
+        if filters.sort_by in InventoryItem.__table__.columns:
+            sort_column = getattr(InventoryItem, filters.sort_by)
+            descending = filters.sort_order == "desc"
         else:
-            query = query.order_by(desc(InventoryItem.updated_at))
+            sort_column = InventoryItem.updated_at
+            descending = True
+        keys = [SortKey.of(sort_column, descending), SortKey(InventoryItem.id, descending)]
         
         # Apply pagination
-        query = query.offset(filters.skip).limit(filters.limit)
-        
-        items = query.all()
-        return items, total
+        offset = 0 if filters.cursor else filters.skip
+        items, next_cursor = paginate(query, keys, filters.limit, filters.cursor, offset)
+        return items, total, next_cursor
 
     def update_item(self, item_id: str, updates: InventoryItemUpdate, makerspace_id: Optional[str] = None) -> Optional[InventoryItem]:
         """Update an inventory item"""
@@ -326,6 +336,33 @@ class InventoryCRUD:
             "locations": locations
         }
 
+    def iter_export_rows(self, makerspace_id: Optional[str] = None,
+                         filters: Optional[Dict[str, Any]] = None) -> Iterator[List[Any]]:
+        """Yield inventory rows for CSV export through a server-side cursor.
+
+        Columns follow ``INVENTORY_EXPORT_COLUMNS`` so the file can be fed back
+        into the bulk import job.
+        """
+        filters = filters or {}
+        query = self.db.query(
+            InventoryItem.name, InventoryItem.category, InventoryItem.quantity,
+            InventoryItem.unit, InventoryItem.subcategory, InventoryItem.min_threshold,
+            InventoryItem.location, InventoryItem.status, InventoryItem.supplier_type,
+            InventoryItem.product_code, InventoryItem.notes, InventoryItem.image_url
+        )
+        if makerspace_id:
+            query = query.filter(InventoryItem.linked_makerspace_id == makerspace_id)
+        if filters.get('category'):
+            query = query.filter(InventoryItem.category == filters['category'])
+        if filters.get('status'):
+            query = query.filter(InventoryItem.status == filters['status'])
+
+        for row in stream_query(query.order_by(InventoryItem.name, InventoryItem.id)):
+            yield [
+                value.value if isinstance(value, enum.Enum) else ('' if value is None else value)
+                for value in row
+            ]
+
     def get_low_stock_alerts(self, makerspace_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get low stock alerts"""
         query = self.db.query(InventoryItem).filter(
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, desc, asc, func
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 
 from ..models.job_management import (
@@ -8,6 +8,7 @@ from ..models.job_management import (
     JobTimeLog, JobQualityCheck, ServiceProvider, ProviderEquipment,
     JobTemplate, JobStatus, JobPriority, JobType, FilamentType
 )
+from ..utils.pagination import SortKey, paginate
 from ..schemas.job_management import (
     ServiceJobCreate, ServiceJobUpdate, ServiceJobFileUpload,
     JobStatusUpdateCreate, JobMaterialUsageCreate, JobTimeLogCreate,
@@ -15,6 +16,12 @@ from ..schemas.job_management import (
     ProviderEquipmentCreate, JobTemplateCreate, JobSearchFilters
 )
 
+# Newest first; job_id breaks ties so the keyset order is total
+SERVICE_JOB_SORT_KEYS = [
+    SortKey.of(ServiceJob.created_at, descending=True),
+    SortKey(ServiceJob.job_id, descending=True),
+]
+
 # Service Job CRUD
 def get_service_job(db: Session, job_id: str) -> Optional[ServiceJob]:
     """Get a service job by ID"""
@@ -22,13 +29,27 @@ def get_service_job(db: Session, job_id: str) -> Optional[ServiceJob]:
 
 def get_service_jobs(
     db: Session,
-    skip: int = 0,
     limit: int = 20,
     filters: Optional[JobSearchFilters] = None,
     user_id: Optional[str] = None,
+    user_role: Optional[str] = None,
+    cursor: Optional[str] = None,
+    offset: int = 0
+) -> Tuple[List[ServiceJob], Optional[str]]:
+    """Get a page of service jobs, newest first; returns ``(jobs, next_cursor)``.
+
+    ``offset`` serves page-number requests and is ignored with a cursor.
+    """
+    query = service_jobs_query(db, filters, user_id, user_role)
+    return paginate(query, SERVICE_JOB_SORT_KEYS, limit, cursor, 0 if cursor else offset)
+
+def service_jobs_query(
+    db: Session,
+    filters: Optional[JobSearchFilters] = None,
+    user_id: Optional[str] = None,
     user_role: Optional[str] = None
-) -> List[ServiceJob]:
-    """Get service jobs with filtering and pagination"""
+):
+    """Service jobs visible to the user, with search filters applied"""
     query = db.query(ServiceJob)
     
     # Apply user-based filtering
@@ -101,7 +122,7 @@ def get_service_jobs(
                 )
             )
     
-    return query.order_by(desc(ServiceJob.created_at)).offset(skip).limit(limit).all()
+    return query
 
 def create_service_job(db: Session, job: ServiceJobCreate, job_id: str, customer_id: str) -> ServiceJob:
     """Create a new service job"""
@@ -181,39 +202,7 @@ def get_jobs_count(
     user_role: Optional[str] = None
 ) -> int:
     """Get total count of jobs matching filters"""
-    query = db.query(ServiceJob)
-    
-    # Apply user-based filtering
-    if user_role not in ["super_admin", "makerspace_admin"]:
-        query = query.filter(
-            or_(
-                ServiceJob.customer_id == user_id,
-                ServiceJob.assigned_provider_id == user_id
-            )
-        )
-    
-    # Apply filters if provided (same logic as get_service_jobs)
-    if filters:
-        if filters.status:
-            query = query.filter(ServiceJob.status.in_(filters.status))
-        
-        if filters.priority:
-            query = query.filter(ServiceJob.priority.in_(filters.priority))
-            
-        if filters.job_type:
-            query = query.filter(ServiceJob.job_type.in_(filters.job_type))
-            
-        if filters.search_query:
-            search_term = f"%{filters.search_query}%"
-            query = query.filter(
-                or_(
-                    ServiceJob.title.ilike(search_term),
-                    ServiceJob.description.ilike(search_term),
-                    ServiceJob.customer_name.ilike(search_term)
-                )
-            )
-    
-    return query.count()
+    return service_jobs_query(db, filters, user_id, user_role).count()
 
 # Job File CRUD
 def get_job_files(db: Session, job_id: str) -> List[ServiceJobFile]:
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, desc, asc
-from typing import List, Optional, Dict, Any
+from sqlalchemy import and_, or_, func, desc
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import uuid
 import secrets
@@ -9,6 +9,7 @@ from ..models.member import (
     Member, MembershipPlan, MemberInvite, MemberActivityLog, 
     MembershipTransaction, MemberRole, MemberStatus, InviteStatus
 )
+from ..utils.pagination import SortKey, paginate
 from ..schemas.member import (
     MemberCreate, MemberUpdate, MemberSuspend, MemberFilter, MemberSort,
     MembershipPlanCreate, MembershipPlanUpdate,
@@ -49,12 +50,12 @@ def get_member_by_keycloak_id(db: Session, keycloak_user_id: str) -> Optional[Me
 def get_members(
     db: Session, 
     user_id: str,
-    skip: int = 0, 
     limit: int = 100, 
     filters: Optional[MemberFilter] = None,
-    sort: Optional[MemberSort] = None
-) -> List[Member]:
-    """Get members with filtering and pagination"""
+    sort: Optional[MemberSort] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[Member], Optional[str]]:
+    """Get a page of members with filtering; returns ``(members, next_cursor)``"""
     query = db.query(Member).options(joinedload(Member.membership_plan))
     
     # Apply user access control
@@ -88,17 +89,13 @@ def get_members(
                 Member.skills.contains([filters.search])  # JSON contains
             ))
     
-    # Apply sorting
-    if sort:
-        sort_column = getattr(Member, sort.field, Member.created_at)
-        if sort.direction == "desc":
-            query = query.order_by(desc(sort_column))
-        else:
-            query = query.order_by(asc(sort_column))
-    else:
-        query = query.order_by(desc(Member.created_at))
-    
-    return query.offset(skip).limit(limit).all()
+    # Apply sorting; id breaks ties so the keyset order is total
+    sort = sort or MemberSort()
+    sort_field = sort.field if sort.field in Member.__table__.columns else "created_at"
+    sort_column = getattr(Member, sort_field)
+    descending = sort.direction == "desc"
+    keys = [SortKey.of(sort_column, descending), SortKey(Member.id, descending)]
+    return paginate(query, keys, limit, cursor)
 
 def create_member(db: Session, member: MemberCreate, created_by: str) -> Member:
     """Create a new member"""
@@ -1,10 +1,14 @@
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, func, text
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+import os
 import uuid
 
 from ..utils.github_service import GitHubService
+from ..utils.pagination import SortKey, paginate
+from ..utils.ttl_cache import TTLCache
+from ..services.github_sync import sync_project_activity
 
 from ..models.project import (
     Project, ProjectCollaborator, ProjectBOM, ProjectEquipmentReservation,
@@ -18,6 +22,13 @@ from ..schemas.project import (
     MilestoneCreate, MilestoneUpdate, ActivityLogCreate
 )
 
+# Per-user project access: project_id -> collaborator role. Collaborator
+# mutations below invalidate the affected users; the TTL bounds staleness
+# for changes made by other worker processes.
+PROJECT_ACCESS_CACHE_TTL_SECONDS = int(os.getenv("PROJECT_ACCESS_CACHE_TTL", "60"))
+EDIT_ROLES = frozenset({CollaboratorRole.EDITOR, CollaboratorRole.OWNER})
+_access_cache = TTLCache()
+
 # Project CRUD operations
 def create_project(db: Session, project: ProjectCreate, owner_id: str) -> Project:
     """Create a new project with initial milestones and collaborators"""
@@ -109,6 +120,9 @@ def create_project(db: Session, project: ProjectCreate, owner_id: str) -> Projec
         db.add(collab_activity)
 
     db.commit()
+    invalidate_project_access(
+        owner_id, *(collab.user_id for collab in project.initial_collaborators or [])
+    )
     db.refresh(db_project)
     return db_project
 
@@ -137,27 +151,31 @@ def get_project(db: Session, project_id: str, user_id: str = None) -> Optional[P
 def get_projects(
     db: Session, 
     user_id: str,
-    skip: int = 0, 
     limit: int = 100,
     filters: Optional[ProjectFilter] = None,
-    sort: Optional[ProjectSort] = None
-) -> List[Project]:
-    """Get projects with filtering and sorting"""
+    sort: Optional[ProjectSort] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[Project], Optional[str]]:
+    """Get a page of projects with filtering and sorting.
+
+    Returns ``(projects, next_cursor)``; pass ``next_cursor`` back to get the
+    following page.
+    """
     query = db.query(Project)
     
     # Apply user access control
     if user_id:
         # User can see: owned projects, collaborated projects, and public projects
-        accessible_projects = db.query(ProjectCollaborator.project_id).filter(
-            ProjectCollaborator.user_id == user_id
-        ).subquery()
-        
-        query = query.filter(
-            or_(
-                Project.project_id.in_(accessible_projects),
-                Project.visibility == ProjectVisibility.PUBLIC
+        accessible_project_ids = list(get_project_roles(db, user_id))
+        if accessible_project_ids:
+            query = query.filter(
+                or_(
+                    Project.project_id.in_(accessible_project_ids),
+                    Project.visibility == ProjectVisibility.PUBLIC
+                )
             )
-        )
+        else:
+            query = query.filter(Project.visibility == ProjectVisibility.PUBLIC)
     else:
         # Public access only
         query = query.filter(Project.visibility == ProjectVisibility.PUBLIC)
@@ -187,16 +205,14 @@ def get_projects(
                 )
             )
     
-    # Apply sorting
-    if sort:
-        if sort.direction == "asc":
-            query = query.order_by(getattr(Project, sort.field).asc())
-        else:
-            query = query.order_by(getattr(Project, sort.field).desc())
-    else:
-        query = query.order_by(Project.updated_at.desc())
-    
-    return query.offset(skip).limit(limit).all()
+    # Apply sorting; project_id breaks ties so the keyset order is total
+    sort = sort or ProjectSort()
+    descending = sort.direction != "asc"
+    keys = [
+        SortKey.of(getattr(Project, sort.field), descending),
+        SortKey(Project.project_id, descending),
+    ]
+    return paginate(query, keys, limit, cursor)
 
 def update_project(
     db: Session, 
@@ -248,8 +264,10 @@ def delete_project(db: Session, project_id: str, user_id: str) -> bool:
     if project.owner_id != user_id:
         return False
     
+    collaborator_ids = [collaborator.user_id for collaborator in project.collaborators]
     db.delete(project)
     db.commit()
+    invalidate_project_access(*collaborator_ids)
     return True
 
 # Collaborator CRUD operations
@@ -294,6 +312,7 @@ def add_collaborator(
     db.add(activity_log)
     
     db.commit()
+    invalidate_project_access(collaborator_data.user_id)
     db.refresh(collaborator)
     return collaborator
 
@@ -333,6 +352,7 @@ def update_collaborator_role(
     db.add(activity_log)
     
     db.commit()
+    invalidate_project_access(user_id)
     db.refresh(collaborator)
     return collaborator
 
@@ -375,6 +395,7 @@ def remove_collaborator(
     db.add(activity_log)
     
     db.commit()
+    invalidate_project_access(user_id)
     return True
 
 # BOM CRUD operations
@@ -590,29 +611,31 @@ def complete_milestone(
     return milestone
 
 # Utility functions
+def get_project_roles(db: Session, user_id: str) -> Dict[str, CollaboratorRole]:
+    """Map of project_id -> role for every project the user collaborates on"""
+    key = f"project_access:{user_id}"
+    roles = _access_cache.get(key)
+    if roles is None:
+        roles = dict(
+            db.query(ProjectCollaborator.project_id, ProjectCollaborator.role).filter(
+                ProjectCollaborator.user_id == user_id
+            ).all()
+        )
+        _access_cache.set(key, roles, PROJECT_ACCESS_CACHE_TTL_SECONDS)
+    return roles
+
+def invalidate_project_access(*user_ids: str) -> None:
+    """Drop cached access for users whose collaborator rows changed"""
+    for user_id in user_ids:
+        _access_cache.invalidate(f"project_access:{user_id}")
+
 def has_project_access(db: Session, project_id: str, user_id: str) -> bool:
     """Check if user has access to project"""
-    collaborator = db.query(ProjectCollaborator).filter(
-        and_(
-            ProjectCollaborator.project_id == project_id,
-            ProjectCollaborator.user_id == user_id
-        )
-    ).first()
-    return collaborator is not None
+    return project_id in get_project_roles(db, user_id)
 
 def has_project_edit_access(db: Session, project_id: str, user_id: str) -> bool:
     """Check if user has edit access to project"""
-    collaborator = db.query(ProjectCollaborator).filter(
-        and_(
-            ProjectCollaborator.project_id == project_id,
-            ProjectCollaborator.user_id == user_id
-        )
-    ).first()
-    
-    if not collaborator:
-        return False
-    
-    return collaborator.role in [CollaboratorRole.EDITOR, CollaboratorRole.OWNER]
+    return get_project_roles(db, user_id).get(project_id) in EDIT_ROLES
 
 def get_user_projects_summary(db: Session, user_id: str) -> Dict[str, int]:
     """Get summary statistics for user's projects"""
@@ -681,7 +704,7 @@ def connect_github_repo(db: Session, project_id: str, repo_url: str, access_toke
             description=f"Connected repository: {repo_info.full_name}",
             user_id=user_id,
             user_name="User",
-            metadata={
+            activity_metadata={
                 "repo_name": repo_info.full_name,
                 "repo_url": repo_url,
                 "default_branch": repo_info.default_branch,
@@ -718,7 +741,7 @@ def disconnect_github_repo(db: Session, project_id: str, user_id: str = None) ->
             description=f"Disconnected repository: {old_repo_name}",
             user_id=user_id,
             user_name="User",
-            metadata={
+            activity_metadata={
                 "repo_name": old_repo_name
             }
         )
@@ -728,135 +751,9 @@ def disconnect_github_repo(db: Session, project_id: str, user_id: str = None) ->
     db.refresh(project)
     return project
 
-def sync_github_activity(db: Session, project_id: str, limit: int = 50) -> List[ProjectActivityLog]:
-    """Sync recent GitHub activity for a project"""
-    project = db.query(Project).filter(Project.project_id == project_id).first()
-    if not project or not project.github_integration_enabled:
-        return []
-
-    github_service = GitHubService(project.github_access_token)
-    new_activities = []
-
-    try:
-        # Get recent commits
-        commits = github_service.get_commits(
-            project.github_repo_url,
-            project.github_default_branch,
-            per_page=min(limit // 3, 20)
-        )
-
-        for commit in commits:
-            # Check if activity already exists
-            existing = db.query(ProjectActivityLog).filter(
-                and_(
-                    ProjectActivityLog.project_id == project_id,
-                    ProjectActivityLog.activity_type == ActivityType.GITHUB_COMMIT_PUSHED,
-                    ProjectActivityLog.metadata["commit_sha"].astext == commit.sha
-                )
-            ).first()
-
-            if not existing:
-                activity_log = ProjectActivityLog(
-                    project_id=project_id,
-                    activity_type=ActivityType.GITHUB_COMMIT_PUSHED,
-                    title=f"Commit: {commit.message[:50]}{'...' if len(commit.message) > 50 else ''}",
-                    description=commit.message,
-                    user_id=commit.author_email,
-                    user_name=commit.author_name,
-                    created_at=commit.author_date,
-                    metadata={
-                        "commit_sha": commit.sha,
-                        "commit_url": commit.url,
-                        "added_files": commit.added_files,
-                        "modified_files": commit.modified_files,
-                        "removed_files": commit.removed_files
-                    }
-                )
-                db.add(activity_log)
-                new_activities.append(activity_log)
-
-        # Get recent pull requests
-        pull_requests = github_service.get_pull_requests(
-            project.github_repo_url,
-            per_page=min(limit // 3, 10)
-        )
-
-        for pr in pull_requests:
-            activity_type = ActivityType.GITHUB_PULL_REQUEST_OPENED
-            if pr.metadata.get("merged"):
-                activity_type = ActivityType.GITHUB_PULL_REQUEST_MERGED
-
-            # Check if activity already exists
-            existing = db.query(ProjectActivityLog).filter(
-                and_(
-                    ProjectActivityLog.project_id == project_id,
-                    ProjectActivityLog.activity_type == activity_type,
-                    ProjectActivityLog.metadata["pr_number"].astext == str(pr.metadata["number"])
-                )
-            ).first()
-
-            if not existing:
-                activity_log = ProjectActivityLog(
-                    project_id=project_id,
-                    activity_type=activity_type,
-                    title=pr.title,
-                    description=pr.description,
-                    user_id=pr.author,
-                    user_name=pr.author,
-                    created_at=pr.created_at,
-                    metadata={
-                        "pr_number": pr.metadata["number"],
-                        "pr_url": pr.url,
-                        "head_branch": pr.metadata["head_branch"],
-                        "base_branch": pr.metadata["base_branch"]
-                    }
-                )
-                db.add(activity_log)
-                new_activities.append(activity_log)
-
-        # Get recent issues
-        issues = github_service.get_issues(
-            project.github_repo_url,
-            per_page=min(limit // 3, 10)
-        )
-
-        for issue in issues:
-            activity_type = ActivityType.GITHUB_ISSUE_CREATED if issue.action == "open" else ActivityType.GITHUB_ISSUE_CLOSED
-
-            # Check if activity already exists
-            existing = db.query(ProjectActivityLog).filter(
-                and_(
-                    ProjectActivityLog.project_id == project_id,
-                    ProjectActivityLog.activity_type == activity_type,
-                    ProjectActivityLog.metadata["issue_number"].astext == str(issue.metadata["number"])
-                )
-            ).first()
-
-            if not existing:
-                activity_log = ProjectActivityLog(
-                    project_id=project_id,
-                    activity_type=activity_type,
-                    title=issue.title,
-                    description=issue.description,
-                    user_id=issue.author,
-                    user_name=issue.author,
-                    created_at=issue.created_at,
-                    metadata={
-                        "issue_number": issue.metadata["number"],
-                        "issue_url": issue.url,
-                        "labels": issue.metadata.get("labels", [])
-                    }
-                )
-                db.add(activity_log)
-                new_activities.append(activity_log)
-
-        db.commit()
-        return new_activities
-
-    except Exception as e:
-        print(f"Error syncing GitHub activity: {e}")
-        db.rollback()
-        return []
+async def sync_github_activity(db: Session, project_id: str, limit: int = 50) -> int:
+    """Sync GitHub activity newer than the project's last sync; returns rows added"""
+    return await sync_project_activity(db, project_id, limit)
 
 def get_github_files(db: Session, project_id: str, path: str = "", branch: str = None):
     """Get files from connected GitHub repository"""
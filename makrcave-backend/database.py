@@ -1,12 +1,20 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from typing import AsyncIterator, Optional
+import logging
 import os
+import time
 from dotenv import load_dotenv
 
+from utils.query_stats import instrument_engine
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Database configuration
 # Default to a clearly development-only SQLite database
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./makrcave_dev.db")
@@ -15,17 +23,197 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./makrcave_dev.db")
 # Only enable SQL logging in development for debugging
 enable_sql_logging = os.getenv("ENVIRONMENT", "production") == "development"
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=enable_sql_logging,  # Only log SQL queries in development
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    # Security: Hide connection details in logs
-    hide_parameters=not enable_sql_logging
-)
+# Connection pool tuning (ignored for SQLite, which uses its own pool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+def _engine_options(url: str) -> dict:
+    options = {
+        "echo": enable_sql_logging,  # Only log SQL queries in development
+        # Security: Hide connection details in logs
+        "hide_parameters": not enable_sql_logging,
+        "pool_pre_ping": True,
+    }
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    return options
+
+def _async_url(url: str) -> str:
+    """Map a sync driver URL onto its asyncio driver"""
+    if url.startswith("postgresql://") or url.startswith("postgres://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+instrument_engine(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for routes that must not block the event loop. It is created on
+# first use so deployments without an async driver still import this module.
+_async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL))
+        instrument_engine(_async_engine)
+        AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+# Optional read replica for analytics and report queries. Reads go to it only
+# while it answers and its replay lag is within REPLICA_MAX_LAG_SECONDS;
+# otherwise they fall back to the primary.
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+ASYNC_REPLICA_DATABASE_URL = os.getenv(
+    "ASYNC_REPLICA_DATABASE_URL", _async_url(REPLICA_DATABASE_URL) if REPLICA_DATABASE_URL else ""
+)
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+# How long a lag verdict is trusted before the replica is probed again
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "10"))
+# Whole seconds a replica connection may take, so an unreachable replica fails
+# the probe quickly instead of stalling the request that runs it
+REPLICA_CONNECT_TIMEOUT = int(os.getenv("REPLICA_CONNECT_TIMEOUT", "2"))
+
+def _replica_engine_options(url: str) -> dict:
+    options = _engine_options(url)
+    if url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {"timeout": REPLICA_CONNECT_TIMEOUT}
+    elif url.startswith("postgres"):
+        options["connect_args"] = {"connect_timeout": REPLICA_CONNECT_TIMEOUT}
+    return options
+
+replica_engine = (
+    create_engine(REPLICA_DATABASE_URL, **_replica_engine_options(REPLICA_DATABASE_URL))
+    if REPLICA_DATABASE_URL else None
+)
+if replica_engine is not None:
+    instrument_engine(replica_engine)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+_async_replica_engine: Optional[AsyncEngine] = None
+AsyncReplicaSessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+def get_async_replica_engine() -> Optional[AsyncEngine]:
+    global _async_replica_engine
+    if _async_replica_engine is None and ASYNC_REPLICA_DATABASE_URL:
+        _async_replica_engine = create_async_engine(
+            ASYNC_REPLICA_DATABASE_URL,
+            **_replica_engine_options(ASYNC_REPLICA_DATABASE_URL),
+        )
+        instrument_engine(_async_replica_engine)
+        AsyncReplicaSessionLocal.configure(bind=_async_replica_engine)
+    return _async_replica_engine
+
+# Seconds the replica is behind the primary. Zero on a primary, and zero when
+# every received WAL record is replayed, so an idle primary doesn't read as lag.
+_POSTGRES_REPLICA_LAG = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+class ReplicaHealth:
+    """Cached verdict on whether a replica is fresh enough to read from"""
+
+    def __init__(self, max_lag_seconds: float = REPLICA_MAX_LAG_SECONDS,
+                 check_interval: float = REPLICA_LAG_CHECK_INTERVAL):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.usable = False
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._checked_at: Optional[float] = None
+
+    def claim_check(self) -> bool:
+        """True if the verdict is stale; the caller then probes and records.
+
+        The timestamp moves forward on claim, so concurrent readers keep using
+        the current verdict instead of all probing at once.
+        """
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        return True
+
+    def record(self, lag_seconds: Optional[float], error: Optional[str] = None) -> bool:
+        usable = error is None and lag_seconds is not None and lag_seconds <= self.max_lag_seconds
+        if usable != self.usable:
+            if usable:
+                logger.info(f"Read replica back in rotation (lag {lag_seconds:.1f}s)")
+            else:
+                logger.warning(
+                    f"Read replica out of rotation, reads fall back to primary "
+                    f"(lag={lag_seconds}, error={error})"
+                )
+        self.usable = usable
+        self.lag_seconds = lag_seconds
+        self.last_error = error
+        return usable
+
+    def status(self) -> dict:
+        return {
+            "usable": self.usable,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "last_error": self.last_error,
+        }
+
+replica_health = ReplicaHealth()
+async_replica_health = ReplicaHealth()
+
+def replica_is_usable() -> bool:
+    """Probe the replica at most once per check interval"""
+    if replica_engine is None:
+        return False
+    if not replica_health.claim_check():
+        return replica_health.usable
+    try:
+        with replica_engine.connect() as conn:
+            lag = conn.execute(_POSTGRES_REPLICA_LAG).scalar() if conn.dialect.name == "postgresql" else 0
+        return replica_health.record(float(lag or 0))
+    except Exception as e:
+        return replica_health.record(None, str(e))
+
+async def async_replica_is_usable() -> bool:
+    try:
+        engine = get_async_replica_engine()
+    except Exception as e:  # Async driver missing or URL unusable
+        return async_replica_health.record(None, str(e))
+    if engine is None:
+        return False
+    if not async_replica_health.claim_check():
+        return async_replica_health.usable
+    try:
+        async with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                lag = (await conn.execute(_POSTGRES_REPLICA_LAG)).scalar()
+            else:
+                lag = 0
+        return async_replica_health.record(float(lag or 0))
+    except Exception as e:
+        return async_replica_health.record(None, str(e))
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -37,6 +225,57 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency yielding an AsyncSession for non-blocking routes.
+
+    Existing sync CRUD code can run on it unchanged, without blocking the
+    loop, via ``await db.run_sync(crud_function, *args)``. This is the
+    migration path for routes that are not yet written with ``select()``.
+    """
+    get_async_engine()
+    async with AsyncSessionLocal() as session:
+        yield session
+
+def get_read_db():
+    """Dependency for analytics/report reads: the replica when fresh, else primary.
+
+    Only for read-only work that tolerates REPLICA_MAX_LAG_SECONDS of
+    staleness. Anything that writes, or must see its own writes, uses get_db.
+    """
+    db = ReplicaSessionLocal() if replica_is_usable() else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db() -> AsyncIterator[AsyncSession]:
+    """Async counterpart of get_read_db"""
+    if await async_replica_is_usable():
+        session_factory = AsyncReplicaSessionLocal
+    else:
+        get_async_engine()
+        session_factory = AsyncSessionLocal
+    async with session_factory() as session:
+        yield session
+
+def replica_status() -> dict:
+    """Replica routing state for health checks"""
+    return {
+        "configured": replica_engine is not None,
+        "sync": replica_health.status(),
+        "async": async_replica_health.status(),
+    }
+
+async def dispose_engines() -> None:
+    """Close pooled connections on shutdown"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _async_replica_engine is not None:
+        await _async_replica_engine.dispose()
+    engine.dispose()
+    if replica_engine is not None:
+        replica_engine.dispose()
+
 # Initialize database tables
 def init_db():
     """Initialize database tables"""
@@ -52,3 +291,7 @@ def reset_db():
 def get_db_session():
     """Get a database session for scripts/utilities"""
     return SessionLocal()
+
+def get_read_session():
+    """Read-only session for background reporting: replica when fresh, else primary"""
+    return ReplicaSessionLocal() if replica_is_usable() else SessionLocal()
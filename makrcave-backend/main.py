@@ -2,11 +2,13 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
+import asyncio
 import os
 
 # Import security middleware
 from middleware.security import add_security_middleware
 from middleware.error_handling import ErrorHandlingMiddleware
+from utils.sampling_profiler import PROFILER_REQUEST_SAMPLE_N, ProfilingMiddleware, profiler
 
 from routes import api_router
 
@@ -59,6 +61,10 @@ add_security_middleware(app)
 # Add unified error handling middleware
 app.add_middleware(ErrorHandlingMiddleware)
 
+# Opt-in request profiling: one request in PROFILER_REQUEST_SAMPLE_N is sampled
+if PROFILER_REQUEST_SAMPLE_N > 0:
+    app.add_middleware(ProfilingMiddleware, profiler=profiler, every_n=PROFILER_REQUEST_SAMPLE_N)
+
 # Global exception handler (fallback)
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -70,11 +76,36 @@ async def global_exception_handler(request, exc):
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "makrcave-backend"}
+    from database import replica_status
+    return {"status": "healthy", "service": "makrcave-backend", "read_replica": replica_status()}
 
 # Include routers
 app.include_router(api_router)
 
+# Let request sampling label stacks by the route whose handler they run in
+profiler.register_routes(app.routes)
+
+# Background jobs. Analytics rollups and GitHub activity sync should run on a
+# single worker per deployment, so the schedulers are opt-in.
+@app.on_event("startup")
+async def start_background_jobs():
+    if os.getenv("ANALYTICS_SNAPSHOTS_ENABLED", "false").lower() == "true":
+        from services.analytics_snapshots import run_snapshot_scheduler
+        app.state.analytics_snapshot_task = asyncio.create_task(run_snapshot_scheduler())
+    if os.getenv("GITHUB_SYNC_ENABLED", "false").lower() == "true":
+        from services.github_sync import run_github_sync_scheduler
+        app.state.github_sync_task = asyncio.create_task(run_github_sync_scheduler())
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    for name in ("analytics_snapshot_task", "github_sync_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    profiler.shutdown()
+    from database import dispose_engines
+    await dispose_engines()
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -13,6 +13,7 @@ from collections import defaultdict
 from fastapi import HTTPException, Request, status
 from fastapi.middleware.base import BaseHTTPMiddleware
 from security import get_request_context
+from utils import query_stats
 
 logger = logging.getLogger(__name__)
 
@@ -167,7 +168,12 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 )
                 break
 
-        response = await call_next(request)
+        # Charge every statement this request runs to its request ID
+        db_stats, db_token = query_stats.begin_request(request_id)
+        try:
+            response = await call_next(request)
+        finally:
+            query_stats.end_request(db_token)
 
         process_time = time.time() - start_time
         ctx = get_request_context()
@@ -177,7 +183,14 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             groups = ctx.get("groups", [])
             logger.info(
                 f"[{request_id}] Response: {response.status_code} for {method} {path} "
-                f"in {process_time:.3f}s sub={sub} roles={roles} groups={len(groups)}"
+                f"in {process_time:.3f}s db={db_stats.count}q/{db_stats.total_ms:.1f}ms "
+                f"sub={sub} roles={roles} groups={len(groups)}"
+            )
+        if db_stats.total_ms > query_stats.DB_QUERY_SLO_MS:
+            logger.warning(
+                f"[{request_id}] DB time {db_stats.total_ms:.1f}ms over "
+                f"{query_stats.DB_QUERY_SLO_MS:.0f}ms budget ({db_stats.count} queries) - "
+                f"{method} {path}"
             )
 
         if response.status_code == 401:
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, JSON, Text, Boolean, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, DateTime, JSON, Text, Boolean, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -48,6 +48,12 @@ class UsageEvent(Base):
     duration_minutes = Column(Integer, nullable=True)  # For time-based events
     metadata = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Serves keyset pages of a makerspace's events, newest first
+        Index("ix_usage_events_makerspace_timestamp", "makerspace_id", "timestamp", "id"),
+    )
 
     def __repr__(self):
         return f"<UsageEvent(id={self.id}, type={self.event_type}, user={self.user_id})>"
@@ -68,6 +74,38 @@ class AnalyticsSnapshot(Base):
     def __repr__(self):
         return f"<AnalyticsSnapshot(id={self.id}, type={self.snapshot_type}, period={self.time_period})>"
 
+class AnalyticsRollup(Base):
+    """Pre-aggregated per-makerspace metrics for one hourly or daily bucket.
+
+    Written by services.analytics_snapshots and read by RealAnalyticsService so
+    dashboards scan a bounded number of rollup rows instead of raw history.
+    """
+    __tablename__ = "analytics_rollups"
+    __table_args__ = (
+        UniqueConstraint("makerspace_id", "granularity", "bucket_start", name="uq_analytics_rollup_bucket"),
+        Index("ix_analytics_rollups_lookup", "makerspace_id", "granularity", "bucket_start"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    makerspace_id = Column(UUID(as_uuid=True), ForeignKey("makerspaces.id"), nullable=False)
+    granularity = Column(String(10), nullable=False)  # 'hourly', 'daily'
+    bucket_start = Column(DateTime, nullable=False)
+    activity_count = Column(Integer, default=0, nullable=False)
+    unique_members = Column(Integer, default=0, nullable=False)  # Distinct within the bucket only
+    checkins = Column(Integer, default=0, nullable=False)
+    equipment_sessions = Column(Integer, default=0, nullable=False)
+    equipment_hours = Column(Float, default=0.0, nullable=False)
+    revenue = Column(Float, default=0.0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+    safety_incidents = Column(Integer, default=0, nullable=False)
+    hourly_activity = Column(JSON, nullable=True)  # {"14": 37, ...}
+    revenue_by_category = Column(JSON, nullable=True)  # {"membership": [revenue, count], ...}
+    equipment_usage = Column(JSON, nullable=True)  # {"<equipment_id>": [sessions, hours], ...}
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<AnalyticsRollup(makerspace={self.makerspace_id}, {self.granularity}@{self.bucket_start})>"
+
 class ReportRequest(Base):
     __tablename__ = "report_requests"
     
@@ -104,6 +142,7 @@ class EquipmentUsageLog(Base):
     maintenance_required = Column(Boolean, default=False)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f"<EquipmentUsageLog(id={self.id}, equipment={self.equipment_id}, duration={self.duration_minutes})>"
@@ -125,6 +164,7 @@ class InventoryAnalytics(Base):
     consumption_rate = Column(Float, nullable=True)  # Units per day
     projects_using = Column(Integer, default=0)  # Number of projects that used this item
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f"<InventoryAnalytics(id={self.id}, item={self.inventory_item_id}, date={self.date})>"
@@ -167,6 +207,7 @@ class RevenueAnalytics(Base):
     tax_amount = Column(Float, nullable=True)
     net_amount = Column(Float, nullable=True)  # After fees and taxes
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f"<RevenueAnalytics(id={self.id}, type={self.revenue_type}, amount={self.amount})>"
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, String, Text, DateTime, Boolean, ForeignKey, Integer, Float, JSON, Enum
+from sqlalchemy import Column, String, Text, DateTime, Boolean, ForeignKey, Integer, Float, JSON, Enum, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
-from ..database import Base
+from database import Base
 
 class ProjectStatus(str, enum.Enum):
     DRAFT = "draft"
@@ -273,6 +273,9 @@ class ProjectMilestone(Base):
 
 class ProjectActivityLog(Base):
     __tablename__ = "project_activity_logs"
+    __table_args__ = (
+        UniqueConstraint("project_id", "activity_type", "external_id", name="uq_project_activity_external"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     project_id = Column(String(100), ForeignKey("projects.project_id"), nullable=False)
@@ -281,9 +284,11 @@ class ProjectActivityLog(Base):
     activity_type = Column(Enum(ActivityType), nullable=False)
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
+    external_id = Column(String(100), nullable=True)  # Commit SHA or PR/issue number for synced activity
     
     # Activity data (JSON for flexibility)
-    metadata = Column(JSON, nullable=True)  # Store additional context about the activity
+    # Attribute renamed because Declarative reserves ``metadata``; the column keeps its name
+    activity_metadata = Column("metadata", JSON, nullable=True)  # Store additional context about the activity
     
     # User and timing
     user_id = Column(String(100), nullable=False)
@@ -293,6 +298,22 @@ class ProjectActivityLog(Base):
     # Relationships
     project = relationship("Project", back_populates="activity_logs")
 
+class ProjectGitHubSyncState(Base):
+    """Per-project high-water marks for incremental GitHub activity sync"""
+    __tablename__ = "project_github_sync_state"
+
+    project_id = Column(String(100), ForeignKey("projects.project_id"), primary_key=True)
+
+    # Newest item already recorded, per activity kind
+    last_commit_sha = Column(String(64), nullable=True)
+    last_commit_at = Column(DateTime(timezone=True), nullable=True)
+    last_pr_updated_at = Column(DateTime(timezone=True), nullable=True)
+    last_issue_updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Sync bookkeeping
+    last_synced_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
 class ProjectTeamRole(Base):
     """Custom team roles for projects beyond basic collaborator roles"""
     __tablename__ = "project_team_roles"
@@ -116,6 +116,14 @@ api_router.include_router(
     dependencies=[Depends(get_current_user), Depends(require_roles(["super_admin", "makerspace_admin"]))],
 )
 
+from .diagnostics import router as diagnostics_router
+api_router.include_router(
+    diagnostics_router,
+    prefix="/api/v1/diagnostics",
+    tags=["diagnostics"],
+    dependencies=[Depends(get_current_user), Depends(require_roles(["super_admin"]))],
+)
+
 from .enhanced_analytics import router as enhanced_analytics_router
 api_router.include_router(
     enhanced_analytics_router,
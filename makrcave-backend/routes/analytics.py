@@ -1,14 +1,22 @@
 """Analytics API routes with real database integration"""
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
 import logging
+import os
 
-from database import get_db
-from dependencies import get_current_user, get_current_makerspace, require_permission
-from services.real_analytics_service import get_real_analytics_service
+from database import get_async_db, get_async_read_db, get_db, get_read_db
+from dependencies import get_current_user, get_current_makerspace, require_permission, require_roles
+from services.real_analytics_service import get_async_analytics_service
 from utils.analytics_mock_data import AnalyticsMockData  # Fallback only
+from utils.report_generator import ReportGenerator, REPORT_RENDERERS
+from crud.analytics import AnalyticsCRUD
+from schemas.analytics import ReportRequestCreate, ReportRequestResponse
+from services.report_jobs import get_report_job_service
+from services.analytics_snapshots import AnalyticsSnapshotEngine
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -18,23 +26,23 @@ mock_data = AnalyticsMockData()
 
 @router.get("/overview")
 async def get_analytics_overview(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user = Depends(get_current_user),
     makerspace = Depends(get_current_makerspace),
     _: bool = Depends(require_permission("analytics:read"))
 ):
     """Get analytics overview with real database data"""
     try:
-        analytics_service = get_real_analytics_service(db)
+        analytics_service = get_async_analytics_service(db)
         
         # Get real-time analytics (last 24 hours)
-        real_time_data = analytics_service.get_real_time_analytics(makerspace.id, hours=24)
+        real_time_data = await analytics_service.get_real_time_analytics(makerspace.id, hours=24)
         
         # Get usage analytics (last 30 days)
-        usage_data = analytics_service.get_usage_analytics(makerspace.id, days=30)
+        usage_data = await analytics_service.get_usage_analytics(makerspace.id, days=30)
         
         # Get revenue analytics (last 30 days)
-        revenue_data = analytics_service.get_revenue_analytics(makerspace.id, days=30)
+        revenue_data = await analytics_service.get_revenue_analytics(makerspace.id, days=30)
         
         # Combine into overview format
         overview = {
@@ -69,15 +77,15 @@ async def get_analytics_overview(
 async def get_usage_analytics(
     period: str = Query("daily", description="Period: daily, weekly, monthly"),
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user = Depends(get_current_user),
     makerspace = Depends(get_current_makerspace),
     _: bool = Depends(require_permission("analytics:read"))
 ):
     """Get detailed usage analytics"""
     try:
-        analytics_service = get_real_analytics_service(db)
-        usage_data = analytics_service.get_usage_analytics(makerspace.id, days=days)
+        analytics_service = get_async_analytics_service(db)
+        usage_data = await analytics_service.get_usage_analytics(makerspace.id, days=days)
         
         return {
             "success": True,
@@ -97,15 +105,15 @@ async def get_usage_analytics(
 @router.get("/revenue")
 async def get_revenue_analytics(
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user = Depends(get_current_user),
     makerspace = Depends(get_current_makerspace),
     _: bool = Depends(require_permission("analytics:read"))
 ):
     """Get revenue and financial analytics"""
     try:
-        analytics_service = get_real_analytics_service(db)
-        revenue_data = analytics_service.get_revenue_analytics(makerspace.id, days=days)
+        analytics_service = get_async_analytics_service(db)
+        revenue_data = await analytics_service.get_revenue_analytics(makerspace.id, days=days)
         
         return {
             "success": True,
@@ -124,15 +132,15 @@ async def get_revenue_analytics(
 @router.get("/equipment")
 async def get_equipment_analytics(
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user = Depends(get_current_user),
     makerspace = Depends(get_current_makerspace),
     _: bool = Depends(require_permission("analytics:read"))
 ):
     """Get equipment utilization and maintenance analytics"""
     try:
-        analytics_service = get_real_analytics_service(db)
-        equipment_data = analytics_service.get_equipment_analytics(makerspace.id, days=days)
+        analytics_service = get_async_analytics_service(db)
+        equipment_data = await analytics_service.get_equipment_analytics(makerspace.id, days=days)
         
         return {
             "success": True,
@@ -151,15 +159,15 @@ async def get_equipment_analytics(
 @router.get("/members")
 async def get_member_analytics(
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user = Depends(get_current_user),
     makerspace = Depends(get_current_makerspace),
     _: bool = Depends(require_permission("analytics:read"))
 ):
     """Get member engagement and skill analytics"""
     try:
-        analytics_service = get_real_analytics_service(db)
-        member_data = analytics_service.get_member_analytics(makerspace.id, days=days)
+        analytics_service = get_async_analytics_service(db)
+        member_data = await analytics_service.get_member_analytics(makerspace.id, days=days)
         
         return {
             "success": True,
@@ -178,15 +186,15 @@ async def get_member_analytics(
 @router.get("/safety")
 async def get_safety_analytics(
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user = Depends(get_current_user),
     makerspace = Depends(get_current_makerspace),
     _: bool = Depends(require_permission("analytics:read"))
 ):
     """Get safety and incident analytics"""
     try:
-        analytics_service = get_real_analytics_service(db)
-        safety_data = analytics_service.get_safety_analytics(makerspace.id, days=days)
+        analytics_service = get_async_analytics_service(db)
+        safety_data = await analytics_service.get_safety_analytics(makerspace.id, days=days)
         
         return {
             "success": True,
@@ -205,15 +213,15 @@ async def get_safety_analytics(
 @router.get("/real-time")
 async def get_realtime_analytics(
     hours: int = Query(24, ge=1, le=168, description="Hours to look back"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user),
     makerspace = Depends(get_current_makerspace),
     _: bool = Depends(require_permission("analytics:read"))
 ):
     """Get real-time analytics data"""
     try:
-        analytics_service = get_real_analytics_service(db)
-        realtime_data = analytics_service.get_real_time_analytics(makerspace.id, hours=hours)
+        analytics_service = get_async_analytics_service(db)
+        realtime_data = await analytics_service.get_real_time_analytics(makerspace.id, hours=hours)
         
         return {
             "success": True,
@@ -234,23 +242,23 @@ async def get_trend_analysis(
     metric: str = Query("revenue", description="Metric to analyze: revenue, usage, members"),
     period: str = Query("daily", description="Period: daily, weekly, monthly"),
     days: int = Query(90, ge=7, le=365, description="Days to analyze"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user = Depends(get_current_user),
     makerspace = Depends(get_current_makerspace),
     _: bool = Depends(require_permission("analytics:read"))
 ):
     """Get trend analysis for specific metrics"""
     try:
-        analytics_service = get_real_analytics_service(db)
+        analytics_service = get_async_analytics_service(db)
         
         if metric == "revenue":
-            data = analytics_service.get_revenue_analytics(makerspace.id, days=days)
+            data = await analytics_service.get_revenue_analytics(makerspace.id, days=days)
             trend_data = data.get("daily_trends", [])
         elif metric == "usage":
-            data = analytics_service.get_usage_analytics(makerspace.id, days=days)
+            data = await analytics_service.get_usage_analytics(makerspace.id, days=days)
             trend_data = data.get("daily_trends", [])
         elif metric == "members":
-            data = analytics_service.get_member_analytics(makerspace.id, days=days)
+            data = await analytics_service.get_member_analytics(makerspace.id, days=days)
             trend_data = data.get("daily_trends", [])
         else:
             raise HTTPException(status_code=400, detail="Invalid metric")
@@ -290,30 +298,30 @@ async def export_analytics(
     format: str = Query("json", description="Export format: json, csv"),
     metrics: str = Query("all", description="Metrics to export: all, revenue, usage, equipment, members, safety"),
     days: int = Query(30, ge=1, le=365, description="Days to export"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user = Depends(get_current_user),
     makerspace = Depends(get_current_makerspace),
     _: bool = Depends(require_permission("analytics:export"))
 ):
     """Export analytics data in various formats"""
     try:
-        analytics_service = get_real_analytics_service(db)
+        analytics_service = get_async_analytics_service(db)
         export_data = {}
         
         if metrics == "all" or "revenue" in metrics:
-            export_data["revenue"] = analytics_service.get_revenue_analytics(makerspace.id, days=days)
+            export_data["revenue"] = await analytics_service.get_revenue_analytics(makerspace.id, days=days)
         
         if metrics == "all" or "usage" in metrics:
-            export_data["usage"] = analytics_service.get_usage_analytics(makerspace.id, days=days)
+            export_data["usage"] = await analytics_service.get_usage_analytics(makerspace.id, days=days)
         
         if metrics == "all" or "equipment" in metrics:
-            export_data["equipment"] = analytics_service.get_equipment_analytics(makerspace.id, days=days)
+            export_data["equipment"] = await analytics_service.get_equipment_analytics(makerspace.id, days=days)
         
         if metrics == "all" or "members" in metrics:
-            export_data["members"] = analytics_service.get_member_analytics(makerspace.id, days=days)
+            export_data["members"] = await analytics_service.get_member_analytics(makerspace.id, days=days)
         
         if metrics == "all" or "safety" in metrics:
-            export_data["safety"] = analytics_service.get_safety_analytics(makerspace.id, days=days)
+            export_data["safety"] = await analytics_service.get_safety_analytics(makerspace.id, days=days)
         
         export_data["metadata"] = {
             "makerspace_id": makerspace.id,
@@ -336,3 +344,119 @@ async def export_analytics(
     except Exception as e:
         logger.error(f"Analytics export error: {e}")
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
+@router.get("/export/usage.csv")
+async def export_usage_events_csv(
+    start_date: date = Query(..., description="First day to include"),
+    end_date: date = Query(..., description="Last day to include"),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+    makerspace = Depends(get_current_makerspace),
+    _: bool = Depends(require_permission("analytics:export"))
+):
+    """Stream raw usage events as CSV without buffering the export in memory"""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+
+    report_generator = ReportGenerator(db)
+    filename = f"usage_report_{makerspace.id}_{start_date}_{end_date}.csv"
+    return StreamingResponse(
+        report_generator.iter_usage_report_csv(makerspace.id, start_date, end_date),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.post("/reports", response_model=ReportRequestResponse, status_code=status.HTTP_202_ACCEPTED)
+async def request_report(
+    report_request: ReportRequestCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+    makerspace = Depends(get_current_makerspace),
+    _: bool = Depends(require_permission("analytics:export"))
+):
+    """Queue a report for background rendering, or serve it from the artifact cache"""
+    renderer = REPORT_RENDERERS.get(report_request.report_type)
+    if not renderer or renderer[1] != report_request.report_format.value:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported report: {report_request.report_type} as {report_request.report_format.value}"
+        )
+
+    end_date = report_request.end_date or date.today()
+    start_date = report_request.start_date or (end_date - timedelta(days=30))
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    report_request.start_date, report_request.end_date = start_date, end_date
+
+    analytics_crud = AnalyticsCRUD(db)
+    db_request = analytics_crud.create_report_request(str(makerspace.id), str(current_user.id), report_request)
+
+    try:
+        get_report_job_service().submit(
+            db, str(db_request.id), str(makerspace.id), report_request.report_type, start_date, end_date
+        )
+    except Exception as e:
+        logger.error(f"Report submission error: {e}")
+        analytics_crud.update_report_status(str(db_request.id), "failed", error_message=str(e))
+
+    db.refresh(db_request)
+    return db_request
+
+@router.get("/reports/{request_id}", response_model=ReportRequestResponse)
+async def get_report_status(
+    request_id: str,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+    makerspace = Depends(get_current_makerspace),
+    _: bool = Depends(require_permission("analytics:export"))
+):
+    """Get the status of a queued report"""
+    report = AnalyticsCRUD(db).get_report_request(request_id, str(makerspace.id))
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return report
+
+@router.get("/reports/{request_id}/download")
+async def download_report(
+    request_id: str,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+    makerspace = Depends(get_current_makerspace),
+    _: bool = Depends(require_permission("analytics:export"))
+):
+    """Download a rendered report"""
+    report = AnalyticsCRUD(db).get_report_request(request_id, str(makerspace.id))
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    if report.status != "completed" or not report.file_url:
+        raise HTTPException(status_code=409, detail="Report file not ready")
+    if not os.path.exists(report.file_url):
+        # Artifact was evicted from the report cache; request it again
+        raise HTTPException(status_code=410, detail="Report file expired")
+
+    return FileResponse(
+        path=report.file_url,
+        filename=f"{report.report_type}_report_{request_id}.{report.report_format}",
+        media_type="application/octet-stream"
+    )
+
+@router.post("/snapshots/refresh")
+async def refresh_analytics_snapshots(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+    makerspace = Depends(get_current_makerspace),
+    _: dict = Depends(require_roles(["super_admin", "makerspace_admin"]))
+):
+    """Bring this makerspace's hourly and daily analytics rollups up to date"""
+    engine = AnalyticsSnapshotEngine(db)
+    try:
+        written = {
+            granularity: engine.refresh(str(makerspace.id), granularity)
+            for granularity in ("hourly", "daily")
+        }
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Analytics snapshot refresh error: {e}")
+        raise HTTPException(status_code=500, detail=f"Snapshot refresh failed: {str(e)}")
+
+    return {"success": True, "buckets_written": written}
@@ -8,7 +8,7 @@ import os
 import io
 from datetime import datetime, timedelta
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..dependencies import get_current_user
 from ..schemas.billing import (
     TransactionCreate, TransactionUpdate, TransactionResponse,
@@ -588,7 +588,7 @@ async def get_billing_analytics(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get billing analytics"""
     if not _can_view_analytics(current_user):
@@ -13,7 +13,7 @@ import os
 from pydantic import BaseModel, Field
 from uuid import UUID
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models.project import Project, BOMItem
 from ..models.member import Member
 from ..schemas.project import BOMItemResponse
@@ -68,7 +68,7 @@ async def export_bom_to_cart(
     project_id: UUID,
     export_request: BOMExportRequest,
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Export BOM items to MakrX Store cart
@@ -313,7 +313,7 @@ async def notify_export_completion(
 @router.get("/{project_id}/bom/export/preview")
 async def preview_bom_export(
     project_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Preview what would be exported from BOM to Store cart
@@ -0,0 +1,54 @@
+"""Runtime diagnostics for platform administrators: query insights and profiling"""
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Any, Dict
+
+from utils.query_stats import query_insights
+from utils.sampling_profiler import PROFILER_MAX_SECONDS, ProfilerBusy, profiler
+
+router = APIRouter()
+
+@router.get("/queries")
+async def get_query_insights() -> Dict[str, Any]:
+    """Recent slow statements with their plans, and N+1 patterns, newest first"""
+    return query_insights.snapshot()
+
+@router.delete("/queries")
+async def clear_query_insights() -> Dict[str, Any]:
+    """Empty the slow-query and N+1 buffers, e.g. after shipping a fix"""
+    query_insights.clear()
+    return {"success": True}
+
+@router.get("/profiler")
+async def get_profiler_status() -> Dict[str, Any]:
+    """Current profiling session, sample counts and measured overhead"""
+    return profiler.status()
+
+@router.post("/profiler/start")
+async def start_profiler(
+    mode: str = Query("wall", regex="^(wall|cpu)$", description="wall: every sample; cpu: skip idle waits"),
+    duration_seconds: float = Query(60, gt=0, le=PROFILER_MAX_SECONDS),
+) -> Dict[str, Any]:
+    """Start a sampling session; it stops on its own after ``duration_seconds``"""
+    try:
+        return profiler.start(mode=mode, duration_seconds=duration_seconds)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/profiler/stop")
+async def stop_profiler() -> Dict[str, Any]:
+    return profiler.stop()
+
+@router.get("/profiler/collapsed", response_class=PlainTextResponse)
+async def export_profile(
+    source: str = Query("session", regex="^(session|requests)$"),
+    clear: bool = Query(False, description="Reset the request profile after export"),
+):
+    """Collapsed stacks for flamegraph.pl or speedscope"""
+    collapsed = profiler.collapsed(source)
+    if clear and source == "requests":
+        profiler.clear_requests()
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": f"attachment; filename=makrcave-{source}.collapsed"}
+    )
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, status
 from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta, date
 import uuid
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..dependencies import get_current_user
 from ..schemas.enhanced_analytics import (
     EnhancedUsageMetricsCreate, EnhancedUsageMetricsResponse,
@@ -57,7 +58,7 @@ async def get_usage_metrics(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get usage metrics with filtering"""
     if not _has_analytics_permission(current_user, "read"):
@@ -76,7 +77,7 @@ async def get_usage_metrics(
 async def get_usage_summary(
     period: AggregationPeriod = AggregationPeriod.WEEKLY,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get usage metrics summary"""
     if not _has_analytics_permission(current_user, "read"):
@@ -123,7 +124,7 @@ async def get_equipment_utilization(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get equipment utilization metrics"""
     if not _has_analytics_permission(current_user, "read"):
@@ -141,7 +142,7 @@ async def get_equipment_utilization(
 @router.get("/equipment-utilization/summary")
 async def get_equipment_utilization_summary(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get equipment utilization summary"""
     if not _has_analytics_permission(current_user, "read"):
@@ -187,7 +188,7 @@ async def get_revenue_analytics(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get revenue analytics with filtering"""
     if not _has_analytics_permission(current_user, "read"):
@@ -206,7 +207,7 @@ async def get_revenue_analytics(
 async def get_revenue_summary(
     period: AggregationPeriod = AggregationPeriod.MONTHLY,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get revenue analytics summary"""
     if not _has_analytics_permission(current_user, "read"):
@@ -253,7 +254,7 @@ async def get_engagement_metrics(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get member engagement metrics"""
     if not _has_analytics_permission(current_user, "read"):
@@ -271,7 +272,7 @@ async def get_engagement_metrics(
 @router.get("/engagement-metrics/summary")
 async def get_engagement_summary(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get member engagement summary"""
     if not _has_analytics_permission(current_user, "read"):
@@ -386,7 +387,7 @@ async def get_performance_benchmarks(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get performance benchmarks"""
     if not _has_analytics_permission(current_user, "read"):
@@ -406,7 +407,7 @@ async def get_performance_benchmarks(
 async def get_comprehensive_dashboard(
     refresh_cache: bool = Query(False),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get comprehensive analytics dashboard"""
     if not _has_analytics_permission(current_user, "read"):
@@ -417,8 +418,9 @@ async def get_comprehensive_dashboard(
     
     try:
         makerspace_id = _get_user_makerspace_id(current_user)
-        dashboard = crud_analytics.get_comprehensive_dashboard(
-            db, makerspace_id, refresh_cache
+        # Section assembly blocks on worker threads; keep it off the event loop
+        dashboard = await run_in_threadpool(
+            crud_analytics.get_comprehensive_dashboard, db, makerspace_id, refresh_cache
         )
         return dashboard
     except Exception as e:
@@ -432,7 +434,7 @@ async def get_comprehensive_dashboard(
 async def execute_analytics_query(
     query: AnalyticsQuery,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Execute custom analytics query"""
     if not _has_analytics_permission(current_user, "query"):
@@ -456,7 +458,7 @@ async def execute_analytics_query(
 async def generate_forecast(
     forecast_request: ForecastRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Generate predictive forecast"""
     if not _has_analytics_permission(current_user, "forecast"):
@@ -8,6 +8,7 @@ from datetime import datetime
 from .. import models
 from ..database import get_db
 from ..dependencies import get_current_user
+from ..crud.project import invalidate_project_access
 from ..schemas.project import (
     ProjectForkCreate, ProjectForkResponse, ProjectCommentCreate, ProjectCommentResponse,
     BOMOrderCreate, BOMOrderResponse, ProjectTeamRoleCreate, ProjectTeamRoleResponse,
@@ -214,11 +215,12 @@ async def fork_project(
         description=f"Project forked by {current_user.get('user_name', 'Unknown User')} as '{fork_data.new_project_name}'",
         user_id=current_user["user_id"],
         user_name=current_user.get("user_name", "Unknown User"),
-        metadata={"forked_project_id": new_project_id}
+        activity_metadata={"forked_project_id": new_project_id}
     )
     db.add(activity_log)
     
     db.commit()
+    invalidate_project_access(current_user["user_id"])
     db.refresh(fork_record)
     return fork_record
 
@@ -418,7 +420,7 @@ async def create_bom_order(
         description=f"Ordered {order_data.quantity_ordered}x {bom_item.item_name}",
         user_id=current_user["user_id"],
         user_name=current_user.get("user_name", "Unknown User"),
-        metadata={"order_id": order.id, "quantity": order_data.quantity_ordered}
+        activity_metadata={"order_id": order.id, "quantity": order_data.quantity_ordered}
     )
     db.add(activity_log)
     
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
 import uuid
 
 from .. import models
-from ..database import get_db
+from ..database import get_async_db, get_db
 from ..dependencies import get_current_user
 from ..schemas.equipment_reservations import (
     EnhancedReservationCreate, EnhancedReservationUpdate, EnhancedReservationResponse,
@@ -195,51 +197,49 @@ async def list_reservations(
     end_date: Optional[datetime] = Query(None),
     include_recurring: bool = Query(True),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List enhanced reservations with filtering"""
-    query = db.query(models.EnhancedEquipmentReservation)
+    query = select(models.EnhancedEquipmentReservation)
     
     # Apply access control
     if current_user["role"] not in ["super_admin", "makerspace_admin"]:
         # Regular users can only see their own reservations
-        query = query.filter(models.EnhancedEquipmentReservation.user_id == current_user["user_id"])
+        query = query.where(models.EnhancedEquipmentReservation.user_id == current_user["user_id"])
     
     # Apply filters
     if equipment_id:
-        query = query.filter(models.EnhancedEquipmentReservation.equipment_id == equipment_id)
+        query = query.where(models.EnhancedEquipmentReservation.equipment_id == equipment_id)
     
     if user_id and current_user["role"] in ["super_admin", "makerspace_admin"]:
-        query = query.filter(models.EnhancedEquipmentReservation.user_id == user_id)
+        query = query.where(models.EnhancedEquipmentReservation.user_id == user_id)
     
     if status:
-        query = query.filter(models.EnhancedEquipmentReservation.status == status)
+        query = query.where(models.EnhancedEquipmentReservation.status == status)
     
     if start_date:
-        query = query.filter(models.EnhancedEquipmentReservation.requested_start >= start_date)
+        query = query.where(models.EnhancedEquipmentReservation.requested_start >= start_date)
     
     if end_date:
-        query = query.filter(models.EnhancedEquipmentReservation.requested_end <= end_date)
+        query = query.where(models.EnhancedEquipmentReservation.requested_end <= end_date)
     
     if not include_recurring:
-        query = query.filter(models.EnhancedEquipmentReservation.is_recurring == False)
+        query = query.where(models.EnhancedEquipmentReservation.is_recurring == False)
     
     # Order by creation date (newest first)
     query = query.order_by(models.EnhancedEquipmentReservation.created_at.desc())
     
-    reservations = query.offset(skip).limit(limit).all()
-    return reservations
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/{reservation_id}", response_model=EnhancedReservationResponse)
 async def get_reservation(
     reservation_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get reservation details"""
-    reservation = db.query(models.EnhancedEquipmentReservation).filter(
-        models.EnhancedEquipmentReservation.id == reservation_id
-    ).first()
+    reservation = await db.get(models.EnhancedEquipmentReservation, reservation_id)
     
     if not reservation:
         raise HTTPException(
@@ -574,12 +574,10 @@ async def estimate_reservation_cost(
 async def check_availability(
     availability_request: AvailabilityCheckRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Check equipment availability for a time period"""
-    equipment = db.query(models.Equipment).filter(
-        models.Equipment.id == availability_request.equipment_id
-    ).first()
+    equipment = await db.get(models.Equipment, availability_request.equipment_id)
     
     if not equipment:
         raise HTTPException(
@@ -588,20 +586,24 @@ async def check_availability(
         )
     
     # Get existing reservations
-    existing_reservations = db.query(models.EnhancedEquipmentReservation).filter(
-        models.EnhancedEquipmentReservation.equipment_id == availability_request.equipment_id,
-        models.EnhancedEquipmentReservation.status.in_([
-            models.ReservationStatus.APPROVED,
-            models.ReservationStatus.ACTIVE
-        ]),
-        models.EnhancedEquipmentReservation.requested_start < availability_request.end_date,
-        models.EnhancedEquipmentReservation.requested_end > availability_request.start_date
-    ).all()
+    result = await db.execute(
+        select(models.EnhancedEquipmentReservation).where(
+            models.EnhancedEquipmentReservation.equipment_id == availability_request.equipment_id,
+            models.EnhancedEquipmentReservation.status.in_([
+                models.ReservationStatus.APPROVED,
+                models.ReservationStatus.ACTIVE
+            ]),
+            models.EnhancedEquipmentReservation.requested_start < availability_request.end_date,
+            models.EnhancedEquipmentReservation.requested_end > availability_request.start_date
+        )
+    )
+    existing_reservations = result.scalars().all()
     
     # Check skill gates if user specified
     skill_gate_blocking = []
     if availability_request.user_id:
-        skill_gates = await verify_skill_gates(db, availability_request.equipment_id, availability_request.user_id)
+        result = await db.execute(_active_skill_gates(availability_request.equipment_id))
+        skill_gates = _evaluate_skill_gates(result.scalars().all(), availability_request.user_id)
         skill_gate_blocking = [gate["gate_name"] for gate in skill_gates if not gate["passed"]]
     
     # Generate availability slots (simplified)
@@ -658,13 +660,18 @@ async def check_equipment_availability(db: Session, equipment_id: str, start_tim
     
     return None
 
-async def verify_skill_gates(db: Session, equipment_id: str, user_id: str) -> List[dict]:
-    """Verify user against equipment skill gates"""
-    skill_gates = db.query(models.EquipmentSkillGate).filter(
+def _active_skill_gates(equipment_id: str):
+    return select(models.EquipmentSkillGate).where(
         models.EquipmentSkillGate.equipment_id == equipment_id,
         models.EquipmentSkillGate.is_active == True
-    ).all()
-    
+    )
+
+async def verify_skill_gates(db: Session, equipment_id: str, user_id: str) -> List[dict]:
+    """Verify user against equipment skill gates"""
+    skill_gates = db.execute(_active_skill_gates(equipment_id)).scalars().all()
+    return _evaluate_skill_gates(skill_gates, user_id)
+
+def _evaluate_skill_gates(skill_gates: List[models.EquipmentSkillGate], user_id: str) -> List[dict]:
     results = []
     for gate in skill_gates:
         # Simplified skill verification - in production this would check against actual skill system
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, desc
 from typing import List, Optional, Dict, Any
@@ -13,12 +14,12 @@ from ..models.filament_tracking import (
     FilamentRoll, FilamentUsageLog, FilamentReorderRequest, FilamentCompatibility,
     FilamentMaterial, FilamentBrand, FilamentRollStatus, DeductionMethod
 )
+from ..utils.gcode_analyzer import GCodeAnalyzer, analyze_gcode_stream
 
 router = APIRouter(prefix="/api/v1/filament", tags=["Filament Tracking"])
 
 # Pydantic models for requests/responses
 from pydantic import BaseModel, Field
-from typing import Optional
 
 class FilamentRollCreate(BaseModel):
     brand: FilamentBrand
@@ -418,7 +419,6 @@ async def analyze_gcode_for_filament_usage(
         )
     
     try:
-        # Analyze G-code (simplified implementation)
         analysis_result = analyze_gcode_content(
             gcode_request.gcode_content,
             roll.density_g_cm3 or 1.24,
@@ -443,6 +443,60 @@ async def analyze_gcode_for_filament_usage(
             detail=f"G-code analysis failed: {str(e)}"
         )
 
+@router.post("/analyze-gcode/upload", response_model=Dict[str, Any])
+async def analyze_gcode_upload_for_filament_usage(
+    filament_roll_id: str = Form(...),
+    print_name: Optional[str] = Form(None),
+    gcode_file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Analyze an uploaded G-code file in a single streaming pass"""
+    
+    roll = db.query(FilamentRoll).filter(FilamentRoll.id == filament_roll_id).first()
+    if not roll:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Filament roll not found"
+        )
+    
+    # Check access permissions
+    makerspace_id = getattr(current_user, 'makerspace_id', None)
+    if str(roll.makerspace_id) != str(makerspace_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this filament roll"
+        )
+    
+    try:
+        # Parsing is CPU-bound; keep it off the event loop
+        analysis_result = await run_in_threadpool(
+            analyze_gcode_stream,
+            gcode_file.file,
+            roll.density_g_cm3 or 1.24,
+            roll.diameter
+        )
+        
+        can_fulfill = roll.can_fulfill_print(analysis_result['estimated_weight_g'])
+        
+        return {
+            "filament_roll_id": filament_roll_id,
+            "print_name": print_name or gcode_file.filename,
+            "gcode_filename": gcode_file.filename,
+            "analysis": analysis_result,
+            "can_fulfill_print": can_fulfill,
+            "remaining_after_print": max(0, roll.remaining_weight_g - analysis_result['estimated_weight_g']),
+            "confidence_level": analysis_result.get('confidence_level', 85.0)
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"G-code analysis failed: {str(e)}"
+        )
+    finally:
+        await gcode_file.close()
+
 @router.post("/rolls/{roll_id}/reorder", response_model=Dict[str, Any])
 async def create_reorder_request(
     roll_id: str,
@@ -601,62 +655,9 @@ async def get_filament_statistics(
 
 def analyze_gcode_content(gcode_content: str, density_g_cm3: float, diameter_mm: float) -> Dict[str, Any]:
     """Analyze G-code content to estimate filament usage"""
-    lines = gcode_content.split('\n')
-    
-    # Extract filament usage from G-code comments (most slicers include this)
-    estimated_length_mm = 0
-    estimated_weight_g = 0
-    layer_count = 0
-    print_time_estimate = 0
-    
-    for line in lines:
-        line = line.strip()
-        
-        # Look for slicer comments with filament usage
-        if '; filament used [mm]' in line.lower():
-            try:
-                estimated_length_mm = float(line.split('=')[-1].strip().replace('mm', ''))
-            except (ValueError, IndexError):
-                pass
-        
-        elif '; filament used [g]' in line.lower():
-            try:
-                estimated_weight_g = float(line.split('=')[-1].strip().replace('g', ''))
-            except (ValueError, IndexError):
-                pass
-        
-        elif '; layer count:' in line.lower() or '; total layers:' in line.lower():
-            try:
-                layer_count = int(line.split(':')[-1].strip())
-            except (ValueError, IndexError):
-                pass
-        
-        elif '; estimated printing time' in line.lower():
-            # Parse time estimate
-            pass
-    
-    # If weight not found, calculate from length
-    if estimated_weight_g == 0 and estimated_length_mm > 0:
-        # Calculate volume: π * r² * length
-        radius_mm = diameter_mm / 2
-        volume_mm3 = 3.14159 * (radius_mm ** 2) * estimated_length_mm
-        volume_cm3 = volume_mm3 / 1000
-        estimated_weight_g = volume_cm3 * density_g_cm3
-    
-    # If no estimates found, use basic heuristics
-    if estimated_weight_g == 0:
-        # Count extrusion commands as a fallback
-        extrusion_commands = len([line for line in lines if line.startswith('G1') and 'E' in line])
-        estimated_weight_g = max(10, extrusion_commands * 0.1)  # Very rough estimate
-    
-    return {
-        "estimated_weight_g": round(estimated_weight_g, 2),
-        "estimated_length_mm": round(estimated_length_mm, 2),
-        "layer_count": layer_count,
-        "print_time_estimate_minutes": print_time_estimate,
-        "confidence_level": 90.0 if estimated_weight_g > 0 else 30.0,
-        "analysis_method": "gcode_comments" if estimated_weight_g > 0 else "heuristic"
-    }
+    analyzer = GCodeAnalyzer()
+    analyzer.feed(gcode_content)
+    return analyzer.result(density_g_cm3, diameter_mm)
 
 def generate_makrx_order_url(roll: FilamentRoll) -> str:
     """Generate MakrX Store order URL for reordering"""
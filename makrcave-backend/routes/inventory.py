@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, BackgroundTasks, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -7,7 +8,8 @@ import io
 import uuid
 import multipart  # noqa: F401 - ensure python-multipart is installed for file uploads
 
-from ..crud.inventory import InventoryCRUD
+from ..crud.inventory import InventoryCRUD, INVENTORY_EXPORT_COLUMNS
+from ..utils.streaming_export import iter_csv
 from ..schemas.inventory import (
     InventoryItemResponse, InventoryItemCreate, InventoryItemUpdate,
     IssueItemRequest, ReorderRequest, InventoryUsageLogResponse,
@@ -419,14 +421,13 @@ async def export_inventory_csv(
         if status:
             filters['status'] = status
         
-        csv_content = inventory_crud.export_to_csv(
-            db=db,
+        rows = InventoryCRUD(db).iter_export_rows(
             makerspace_id=current_user.makerspace_id,
             filters=filters
         )
         
-        return Response(
-            content=csv_content,
+        return StreamingResponse(
+            iter_csv(INVENTORY_EXPORT_COLUMNS, rows),
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=inventory_export.csv"}
         )
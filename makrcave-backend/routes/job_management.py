@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_, or_, desc, asc, func
 from typing import List, Optional, Dict, Any
@@ -9,7 +10,7 @@ import hashlib
 import os
 from pathlib import Path
 
-from ..database import get_db
+from ..database import get_async_db, get_db
 from ..dependencies import get_current_user, get_current_user_optional
 from ..models.job_management import (
     ServiceJob, ServiceJobFile, JobStatusUpdate, JobMaterialUsage, 
@@ -25,6 +26,8 @@ from ..schemas.job_management import (
     JobDashboardStats, JobAnalytics, JobSearchFilters, JobListResponse,
     GCodeAnalysisResult, ModelAnalysisResult
 )
+from ..crud import job_management as crud_jobs
+from ..utils.pagination import InvalidCursor
 
 router = APIRouter(prefix="/api/v1/jobs", tags=["job-management"])
 
@@ -109,94 +112,26 @@ async def create_service_job(
 async def list_service_jobs(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides page"),
     filters: JobSearchFilters = Depends(),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List service jobs with filtering and pagination"""
     try:
-        # Build query with filters
-        query = db.query(ServiceJob)
-        
-        # Apply filters
-        if filters.status:
-            query = query.filter(ServiceJob.status.in_(filters.status))
-        
-        if filters.priority:
-            query = query.filter(ServiceJob.priority.in_(filters.priority))
-            
-        if filters.job_type:
-            query = query.filter(ServiceJob.job_type.in_(filters.job_type))
-            
-        if filters.material_type:
-            query = query.filter(ServiceJob.material_type.in_(filters.material_type))
-            
-        if filters.assigned_provider_id:
-            query = query.filter(ServiceJob.assigned_provider_id == filters.assigned_provider_id)
-            
-        if filters.assigned_makerspace_id:
-            query = query.filter(ServiceJob.assigned_makerspace_id == filters.assigned_makerspace_id)
-            
-        if filters.customer_email:
-            query = query.filter(ServiceJob.customer_email.ilike(f"%{filters.customer_email}%"))
-            
-        if filters.created_after:
-            query = query.filter(ServiceJob.created_at >= filters.created_after)
-            
-        if filters.created_before:
-            query = query.filter(ServiceJob.created_at <= filters.created_before)
-            
-        if filters.deadline_after:
-            query = query.filter(ServiceJob.deadline >= filters.deadline_after)
-            
-        if filters.deadline_before:
-            query = query.filter(ServiceJob.deadline <= filters.deadline_before)
-            
-        if filters.min_value:
-            query = query.filter(
-                or_(
-                    ServiceJob.quoted_price >= filters.min_value,
-                    ServiceJob.final_price >= filters.min_value
-                )
-            )
-            
-        if filters.max_value:
-            query = query.filter(
-                or_(
-                    ServiceJob.quoted_price <= filters.max_value,
-                    ServiceJob.final_price <= filters.max_value
-                )
-            )
-            
-        if filters.search_query:
-            search_term = f"%{filters.search_query}%"
-            query = query.filter(
-                or_(
-                    ServiceJob.title.ilike(search_term),
-                    ServiceJob.description.ilike(search_term),
-                    ServiceJob.customer_name.ilike(search_term)
-                )
-            )
-        
-        # User-based filtering (role-based access control)
+        # Regular users can only see their own jobs or jobs assigned to them
         user_role = current_user.get("role", "user")
         user_id = current_user.get("user_id")
         
-        if user_role not in ["super_admin", "makerspace_admin"]:
-            # Regular users can only see their own jobs or jobs assigned to them
-            query = query.filter(
-                or_(
-                    ServiceJob.customer_id == user_id,
-                    ServiceJob.assigned_provider_id == user_id
-                )
+        def load_page(session: Session):
+            jobs, next_cursor = crud_jobs.get_service_jobs(
+                session, page_size, filters, user_id, user_role, cursor, (page - 1) * page_size
             )
+            total_count = crud_jobs.get_jobs_count(session, filters, user_id, user_role)
+            return jobs, next_cursor, total_count
         
-        # Count total results
-        total_count = query.count()
-        
-        # Apply pagination and ordering
-        offset = (page - 1) * page_size
-        jobs = query.order_by(desc(ServiceJob.created_at)).offset(offset).limit(page_size).all()
+        # Runs the sync CRUD on the async connection without blocking the loop
+        jobs, next_cursor, total_count = await db.run_sync(load_page)
         
         # Calculate pagination info
         total_pages = (total_count + page_size - 1) // page_size
@@ -210,9 +145,15 @@ async def list_service_jobs(
             page_size=page_size,
             total_pages=total_pages,
             has_next=has_next,
-            has_previous=has_previous
+            has_previous=has_previous,
+            next_cursor=next_cursor
         )
         
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, Response
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from typing import List, Optional
@@ -16,6 +16,7 @@ from ..schemas.member import (
 )
 from ..crud import member as crud_member
 from ..utils.email_service import send_member_invite_email
+from ..utils.pagination import InvalidCursor
 
 router = APIRouter()
 security = HTTPBearer()
@@ -67,7 +68,8 @@ async def create_member(
 
 @router.get("/", response_model=List[MemberSummaryResponse])
 async def get_members(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     limit: int = Query(100, ge=1, le=1000),
     status_filter: Optional[List[str]] = Query(None),
     role_filter: Optional[List[str]] = Query(None),
@@ -100,9 +102,11 @@ async def get_members(
         
         sort = MemberSort(field=sort_field, direction=sort_direction)
         
-        members = crud_member.get_members(
-            db, current_user["user_id"], skip, limit, filters, sort
+        members, next_cursor = crud_member.get_members(
+            db, current_user["user_id"], limit, filters, sort, cursor
         )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
         # Convert to summary response
         summary_members = []
@@ -124,6 +128,11 @@ async def get_members(
         
         return summary_members
         
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Response
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from typing import List, Optional
@@ -18,6 +18,7 @@ from ..schemas.project import (
     GitHubRepoConnect, GitHubRepoInfo, GitHubFile, GitHubCommit
 )
 from ..crud import project as crud_project
+from ..utils.pagination import InvalidCursor
 
 router = APIRouter()
 security = HTTPBearer()
@@ -54,7 +55,8 @@ async def create_project(
 
 @router.get("/", response_model=List[ProjectSummaryResponse])
 async def get_projects(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     limit: int = Query(100, ge=1, le=1000),
     status_filter: Optional[List[str]] = Query(None),
     visibility_filter: Optional[List[str]] = Query(None),
@@ -83,9 +85,11 @@ async def get_projects(
         
         sort = ProjectSort(field=sort_field, direction=sort_direction)
         
-        projects = crud_project.get_projects(
-            db, current_user["user_id"], skip, limit, filters, sort
+        projects, next_cursor = crud_project.get_projects(
+            db, current_user["user_id"], limit, filters, sort, cursor
         )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
         # Convert to summary response with counts
         summary_projects = []
@@ -99,6 +103,11 @@ async def get_projects(
             summary_projects.append(summary)
         
         return summary_projects
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -293,7 +302,7 @@ async def reorder_bom_item(
         description=f"Reorder requested for {bom_item.item_name} (qty: {reorder_request['quantity']})",
         user_id=current_user["user_id"],
         user_name="User",
-        metadata=reorder_request
+        activity_metadata=reorder_request
     )
     db.add(activity_log)
 
@@ -621,11 +630,11 @@ async def sync_github_activity(
             detail="Access denied"
         )
 
-    new_activities = crud_project.sync_github_activity(db, project_id)
+    activities_count = await crud_project.sync_github_activity(db, project_id)
 
     return {
-        "message": f"Synced {len(new_activities)} new GitHub activities",
-        "activities_count": len(new_activities)
+        "message": f"Synced {activities_count} new GitHub activities",
+        "activities_count": activities_count
     }
 
 @router.get("/{project_id}/github/files", response_model=List[GitHubFile])
@@ -697,11 +706,11 @@ async def get_github_commits(
             detail="Project not found or GitHub integration not enabled"
         )
 
-    from ..utils.github_service import GitHubService
-    github_service = GitHubService(project.github_access_token)
+    from ..utils.github_service import AsyncGitHubService
+    github_service = AsyncGitHubService(project.github_access_token)
     branch = branch or project.github_default_branch
 
-    commits = github_service.get_commits(project.github_repo_url, branch, per_page, page)
+    commits = await github_service.get_commits(project.github_repo_url, branch, per_page, page)
     return commits
 
 @router.post("/{project_id}/github/readme/generate")
@@ -181,9 +181,10 @@ class InventoryFilter(BaseModel):
     low_stock_only: bool = False
     search: Optional[str] = None
     
-    # Pagination
+    # Pagination; a cursor from the previous page takes precedence over skip
     skip: int = Field(0, ge=0)
     limit: int = Field(100, ge=1, le=1000)
+    cursor: Optional[str] = None
     
     # Sorting
     sort_by: str = "updated_at"
@@ -196,6 +197,7 @@ class InventoryResponse(BaseModel):
     per_page: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
 
 # Analytics and reporting schemas
 class InventoryStats(BaseModel):
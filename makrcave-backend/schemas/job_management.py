@@ -496,6 +496,7 @@ class JobListResponse(BaseModel):
     total_pages: int
     has_next: bool
     has_previous: bool
+    next_cursor: Optional[str] = None
 
 # File processing schemas
 class GCodeAnalysisResult(BaseModel):
@@ -1,11 +1,11 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import AliasChoices, BaseModel, Field, validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
-from ..models.project import ProjectStatus, ProjectVisibility, CollaboratorRole, ActivityType
+from models.project import ProjectStatus, ProjectVisibility, CollaboratorRole, ActivityType
 
 # Project type enum
-class ProjectType(str, enum.Enum):
+class ProjectType(str, Enum):
     INTERNAL = "internal"
     OPEN_COLLAB = "open-collab"
     SPONSORED = "sponsored"
@@ -21,11 +21,11 @@ class ProjectBase(BaseModel):
     tags: Optional[List[str]] = []
 
     # Enhanced public project fields
-    difficulty_level: str = Field("beginner", regex="^(beginner|intermediate|advanced|expert)$")
+    difficulty_level: str = Field("beginner", pattern="^(beginner|intermediate|advanced|expert)$")
     estimated_duration: Optional[str] = None
     required_skills: Optional[List[str]] = []
     learning_objectives: Optional[List[str]] = []
-    license_type: str = Field("cc-by-sa", regex="^(cc-by-sa|cc-by|cc-by-nc|mit|apache|proprietary)$")
+    license_type: str = Field("cc-by-sa", pattern="^(cc-by-sa|cc-by|cc-by-nc|mit|apache|proprietary)$")
     required_equipment: Optional[List[str]] = []
     space_requirements: Optional[str] = None
     safety_considerations: Optional[str] = None
@@ -35,7 +35,7 @@ class InitialMilestone(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     description: Optional[str] = None
     target_date: Optional[datetime] = None
-    priority: str = Field("medium", regex="^(low|medium|high|critical)$")
+    priority: str = Field("medium", pattern="^(low|medium|high|critical)$")
 
 # Enhanced collaborator schema for project creation
 class InitialCollaborator(BaseModel):
@@ -97,7 +97,7 @@ class ProjectBOMResponse(BaseModel):
     unit_cost: Optional[float] = None
     total_cost: Optional[float] = None
     usage_notes: Optional[str] = None
-    alternatives: Optional[List[BOMAlternative]] = []
+    alternatives: Optional[List["BOMAlternative"]] = []
     is_critical: bool = False
     procurement_status: str = "needed"
     availability_status: str = "unknown"
@@ -162,7 +162,9 @@ class ProjectActivityLogResponse(BaseModel):
     activity_type: ActivityType
     title: str
     description: Optional[str] = None
-    metadata: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = Field(
+        None, validation_alias=AliasChoices("activity_metadata", "metadata")
+    )
     user_id: str
     user_name: str
     created_at: datetime
@@ -242,11 +244,13 @@ class BOMAlternative(BaseModel):
     item_name: str = Field(..., min_length=1, max_length=200)
     part_code: Optional[str] = None
     unit_cost: Optional[float] = Field(None, ge=0)
-    availability_status: str = Field("unknown", regex="^(in-stock|low-stock|out-of-stock|unknown)$")
+    availability_status: str = Field("unknown", pattern="^(in-stock|low-stock|out-of-stock|unknown)$")
     compatibility_notes: Optional[str] = None
 
+ProjectBOMResponse.model_rebuild()
+
 class BOMItemCreate(BaseModel):
-    item_type: str = Field(..., regex="^(inventory|makrx_store)$")
+    item_type: str = Field(..., pattern="^(inventory|makrx_store)$")
     item_id: str = Field(..., min_length=1)
     item_name: str = Field(..., min_length=1, max_length=200)
     part_code: Optional[str] = None
@@ -310,13 +314,13 @@ class MilestoneCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     description: Optional[str] = None
     target_date: Optional[datetime] = None
-    priority: str = Field("medium", regex="^(low|medium|high|critical)$")
+    priority: str = Field("medium", pattern="^(low|medium|high|critical)$")
 
 class MilestoneUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = None
     target_date: Optional[datetime] = None
-    priority: Optional[str] = Field(None, regex="^(low|medium|high|critical)$")
+    priority: Optional[str] = Field(None, pattern="^(low|medium|high|critical)$")
     is_completed: Optional[bool] = None
     order_index: Optional[int] = None
 
@@ -338,8 +342,8 @@ class ProjectFilter(BaseModel):
     search: Optional[str] = None  # Search in name and description
 
 class ProjectSort(BaseModel):
-    field: str = Field("updated_at", regex="^(name|created_at|updated_at|start_date|end_date)$")
-    direction: str = Field("desc", regex="^(asc|desc)$")
+    field: str = Field("updated_at", pattern="^(name|created_at|updated_at|start_date|end_date)$")
+    direction: str = Field("desc", pattern="^(asc|desc)$")
 
 # Batch operation schemas
 class ProjectStatusUpdate(BaseModel):
@@ -367,7 +371,7 @@ class UserProjectStatistics(BaseModel):
 
 # GitHub Integration Schemas
 class GitHubRepoConnect(BaseModel):
-    repo_url: str = Field(..., regex=r"^https://github\.com/[\w\-\.]+/[\w\-\.]+/?$")
+    repo_url: str = Field(..., pattern=r"^https://github\.com/[\w\-\.]+/[\w\-\.]+/?$")
     access_token: Optional[str] = None  # For private repos
     default_branch: str = "main"
 
@@ -522,7 +526,7 @@ class ProjectTeamRoleResponse(BaseModel):
 
 class ResourceSharingCreate(BaseModel):
     target_project_id: str = Field(..., min_length=1)
-    resource_type: str = Field(..., regex="^(bom_item|file|milestone_template|equipment_config)$")
+    resource_type: str = Field(..., pattern="^(bom_item|file|milestone_template|equipment_config)$")
     resource_id: str = Field(..., min_length=1)
     sharing_notes: Optional[str] = None
 
@@ -0,0 +1,401 @@
+"""Incremental hourly/daily rollups for RealAnalyticsService.
+
+The engine aggregates raw MemberActivity, EquipmentUsage, Transaction and
+SafetyIncident rows into one ``AnalyticsRollup`` row per makerspace, bucket
+and granularity. Each refresh only recomputes buckets after the stored
+watermark (plus a short late-arrival window). Readers combine the stored
+buckets with a live aggregate over the small tail of raw rows that no
+rollup covers yet. The cost of a dashboard query then depends on the window
+length in buckets, not on the number of raw rows.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from database import SessionLocal
+from models.analytics import AnalyticsRollup
+from models.billing import Transaction
+from models.enhanced_analytics import EquipmentUsage, MemberActivity, SafetyIncident
+from models.makerspace_settings import MakerspaceSettings
+from sqlalchemy import and_, extract, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import case
+
+logger = logging.getLogger(__name__)
+
+GRANULARITY_STEP = {
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+}
+_TRUNC_UNIT = {"hourly": "hour", "daily": "day"}
+# SQLite has no date_trunc; strftime yields the bucket start as text instead
+_SQLITE_BUCKET_FORMAT = {"hourly": "%Y-%m-%d %H:00:00", "daily": "%Y-%m-%d 00:00:00"}
+
+# How far back the first refresh backfills for each granularity
+INITIAL_BACKFILL = {
+    "hourly": timedelta(days=int(os.getenv("ANALYTICS_HOURLY_BACKFILL_DAYS", "7"))),
+    "daily": timedelta(days=int(os.getenv("ANALYTICS_DAILY_BACKFILL_DAYS", "730"))),
+}
+# Closed buckets recomputed on every refresh to pick up late-arriving rows
+LATE_ARRIVAL_BUCKETS = int(os.getenv("ANALYTICS_LATE_ARRIVAL_BUCKETS", "2"))
+SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("ANALYTICS_SNAPSHOT_INTERVAL", "300"))
+
+REPORTABLE_SEVERITIES = ("medium", "high", "critical")
+
+_METRIC_FIELDS = (
+    "activity_count",
+    "unique_members",
+    "checkins",
+    "equipment_sessions",
+    "equipment_hours",
+    "revenue",
+    "transaction_count",
+    "safety_incidents",
+    "hourly_activity",
+    "revenue_by_category",
+    "equipment_usage",
+)
+
+
+def floor_bucket(timestamp: datetime, granularity: str) -> datetime:
+    """Start of the bucket containing ``timestamp``"""
+    if granularity == "hourly":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def empty_bucket(bucket_start: datetime) -> Dict[str, Any]:
+    return {
+        "bucket_start": bucket_start,
+        "activity_count": 0,
+        "unique_members": 0,
+        "checkins": 0,
+        "equipment_sessions": 0,
+        "equipment_hours": 0.0,
+        "revenue": 0.0,
+        "transaction_count": 0,
+        "safety_incidents": 0,
+        "hourly_activity": {},
+        "revenue_by_category": {},
+        "equipment_usage": {},
+    }
+
+
+class AnalyticsSnapshotEngine:
+    """Computes, stores and reads AnalyticsRollup buckets"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def _bucket_expr(self, column, granularity: str):
+        """Start of the bucket containing ``column``, as SQL for this dialect"""
+        if self.dialect == "sqlite":
+            return func.strftime(_SQLITE_BUCKET_FORMAT[granularity], column)
+        return func.date_trunc(_TRUNC_UNIT[granularity], column)
+
+    def _hours_between(self, start_column, end_column):
+        if self.dialect == "sqlite":
+            return (func.julianday(end_column) - func.julianday(start_column)) * 24
+        return func.extract("epoch", end_column - start_column) / 3600
+
+    def compute_buckets(
+        self, makerspace_id: str, granularity: str, start: datetime, end: datetime
+    ) -> Dict[datetime, Dict[str, Any]]:
+        """Aggregate raw rows in ``[start, end)`` into per-bucket metrics"""
+        buckets: Dict[datetime, Dict[str, Any]] = {}
+
+        def bucket_for(bucket_start) -> Dict[str, Any]:
+            if isinstance(bucket_start, str):
+                bucket_start = datetime.fromisoformat(bucket_start)
+            elif not isinstance(bucket_start, datetime):
+                bucket_start = datetime(
+                    bucket_start.year, bucket_start.month, bucket_start.day
+                )
+            bucket_start = floor_bucket(bucket_start.replace(tzinfo=None), granularity)
+            return buckets.setdefault(bucket_start, empty_bucket(bucket_start))
+
+        # Member activity
+        activity_bucket = self._bucket_expr(MemberActivity.timestamp, granularity)
+        activity_filter = and_(
+            MemberActivity.makerspace_id == makerspace_id,
+            MemberActivity.timestamp >= start,
+            MemberActivity.timestamp < end,
+        )
+        for row in (
+            self.db.query(
+                activity_bucket.label("bucket"),
+                func.count(MemberActivity.id).label("activity_count"),
+                func.count(func.distinct(MemberActivity.member_id)).label(
+                    "unique_members"
+                ),
+                func.sum(
+                    case((MemberActivity.activity_type == "checkin", 1), else_=0)
+                ).label("checkins"),
+            )
+            .filter(activity_filter)
+            .group_by(activity_bucket)
+            .all()
+        ):
+            bucket = bucket_for(row.bucket)
+            bucket["activity_count"] = row.activity_count or 0
+            bucket["unique_members"] = row.unique_members or 0
+            bucket["checkins"] = int(row.checkins or 0)
+
+        activity_hour = extract("hour", MemberActivity.timestamp)
+        for row in (
+            self.db.query(
+                activity_bucket.label("bucket"),
+                activity_hour.label("hour"),
+                func.count(MemberActivity.id).label("activity_count"),
+            )
+            .filter(activity_filter)
+            .group_by(activity_bucket, activity_hour)
+            .all()
+        ):
+            bucket_for(row.bucket)["hourly_activity"][str(int(row.hour))] = (
+                row.activity_count
+            )
+
+        # Equipment sessions
+        usage_bucket = self._bucket_expr(EquipmentUsage.start_time, granularity)
+        for row in (
+            self.db.query(
+                usage_bucket.label("bucket"),
+                EquipmentUsage.equipment_id,
+                func.count(EquipmentUsage.id).label("sessions"),
+                func.sum(
+                    self._hours_between(
+                        EquipmentUsage.start_time, EquipmentUsage.end_time
+                    )
+                ).label("hours"),
+            )
+            .filter(
+                and_(
+                    EquipmentUsage.makerspace_id == makerspace_id,
+                    EquipmentUsage.start_time >= start,
+                    EquipmentUsage.start_time < end,
+                )
+            )
+            .group_by(usage_bucket, EquipmentUsage.equipment_id)
+            .all()
+        ):
+            bucket = bucket_for(row.bucket)
+            hours = float(row.hours or 0)
+            bucket["equipment_sessions"] += row.sessions
+            bucket["equipment_hours"] += hours
+            bucket["equipment_usage"][str(row.equipment_id)] = [row.sessions, hours]
+
+        # Completed transactions
+        revenue_bucket = self._bucket_expr(Transaction.created_at, granularity)
+        for row in (
+            self.db.query(
+                revenue_bucket.label("bucket"),
+                Transaction.category,
+                func.sum(Transaction.amount).label("revenue"),
+                func.count(Transaction.id).label("count"),
+            )
+            .filter(
+                and_(
+                    Transaction.makerspace_id == makerspace_id,
+                    Transaction.created_at >= start,
+                    Transaction.created_at < end,
+                    Transaction.status == "completed",
+                )
+            )
+            .group_by(revenue_bucket, Transaction.category)
+            .all()
+        ):
+            bucket = bucket_for(row.bucket)
+            revenue = float(row.revenue or 0)
+            bucket["revenue"] += revenue
+            bucket["transaction_count"] += row.count
+            bucket["revenue_by_category"][str(row.category)] = [revenue, row.count]
+
+        # Safety incidents are recorded per day, so they only roll up daily
+        if granularity == "daily":
+            for row in (
+                self.db.query(
+                    SafetyIncident.incident_date,
+                    func.count(SafetyIncident.id).label("count"),
+                )
+                .filter(
+                    and_(
+                        SafetyIncident.makerspace_id == makerspace_id,
+                        SafetyIncident.incident_date >= start.date(),
+                        SafetyIncident.incident_date < end.date(),
+                        SafetyIncident.severity.in_(REPORTABLE_SEVERITIES),
+                    )
+                )
+                .group_by(SafetyIncident.incident_date)
+                .all()
+            ):
+                bucket_for(row.incident_date)["safety_incidents"] = row.count
+
+        return buckets
+
+    def get_watermark(self, makerspace_id: str, granularity: str) -> Optional[datetime]:
+        """End of the newest stored bucket, or None if nothing is stored yet"""
+        latest = (
+            self.db.query(func.max(AnalyticsRollup.bucket_start))
+            .filter(
+                and_(
+                    AnalyticsRollup.makerspace_id == makerspace_id,
+                    AnalyticsRollup.granularity == granularity,
+                )
+            )
+            .scalar()
+        )
+        return latest + GRANULARITY_STEP[granularity] if latest else None
+
+    def refresh(
+        self, makerspace_id: str, granularity: str, now: Optional[datetime] = None
+    ) -> int:
+        """Recompute closed buckets after the watermark; returns buckets written"""
+        step = GRANULARITY_STEP[granularity]
+        end = floor_bucket(now or datetime.utcnow(), granularity)
+        watermark = self.get_watermark(makerspace_id, granularity)
+        if watermark is None:
+            start = floor_bucket(end - INITIAL_BACKFILL[granularity], granularity)
+        else:
+            start = min(watermark, end) - step * LATE_ARRIVAL_BUCKETS
+        if start >= end:
+            return 0
+
+        computed = self.compute_buckets(makerspace_id, granularity, start, end)
+
+        self.db.query(AnalyticsRollup).filter(
+            and_(
+                AnalyticsRollup.makerspace_id == makerspace_id,
+                AnalyticsRollup.granularity == granularity,
+                AnalyticsRollup.bucket_start >= start,
+                AnalyticsRollup.bucket_start < end,
+            )
+        ).delete(synchronize_session=False)
+
+        # Empty buckets are stored too so the watermark advances through quiet periods
+        rows = []
+        bucket_start = start
+        computed_at = datetime.utcnow()
+        while bucket_start < end:
+            metrics = computed.get(bucket_start) or empty_bucket(bucket_start)
+            rows.append(
+                {
+                    "makerspace_id": makerspace_id,
+                    "granularity": granularity,
+                    "computed_at": computed_at,
+                    **metrics,
+                }
+            )
+            bucket_start += step
+        try:
+            self.db.bulk_insert_mappings(AnalyticsRollup, rows)
+            self.db.commit()
+        except IntegrityError:
+            # A concurrent refresh wrote the same buckets first; its rows stand
+            self.db.rollback()
+            logger.info(
+                f"Analytics snapshot refresh for {makerspace_id} ({granularity}) lost "
+                f"a race; skipped"
+            )
+            return 0
+        return len(rows)
+
+    def refresh_all(
+        self, granularities=("hourly", "daily"), now: Optional[datetime] = None
+    ) -> int:
+        """Refresh every makerspace; failures are logged and skipped"""
+        written = 0
+        makerspace_ids = [
+            row[0] for row in self.db.query(MakerspaceSettings.makerspace_id).all()
+        ]
+        for makerspace_id in makerspace_ids:
+            for granularity in granularities:
+                try:
+                    written += self.refresh(str(makerspace_id), granularity, now=now)
+                except Exception as e:
+                    self.db.rollback()
+                    logger.error(
+                        f"Analytics snapshot refresh failed for {makerspace_id} "
+                        f"({granularity}): {e}"
+                    )
+        return written
+
+    def get_buckets(
+        self,
+        makerspace_id: str,
+        granularity: str,
+        start: datetime,
+        now: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Buckets from ``floor(start)`` to now: stored rollups plus live raw gaps.
+
+        The window is aligned down to a bucket boundary, so it can reach up to
+        one bucket further back than ``start``. Any part of the window before
+        the earliest stored rollup or after the watermark is aggregated live.
+        """
+        now = now or datetime.utcnow()
+        start = floor_bucket(start, granularity)
+        watermark = self.get_watermark(makerspace_id, granularity)
+
+        buckets: List[Dict[str, Any]] = []
+        tail_start = start
+        if watermark is not None and watermark > start:
+            stored = (
+                self.db.query(AnalyticsRollup)
+                .filter(
+                    and_(
+                        AnalyticsRollup.makerspace_id == makerspace_id,
+                        AnalyticsRollup.granularity == granularity,
+                        AnalyticsRollup.bucket_start >= start,
+                    )
+                )
+                .order_by(AnalyticsRollup.bucket_start)
+                .all()
+            )
+            head_end = stored[0].bucket_start if stored else watermark
+            if start < head_end:
+                head = self.compute_buckets(makerspace_id, granularity, start, head_end)
+                buckets.extend(head[key] for key in sorted(head))
+            buckets.extend(
+                {
+                    field: getattr(row, field)
+                    for field in ("bucket_start",) + _METRIC_FIELDS
+                }
+                for row in stored
+            )
+            tail_start = watermark
+
+        if tail_start < now:
+            tail = self.compute_buckets(makerspace_id, granularity, tail_start, now)
+            buckets.extend(tail[key] for key in sorted(tail))
+
+        for bucket in buckets:
+            bucket["hourly_activity"] = bucket["hourly_activity"] or {}
+            bucket["revenue_by_category"] = bucket["revenue_by_category"] or {}
+            bucket["equipment_usage"] = bucket["equipment_usage"] or {}
+        return buckets
+
+
+def refresh_all_snapshots() -> int:
+    """Run one refresh pass on a fresh session (for schedulers and scripts)"""
+    db = SessionLocal()
+    try:
+        return AnalyticsSnapshotEngine(db).refresh_all()
+    finally:
+        db.close()
+
+
+async def run_snapshot_scheduler(interval_seconds: int = SNAPSHOT_INTERVAL_SECONDS):
+    """Refresh rollups periodically without blocking the event loop"""
+    while True:
+        try:
+            written = await asyncio.to_thread(refresh_all_snapshots)
+            logger.info(f"Analytics snapshot refresh wrote {written} buckets")
+        except Exception as e:
+            logger.error(f"Analytics snapshot scheduler error: {e}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,432 @@
+"""Incremental GitHub activity sync for projects.
+
+Each linked project keeps high-water marks in ``ProjectGitHubSyncState``: the
+newest commit SHA and commit time, and the newest PR and issue ``updated_at``.
+A sync only asks GitHub for items past those marks. Commits and issues use
+``since``; PRs are sorted by ``updated`` and cut at the mark. Each kind is
+paged until its mark (or the end of the listing) is reached, so a busy
+repository loses nothing between syncs. Commit file details are fetched only
+for commits that are actually new.
+
+Deduplication is one set-based query for the fetched SHAs, PR numbers and
+issue numbers, not one query per item. New rows go in with a single bulk
+INSERT in the same transaction that advances the marks. The INSERT skips
+rows that hit the ``(project, activity type, external id)`` unique
+constraint, so a scheduled sync racing a manual one cannot log an item twice.
+
+The scheduler syncs every linked repository under a global concurrency
+budget, least recently synced first. Database work runs in worker threads,
+so the event loop is never blocked.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from database import SessionLocal
+from models.project import (
+    ActivityType,
+    Project,
+    ProjectActivityLog,
+    ProjectGitHubSyncState,
+)
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from utils.github_service import AsyncGitHubService
+
+logger = logging.getLogger(__name__)
+
+GITHUB_SYNC_INTERVAL_SECONDS = int(os.getenv("GITHUB_SYNC_INTERVAL", "900"))
+GITHUB_SYNC_CONCURRENCY = int(os.getenv("GITHUB_SYNC_CONCURRENCY", "4"))
+# Items requested per kind once a project has high-water marks
+GITHUB_SYNC_PAGE_SIZE = int(os.getenv("GITHUB_SYNC_PAGE_SIZE", "100"))
+# Safety cap on pages fetched per kind in one incremental sync
+GITHUB_SYNC_MAX_PAGES = int(os.getenv("GITHUB_SYNC_MAX_PAGES", "50"))
+
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite hands back naive datetimes; treat them as UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _parse_updated_at(activity) -> Optional[datetime]:
+    raw = (activity.metadata or {}).get("updated_at")
+    if not raw:
+        return None
+    return datetime.fromisoformat(raw.replace("Z", "+00:00"))
+
+
+def _commit_title(message: str) -> str:
+    return f"Commit: {message[:50]}{'...' if len(message) > 50 else ''}"
+
+
+async def _fetch_until_mark(
+    fetch_page: Callable[[int], Awaitable[List[Any]]],
+    reached_mark: Callable[[Any], bool],
+    kind: str,
+    project_id: str,
+) -> List[Any]:
+    """Items newest first, paging until ``reached_mark`` or an empty page"""
+    items: List[Any] = []
+    for page in range(1, GITHUB_SYNC_MAX_PAGES + 1):
+        batch = await fetch_page(page)
+        if not batch:
+            return items
+        for item in batch:
+            if reached_mark(item):
+                return items
+            items.append(item)
+    logger.warning(
+        f"GitHub sync for {project_id} stopped after {GITHUB_SYNC_MAX_PAGES} pages of "
+        f"{kind}; older {kind} past that were not recorded"
+    )
+    return items
+
+
+def _load_sync_inputs(db: Session, project_id: str) -> Optional[Dict[str, Any]]:
+    project = db.query(Project).filter(Project.project_id == project_id).first()
+    if not project or not project.github_integration_enabled:
+        return None
+    state = (
+        db.query(ProjectGitHubSyncState)
+        .filter(ProjectGitHubSyncState.project_id == project_id)
+        .first()
+    )
+    return {
+        "repo_url": project.github_repo_url,
+        "access_token": project.github_access_token,
+        "branch": project.github_default_branch,
+        "last_commit_sha": state.last_commit_sha if state else None,
+        "last_commit_at": _aware(state.last_commit_at) if state else None,
+        "last_pr_updated_at": _aware(state.last_pr_updated_at) if state else None,
+        "last_issue_updated_at": _aware(state.last_issue_updated_at) if state else None,
+    }
+
+
+def _existing_keys(
+    db: Session,
+    project_id: str,
+    shas: List[str],
+    pr_numbers: List[str],
+    issue_numbers: List[str],
+) -> Set[Tuple[ActivityType, str]]:
+    """``(activity_type, external_id)`` pairs already logged, in one query"""
+    lookups = (
+        ([ActivityType.GITHUB_COMMIT_PUSHED], shas),
+        (
+            [
+                ActivityType.GITHUB_PULL_REQUEST_OPENED,
+                ActivityType.GITHUB_PULL_REQUEST_MERGED,
+            ],
+            pr_numbers,
+        ),
+        (
+            [ActivityType.GITHUB_ISSUE_CREATED, ActivityType.GITHUB_ISSUE_CLOSED],
+            issue_numbers,
+        ),
+    )
+    conditions = [
+        and_(
+            ProjectActivityLog.activity_type.in_(types),
+            ProjectActivityLog.external_id.in_(ids),
+        )
+        for types, ids in lookups
+        if ids
+    ]
+    if not conditions:
+        return set()
+
+    rows = (
+        db.query(ProjectActivityLog.activity_type, ProjectActivityLog.external_id)
+        .filter(ProjectActivityLog.project_id == project_id, or_(*conditions))
+        .all()
+    )
+    return {(activity_type, external_id) for activity_type, external_id in rows}
+
+
+def _save(
+    db: Session, project_id: str, rows: List[Dict[str, Any]], marks: Dict[str, Any]
+) -> None:
+    """Bulk-insert new activity and advance the marks in one transaction"""
+    if rows:
+        dialect_insert = _DIALECT_INSERTS.get(db.get_bind().dialect.name)
+        if dialect_insert is None:
+            statement = insert(ProjectActivityLog)
+        else:
+            statement = dialect_insert(ProjectActivityLog).on_conflict_do_nothing(
+                index_elements=["project_id", "activity_type", "external_id"]
+            )
+        db.execute(statement, rows)
+    state = (
+        db.query(ProjectGitHubSyncState)
+        .filter(ProjectGitHubSyncState.project_id == project_id)
+        .first()
+    )
+    if state is None:
+        state = ProjectGitHubSyncState(project_id=project_id)
+        db.add(state)
+    for field, value in marks.items():
+        setattr(state, field, value)
+    state.last_synced_at = datetime.now(timezone.utc)
+    state.last_error = None
+    db.commit()
+
+
+def _record_error(db: Session, project_id: str, error: str) -> None:
+    db.rollback()
+    state = (
+        db.query(ProjectGitHubSyncState)
+        .filter(ProjectGitHubSyncState.project_id == project_id)
+        .first()
+    )
+    if state is None:
+        state = ProjectGitHubSyncState(project_id=project_id)
+        db.add(state)
+    state.last_synced_at = datetime.now(timezone.utc)
+    state.last_error = error[:1000]
+    db.commit()
+
+
+async def sync_project_activity(db: Session, project_id: str, limit: int = 50) -> int:
+    """Record GitHub activity newer than the project's marks; returns rows added"""
+    inputs = await asyncio.to_thread(_load_sync_inputs, db, project_id)
+    if inputs is None:
+        return 0
+
+    github = AsyncGitHubService(inputs["access_token"])
+    repo_url = inputs["repo_url"]
+    incremental = inputs["last_commit_sha"] is not None
+
+    def fetch_commits(page: int, per_page: int = GITHUB_SYNC_PAGE_SIZE):
+        return github.get_commits(
+            repo_url,
+            inputs["branch"],
+            per_page=per_page,
+            page=page,
+            since=inputs["last_commit_at"],
+            with_files=False,
+        )
+
+    def fetch_pull_requests(page: int, per_page: int = GITHUB_SYNC_PAGE_SIZE):
+        return github.get_pull_requests(
+            repo_url, per_page=per_page, sort="updated", page=page
+        )
+
+    def fetch_issues(page: int, per_page: int = GITHUB_SYNC_PAGE_SIZE):
+        return github.get_issues(
+            repo_url,
+            per_page=per_page,
+            since=inputs["last_issue_updated_at"],
+            page=page,
+        )
+
+    def pr_reached(pr) -> bool:
+        mark = inputs["last_pr_updated_at"]
+        return mark is not None and (_parse_updated_at(pr) or pr.created_at) <= mark
+
+    try:
+        if incremental:
+            # Lists are newest first; each is paged until it reaches its mark
+            commits, pull_requests, issues = await asyncio.gather(
+                _fetch_until_mark(
+                    fetch_commits,
+                    lambda commit: commit.sha == inputs["last_commit_sha"],
+                    "commits",
+                    project_id,
+                ),
+                _fetch_until_mark(
+                    fetch_pull_requests, pr_reached, "pull requests", project_id
+                ),
+                _fetch_until_mark(
+                    fetch_issues, lambda issue: False, "issues", project_id
+                ),
+            )
+        else:
+            # First sync records recent activity only
+            commits, pull_requests, issues = await asyncio.gather(
+                fetch_commits(1, min(limit // 3, 20)),
+                fetch_pull_requests(1, min(limit // 3, 10)),
+                fetch_issues(1, min(limit // 3, 10)),
+            )
+
+        new_commits = list(commits)
+        if inputs["last_pr_updated_at"]:
+            pull_requests = [
+                pr
+                for pr in pull_requests
+                if (_parse_updated_at(pr) or pr.created_at)
+                > inputs["last_pr_updated_at"]
+            ]
+        if inputs["last_issue_updated_at"]:
+            issues = [
+                issue
+                for issue in issues
+                if (_parse_updated_at(issue) or issue.created_at)
+                > inputs["last_issue_updated_at"]
+            ]
+
+        existing = await asyncio.to_thread(
+            _existing_keys,
+            db,
+            project_id,
+            [commit.sha for commit in new_commits],
+            [str(pr.metadata["number"]) for pr in pull_requests],
+            [str(issue.metadata["number"]) for issue in issues],
+        )
+        new_commits = [
+            commit
+            for commit in new_commits
+            if (ActivityType.GITHUB_COMMIT_PUSHED, commit.sha) not in existing
+        ]
+        # File changes only for commits that will actually be recorded
+        details = await asyncio.gather(
+            *(github.get_commit_details(repo_url, commit.sha) for commit in new_commits)
+        )
+
+        rows = []
+        for commit, detail in zip(new_commits, details):
+            rows.append(
+                {
+                    "project_id": project_id,
+                    "activity_type": ActivityType.GITHUB_COMMIT_PUSHED,
+                    "title": _commit_title(commit.message),
+                    "description": commit.message,
+                    "user_id": commit.author_email,
+                    "user_name": commit.author_name,
+                    "created_at": commit.author_date,
+                    "external_id": commit.sha,
+                    "metadata": {
+                        "commit_sha": commit.sha,
+                        "commit_url": commit.url,
+                        **detail,
+                    },
+                }
+            )
+
+        for pr in pull_requests:
+            activity_type = ActivityType.GITHUB_PULL_REQUEST_OPENED
+            if pr.metadata.get("merged"):
+                activity_type = ActivityType.GITHUB_PULL_REQUEST_MERGED
+            if (activity_type, str(pr.metadata["number"])) in existing:
+                continue
+            rows.append(
+                {
+                    "project_id": project_id,
+                    "activity_type": activity_type,
+                    "title": pr.title,
+                    "description": pr.description,
+                    "user_id": pr.author,
+                    "user_name": pr.author,
+                    "created_at": pr.created_at,
+                    "external_id": str(pr.metadata["number"]),
+                    "metadata": {
+                        "pr_number": pr.metadata["number"],
+                        "pr_url": pr.url,
+                        "head_branch": pr.metadata["head_branch"],
+                        "base_branch": pr.metadata["base_branch"],
+                    },
+                }
+            )
+
+        for issue in issues:
+            activity_type = (
+                ActivityType.GITHUB_ISSUE_CREATED
+                if issue.action == "open"
+                else ActivityType.GITHUB_ISSUE_CLOSED
+            )
+            if (activity_type, str(issue.metadata["number"])) in existing:
+                continue
+            rows.append(
+                {
+                    "project_id": project_id,
+                    "activity_type": activity_type,
+                    "title": issue.title,
+                    "description": issue.description,
+                    "user_id": issue.author,
+                    "user_name": issue.author,
+                    "created_at": issue.created_at,
+                    "external_id": str(issue.metadata["number"]),
+                    "metadata": {
+                        "issue_number": issue.metadata["number"],
+                        "issue_url": issue.url,
+                        "labels": issue.metadata.get("labels", []),
+                    },
+                }
+            )
+
+        marks: Dict[str, Any] = {}
+        if commits:
+            marks["last_commit_sha"] = commits[0].sha
+            marks["last_commit_at"] = max(commit.committer_date for commit in commits)
+        pr_times = [_parse_updated_at(pr) or pr.created_at for pr in pull_requests]
+        if pr_times:
+            marks["last_pr_updated_at"] = max(pr_times)
+        issue_times = [_parse_updated_at(issue) or issue.created_at for issue in issues]
+        if issue_times:
+            marks["last_issue_updated_at"] = max(issue_times)
+
+        await asyncio.to_thread(_save, db, project_id, rows, marks)
+        return len(rows)
+
+    except Exception as e:
+        logger.error(f"Error syncing GitHub activity for {project_id}: {e}")
+        await asyncio.to_thread(_record_error, db, project_id, str(e))
+        return 0
+
+
+def _linked_project_ids() -> List[str]:
+    """Linked projects, least recently synced first"""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Project.project_id)
+            .outerjoin(
+                ProjectGitHubSyncState,
+                ProjectGitHubSyncState.project_id == Project.project_id,
+            )
+            .filter(Project.github_integration_enabled.is_(True))
+            .order_by(ProjectGitHubSyncState.last_synced_at.asc().nullsfirst())
+            .all()
+        )
+        return [row.project_id for row in rows]
+    finally:
+        db.close()
+
+
+async def sync_all_projects(concurrency: int = GITHUB_SYNC_CONCURRENCY) -> int:
+    """Sync every linked repository, at most ``concurrency`` at a time"""
+    project_ids = await asyncio.to_thread(_linked_project_ids)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def sync_one(project_id: str) -> int:
+        async with semaphore:
+            db = SessionLocal()
+            try:
+                return await sync_project_activity(db, project_id)
+            finally:
+                db.close()
+
+    results = await asyncio.gather(
+        *(sync_one(pid) for pid in project_ids), return_exceptions=True
+    )
+    return sum(result for result in results if isinstance(result, int))
+
+
+async def run_github_sync_scheduler(
+    interval_seconds: int = GITHUB_SYNC_INTERVAL_SECONDS,
+):
+    """Sync all linked repositories periodically"""
+    while True:
+        try:
+            added = await sync_all_projects()
+            logger.info(f"GitHub sync recorded {added} new activities")
+        except Exception as e:
+            logger.error(f"GitHub sync scheduler error: {e}")
+        await asyncio.sleep(interval_seconds)
@@ -1,8 +1,9 @@
 """Real analytics service replacing mock data with actual database queries"""
 from datetime import datetime, timedelta, date
 from typing import Dict, List, Optional, Any, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, extract, text
+from sqlalchemy import func, and_, or_, text
 from sqlalchemy.sql import case
 import logging
 from collections import defaultdict
@@ -17,6 +18,7 @@ from models.equipment import Equipment, EquipmentReservation
 from models.makerspace_settings import MakerspaceSettings
 from models.project import Project
 from models.billing import Transaction, CreditTransaction
+from services.analytics_snapshots import AnalyticsSnapshotEngine, floor_bucket
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,7 @@ class RealAnalyticsService:
     
     def __init__(self, db: Session):
         self.db = db
+        self.snapshots = AnalyticsSnapshotEngine(db)
         
     def get_real_time_analytics(self, makerspace_id: str, hours: int = 24) -> Dict[str, Any]:
         """Get real-time analytics for the last N hours"""
@@ -54,23 +57,10 @@ class RealAnalyticsService:
             
             utilization_rate = (active_equipment / total_equipment) * 100
             
-            # Revenue in period
-            revenue = self.db.query(func.sum(Transaction.amount)).filter(
-                and_(
-                    Transaction.makerspace_id == makerspace_id,
-                    Transaction.created_at >= cutoff_time,
-                    Transaction.status == 'completed'
-                )
-            ).scalar() or 0.0
-            
-            # Current occupancy
-            current_occupancy = self.db.query(func.count(MemberActivity.id)).filter(
-                and_(
-                    MemberActivity.makerspace_id == makerspace_id,
-                    MemberActivity.activity_type == 'checkin',
-                    MemberActivity.timestamp >= cutoff_time
-                )
-            ).scalar() or 0
+            # Revenue and check-ins come from hourly rollups plus the raw tail
+            hourly_buckets = self.snapshots.get_buckets(makerspace_id, "hourly", cutoff_time)
+            revenue = sum(bucket["revenue"] for bucket in hourly_buckets)
+            current_occupancy = sum(bucket["checkins"] for bucket in hourly_buckets)
             
             # Safety incidents
             safety_incidents = self.db.query(func.count(SafetyIncident.id)).filter(
@@ -104,28 +94,14 @@ class RealAnalyticsService:
         try:
             start_date = datetime.utcnow() - timedelta(days=days)
             
-            # Daily usage trends
-            daily_usage = self.db.query(
-                func.date(MemberActivity.timestamp).label('date'),
-                func.count(func.distinct(MemberActivity.member_id)).label('unique_members'),
-                func.count(MemberActivity.id).label('total_activities')
-            ).filter(
-                and_(
-                    MemberActivity.makerspace_id == makerspace_id,
-                    MemberActivity.timestamp >= start_date
-                )
-            ).group_by(func.date(MemberActivity.timestamp)).order_by('date').all()
+            # Daily trends and peak hours come from daily rollups plus the raw tail
+            daily_buckets = self.snapshots.get_buckets(makerspace_id, "daily", start_date)
+            daily_usage = [bucket for bucket in daily_buckets if bucket["activity_count"]]
             
-            # Peak hours analysis
-            hourly_usage = self.db.query(
-                extract('hour', MemberActivity.timestamp).label('hour'),
-                func.count(MemberActivity.id).label('activity_count')
-            ).filter(
-                and_(
-                    MemberActivity.makerspace_id == makerspace_id,
-                    MemberActivity.timestamp >= start_date
-                )
-            ).group_by(extract('hour', MemberActivity.timestamp)).all()
+            hourly_usage = defaultdict(int)
+            for bucket in daily_buckets:
+                for hour, count in bucket["hourly_activity"].items():
+                    hourly_usage[int(hour)] += count
             
             # Equipment popularity
             equipment_usage = self.db.query(
@@ -166,15 +142,15 @@ class RealAnalyticsService:
                 "period_days": days,
                 "daily_trends": [
                     {
-                        "date": str(row.date),
-                        "unique_members": row.unique_members,
-                        "total_activities": row.total_activities
+                        "date": str(bucket["bucket_start"].date()),
+                        "unique_members": bucket["unique_members"],
+                        "total_activities": bucket["activity_count"]
                     }
-                    for row in daily_usage
+                    for bucket in daily_usage
                 ],
                 "peak_hours": [
-                    {"hour": int(row.hour), "activity_count": row.activity_count}
-                    for row in hourly_usage
+                    {"hour": hour, "activity_count": count}
+                    for hour, count in sorted(hourly_usage.items())
                 ],
                 "popular_equipment": [
                     {
@@ -200,31 +176,18 @@ class RealAnalyticsService:
         try:
             start_date = datetime.utcnow() - timedelta(days=days)
             
-            # Daily revenue trends
-            daily_revenue = self.db.query(
-                func.date(Transaction.created_at).label('date'),
-                func.sum(Transaction.amount).label('revenue'),
-                func.count(Transaction.id).label('transaction_count')
-            ).filter(
-                and_(
-                    Transaction.makerspace_id == makerspace_id,
-                    Transaction.created_at >= start_date,
-                    Transaction.status == 'completed'
-                )
-            ).group_by(func.date(Transaction.created_at)).order_by('date').all()
+            # Current and previous period come from one pass over daily rollups
+            prev_start = start_date - timedelta(days=days)
+            period_start = floor_bucket(start_date, "daily")
+            daily_buckets = self.snapshots.get_buckets(makerspace_id, "daily", prev_start)
+            current_buckets = [b for b in daily_buckets if b["bucket_start"] >= period_start]
+            daily_revenue = [b for b in current_buckets if b["transaction_count"]]
             
-            # Revenue by category
-            revenue_by_category = self.db.query(
-                Transaction.category,
-                func.sum(Transaction.amount).label('revenue'),
-                func.count(Transaction.id).label('count')
-            ).filter(
-                and_(
-                    Transaction.makerspace_id == makerspace_id,
-                    Transaction.created_at >= start_date,
-                    Transaction.status == 'completed'
-                )
-            ).group_by(Transaction.category).all()
+            revenue_by_category = defaultdict(lambda: [0.0, 0])
+            for bucket in current_buckets:
+                for category, (category_revenue, category_count) in bucket["revenue_by_category"].items():
+                    revenue_by_category[category][0] += category_revenue
+                    revenue_by_category[category][1] += category_count
             
             # Top paying members
             top_members = self.db.query(
@@ -254,19 +217,13 @@ class RealAnalyticsService:
             ).first()
             
             # Calculate totals and growth
-            total_revenue = sum(float(row.revenue or 0) for row in daily_revenue)
-            total_transactions = sum(row.transaction_count for row in daily_revenue)
+            total_revenue = sum(bucket["revenue"] for bucket in daily_revenue)
+            total_transactions = sum(bucket["transaction_count"] for bucket in daily_revenue)
             
             # Growth calculation (compare with previous period)
-            prev_start = start_date - timedelta(days=days)
-            prev_revenue = self.db.query(func.sum(Transaction.amount)).filter(
-                and_(
-                    Transaction.makerspace_id == makerspace_id,
-                    Transaction.created_at >= prev_start,
-                    Transaction.created_at < start_date,
-                    Transaction.status == 'completed'
-                )
-            ).scalar() or 0.0
+            prev_revenue = sum(
+                bucket["revenue"] for bucket in daily_buckets if bucket["bucket_start"] < period_start
+            )
             
             growth_rate = ((total_revenue - float(prev_revenue)) / float(prev_revenue) * 100) if prev_revenue > 0 else 0
             
@@ -280,19 +237,19 @@ class RealAnalyticsService:
                 },
                 "daily_trends": [
                     {
-                        "date": str(row.date),
-                        "revenue": float(row.revenue or 0),
-                        "transaction_count": row.transaction_count
+                        "date": str(bucket["bucket_start"].date()),
+                        "revenue": bucket["revenue"],
+                        "transaction_count": bucket["transaction_count"]
                     }
-                    for row in daily_revenue
+                    for bucket in daily_revenue
                 ],
                 "revenue_by_category": [
                     {
-                        "category": row.category,
-                        "revenue": float(row.revenue or 0),
-                        "count": row.count
+                        "category": category,
+                        "revenue": category_revenue,
+                        "count": category_count
                     }
-                    for row in revenue_by_category
+                    for category, (category_revenue, category_count) in revenue_by_category.items()
                 ],
                 "top_members": [
                     {
@@ -319,28 +276,21 @@ class RealAnalyticsService:
         try:
             start_date = datetime.utcnow() - timedelta(days=days)
             
-            # Equipment utilization rates
+            # Equipment utilization rates from daily rollups plus the raw tail
             equipment_stats = self.db.query(
                 Equipment.id,
                 Equipment.name,
                 Equipment.category,
-                Equipment.status,
-                func.count(EquipmentUsage.id).label('usage_sessions'),
-                func.sum(
-                    func.extract('epoch', EquipmentUsage.end_time - EquipmentUsage.start_time) / 3600
-                ).label('total_hours'),
-                func.avg(
-                    func.extract('epoch', EquipmentUsage.end_time - EquipmentUsage.start_time) / 3600
-                ).label('avg_session_hours')
-            ).outerjoin(
-                EquipmentUsage,
-                and_(
-                    EquipmentUsage.equipment_id == Equipment.id,
-                    EquipmentUsage.start_time >= start_date
-                )
+                Equipment.status
             ).filter(
                 Equipment.makerspace_id == makerspace_id
-            ).group_by(Equipment.id).all()
+            ).all()
+            
+            usage_by_equipment = defaultdict(lambda: [0, 0.0])
+            for bucket in self.snapshots.get_buckets(makerspace_id, "daily", start_date):
+                for equipment_id, (sessions, hours) in bucket["equipment_usage"].items():
+                    usage_by_equipment[equipment_id][0] += sessions
+                    usage_by_equipment[equipment_id][1] += hours
             
             # Maintenance tracking
             maintenance_due = self.db.query(
@@ -380,15 +330,16 @@ class RealAnalyticsService:
             
             equipment_list = []
             for eq in equipment_stats:
-                utilization_rate = (float(eq.total_hours or 0) / total_available_hours) * 100 if total_available_hours > 0 else 0
+                usage_sessions, total_hours = usage_by_equipment.get(str(eq.id), (0, 0.0))
+                utilization_rate = (total_hours / total_available_hours) * 100 if total_available_hours > 0 else 0
                 equipment_list.append({
                     "id": eq.id,
                     "name": eq.name,
                     "category": eq.category,
                     "status": eq.status,
-                    "usage_sessions": eq.usage_sessions or 0,
-                    "total_hours": round(float(eq.total_hours or 0), 2),
-                    "avg_session_hours": round(float(eq.avg_session_hours or 0), 2),
+                    "usage_sessions": usage_sessions,
+                    "total_hours": round(total_hours, 2),
+                    "avg_session_hours": round(total_hours / usage_sessions, 2) if usage_sessions else 0,
                     "utilization_rate": round(utilization_rate, 1)
                 })
             
@@ -682,3 +633,28 @@ def get_real_analytics_service(db: Session = None) -> RealAnalyticsService:
     if db is None:
         db = next(get_db())
     return RealAnalyticsService(db)
+
+class AsyncRealAnalyticsService:
+    """Awaitable facade over RealAnalyticsService for an AsyncSession.
+
+    Each method runs the sync implementation through ``AsyncSession.run_sync``,
+    so the aggregate queries use the async connection instead of blocking the
+    event loop.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def __getattr__(self, name: str):
+        method = getattr(RealAnalyticsService, name)
+
+        async def call(*args, **kwargs):
+            return await self.db.run_sync(
+                lambda session: method(RealAnalyticsService(session), *args, **kwargs)
+            )
+
+        return call
+
+def get_async_analytics_service(db: AsyncSession) -> AsyncRealAnalyticsService:
+    """Get analytics service for an async route"""
+    return AsyncRealAnalyticsService(db)
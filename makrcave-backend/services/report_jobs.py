@@ -0,0 +1,175 @@
+"""Background report rendering with a shared artifact cache.
+
+Report requests are recorded as ``ReportRequest`` rows and rendered on a small
+worker pool instead of the API worker. Rendered files are cached by
+(makerspace, report type, date range, data version): a repeat request for the
+same period completes immediately from the cache, and concurrent requests for
+the same key share one render. Data versions are read from the same read
+session the render uses, so an artifact is never cached under a version newer
+than the data a lagging replica returned.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Dict, Optional
+
+from crud.analytics import AnalyticsCRUD
+from database import SessionLocal, get_read_session
+from sqlalchemy.orm import Session
+from utils.report_cache import ReportArtifactCache, get_report_cache, report_cache_key
+from utils.report_generator import REPORT_RENDERERS, ReportGenerator
+
+logger = logging.getLogger(__name__)
+
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+# Minimum seconds between cache eviction sweeps
+REPORT_EVICTION_INTERVAL = int(os.getenv("REPORT_EVICTION_INTERVAL", "300"))
+
+
+class ReportJobService:
+    """Enqueues report renders on a worker pool and records their outcome"""
+
+    def __init__(
+        self,
+        max_workers: int = REPORT_WORKERS,
+        cache: Optional[ReportArtifactCache] = None,
+    ):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="report-worker"
+        )
+        self.cache = cache or get_report_cache()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._last_eviction = 0.0
+
+    def submit(
+        self,
+        db: Session,
+        request_id: str,
+        makerspace_id: str,
+        report_type: str,
+        start_date: date,
+        end_date: date,
+    ) -> Optional[str]:
+        """Serve a report request from cache or enqueue it for rendering.
+
+        Returns the artifact path on a cache hit (the request is marked
+        completed right away), otherwise ``None`` once the job is queued.
+        """
+        _, file_format = REPORT_RENDERERS[report_type]
+        read_db = get_read_session()
+        try:
+            data_version = ReportGenerator(read_db).get_data_version(
+                report_type, makerspace_id, start_date, end_date
+            )
+        finally:
+            read_db.close()
+        key = report_cache_key(
+            makerspace_id, report_type, start_date, end_date, data_version
+        )
+
+        analytics_crud = AnalyticsCRUD(db)
+        cached_path = self.cache.get(key, file_format)
+        if cached_path:
+            analytics_crud.update_report_status(
+                request_id, "completed", file_url=cached_path
+            )
+            return cached_path
+
+        analytics_crud.update_report_status(request_id, "processing")
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self.executor.submit(
+                    self._render,
+                    key,
+                    file_format,
+                    report_type,
+                    makerspace_id,
+                    start_date,
+                    end_date,
+                )
+                self._inflight[key] = future
+                future.add_done_callback(lambda _f, key=key: self._forget(key))
+        future.add_done_callback(lambda f: self._record_result(request_id, f))
+        return None
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _render(
+        self,
+        key: str,
+        file_format: str,
+        report_type: str,
+        makerspace_id: str,
+        start_date: date,
+        end_date: date,
+    ) -> str:
+        db = get_read_session()
+        try:
+            generator = ReportGenerator(db)
+            # Versioned before rendering, so the data rendered is at least this new
+            data_version = generator.get_data_version(
+                report_type, makerspace_id, start_date, end_date
+            )
+            rendered_path = generator.render(
+                report_type, makerspace_id, start_date, end_date
+            )
+        finally:
+            db.close()
+
+        # Cached under the version this render saw, which may differ from the
+        # submit-time key
+        artifact_key = report_cache_key(
+            makerspace_id, report_type, start_date, end_date, data_version
+        )
+        artifact_path = self.cache.put(artifact_key, file_format, rendered_path)
+        self._maybe_evict()
+        return artifact_path
+
+    def _record_result(self, request_id: str, future: Future) -> None:
+        db = SessionLocal()
+        try:
+            analytics_crud = AnalyticsCRUD(db)
+            error = future.exception()
+            if error is not None:
+                logger.error(f"Report {request_id} failed: {error}")
+                analytics_crud.update_report_status(
+                    request_id, "failed", error_message=str(error)
+                )
+            else:
+                analytics_crud.update_report_status(
+                    request_id, "completed", file_url=future.result()
+                )
+        except Exception as e:
+            logger.error(f"Failed to record report {request_id} result: {e}")
+        finally:
+            db.close()
+
+    def _maybe_evict(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_eviction < REPORT_EVICTION_INTERVAL:
+                return
+            self._last_eviction = now
+        self.cache.evict()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait)
+
+
+_report_job_service: Optional[ReportJobService] = None
+
+
+def get_report_job_service() -> ReportJobService:
+    """Process-wide report job service"""
+    global _report_job_service
+    if _report_job_service is None:
+        _report_job_service = ReportJobService()
+    return _report_job_service
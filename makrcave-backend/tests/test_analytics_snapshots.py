@@ -0,0 +1,262 @@
+import importlib
+import os
+import sys
+import types
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    String,
+    UniqueConstraint,
+    create_engine,
+)
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.types import JSON
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# SQLite stand-ins for the columns the rollup engine reads and writes; the
+# production models use PostgreSQL types and cross-table foreign keys
+Base = declarative_base()
+
+
+class MemberActivity(Base):
+    __tablename__ = "member_activities"
+    id = Column(Integer, primary_key=True)
+    makerspace_id = Column(String, nullable=False)
+    member_id = Column(String, nullable=False)
+    activity_type = Column(String, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+
+
+class EquipmentUsage(Base):
+    __tablename__ = "equipment_usage"
+    id = Column(Integer, primary_key=True)
+    makerspace_id = Column(String, nullable=False)
+    equipment_id = Column(String, nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime)
+
+
+class Transaction(Base):
+    __tablename__ = "transactions"
+    id = Column(Integer, primary_key=True)
+    makerspace_id = Column(String, nullable=False)
+    category = Column(String)
+    amount = Column(Float, nullable=False)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+
+class SafetyIncident(Base):
+    __tablename__ = "safety_incidents"
+    id = Column(Integer, primary_key=True)
+    makerspace_id = Column(String, nullable=False)
+    incident_date = Column(Date, nullable=False)
+    severity = Column(String, nullable=False)
+
+
+class MakerspaceSettings(Base):
+    __tablename__ = "makerspace_settings"
+    id = Column(Integer, primary_key=True)
+    makerspace_id = Column(String, nullable=False)
+
+
+class AnalyticsRollup(Base):
+    __tablename__ = "analytics_rollups"
+    __table_args__ = (UniqueConstraint("makerspace_id", "granularity", "bucket_start"),)
+    id = Column(Integer, primary_key=True)
+    makerspace_id = Column(String, nullable=False)
+    granularity = Column(String, nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    activity_count = Column(Integer, default=0, nullable=False)
+    unique_members = Column(Integer, default=0, nullable=False)
+    checkins = Column(Integer, default=0, nullable=False)
+    equipment_sessions = Column(Integer, default=0, nullable=False)
+    equipment_hours = Column(Float, default=0.0, nullable=False)
+    revenue = Column(Float, default=0.0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+    safety_incidents = Column(Integer, default=0, nullable=False)
+    hourly_activity = Column(JSON)
+    revenue_by_category = Column(JSON)
+    equipment_usage = Column(JSON)
+    computed_at = Column(DateTime, nullable=False)
+
+
+SPACE = "ms-1"
+NOW = datetime(2024, 5, 10, 12, 30)
+
+
+@pytest.fixture
+def snapshots(monkeypatch):
+    models = {
+        "models.analytics": {"AnalyticsRollup": AnalyticsRollup},
+        "models.billing": {"Transaction": Transaction},
+        "models.enhanced_analytics": {
+            "EquipmentUsage": EquipmentUsage,
+            "MemberActivity": MemberActivity,
+            "SafetyIncident": SafetyIncident,
+        },
+        "models.makerspace_settings": {"MakerspaceSettings": MakerspaceSettings},
+    }
+    for name, attributes in models.items():
+        monkeypatch.setitem(sys.modules, name, types.SimpleNamespace(**attributes))
+    sys.modules.pop("services.analytics_snapshots", None)
+    module = importlib.import_module("services.analytics_snapshots")
+    monkeypatch.setitem(module.INITIAL_BACKFILL, "hourly", timedelta(hours=6))
+    monkeypatch.setattr(module, "LATE_ARRIVAL_BUCKETS", 2)
+    yield module
+    sys.modules.pop("services.analytics_snapshots", None)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _activity(db, when, member="m-1", activity_type="checkin", space=SPACE):
+    db.add(
+        MemberActivity(
+            makerspace_id=space,
+            member_id=member,
+            activity_type=activity_type,
+            timestamp=when,
+        )
+    )
+
+
+def test_compute_buckets_aggregates_each_source(snapshots, db):
+    _activity(db, datetime(2024, 5, 10, 9, 5))
+    _activity(db, datetime(2024, 5, 10, 9, 40), member="m-2", activity_type="print")
+    _activity(db, datetime(2024, 5, 10, 10, 15))
+    _activity(db, datetime(2024, 5, 10, 9, 10), space="other")
+    db.add(
+        EquipmentUsage(
+            makerspace_id=SPACE,
+            equipment_id="printer-1",
+            start_time=datetime(2024, 5, 10, 9, 0),
+            end_time=datetime(2024, 5, 10, 10, 30),
+        )
+    )
+    for amount, status in ((40.0, "completed"), (15.0, "completed"), (99.0, "failed")):
+        db.add(
+            Transaction(
+                makerspace_id=SPACE,
+                category="membership",
+                amount=amount,
+                status=status,
+                created_at=datetime(2024, 5, 10, 9, 30),
+            )
+        )
+    db.commit()
+
+    engine = snapshots.AnalyticsSnapshotEngine(db)
+    buckets = engine.compute_buckets(
+        SPACE, "hourly", datetime(2024, 5, 10, 0), datetime(2024, 5, 11, 0)
+    )
+
+    nine = buckets[datetime(2024, 5, 10, 9)]
+    assert sorted(buckets) == [datetime(2024, 5, 10, 9), datetime(2024, 5, 10, 10)]
+    assert nine["activity_count"] == 2
+    assert nine["unique_members"] == 2
+    assert nine["checkins"] == 1
+    assert nine["hourly_activity"] == {"9": 2}
+    assert nine["equipment_sessions"] == 1
+    assert nine["equipment_hours"] == pytest.approx(1.5)
+    assert nine["revenue"] == 55.0
+    assert nine["revenue_by_category"] == {"membership": [55.0, 2]}
+
+
+def test_safety_incidents_roll_up_daily_by_severity(snapshots, db):
+    for severity in ("low", "medium", "critical"):
+        db.add(
+            SafetyIncident(
+                makerspace_id=SPACE, incident_date=date(2024, 5, 9), severity=severity
+            )
+        )
+    db.commit()
+    engine = snapshots.AnalyticsSnapshotEngine(db)
+
+    daily = engine.compute_buckets(
+        SPACE, "daily", datetime(2024, 5, 9), datetime(2024, 5, 10)
+    )
+    hourly = engine.compute_buckets(
+        SPACE, "hourly", datetime(2024, 5, 9), datetime(2024, 5, 10)
+    )
+
+    assert daily[datetime(2024, 5, 9)]["safety_incidents"] == 2
+    assert hourly == {}
+
+
+def test_refresh_backfills_then_only_recomputes_the_late_window(snapshots, db):
+    _activity(db, datetime(2024, 5, 10, 8, 15))
+    db.commit()
+    engine = snapshots.AnalyticsSnapshotEngine(db)
+
+    # Six hourly buckets, empty ones included, from 06:00 up to the open 12:00
+    assert engine.refresh(SPACE, "hourly", now=NOW) == 6
+    assert engine.get_watermark(SPACE, "hourly") == datetime(2024, 5, 10, 12)
+
+    # A row arriving late for 11:00 is picked up by the next refresh
+    _activity(db, datetime(2024, 5, 10, 11, 50), member="m-9")
+    db.commit()
+    assert engine.refresh(SPACE, "hourly", now=NOW + timedelta(hours=1)) == 3
+
+    stored = {
+        row.bucket_start: row.activity_count
+        for row in db.query(AnalyticsRollup).filter_by(granularity="hourly")
+    }
+    assert len(stored) == 7
+    assert stored[datetime(2024, 5, 10, 8)] == 1
+    assert stored[datetime(2024, 5, 10, 11)] == 1
+
+
+def test_get_buckets_joins_live_head_stored_rollups_and_live_tail(snapshots, db):
+    for hour in (3, 8, 12):
+        _activity(db, datetime(2024, 5, 10, hour, 10))
+    db.commit()
+    engine = snapshots.AnalyticsSnapshotEngine(db)
+    engine.refresh(SPACE, "hourly", now=NOW)  # Stores 06:00-11:00
+
+    buckets = engine.get_buckets(
+        SPACE, "hourly", datetime(2024, 5, 10, 2, 45), now=NOW + timedelta(minutes=5)
+    )
+
+    counted = {
+        bucket["bucket_start"]: bucket["activity_count"]
+        for bucket in buckets
+        if bucket["activity_count"]
+    }
+    assert counted == {
+        datetime(2024, 5, 10, 3): 1,  # Before the earliest rollup: live
+        datetime(2024, 5, 10, 8): 1,  # Stored
+        datetime(2024, 5, 10, 12): 1,  # After the watermark: live
+    }
+    starts = [bucket["bucket_start"] for bucket in buckets]
+    assert starts == sorted(starts)
+
+
+def test_refresh_all_covers_every_makerspace(snapshots, db):
+    db.add_all(
+        [
+            MakerspaceSettings(makerspace_id=SPACE),
+            MakerspaceSettings(makerspace_id="ms-2"),
+        ]
+    )
+    db.commit()
+
+    written = snapshots.AnalyticsSnapshotEngine(db).refresh_all(
+        granularities=("hourly",), now=NOW
+    )
+
+    assert written == 12
+    assert {row.makerspace_id for row in db.query(AnalyticsRollup)} == {SPACE, "ms-2"}
@@ -0,0 +1,101 @@
+import io
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.gcode_analyzer import GCodeAnalyzer, analyze_gcode_stream  # noqa: E402
+
+SAMPLE = """; generated by test
+M82
+G90
+G92 E0
+G1 Z0.2 F3000
+G1 X10 Y0 E5 F1200
+G1 E3 F2400 ; retract
+G1 X20 Y0 F6000
+G1 E5 ; prime
+G1 X30 E10 F1200
+G1 Z0.4
+G92 E0
+G1 X40 E2
+M83
+G1 X50 E2
+G4 S30
+; filament used [mm] = 1234.5
+; estimated printing time (normal mode) = 1h 2m 3s
+"""
+
+
+def test_absolute_and_relative_extrusion_with_retractions():
+    result = analyze_gcode_stream(io.BytesIO(SAMPLE.encode()), 1.24, 1.75, chunk_size=7)
+
+    # 5 + 5 (prime after retraction is not new material) + 2 + 2
+    assert result["estimated_length_mm"] == pytest.approx(14.0)
+    expected_weight = math.pi * (1.75 / 2) ** 2 * 14.0 / 1000 * 1.24
+    assert result["estimated_weight_g"] == pytest.approx(round(expected_weight, 2))
+    assert result["retraction_count"] == 1
+    assert result["retracted_length_mm"] == pytest.approx(2.0)
+    assert result["layer_count"] == 2
+    assert result["analysis_method"] == "gcode_extrusion"
+
+
+def test_slicer_comments_are_reported():
+    result = analyze_gcode_stream(io.BytesIO(SAMPLE.encode()), 1.24, 1.75)
+
+    assert result["slicer_estimates"]["length_mm"] == pytest.approx(1234.5)
+    assert result["slicer_estimates"]["print_time_minutes"] == pytest.approx(62.05)
+
+
+def test_print_time_uses_feedrate_and_dwell():
+    analyzer = GCodeAnalyzer()
+    analyzer.feed("G1 X60 F600\nG4 P30000")
+    result = analyzer.result(1.24, 1.75)
+
+    # 60 mm at 10 mm/s (6 s) plus a 30 s dwell
+    assert result["print_time_estimate_minutes"] == pytest.approx(0.6)
+
+
+def test_falls_back_to_slicer_length_without_extrusion_moves():
+    analyzer = GCodeAnalyzer()
+    analyzer.feed(";Filament used: 1.5m\n")
+    result = analyzer.result(1.24, 1.75)
+
+    assert result["estimated_length_mm"] == pytest.approx(1500.0)
+    assert result["analysis_method"] == "gcode_comments"
+
+
+@pytest.mark.parametrize("command", ["G2", "G3", "G02", "G03"])
+def test_arc_moves_extrude_like_linear_moves(command):
+    analyzer = GCodeAnalyzer()
+    analyzer.feed(
+        "M83\nG1 X10 Y0 Z0.2 F600\n"
+        f"{command} X10 Y0 I-10 J0 E4\n"  # Full circle, radius 10
+        "G1 E-1\nG1 E1\n"
+        f"{command} X-10 Y0 R10 E2\n"  # Half circle
+    )
+    result = analyzer.result(1.24, 1.75)
+
+    assert result["estimated_length_mm"] == pytest.approx(6.0)
+    assert result["retraction_count"] == 1
+    assert result["layer_count"] == 1
+    # Timed along the arcs (30*pi mm plus the 10.2 mm lead-in) at 10 mm/s,
+    # plus the 2 mm retract and prime
+    expected_s = (math.hypot(10, 0.2) + 30 * math.pi + 2) / 10
+    assert result["print_time_estimate_minutes"] == pytest.approx(
+        round(expected_s / 60, 1)
+    )
+
+
+def test_arc_length_follows_direction_and_radius_sign():
+    analyzer = GCodeAnalyzer()
+    analyzer.x, analyzer.y = 10.0, 0.0
+    quarter, rest = 5 * math.pi, 15 * math.pi
+
+    # Counter-clockwise from (10, 0) to (0, 10) is a quarter turn
+    assert analyzer._arc_length({"I": -10}, 0, 10, False) == pytest.approx(quarter)
+    assert analyzer._arc_length({"I": -10}, 0, 10, True) == pytest.approx(rest)
+    assert analyzer._arc_length({"R": 10}, 0, 10, False) == pytest.approx(quarter)
+    assert analyzer._arc_length({"R": -10}, 0, 10, False) == pytest.approx(rest)
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.github_client import AsyncGitHubClient, GitHubRateLimited  # noqa: E402
+
+
+def _client(handler, **kwargs):
+    return AsyncGitHubClient(base_url="https://api.test", transport=httpx.MockTransport(handler), **kwargs)
+
+
+def test_etag_revalidation_reuses_cached_body():
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"n": 1}, headers={"ETag": '"v1"'})
+
+    async def run():
+        client = _client(handler)
+        first = await client.get_json("/repos/a/b/pulls", {"state": "all"}, token="t")
+        second = await client.get_json("/repos/a/b/pulls", {"state": "all"}, token="t")
+        await client.aclose()
+        return first, second
+
+    assert asyncio.run(run()) == ({"n": 1}, {"n": 1})
+    assert seen == [None, '"v1"']
+
+
+def test_immutable_responses_are_not_refetched_and_tokens_are_partitioned():
+    calls = []
+
+    def handler(request):
+        calls.append(request.headers.get("Authorization"))
+        return httpx.Response(200, json={"files": []})
+
+    async def run():
+        client = _client(handler)
+        for token in ("a", "a", "b"):
+            await client.get_json("/repos/x/y/commits/abc", token=token, immutable=True)
+        await client.aclose()
+
+    asyncio.run(run())
+    assert calls == ["token a", "token b"]
+
+
+def test_concurrent_requests_are_bounded():
+    in_flight = [0]
+    peak = [0]
+
+    async def handler(request):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        return httpx.Response(200, json={})
+
+    async def run():
+        client = _client(handler, max_concurrency=3)
+        await asyncio.gather(*(client.get_json(f"/c/{i}") for i in range(12)))
+        await client.aclose()
+
+    asyncio.run(run())
+    assert peak[0] == 3
+
+
+def test_exhausted_token_with_distant_reset_raises():
+    reset = str(int(time.time()) + 3600)
+
+    def handler(request):
+        return httpx.Response(200, json={}, headers={"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": reset})
+
+    async def run():
+        client = _client(handler, rate_limit_reserve=10, max_rate_limit_wait=1)
+        await client.get_json("/first", token="t")
+        try:
+            await client.get_json("/second", token="t")
+        finally:
+            await client.aclose()
+
+    try:
+        asyncio.run(run())
+    except GitHubRateLimited as e:
+        assert e.reset_at == float(reset)
+    else:
+        raise AssertionError("expected GitHubRateLimited")
@@ -0,0 +1,91 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from models.project import (  # noqa: E402
+    ActivityType,
+    ProjectActivityLog,
+    ProjectGitHubSyncState,
+)
+
+from services import github_sync  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    tables = [ProjectActivityLog.__table__, ProjectGitHubSyncState.__table__]
+    ProjectActivityLog.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _commit_row(sha):
+    return {
+        "project_id": "p1",
+        "activity_type": ActivityType.GITHUB_COMMIT_PUSHED,
+        "title": f"Commit {sha}",
+        "user_id": "dev@example.com",
+        "user_name": "Dev",
+        "external_id": sha,
+        "metadata": {"commit_sha": sha},
+    }
+
+
+def test_save_skips_activity_that_is_already_logged(db):
+    github_sync._save(db, "p1", [_commit_row("a1"), _commit_row("b2")], {})
+    github_sync._save(db, "p1", [_commit_row("b2"), _commit_row("c3")], {})
+
+    assert db.query(ProjectActivityLog).count() == 3
+
+
+def test_existing_keys_matches_by_type_and_external_id(db):
+    pr_row = dict(
+        _commit_row("7"), activity_type=ActivityType.GITHUB_PULL_REQUEST_OPENED
+    )
+    github_sync._save(db, "p1", [_commit_row("a1"), pr_row], {})
+
+    keys = github_sync._existing_keys(db, "p1", ["a1", "zz"], ["7"], ["7"])
+
+    assert keys == {
+        (ActivityType.GITHUB_COMMIT_PUSHED, "a1"),
+        (ActivityType.GITHUB_PULL_REQUEST_OPENED, "7"),
+    }
+
+
+def test_fetch_pages_until_the_mark(monkeypatch):
+    monkeypatch.setattr(github_sync, "GITHUB_SYNC_MAX_PAGES", 10)
+    pages = {1: [9, 8, 7], 2: [6, 5, 4], 3: [3, 2, 1]}
+    fetched = []
+
+    async def fetch_page(page):
+        fetched.append(page)
+        return pages.get(page, [])
+
+    items = asyncio.run(
+        github_sync._fetch_until_mark(
+            fetch_page, lambda item: item == 4, "commits", "p1"
+        )
+    )
+
+    assert items == [9, 8, 7, 6, 5]
+    assert fetched == [1, 2]
+
+
+def test_fetch_stops_at_the_page_cap(monkeypatch):
+    monkeypatch.setattr(github_sync, "GITHUB_SYNC_MAX_PAGES", 2)
+
+    async def fetch_page(page):
+        return [page]
+
+    items = asyncio.run(
+        github_sync._fetch_until_mark(fetch_page, lambda item: False, "issues", "p1")
+    )
+
+    assert items == [1, 2]
@@ -0,0 +1,89 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.pagination import (  # noqa: E402
+    InvalidCursor,
+    SortKey,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), nullable=False)
+    due_at = Column(DateTime, nullable=True)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2024, 1, 1)
+    for i in range(1, 24):
+        due_at = None if i % 5 == 0 else start + timedelta(days=i % 4)
+        session.add(Item(id=i, name=f"item-{i % 3}", due_at=due_at))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _walk(db, keys, limit):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = paginate(db.query(Item), keys, limit, cursor)
+        seen.extend(row.id for row in rows)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_every_row_once_in_order(db, descending):
+    keys = [
+        SortKey(Item.due_at, descending=descending, nullable=True),
+        SortKey(Item.id, descending=descending),
+    ]
+    expected = [
+        row.id for row in db.query(Item).order_by(*(key.order_by() for key in keys))
+    ]
+    assert _walk(db, keys, 4) == expected
+    assert len(expected) == 23
+
+
+def test_mixed_directions(db):
+    keys = [SortKey(Item.name), SortKey(Item.id, descending=True)]
+    expected = [
+        row.id for row in db.query(Item).order_by(Item.name.asc(), Item.id.desc())
+    ]
+    assert _walk(db, keys, 5) == expected
+
+
+def test_rows_inserted_before_the_cursor_do_not_shift_pages(db):
+    keys = [SortKey(Item.id)]
+    first, cursor = paginate(db.query(Item), keys, 5)
+    db.add(Item(id=0, name="new"))
+    db.commit()
+    second, _ = paginate(db.query(Item), keys, 5, cursor)
+    assert [row.id for row in first] == [1, 2, 3, 4, 5]
+    assert [row.id for row in second] == [6, 7, 8, 9, 10]
+
+
+def test_cursor_round_trip_and_validation():
+    values = [datetime(2024, 5, 1, 12, 30), None, "abc", 7]
+    assert decode_cursor(encode_cursor(values)) == values
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not a cursor!")
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor([1, 2]), size=3)
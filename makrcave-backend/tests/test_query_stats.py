@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils import query_stats  # noqa: E402
+from utils.query_stats import (
+    QueryInsights,
+    begin_request,
+    end_request,
+    instrument_engine,
+)  # noqa: E402
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(query_stats, "query_insights", QueryInsights(size=5))
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    instrument_engine(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (id, name) VALUES (1, 'a'), (2, 'b')"))
+    return engine
+
+
+def test_statements_are_charged_to_the_active_request(engine):
+    stats, token = begin_request("req-1")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": 1})
+        conn.execute(text("SELECT count(*) FROM items"))
+    end_request(token)
+
+    assert stats.count == 2
+    assert stats.total_ms > 0
+    assert query_stats.current_stats() is None
+
+
+def test_attribution_follows_the_request_into_worker_threads(engine):
+    def load():
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT name FROM items")).all()
+
+    async def handler():
+        stats, token = begin_request("req-2")
+        await asyncio.to_thread(load)
+        end_request(token)
+        return stats
+
+    assert asyncio.run(handler()).count == 1
+
+
+def test_repeated_statement_is_reported_as_n_plus_one(engine, monkeypatch):
+    monkeypatch.setattr(query_stats, "N_PLUS_ONE_THRESHOLD", 3)
+    stats, token = begin_request("req-3")
+    with engine.connect() as conn:
+        for item_id in range(5):
+            conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+        conn.execute(text("SELECT count(*) FROM items"))
+    end_request(token)
+
+    reported = query_stats.query_insights.snapshot()["n_plus_one"]
+    assert len(reported) == 1
+    assert reported[0]["request_id"] == "req-3"
+    assert reported[0]["times"] == 5
+
+
+def test_slow_statements_are_captured_with_a_plan_once(engine, monkeypatch):
+    monkeypatch.setattr(query_stats, "SLOW_QUERY_MS", 0)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": 1})
+        conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": 2})
+
+    slow = query_stats.query_insights.snapshot()["slow_queries"]
+    assert len(slow) == 2
+    assert slow[0]["plan"] is None  # Explained recently; not again
+    assert "items" in slow[1]["plan"]
+    assert "1" not in slow[1]["statement"]  # Parameter values are not kept
+
+
+def test_failed_explain_leaves_the_callers_transaction_usable(engine, monkeypatch):
+    monkeypatch.setattr(query_stats, "SLOW_QUERY_MS", 0)
+    monkeypatch.setitem(query_stats._EXPLAIN_PREFIXES, "sqlite", "EXPLAIN BOGUS ")
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO items (id, name) VALUES (3, 'c')"))
+        conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": 3})
+        conn.execute(text("INSERT INTO items (id, name) VALUES (4, 'd')"))
+    slow = query_stats.query_insights.snapshot()["slow_queries"]
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM items")).scalar() == 4
+    assert [entry["statement"].split()[0] for entry in slow] == [
+        "INSERT",
+        "SELECT",
+        "INSERT",
+    ]
+    assert slow[1]["plan"].startswith("EXPLAIN failed")
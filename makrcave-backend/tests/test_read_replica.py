@@ -0,0 +1,82 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import database  # noqa: E402
+from database import ReplicaHealth  # noqa: E402
+
+
+def test_health_rejects_lag_over_limit_and_errors():
+    health = ReplicaHealth(max_lag_seconds=5, check_interval=60)
+    assert health.record(1.5) is True
+    assert health.record(7.0) is False
+    assert health.record(None, "connection refused") is False
+    assert health.status()["last_error"] == "connection refused"
+
+
+def test_health_probes_once_per_interval():
+    health = ReplicaHealth(max_lag_seconds=5, check_interval=60)
+    assert health.claim_check() is True
+    assert health.claim_check() is False
+    health.check_interval = 0
+    assert health.claim_check() is True
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    def install(url):
+        engine = create_engine(url)
+        monkeypatch.setattr(database, "replica_engine", engine)
+        monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker(bind=engine))
+        monkeypatch.setattr(
+            database,
+            "replica_health",
+            ReplicaHealth(max_lag_seconds=5, check_interval=60),
+        )
+        return engine
+
+    return install
+
+
+def _read_session_bind():
+    dependency = database.get_read_db()
+    db = next(dependency)
+    try:
+        return db.get_bind()
+    finally:
+        dependency.close()
+
+
+def test_reads_use_a_healthy_replica(replica, tmp_path):
+    engine = replica(f"sqlite:///{tmp_path / 'replica.db'}")
+    assert _read_session_bind() is engine
+    assert database.replica_health.usable is True
+
+
+def test_reads_fall_back_to_primary_when_replica_is_down(replica, tmp_path):
+    replica(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    assert _read_session_bind() is database.engine
+    assert database.replica_health.last_error
+
+
+def test_reads_use_primary_without_a_replica(monkeypatch):
+    monkeypatch.setattr(database, "replica_engine", None)
+    assert _read_session_bind() is database.engine
+
+
+@pytest.mark.parametrize(
+    "url, connect_args",
+    [
+        ("postgresql://r@replica/db", {"connect_timeout": 2}),
+        ("postgresql+psycopg2://r@replica/db", {"connect_timeout": 2}),
+        ("postgresql+asyncpg://r@replica/db", {"timeout": 2}),
+        ("sqlite:///replica.db", {"check_same_thread": False}),
+    ],
+)
+def test_replica_engines_get_a_short_connect_timeout(url, connect_args, monkeypatch):
+    monkeypatch.setattr(database, "REPLICA_CONNECT_TIMEOUT", 2)
+    assert database._replica_engine_options(url)["connect_args"] == connect_args
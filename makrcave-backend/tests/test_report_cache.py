@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import types
+from datetime import date, datetime
+
+from sqlalchemy import Column, DateTime, Float, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.report_cache import ReportArtifactCache, report_cache_key  # noqa: E402
+from utils.report_generator import ReportGenerator  # noqa: E402
+
+
+def _render(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_cache_key_changes_with_data_version():
+    args = ("space-1", "usage", date(2024, 1, 1), date(2024, 1, 31))
+    assert report_cache_key(*args, "10:a") == report_cache_key(*args, "10:a")
+    assert report_cache_key(*args, "10:a") != report_cache_key(*args, "11:b")
+
+
+def test_put_then_get_round_trip(tmp_path):
+    cache = ReportArtifactCache(cache_dir=str(tmp_path / "cache"))
+    stored = cache.put("abc", "csv", _render(tmp_path, "r.csv", 10))
+
+    assert cache.get("abc", "csv") == stored
+    assert cache.get("abc", "pdf") is None
+
+
+def test_evict_drops_expired_then_least_recently_used(tmp_path):
+    cache = ReportArtifactCache(cache_dir=str(tmp_path / "cache"))
+    old = cache.put("old", "csv", _render(tmp_path, "a.csv", 10))
+    lru = cache.put("lru", "csv", _render(tmp_path, "b.csv", 10))
+    mru = cache.put("mru", "csv", _render(tmp_path, "c.csv", 10))
+    now = time.time()
+    os.utime(old, (now - 3600, now - 3600))
+    os.utime(lru, (now - 60, now - 60))
+
+    removed = cache.evict(max_age_seconds=600, max_bytes=10)
+
+    assert removed == 2
+    assert not os.path.exists(old)
+    assert not os.path.exists(lru)
+    assert os.path.exists(mru)
+
+
+def test_data_version_changes_when_a_row_is_edited_in_place(monkeypatch):
+    Base = declarative_base()
+
+    # One SQLite table carrying every range column get_data_version reads
+    class AnalyticsRow(Base):
+        __tablename__ = "analytics_rows"
+        id = Column(Integer, primary_key=True)
+        makerspace_id = Column(String, nullable=False)
+        timestamp = Column(DateTime)
+        date = Column(DateTime)
+        session_start = Column(DateTime)
+        amount = Column(Float, nullable=False)
+        created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+        updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    monkeypatch.setitem(
+        sys.modules,
+        "models.analytics",
+        types.SimpleNamespace(
+            UsageEvent=AnalyticsRow,
+            InventoryAnalytics=AnalyticsRow,
+            RevenueAnalytics=AnalyticsRow,
+            EquipmentUsageLog=AnalyticsRow,
+            ProjectAnalytics=AnalyticsRow,
+        ),
+    )
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    row = AnalyticsRow(makerspace_id="ms-1", date=datetime(2024, 1, 10), amount=10.0)
+    db.add(row)
+    db.commit()
+
+    generator = ReportGenerator(db)
+    args = ("revenue", "ms-1", date(2024, 1, 1), date(2024, 1, 31))
+    before = generator.get_data_version(*args)
+    time.sleep(0.01)
+    row.amount = 25.0
+    db.commit()
+
+    assert generator.get_data_version(*args) != before
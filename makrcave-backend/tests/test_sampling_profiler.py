@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.sampling_profiler import ProfilerBusy, ProfilingMiddleware, SamplingProfiler  # noqa: E402
+
+
+def busy_work(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        hashlib.sha256(b"x" * 1024).digest()
+
+
+def idle_work(seconds):
+    threading.Event().wait(seconds)
+
+
+def _run_threads(*targets):
+    threads = [threading.Thread(target=target, args=(0.4,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_cpu_session_keeps_busy_stacks_and_drops_idle_waits():
+    profiler = SamplingProfiler(interval_ms=5)
+    profiler.start(mode="cpu", duration_seconds=10)
+    with pytest.raises(ProfilerBusy):
+        profiler.start()
+    _run_threads(busy_work, idle_work)
+    status = profiler.stop()
+
+    collapsed = profiler.collapsed()
+    assert status["samples"] > 0 and not status["running"]
+    assert "busy_work" in collapsed
+    assert "idle_work" not in collapsed
+    stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert stack.startswith("_bootstrap") and int(count) > 0
+
+
+def test_middleware_profiles_one_request_in_n_by_route():
+    profiler = SamplingProfiler(interval_ms=5)
+
+    async def list_items():
+        await asyncio.sleep(0)
+        busy_work(0.2)
+
+    profiler.register_routes(
+        [SimpleNamespace(endpoint=list_items, methods={"GET"}, path="/items")]
+    )
+
+    async def app(scope, receive, send):
+        await list_items()
+
+    middleware = ProfilingMiddleware(app, profiler, every_n=2)
+
+    async def serve():
+        for _ in range(2):
+            await middleware({"type": "http"}, None, None)
+
+    asyncio.run(serve())
+    collapsed = profiler.collapsed("requests")
+    assert collapsed.startswith("GET /items;list_items")
+    assert "busy_work" in collapsed
+    profiler.clear_requests()
+    assert profiler.collapsed("requests") == ""
+
+
+def test_distinct_stacks_are_bounded():
+    profiler = SamplingProfiler(max_stacks=1)
+    profiler._count(profiler._session_counts, ("a",))
+    profiler._count(profiler._session_counts, ("b",))
+    assert profiler.collapsed() in ("a 1\n[truncated] 1\n", "[truncated] 1\na 1\n")
@@ -0,0 +1,75 @@
+import os
+import sys
+import types
+from datetime import date, datetime
+
+from openpyxl import load_workbook
+from sqlalchemy import Column, DateTime, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.report_generator import ReportGenerator  # noqa: E402
+from utils.streaming_export import XlsxStreamWriter, iter_csv  # noqa: E402
+
+
+def test_iter_csv_chunks_rows_after_preamble():
+    rows = ([i, f"item-{i}"] for i in range(5))
+    chunks = list(
+        iter_csv(["id", "name"], rows, preamble=["# REPORT", ""], chunk_rows=2)
+    )
+
+    assert len(chunks) == 3
+    text = "".join(chunks)
+    assert text.startswith("# REPORT\n\nid,name\r\n0,item-0\r\n")
+    assert text.endswith("4,item-4\r\n")
+
+
+def test_iter_csv_header_only_for_empty_rows():
+    assert "".join(iter_csv(["a", "b"], iter(()))) == "a,b\r\n"
+
+
+def test_xlsx_stream_writer_writes_sheets_in_order(tmp_path):
+    path = str(tmp_path / "report.xlsx")
+    with XlsxStreamWriter(path) as writer:
+        writer.add_sheet("Summary", ["Metric", "Value"], [["Total", 3]])
+        count = writer.add_sheet(
+            "Detail", ["Id"], iter(range(3)), row_mapper=lambda value: [value * 10]
+        )
+
+    assert count == 3
+    workbook = load_workbook(path)
+    assert workbook.sheetnames == ["Summary", "Detail"]
+    detail = workbook["Detail"]
+    assert [row[0] for row in detail.iter_rows(values_only=True)] == ["Id", 0, 10, 20]
+
+
+def test_usage_export_includes_the_whole_last_day(monkeypatch):
+    # Only the columns the usage query touches, on SQLite
+    Base = declarative_base()
+
+    class UsageEvent(Base):
+        __tablename__ = "usage_events"
+        id = Column(Integer, primary_key=True)
+        makerspace_id = Column(String, nullable=False)
+        timestamp = Column(DateTime, nullable=False)
+
+    monkeypatch.setitem(
+        sys.modules, "models.analytics", types.SimpleNamespace(UsageEvent=UsageEvent)
+    )
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    for moment in (
+        datetime(2024, 3, 1, 0, 0),
+        datetime(2024, 3, 31, 23, 59, 59),
+        datetime(2024, 4, 1, 0, 0),
+    ):
+        db.add(UsageEvent(makerspace_id="ms-1", timestamp=moment))
+    db.commit()
+
+    query = ReportGenerator(db)._usage_events_query(
+        "ms-1", date(2024, 3, 1), date(2024, 3, 31)
+    )
+
+    days = [event.timestamp.day for event in query.order_by(UsageEvent.timestamp)]
+    assert days == [1, 31]
@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.ttl_cache import TTLCache  # noqa: E402
+
+
+def test_entries_expire_individually(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = TTLCache()
+    cache.set("short", 1, ttl_seconds=10)
+    cache.set("long", 2, ttl_seconds=100)
+
+    now[0] += 50
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    assert cache.get_entry("long") == (1100.0, 2)
+
+
+def test_invalidate_prefix_only_touches_matching_keys():
+    cache = TTLCache()
+    cache.set("dashboard:a:usage", 1, 60)
+    cache.set("dashboard:a:revenue", 2, 60)
+    cache.set("dashboard:b:usage", 3, 60)
+
+    assert cache.invalidate_prefix("dashboard:a:") == 2
+    assert cache.get("dashboard:b:usage") == 3
+
+
+def test_full_cache_evicts_entry_closest_to_expiry():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1, 10)
+    cache.set("b", 2, 100)
+    cache.set("c", 3, 100)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2 and cache.get("c") == 3
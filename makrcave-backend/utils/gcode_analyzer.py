@@ -0,0 +1,354 @@
+"""Streaming G-code analysis for filament usage and print time.
+
+The analyzer is a single-pass state machine over G-code lines. Input is fed
+in chunks (an uploaded file is never held in memory as a whole) and only the
+machine state and running totals are kept, so memory use is constant in the
+size of the file.
+
+Tracked state:
+- absolute/relative positioning (G90/G91) and extruder mode (M82/M83)
+- position resets (G92), including the common ``G92 E0`` per layer
+- retractions and the matching prime moves, which do not consume filament
+- layer changes, counted as the first extrusion at each new Z height
+- feedrate, used for a constant-speed print time estimate (no acceleration)
+- arc moves (G2/G3), extruding and timed along the arc rather than the chord
+
+Slicer summary comments (PrusaSlicer/SuperSlicer/Cura) are captured as well
+and reported alongside the computed values.
+"""
+
+import math
+import re
+from typing import IO, Any, Dict, Optional
+
+# Bytes read per chunk from an uploaded file
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Feedrate assumed before the first F word, in mm/min
+DEFAULT_FEEDRATE = 1500.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)\s*([dhms])")
+
+# Comment prefixes of the slicer summaries picked up by ``_process_comment``
+_SUMMARY_PREFIXES = (
+    "filament",
+    "estimated printing time",
+    "time:",
+    "layer_count",
+    "total layers",
+)
+
+
+def _parse_duration_minutes(text: str) -> Optional[float]:
+    """Parse slicer durations such as ``1d 2h 3m 4s`` into minutes"""
+    factors = {"d": 1440.0, "h": 60.0, "m": 1.0, "s": 1 / 60.0}
+    parts = _DURATION_PART.findall(text)
+    if not parts:
+        return None
+    return sum(float(value) * factors[unit] for value, unit in parts)
+
+
+def _comment_number(text: str) -> Optional[float]:
+    value = text.split("=", 1)[-1].split(":", 1)[-1].strip()
+    # Multi-extruder files list one value per tool: "12.3, 4.5"
+    total = 0.0
+    found = False
+    for part in value.split(","):
+        part = part.strip().rstrip("mgMG").strip()
+        try:
+            total += float(part)
+            found = True
+        except ValueError:
+            continue
+    return total if found else None
+
+
+class GCodeAnalyzer:
+    """Incremental G-code analyzer; call ``feed`` repeatedly, then ``result``"""
+
+    def __init__(self):
+        self.absolute_xyz = True
+        self.absolute_e = True
+        self.x = self.y = self.z = 0.0
+        self.e = 0.0
+        self.feedrate = DEFAULT_FEEDRATE
+
+        self.extruded_mm = 0.0
+        self.pending_retraction_mm = 0.0
+        self.retraction_count = 0
+        self.retracted_mm = 0.0
+        self.layer_count = 0
+        self.last_layer_z: Optional[float] = None
+        self.move_time_s = 0.0
+        self.dwell_time_s = 0.0
+        self.max_feedrate = 0.0
+
+        self.lines_processed = 0
+        self.bytes_processed = 0
+        self.slicer_estimates: Dict[str, float] = {}
+        self._tail = ""
+
+    # Input
+
+    def feed(self, chunk) -> None:
+        """Consume the next chunk of G-code (``bytes`` or ``str``)"""
+        if isinstance(chunk, bytes):
+            self.bytes_processed += len(chunk)
+            chunk = chunk.decode("ascii", errors="replace")
+        else:
+            self.bytes_processed += len(chunk)
+
+        data = self._tail + chunk
+        lines = data.split("\n")
+        # The last element is an incomplete line (or empty); keep it for later
+        self._tail = lines.pop()
+        for line in lines:
+            self.process_line(line)
+
+    def close(self) -> None:
+        """Flush a trailing line without a newline"""
+        if self._tail:
+            self.process_line(self._tail)
+            self._tail = ""
+
+    # Parsing
+
+    def process_line(self, line: str) -> None:
+        self.lines_processed += 1
+        code, sep, comment = line.partition(";")
+        if sep and comment:
+            self._process_comment(comment.strip())
+
+        words = code.split()
+        if not words:
+            return
+        command = words[0].upper()
+
+        if command in ("G0", "G1", "G00", "G01"):
+            self._process_move(words[1:])
+        elif command in ("G2", "G3", "G02", "G03"):
+            self._process_move(words[1:], clockwise=command in ("G2", "G02"))
+        elif command == "G92":
+            self._process_set_position(words[1:])
+        elif command == "G90":
+            self.absolute_xyz = True
+            self.absolute_e = True
+        elif command == "G91":
+            self.absolute_xyz = False
+            self.absolute_e = False
+        elif command == "M82":
+            self.absolute_e = True
+        elif command == "M83":
+            self.absolute_e = False
+        elif command == "G4":
+            self._process_dwell(words[1:])
+        elif command == "G28":
+            # Homing resets the axes it names (all of them when none are given)
+            axes = {word[0].upper() for word in words[1:]} or {"X", "Y", "Z"}
+            if "X" in axes:
+                self.x = 0.0
+            if "Y" in axes:
+                self.y = 0.0
+            if "Z" in axes:
+                self.z = 0.0
+
+    @staticmethod
+    def _params(words) -> Dict[str, float]:
+        params = {}
+        for word in words:
+            try:
+                params[word[0].upper()] = float(word[1:])
+            except (ValueError, IndexError):
+                continue
+        return params
+
+    def _arc_length(self, params, nx: float, ny: float, clockwise: bool) -> float:
+        """XY length of an arc from the current position, given I/J or R"""
+        dx, dy = nx - self.x, ny - self.y
+        if "R" in params:
+            radius = abs(params["R"])
+            chord = math.hypot(dx, dy)
+            if radius == 0 or chord == 0:
+                return chord
+            sweep = 2 * math.asin(min(chord / (2 * radius), 1.0))
+            if params["R"] < 0:
+                # A negative radius selects the longer of the two arcs
+                sweep = 2 * math.pi - sweep
+            return radius * sweep
+
+        # I/J are offsets of the centre from the start point
+        cx = self.x + params.get("I", 0.0)
+        cy = self.y + params.get("J", 0.0)
+        radius = math.hypot(self.x - cx, self.y - cy)
+        if radius == 0:
+            return math.hypot(dx, dy)
+        start = math.atan2(self.y - cy, self.x - cx)
+        end = math.atan2(ny - cy, nx - cx)
+        sweep = start - end if clockwise else end - start
+        if sweep <= 1e-9:
+            # Wrap around; an arc ending where it started is a full circle
+            sweep += 2 * math.pi
+        return radius * sweep
+
+    def _process_move(self, words, clockwise: Optional[bool] = None) -> None:
+        """Linear (G0/G1) or, when ``clockwise`` is given, arc (G2/G3) move"""
+        params = self._params(words)
+        if "F" in params and params["F"] > 0:
+            self.feedrate = params["F"]
+            self.max_feedrate = max(self.max_feedrate, self.feedrate)
+
+        if self.absolute_xyz:
+            nx = params.get("X", self.x)
+            ny = params.get("Y", self.y)
+            nz = params.get("Z", self.z)
+        else:
+            nx = self.x + params.get("X", 0.0)
+            ny = self.y + params.get("Y", 0.0)
+            nz = self.z + params.get("Z", 0.0)
+
+        de = 0.0
+        if "E" in params:
+            if self.absolute_e:
+                de = params["E"] - self.e
+                self.e = params["E"]
+            else:
+                de = params["E"]
+                self.e += de
+
+        if clockwise is None:
+            planar = math.hypot(nx - self.x, ny - self.y)
+        else:
+            planar = self._arc_length(params, nx, ny, clockwise)
+        # Z changes during an arc make it a helix
+        distance = math.hypot(planar, nz - self.z)
+        # Pure extruder moves (retract/prime) are timed by filament travel
+        travel = distance if distance > 0 else abs(de)
+        if travel > 0:
+            self.move_time_s += travel / (self.feedrate / 60.0)
+
+        if de < 0:
+            self.retraction_count += 1
+            self.retracted_mm += -de
+            self.pending_retraction_mm += -de
+        elif de > 0:
+            # Priming after a retraction only refills the nozzle
+            primed = min(de, self.pending_retraction_mm)
+            self.pending_retraction_mm -= primed
+            new_material = de - primed
+            if new_material > 0:
+                self.extruded_mm += new_material
+                if distance > 0 and (
+                    self.last_layer_z is None or nz > self.last_layer_z
+                ):
+                    self.layer_count += 1
+                    self.last_layer_z = nz
+
+        self.x, self.y, self.z = nx, ny, nz
+
+    def _process_set_position(self, words) -> None:
+        params = self._params(words)
+        if not params:
+            # Bare G92 zeroes every axis
+            self.x = self.y = self.z = self.e = 0.0
+            return
+        self.x = params.get("X", self.x)
+        self.y = params.get("Y", self.y)
+        self.z = params.get("Z", self.z)
+        self.e = params.get("E", self.e)
+
+    def _process_dwell(self, words) -> None:
+        params = self._params(words)
+        if "S" in params:
+            self.dwell_time_s += params["S"]
+        elif "P" in params:
+            self.dwell_time_s += params["P"] / 1000.0
+
+    def _process_comment(self, comment: str) -> None:
+        lowered = comment.lower()
+        if not lowered.startswith(_SUMMARY_PREFIXES):
+            return
+
+        if lowered.startswith("filament used [mm]"):
+            value = _comment_number(comment)
+            if value is not None:
+                self.slicer_estimates["length_mm"] = value
+        elif lowered.startswith("filament used [g]"):
+            value = _comment_number(comment)
+            if value is not None:
+                self.slicer_estimates["weight_g"] = value
+        elif lowered.startswith("filament used:"):
+            # Cura reports metres: ";Filament used: 1.23456m"
+            value = _comment_number(comment)
+            if value is not None:
+                self.slicer_estimates["length_mm"] = value * 1000.0
+        elif lowered.startswith("estimated printing time"):
+            if "silent" in lowered:
+                return
+            minutes = _parse_duration_minutes(comment.split("=", 1)[-1])
+            if minutes is not None:
+                self.slicer_estimates["print_time_minutes"] = minutes
+        elif lowered.startswith("time:"):
+            value = _comment_number(comment)
+            if value is not None:
+                self.slicer_estimates["print_time_minutes"] = value / 60.0
+        elif lowered.startswith(("layer_count", "total layers")):
+            value = _comment_number(comment)
+            if value is not None:
+                self.slicer_estimates["layer_count"] = value
+
+    # Output
+
+    def result(self, density_g_cm3: float, diameter_mm: float) -> Dict[str, Any]:
+        """Summarise the analysis for a filament of the given density and diameter"""
+        self.close()
+        cross_section_mm2 = math.pi * (diameter_mm / 2) ** 2
+
+        length_mm = self.extruded_mm
+        if length_mm > 0:
+            method, confidence = "gcode_extrusion", 95.0
+        elif "length_mm" in self.slicer_estimates:
+            length_mm = self.slicer_estimates["length_mm"]
+            method, confidence = "gcode_comments", 90.0
+        else:
+            method, confidence = "none", 0.0
+
+        weight_g = cross_section_mm2 * length_mm / 1000.0 * density_g_cm3
+        if method == "none" and "weight_g" in self.slicer_estimates:
+            weight_g = self.slicer_estimates["weight_g"]
+            method, confidence = "gcode_comments", 85.0
+
+        print_time_minutes = (self.move_time_s + self.dwell_time_s) / 60.0
+        layer_count = self.layer_count or int(
+            self.slicer_estimates.get("layer_count", 0)
+        )
+
+        return {
+            "estimated_weight_g": round(weight_g, 2),
+            "estimated_length_mm": round(length_mm, 2),
+            "layer_count": layer_count,
+            "print_time_estimate_minutes": round(print_time_minutes, 1),
+            "retraction_count": self.retraction_count,
+            "retracted_length_mm": round(self.retracted_mm, 2),
+            "max_feedrate_mm_min": self.max_feedrate,
+            "slicer_estimates": self.slicer_estimates,
+            "lines_processed": self.lines_processed,
+            "bytes_processed": self.bytes_processed,
+            "confidence_level": confidence,
+            "analysis_method": method,
+        }
+
+
+def analyze_gcode_stream(
+    stream: IO,
+    density_g_cm3: float,
+    diameter_mm: float,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Analyze a file-like object of G-code in fixed-size chunks"""
+    analyzer = GCodeAnalyzer()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        analyzer.feed(chunk)
+    return analyzer.result(density_g_cm3, diameter_mm)
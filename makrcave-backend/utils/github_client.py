@@ -0,0 +1,205 @@
+"""Async GitHub REST transport with conditional requests and rate-limit pacing.
+
+One pooled ``httpx.AsyncClient`` serves every project, so calls reuse
+keep-alive connections instead of opening a TLS session each time. A
+semaphore bounds how many requests are in flight, which lets callers fan out
+(for example, one commit-detail request per commit) without flooding GitHub.
+
+Responses that carry an ``ETag`` are cached and revalidated with
+``If-None-Match``. A ``304 Not Modified`` reuses the cached body and does not
+count against the rate limit. Immutable resources, such as a commit by SHA,
+are served straight from the cache. ``X-RateLimit-Remaining`` and
+``X-RateLimit-Reset`` are tracked per token. Once a token is down to its
+reserve, its requests wait for the reset window instead of being rejected.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", "8"))
+GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", "15"))
+GITHUB_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_CACHE_MAX_ENTRIES", "5000"))
+GITHUB_CACHE_TTL_SECONDS = int(os.getenv("GITHUB_CACHE_TTL_SECONDS", "86400"))
+# Requests kept in hand per token before pacing kicks in
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "20"))
+# Longest a request will wait for a rate-limit reset before giving up
+GITHUB_MAX_RATE_LIMIT_WAIT = float(os.getenv("GITHUB_MAX_RATE_LIMIT_WAIT", "60"))
+
+
+class GitHubRateLimited(Exception):
+    """The token is out of requests and the reset is too far away to wait for"""
+
+    def __init__(self, reset_at: float):
+        super().__init__(f"GitHub rate limit exhausted until {reset_at:.0f}")
+        self.reset_at = reset_at
+
+
+class _RateLimit:
+    __slots__ = ("remaining", "reset_at")
+
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+
+
+def _token_key(token: Optional[str]) -> str:
+    """Cache/rate-limit partition for a token (never the token itself)"""
+    if not token:
+        return "anonymous"
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+class AsyncGitHubClient:
+    """Shared GitHub API client; ``get_json`` returns the decoded body or None"""
+
+    def __init__(
+        self,
+        base_url: str = GITHUB_API_URL,
+        max_concurrency: int = GITHUB_MAX_CONCURRENCY,
+        timeout: float = GITHUB_TIMEOUT,
+        cache: Optional[TTLCache] = None,
+        cache_ttl_seconds: int = GITHUB_CACHE_TTL_SECONDS,
+        rate_limit_reserve: int = GITHUB_RATE_LIMIT_RESERVE,
+        max_rate_limit_wait: float = GITHUB_MAX_RATE_LIMIT_WAIT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            headers={
+                "Accept": "application/vnd.github.v3+json",
+                "User-Agent": "MakrCave-Project-Manager",
+            },
+            transport=transport,
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.cache = cache or TTLCache(max_entries=GITHUB_CACHE_MAX_ENTRIES)
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.rate_limit_reserve = rate_limit_reserve
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self._rate_limits: Dict[str, _RateLimit] = {}
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def rate_limit(self, token: Optional[str] = None) -> Tuple[Optional[int], float]:
+        """Last seen ``(remaining, reset_at)`` for a token"""
+        state = self._rate_limits.get(_token_key(token))
+        return (state.remaining, state.reset_at) if state else (None, 0.0)
+
+    async def get_json(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        token: Optional[str] = None,
+        immutable: bool = False,
+    ) -> Optional[Any]:
+        """GET ``path``; returns the JSON body, or None for a non-200 response.
+
+        ``immutable`` responses (content addressed by SHA) are never revalidated.
+        """
+        token_key = _token_key(token)
+        cache_key = (token_key, path, tuple(sorted((params or {}).items())))
+        cached = self.cache.get(cache_key)
+        if cached is not None and immutable:
+            return cached[1]
+
+        headers = {}
+        if token:
+            headers["Authorization"] = f"token {token}"
+        if cached is not None and cached[0]:
+            headers["If-None-Match"] = cached[0]
+
+        for attempt in range(2):
+            # Pace outside the semaphore so an exhausted token can't hold slots other tokens need
+            await self._wait_for_budget(token_key)
+            async with self._semaphore:
+                response = await self._client.get(path, params=params, headers=headers)
+            self._record_rate_limit(token_key, response.headers)
+
+            if response.status_code == 304 and cached is not None:
+                self.cache.set(cache_key, cached, self.cache_ttl_seconds)
+                return cached[1]
+            if response.status_code == 200:
+                data = response.json()
+                etag = response.headers.get("ETag")
+                if etag or immutable:
+                    self.cache.set(cache_key, (etag, data), self.cache_ttl_seconds)
+                return data
+            if response.status_code in (403, 429) and attempt == 0 and self._is_rate_limited(response):
+                # Primary or secondary limit hit mid-flight: wait it out once
+                await self._sleep_until_reset(token_key, response.headers.get("Retry-After"))
+                continue
+            logger.warning(f"GitHub GET {path} returned {response.status_code}")
+            return None
+        return None
+
+    @staticmethod
+    def _is_rate_limited(response: httpx.Response) -> bool:
+        return (
+            response.headers.get("X-RateLimit-Remaining") == "0"
+            or "Retry-After" in response.headers
+        )
+
+    def _record_rate_limit(self, token_key: str, headers: httpx.Headers) -> None:
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        state = self._rate_limits.setdefault(token_key, _RateLimit())
+        try:
+            state.remaining = int(remaining)
+            state.reset_at = float(reset)
+        except ValueError:
+            pass
+
+    async def _wait_for_budget(self, token_key: str) -> None:
+        """Pace a token that is down to its reserve until its window resets"""
+        state = self._rate_limits.get(token_key)
+        if state is None or state.remaining is None or state.remaining > self.rate_limit_reserve:
+            if state is not None and state.remaining is not None:
+                state.remaining -= 1  # Count in-flight requests before headers return
+            return
+        await self._sleep_until_reset(token_key)
+
+    async def _sleep_until_reset(self, token_key: str, retry_after: Optional[str] = None) -> None:
+        state = self._rate_limits.setdefault(token_key, _RateLimit())
+        if retry_after is not None:
+            try:
+                wait = float(retry_after)
+            except ValueError:
+                wait = 1.0
+        else:
+            wait = state.reset_at - time.time()
+        if wait > self.max_rate_limit_wait:
+            raise GitHubRateLimited(state.reset_at)
+        if wait > 0:
+            logger.info(f"GitHub rate limit reserve reached; waiting {wait:.1f}s")
+            await asyncio.sleep(wait)
+        # The new window's budget is unknown until the next response
+        state.remaining = None
+
+
+_client: Optional[AsyncGitHubClient] = None
+
+
+def get_github_client() -> AsyncGitHubClient:
+    """Process-wide client shared by every project"""
+    global _client
+    if _client is None:
+        _client = AsyncGitHubClient()
+    return _client
@@ -1,3 +1,4 @@
+import asyncio
 import requests
 import base64
 import json
@@ -6,7 +7,75 @@ from datetime import datetime
 import re
 from urllib.parse import urlparse
 
-from ..schemas.project import GitHubRepoInfo, GitHubCommit, GitHubFile, GitHubActivity
+from schemas.project import GitHubRepoInfo, GitHubCommit, GitHubFile, GitHubActivity
+from utils.github_client import AsyncGitHubClient, get_github_client
+
+# Shared session so blocking calls reuse pooled keep-alive connections
+_session = requests.Session()
+
+def _parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+def _files_by_status(files: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Split a commit's changed files into added/modified/removed"""
+    changes = {"added_files": [], "modified_files": [], "removed_files": []}
+    for file in files:
+        key = f"{file['status']}_files"
+        if key in changes:
+            changes[key].append(file["filename"])
+    return changes
+
+def _commit_from_api(commit_data: Dict[str, Any], commit_detail: Dict[str, List[str]]) -> GitHubCommit:
+    commit = commit_data["commit"]
+    return GitHubCommit(
+        sha=commit_data["sha"],
+        message=commit["message"],
+        author_name=commit["author"]["name"],
+        author_email=commit["author"]["email"],
+        author_date=_parse_datetime(commit["author"]["date"]),
+        committer_name=commit["committer"]["name"],
+        committer_email=commit["committer"]["email"],
+        committer_date=_parse_datetime(commit["committer"]["date"]),
+        url=commit_data["html_url"],
+        added_files=commit_detail.get("added_files", []),
+        modified_files=commit_detail.get("modified_files", []),
+        removed_files=commit_detail.get("removed_files", [])
+    )
+
+def _pull_request_activity(pr: Dict[str, Any]) -> GitHubActivity:
+    return GitHubActivity(
+        type="pull_request",
+        action=pr["state"],
+        title=pr["title"],
+        description=pr.get("body"),
+        author=pr["user"]["login"],
+        created_at=_parse_datetime(pr["created_at"]),
+        url=pr["html_url"],
+        metadata={
+            "number": pr["number"],
+            "merged": pr.get("merged", False) or bool(pr.get("merged_at")),
+            "head_branch": pr["head"]["ref"],
+            "base_branch": pr["base"]["ref"],
+            "updated_at": pr.get("updated_at")
+        }
+    )
+
+def _issue_activity(issue: Dict[str, Any]) -> GitHubActivity:
+    return GitHubActivity(
+        type="issue",
+        action=issue["state"],
+        title=issue["title"],
+        description=issue.get("body"),
+        author=issue["user"]["login"],
+        created_at=_parse_datetime(issue["created_at"]),
+        url=issue["html_url"],
+        metadata={
+            "number": issue["number"],
+            "labels": [label["name"] for label in issue.get("labels", [])],
+            "assignees": [assignee["login"] for assignee in issue.get("assignees", [])],
+            "updated_at": issue.get("updated_at")
+        }
+    )
 
 class GitHubService:
     def __init__(self, access_token: Optional[str] = None):
@@ -46,7 +115,7 @@ class GitHubService:
                 return None
 
             url = f"{self.base_url}/repos/{repo_info['full_name']}"
-            response = requests.get(url, headers=self.headers)
+            response = _session.get(url, headers=self.headers)
             
             if response.status_code == 200:
                 data = response.json()
@@ -80,7 +149,7 @@ class GitHubService:
 
             url = f"{self.base_url}/repos/{repo_info['full_name']}/contents/{path}"
             params = {"ref": branch}
-            response = requests.get(url, headers=self.headers, params=params)
+            response = _session.get(url, headers=self.headers, params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -120,7 +189,7 @@ class GitHubService:
 
             url = f"{self.base_url}/repos/{repo_info['full_name']}/contents/{file_path}"
             params = {"ref": branch}
-            response = requests.get(url, headers=self.headers, params=params)
+            response = _session.get(url, headers=self.headers, params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -146,32 +215,16 @@ class GitHubService:
                 "per_page": per_page,
                 "page": page
             }
-            response = requests.get(url, headers=self.headers, params=params)
+            response = _session.get(url, headers=self.headers, params=params)
             
             if response.status_code == 200:
                 commits_data = response.json()
                 commits = []
                 
                 for commit_data in commits_data:
-                    commit = commit_data["commit"]
-                    
                     # Get detailed commit info for file changes
                     commit_detail = self.get_commit_details(repo_url, commit_data["sha"])
-                    
-                    commits.append(GitHubCommit(
-                        sha=commit_data["sha"],
-                        message=commit["message"],
-                        author_name=commit["author"]["name"],
-                        author_email=commit["author"]["email"],
-                        author_date=datetime.fromisoformat(commit["author"]["date"].replace("Z", "+00:00")),
-                        committer_name=commit["committer"]["name"],
-                        committer_email=commit["committer"]["email"],
-                        committer_date=datetime.fromisoformat(commit["committer"]["date"].replace("Z", "+00:00")),
-                        url=commit_data["html_url"],
-                        added_files=commit_detail.get("added_files", []),
-                        modified_files=commit_detail.get("modified_files", []),
-                        removed_files=commit_detail.get("removed_files", [])
-                    ))
+                    commits.append(_commit_from_api(commit_data, commit_detail))
                 
                 return commits
             
@@ -188,32 +241,10 @@ class GitHubService:
                 return {"added_files": [], "modified_files": [], "removed_files": []}
 
             url = f"{self.base_url}/repos/{repo_info['full_name']}/commits/{commit_sha}"
-            response = requests.get(url, headers=self.headers)
+            response = _session.get(url, headers=self.headers)
             
             if response.status_code == 200:
-                data = response.json()
-                files = data.get("files", [])
-                
-                added_files = []
-                modified_files = []
-                removed_files = []
-                
-                for file in files:
-                    filename = file["filename"]
-                    status = file["status"]
-                    
-                    if status == "added":
-                        added_files.append(filename)
-                    elif status == "modified":
-                        modified_files.append(filename)
-                    elif status == "removed":
-                        removed_files.append(filename)
-                
-                return {
-                    "added_files": added_files,
-                    "modified_files": modified_files,
-                    "removed_files": removed_files
-                }
+                return _files_by_status(response.json().get("files", []))
             
             return {"added_files": [], "modified_files": [], "removed_files": []}
         except Exception as e:
@@ -229,28 +260,14 @@ class GitHubService:
 
             url = f"{self.base_url}/repos/{repo_info['full_name']}/pulls"
             params = {"state": state, "per_page": per_page}
-            response = requests.get(url, headers=self.headers, params=params)
+            response = _session.get(url, headers=self.headers, params=params)
             
             if response.status_code == 200:
                 prs_data = response.json()
                 activities = []
                 
                 for pr in prs_data:
-                    activities.append(GitHubActivity(
-                        type="pull_request",
-                        action=pr["state"],
-                        title=pr["title"],
-                        description=pr.get("body"),
-                        author=pr["user"]["login"],
-                        created_at=datetime.fromisoformat(pr["created_at"].replace("Z", "+00:00")),
-                        url=pr["html_url"],
-                        metadata={
-                            "number": pr["number"],
-                            "merged": pr.get("merged", False),
-                            "head_branch": pr["head"]["ref"],
-                            "base_branch": pr["base"]["ref"]
-                        }
-                    ))
+                    activities.append(_pull_request_activity(pr))
                 
                 return activities
             
@@ -268,7 +285,7 @@ class GitHubService:
 
             url = f"{self.base_url}/repos/{repo_info['full_name']}/issues"
             params = {"state": state, "per_page": per_page}
-            response = requests.get(url, headers=self.headers, params=params)
+            response = _session.get(url, headers=self.headers, params=params)
             
             if response.status_code == 200:
                 issues_data = response.json()
@@ -279,20 +296,7 @@ class GitHubService:
                     if "pull_request" in issue:
                         continue
                     
-                    activities.append(GitHubActivity(
-                        type="issue",
-                        action=issue["state"],
-                        title=issue["title"],
-                        description=issue.get("body"),
-                        author=issue["user"]["login"],
-                        created_at=datetime.fromisoformat(issue["created_at"].replace("Z", "+00:00")),
-                        url=issue["html_url"],
-                        metadata={
-                            "number": issue["number"],
-                            "labels": [label["name"] for label in issue.get("labels", [])],
-                            "assignees": [assignee["login"] for assignee in issue.get("assignees", [])]
-                        }
-                    ))
+                    activities.append(_issue_activity(issue))
                 
                 return activities
             
@@ -310,7 +314,7 @@ class GitHubService:
 
             url = f"{self.base_url}/repos/{repo_info['full_name']}/releases"
             params = {"per_page": per_page}
-            response = requests.get(url, headers=self.headers, params=params)
+            response = _session.get(url, headers=self.headers, params=params)
             
             if response.status_code == 200:
                 releases_data = response.json()
@@ -365,7 +369,7 @@ class GitHubService:
                 "branch": branch
             }
             
-            response = requests.put(url, headers=self.headers, json=data)
+            response = _session.put(url, headers=self.headers, json=data)
             return response.status_code == 201
         except Exception as e:
             print(f"Error creating file: {e}")
@@ -390,8 +394,100 @@ class GitHubService:
                 "branch": branch
             }
             
-            response = requests.put(url, headers=self.headers, json=data)
+            response = _session.put(url, headers=self.headers, json=data)
             return response.status_code == 200
         except Exception as e:
             print(f"Error updating file: {e}")
             return False
+
+
+class AsyncGitHubService:
+    """
+    Non-blocking counterpart of GitHubService for activity reads.
+    Requests go through the shared AsyncGitHubClient (pooled connections,
+    ETag revalidation, rate-limit pacing); commit details are fetched
+    concurrently and cached by SHA.
+    """
+
+    def __init__(self, access_token: Optional[str] = None, client: Optional[AsyncGitHubClient] = None):
+        self.access_token = access_token
+        self.client = client or get_github_client()
+
+    parse_repo_url = GitHubService.parse_repo_url
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None, immutable: bool = False):
+        return await self.client.get_json(path, params=params, token=self.access_token, immutable=immutable)
+
+    async def get_commits(self, repo_url: str, branch: str = "main", per_page: int = 30, page: int = 1,
+                          since: Optional[datetime] = None, with_files: bool = True) -> List[GitHubCommit]:
+        """Get commit history; file changes for all commits are fetched in parallel"""
+        try:
+            repo_info = self.parse_repo_url(repo_url)
+            if not repo_info:
+                return []
+
+            params = {"sha": branch, "per_page": per_page, "page": page}
+            if since:
+                params["since"] = since.isoformat()
+            commits_data = await self._get(f"/repos/{repo_info['full_name']}/commits", params)
+            if not commits_data:
+                return []
+
+            if with_files:
+                details = await asyncio.gather(
+                    *(self.get_commit_details(repo_url, commit_data["sha"]) for commit_data in commits_data)
+                )
+            else:
+                details = [{} for _ in commits_data]
+            return [_commit_from_api(data, detail) for data, detail in zip(commits_data, details)]
+        except Exception as e:
+            print(f"Error fetching commits: {e}")
+            return []
+
+    async def get_commit_details(self, repo_url: str, commit_sha: str) -> Dict[str, List[str]]:
+        """File changes of one commit (immutable, so cached without revalidation)"""
+        try:
+            repo_info = self.parse_repo_url(repo_url)
+            if not repo_info:
+                return {"added_files": [], "modified_files": [], "removed_files": []}
+
+            data = await self._get(f"/repos/{repo_info['full_name']}/commits/{commit_sha}", immutable=True)
+            if data is None:
+                return {"added_files": [], "modified_files": [], "removed_files": []}
+            return _files_by_status(data.get("files", []))
+        except Exception as e:
+            print(f"Error fetching commit details: {e}")
+            return {"added_files": [], "modified_files": [], "removed_files": []}
+
+    async def get_pull_requests(self, repo_url: str, state: str = "all", per_page: int = 30,
+                                sort: str = "created", direction: str = "desc",
+                                page: int = 1) -> List[GitHubActivity]:
+        """Get pull requests from repository"""
+        try:
+            repo_info = self.parse_repo_url(repo_url)
+            if not repo_info:
+                return []
+
+            params = {"state": state, "per_page": per_page, "sort": sort, "direction": direction, "page": page}
+            prs_data = await self._get(f"/repos/{repo_info['full_name']}/pulls", params)
+            return [_pull_request_activity(pr) for pr in prs_data or []]
+        except Exception as e:
+            print(f"Error fetching pull requests: {e}")
+            return []
+
+    async def get_issues(self, repo_url: str, state: str = "all", per_page: int = 30,
+                         since: Optional[datetime] = None, page: int = 1) -> List[GitHubActivity]:
+        """Get issues (not pull requests) from repository"""
+        try:
+            repo_info = self.parse_repo_url(repo_url)
+            if not repo_info:
+                return []
+
+            params = {"state": state, "per_page": per_page, "page": page}
+            if since:
+                params["since"] = since.isoformat()
+            issues_data = await self._get(f"/repos/{repo_info['full_name']}/issues", params)
+            return [_issue_activity(issue) for issue in issues_data or [] if "pull_request" not in issue]
+        except Exception as e:
+            print(f"Error fetching issues: {e}")
+            return []
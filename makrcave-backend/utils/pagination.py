@@ -0,0 +1,143 @@
+"""Keyset (cursor) pagination for SQLAlchemy queries.
+
+A page is the ``limit`` rows that come after the last row of the previous
+page in a total ordering. The ordering is the requested sort columns plus a
+unique tiebreaker column. The values of that sort-key tuple are encoded into
+an opaque cursor. The next page filters on ``(k1, k2, ...) > cursor``, so the
+database seeks straight to it through the sort index. Page 500 costs the same
+as page 1, and rows inserted concurrently are neither skipped nor repeated.
+
+Nullable keys sort last in both directions. A NULL in the cursor matches only
+NULLs in that column.
+"""
+import base64
+import enum
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, false, or_
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or was issued for a different sort"""
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One column of the keyset ordering"""
+    column: Any
+    descending: bool = False
+    nullable: bool = False
+
+    @classmethod
+    def of(cls, column, descending: bool = False) -> "SortKey":
+        """Key for a mapped column, NULL-aware if the column is nullable"""
+        return cls(column, descending, getattr(column.expression, "nullable", True))
+
+    @property
+    def name(self) -> str:
+        return self.column.key
+
+    def order_by(self):
+        ordered = self.column.desc() if self.descending else self.column.asc()
+        return ordered.nulls_last() if self.nullable else ordered
+
+    def after(self, value: Any):
+        """Rows strictly after ``value`` in this column's order"""
+        if value is None:
+            return false()  # NULLs sort last; ties are broken by later keys
+        condition = self.column < value if self.descending else self.column > value
+        return or_(condition, self.column.is_(None)) if self.nullable else condition
+
+    def equals(self, value: Any):
+        return self.column.is_(None) if value is None else self.column == value
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"uuid": str(value)}
+    if isinstance(value, enum.Enum):
+        return value.name  # SQLAlchemy Enum columns bind member names
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        if "uuid" in value:
+            return uuid.UUID(value["uuid"])
+        raise InvalidCursor("Unknown cursor value")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: Optional[int] = None) -> List[Any]:
+    """Decode a cursor; ``size`` checks it matches the number of sort keys"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if not isinstance(values, list) or (size is not None and len(values) != size):
+        raise InvalidCursor("Cursor does not match the requested sort")
+    try:
+        return [_decode_value(v) for v in values]
+    except ValueError as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+
+def keyset_condition(keys: Sequence[SortKey], values: Sequence[Any]):
+    """``(k1, k2, ...) > values`` expanded for mixed directions and NULLs"""
+    clauses = []
+    for i, key in enumerate(keys):
+        prefix = [keys[j].equals(values[j]) for j in range(i)]
+        clauses.append(and_(*prefix, key.after(values[i])))
+    return or_(*clauses)
+
+
+def row_cursor(row: Any, keys: Sequence[SortKey]) -> str:
+    return encode_cursor([getattr(row, key.name) for key in keys])
+
+
+def apply_keyset(query, keys: Sequence[SortKey], cursor: Optional[str] = None):
+    """Order ``query`` by ``keys`` and seek past ``cursor``"""
+    if cursor:
+        query = query.filter(keyset_condition(keys, decode_cursor(cursor, len(keys))))
+    return query.order_by(*(key.order_by() for key in keys))
+
+
+def paginate(query, keys: Sequence[SortKey], limit: int, cursor: Optional[str] = None,
+             offset: int = 0) -> Tuple[List[Any], Optional[str]]:
+    """Fetch one page; returns ``(rows, next_cursor)`` (None on the last page).
+
+    The last key must be unique (normally the primary key) so the ordering is
+    total. ``offset`` serves legacy page-number requests. Pass it only
+    without a cursor, since it is applied after the seek.
+    """
+    query = apply_keyset(query, keys, cursor)
+    if offset:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, row_cursor(rows[-1], keys)
@@ -0,0 +1,237 @@
+"""Per-request query accounting, N+1 detection and slow-query capture.
+
+``instrument_engine`` hooks SQLAlchemy's cursor events on an engine. Each
+statement is timed and charged to the request whose ``QueryStats`` is active in
+the current context. The request logging middleware sets it up, and the
+context variable follows the request into ``run_in_threadpool`` workers and
+into the greenlets that back async sessions. Work submitted to a bare
+executor (such as the dashboard section pool) is not attributed.
+
+When a request ends, any statement text it ran more than
+``N_PLUS_ONE_THRESHOLD`` times is reported as a likely N+1, such as a lazy
+load or a per-row lookup inside a loop. Statements slower than
+``SLOW_QUERY_MS`` go into a bounded ring buffer along with their EXPLAIN plan.
+A given statement is explained at most once per
+``SLOW_QUERY_EXPLAIN_INTERVAL``, so a hot slow query doesn't double its own
+cost. Parameter values are never stored, because they can carry personal data.
+"""
+
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# Total DB time per request above which the request is logged as over budget
+DB_QUERY_SLO_MS = float(os.getenv("DB_QUERY_SLO_MS", "500"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+
+_MAX_STATEMENT_CHARS = 4000
+# Distinct statements remembered for explain throttling before the map resets
+_MAX_EXPLAINED_STATEMENTS = 1000
+_EXPLAIN_PREFIXES = {"postgresql": "EXPLAIN ", "sqlite": "EXPLAIN QUERY PLAN "}
+
+
+class QueryStats:
+    """Statements run on behalf of one request"""
+
+    __slots__ = ("request_id", "count", "total_ms", "repeats")
+
+    def __init__(self, request_id: Optional[str]):
+        self.request_id = request_id
+        self.count = 0
+        self.total_ms = 0.0
+        self.repeats: Dict[str, int] = {}
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.repeats[statement] = self.repeats.get(statement, 0) + 1
+
+    def n_plus_one(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """``(statement, times)`` for statements run more than ``threshold`` times"""
+        if threshold is None:
+            threshold = N_PLUS_ONE_THRESHOLD
+        return [
+            (statement, times)
+            for statement, times in self.repeats.items()
+            if times > threshold
+        ]
+
+
+class QueryInsights:
+    """Bounded buffers of recent slow statements and N+1 patterns"""
+
+    def __init__(
+        self,
+        size: int = SLOW_QUERY_LOG_SIZE,
+        explain_interval: float = SLOW_QUERY_EXPLAIN_INTERVAL,
+    ):
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self.n_plus_one: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self.explain_interval = explain_interval
+        self._explained_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def should_explain(self, statement: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            last = self._explained_at.get(statement)
+            if last is not None and now - last < self.explain_interval:
+                return False
+            if len(self._explained_at) >= _MAX_EXPLAINED_STATEMENTS:
+                self._explained_at.clear()
+            self._explained_at[statement] = now
+            return True
+
+    def add_slow_query(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self.slow_queries.append(entry)
+
+    def add_n_plus_one(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self.n_plus_one.append(entry)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Newest first"""
+        with self._lock:
+            return {
+                "slow_query_ms": SLOW_QUERY_MS,
+                "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+                "slow_queries": list(reversed(self.slow_queries)),
+                "n_plus_one": list(reversed(self.n_plus_one)),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self.slow_queries.clear()
+            self.n_plus_one.clear()
+            self._explained_at.clear()
+
+
+query_insights = QueryInsights()
+
+_current_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "query_stats", default=None
+)
+# Set while _explain runs so its SAVEPOINT and EXPLAIN are not measured
+_explaining: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "query_stats_explaining", default=False
+)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def begin_request(request_id: Optional[str]) -> Tuple[QueryStats, contextvars.Token]:
+    """Start charging statements in this context to a new ``QueryStats``"""
+    stats = QueryStats(request_id)
+    return stats, _current_stats.set(stats)
+
+
+def end_request(token: contextvars.Token) -> QueryStats:
+    """Stop charging statements and report the request's N+1 patterns"""
+    stats = _current_stats.get()
+    _current_stats.reset(token)
+    for statement, times in stats.n_plus_one():
+        logger.warning(
+            f"[{stats.request_id}] Possible N+1: statement ran {times} times in one "
+            f"request: {statement[:200]}"
+        )
+        query_insights.add_n_plus_one(
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "request_id": stats.request_id,
+                "times": times,
+                "statement": statement[:_MAX_STATEMENT_CHARS],
+            }
+        )
+    return stats
+
+
+def _explain(conn, statement: str, parameters: Any) -> Optional[str]:
+    """Plan for a read statement, on a fresh cursor so pending results survive.
+
+    Inside a transaction the EXPLAIN runs under a SAVEPOINT, so a failing plan
+    (e.g. a statement the planner rejects) cannot abort the caller's transaction.
+    """
+    prefix = _EXPLAIN_PREFIXES.get(conn.dialect.name)
+    words = statement.lstrip().split(None, 1)
+    if prefix is None or not words or words[0].upper() not in ("SELECT", "WITH"):
+        return None
+    token = _explaining.set(True)
+    try:
+        guard = (
+            conn.begin_nested() if conn.in_transaction() else contextlib.nullcontext()
+        )
+        with guard:
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(prefix + statement, parameters)
+                return "\n".join(str(row[-1]) for row in cursor.fetchall())
+            finally:
+                cursor.close()
+    finally:
+        _explaining.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and not _explaining.get():
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+
+    plan = None
+    if (
+        SLOW_QUERY_EXPLAIN
+        and not executemany
+        and query_insights.should_explain(statement)
+    ):
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as e:
+            plan = f"EXPLAIN failed: {e}"
+    request_id = stats.request_id if stats else None
+    logger.warning(f"[{request_id}] Slow query ({elapsed_ms:.1f}ms): {statement[:200]}")
+    query_insights.add_slow_query(
+        {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "request_id": request_id,
+            "duration_ms": round(elapsed_ms, 2),
+            "statement": statement[:_MAX_STATEMENT_CHARS],
+            "executemany": executemany,
+            "plan": plan,
+        }
+    )
+
+
+def instrument_engine(engine) -> None:
+    """Attach the hooks to a sync ``Engine`` or an ``AsyncEngine``"""
+    target = getattr(engine, "sync_engine", engine)
+    if event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
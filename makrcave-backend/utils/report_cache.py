@@ -0,0 +1,128 @@
+"""On-disk cache for rendered report artifacts.
+
+Artifacts are keyed by (makerspace, report type, date range, data version), so
+a repeat request for the same period is served from disk until the underlying
+data changes. Eviction is size- and age-based, oldest access first.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import date
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", "/tmp/makrcave_reports")
+REPORT_CACHE_MAX_AGE_DAYS = int(os.getenv("REPORT_CACHE_MAX_AGE_DAYS", "7"))
+REPORT_CACHE_MAX_MB = int(os.getenv("REPORT_CACHE_MAX_MB", "1024"))
+
+
+def report_cache_key(
+    makerspace_id: str,
+    report_type: str,
+    start_date: date,
+    end_date: date,
+    data_version: str,
+) -> str:
+    """Stable cache key for a rendered report"""
+    raw = f"{makerspace_id}|{report_type}|{start_date}|{end_date}|{data_version}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ReportArtifactCache:
+    """Directory of rendered reports named ``<key>.<format>``"""
+
+    def __init__(
+        self,
+        cache_dir: str = REPORT_CACHE_DIR,
+        max_age_days: int = REPORT_CACHE_MAX_AGE_DAYS,
+        max_bytes: int = REPORT_CACHE_MAX_MB * 1024 * 1024,
+    ):
+        self.cache_dir = cache_dir
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str, file_format: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{file_format}")
+
+    def get(self, key: str, file_format: str) -> Optional[str]:
+        """Return the cached artifact path, refreshing its access time"""
+        path = self._path(key, file_format)
+        if not os.path.exists(path):
+            return None
+        if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+            return None
+        try:
+            # mtime doubles as last-access time for LRU eviction
+            os.utime(path, None)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key: str, file_format: str, source_path: str) -> str:
+        """Move a freshly rendered file into the cache and return its new path"""
+        path = self._path(key, file_format)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        shutil.move(source_path, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".part"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(
+        self,
+        max_age_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ) -> int:
+        """Drop expired artifacts, then least recently used ones until under budget.
+
+        Returns the number of files removed.
+        """
+        max_age_seconds = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for mtime, size, path in entries:
+                if mtime >= cutoff and total <= max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    removed += 1
+                    total -= size
+                except OSError:
+                    pass  # File already deleted or permission issue
+
+        if removed:
+            logger.info(f"Evicted {removed} cached report artifacts")
+        return removed
+
+
+_report_cache: Optional[ReportArtifactCache] = None
+
+
+def get_report_cache() -> ReportArtifactCache:
+    """Process-wide report artifact cache"""
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = ReportArtifactCache()
+    return _report_cache
@@ -1,8 +1,7 @@
-import pandas as pd
 import io
 import os
-from datetime import datetime, date
-from typing import Dict, List, Any, Optional
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Any, Optional, Iterator
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
@@ -13,8 +12,48 @@ from reportlab.graphics.charts.lineplots import LinePlot
 from reportlab.graphics.charts.piecharts import Pie
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics.widgetbase import Widget
+from sqlalchemy import func, desc, case
 from sqlalchemy.orm import Session
-import openpyxl  # noqa: F401 - required for Excel export engine
+
+from utils.report_cache import get_report_cache
+from utils.streaming_export import stream_query, iter_csv, write_csv_file, XlsxStreamWriter
+
+# report_type -> (ReportGenerator method, file format)
+REPORT_RENDERERS = {
+    'usage': ('generate_usage_report_csv', 'csv'),
+    'inventory': ('generate_inventory_report_xlsx', 'xlsx'),
+    'revenue': ('generate_revenue_report_pdf', 'pdf'),
+    'equipment': ('generate_equipment_report_xlsx', 'xlsx'),
+    'projects': ('generate_projects_report_csv', 'csv'),
+}
+
+USAGE_REPORT_COLUMNS = [
+    'Date', 'Time', 'Event Type', 'User ID', 'Resource Type',
+    'Resource ID', 'Duration (minutes)', 'Metadata'
+]
+
+INVENTORY_DETAIL_COLUMNS = [
+    'Date', 'Item ID', 'Starting Quantity', 'Consumed', 'Restocked', 'Ending Quantity',
+    'Cost per Unit', 'Total Cost Consumed', 'Consumption Rate', 'Projects Using',
+    'Reorder Triggered'
+]
+
+EQUIPMENT_SUMMARY_COLUMNS = [
+    'Equipment ID', 'Total Sessions', 'Total Hours', 'Total Power (kWh)',
+    'Maintenance Alerts', 'Average Success Rate'
+]
+
+EQUIPMENT_LOG_COLUMNS = [
+    'Equipment ID', 'User ID', 'Session Start', 'Session End', 'Duration (minutes)',
+    'Job ID', 'Success Rate', 'Power Consumption (kWh)', 'Maintenance Required', 'Notes'
+]
+
+PROJECT_REPORT_COLUMNS = [
+    'Project ID', 'Created By', 'Total Cost', 'BOM Items Count', 'External Items Count',
+    'Print Time (hours)', 'Material Efficiency (%)', 'Completion Rate (%)',
+    'Equipment Hours Used', 'Collaboration Count', 'Complexity Score', 'Created At',
+    'Updated At'
+]
 
 class ReportGenerator:
     def __init__(self, db: Session):
@@ -35,119 +74,141 @@ class ReportGenerator:
             textColor=colors.HexColor('#374151')
         )
 
-    def generate_usage_report_csv(self, makerspace_id: str, start_date: date, end_date: date) -> str:
-        """Generate usage analytics CSV report"""
-        # Query usage events
+    def _usage_events_query(self, makerspace_id: str, start_date: date, end_date: date):
         from models.analytics import UsageEvent
-        
-        events = self.db.query(UsageEvent).filter(
+
+        return self.db.query(UsageEvent).filter(
             UsageEvent.makerspace_id == makerspace_id,
             UsageEvent.timestamp >= start_date,
-            UsageEvent.timestamp <= end_date
-        ).all()
-        
-        # Convert to DataFrame
-        data = []
-        for event in events:
-            data.append({
-                'Date': event.timestamp.strftime('%Y-%m-%d'),
-                'Time': event.timestamp.strftime('%H:%M:%S'),
-                'Event Type': event.event_type,
-                'User ID': str(event.user_id) if event.user_id else 'System',
-                'Resource Type': event.resource_type or 'N/A',
-                'Resource ID': str(event.resource_id) if event.resource_id else 'N/A',
-                'Duration (minutes)': event.duration_minutes or 0,
-                'Metadata': str(event.metadata) if event.metadata else ''
-            })
-        
-        df = pd.DataFrame(data)
-        
-        # Generate summary statistics
-        summary_data = []
-        summary_data.append(['Total Events', len(df)])
-        summary_data.append(['Date Range', f"{start_date} to {end_date}"])
-        summary_data.append(['Most Common Event', df['Event Type'].mode().iloc[0] if not df.empty else 'N/A'])
-        summary_data.append(['Total Duration (hours)', round(df['Duration (minutes)'].sum() / 60, 2)])
-        
-        # Save to CSV
-        filename = f"usage_report_{makerspace_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            # end_date is a calendar day: keep every event up to its midnight
+            UsageEvent.timestamp < end_date + timedelta(days=1)
+        )
+
+    def _usage_report_preamble(self, makerspace_id: str, start_date: date, end_date: date) -> List[str]:
+        """Build the commented summary header from aggregates instead of loaded rows"""
+        from models.analytics import UsageEvent
+
+        base_query = self._usage_events_query(makerspace_id, start_date, end_date)
+        total_events, total_minutes = base_query.with_entities(
+            func.count(UsageEvent.id),
+            func.coalesce(func.sum(UsageEvent.duration_minutes), 0)
+        ).one()
+        most_common = base_query.with_entities(
+            UsageEvent.event_type, func.count(UsageEvent.id).label('event_count')
+        ).group_by(UsageEvent.event_type).order_by(desc('event_count')).first()
+
+        return [
+            "# USAGE ANALYTICS REPORT",
+            f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"# Makerspace ID: {makerspace_id}",
+            f"# Period: {start_date} to {end_date}",
+            "",
+            "# SUMMARY",
+            f"# Total Events: {total_events}",
+            f"# Date Range: {start_date} to {end_date}",
+            f"# Most Common Event: {most_common[0] if most_common else 'N/A'}",
+            f"# Total Duration (hours): {round((total_minutes or 0) / 60, 2)}",
+            "",
+        ]
+
+    @staticmethod
+    def _usage_event_row(event) -> List[Any]:
+        return [
+            event.timestamp.strftime('%Y-%m-%d'),
+            event.timestamp.strftime('%H:%M:%S'),
+            event.event_type,
+            str(event.user_id) if event.user_id else 'System',
+            event.resource_type or 'N/A',
+            str(event.resource_id) if event.resource_id else 'N/A',
+            event.duration_minutes or 0,
+            str(event.metadata) if event.metadata else ''
+        ]
+
+    def iter_usage_report_csv(self, makerspace_id: str, start_date: date, end_date: date) -> Iterator[str]:
+        """Stream the usage analytics CSV in chunks, suitable for a StreamingResponse"""
+        from models.analytics import UsageEvent
+
+        preamble = self._usage_report_preamble(makerspace_id, start_date, end_date)
+        events = stream_query(
+            self._usage_events_query(makerspace_id, start_date, end_date).order_by(UsageEvent.timestamp)
+        )
+        return iter_csv(
+            USAGE_REPORT_COLUMNS,
+            (self._usage_event_row(event) for event in events),
+            preamble=preamble
+        )
+
+    def generate_usage_report_csv(self, makerspace_id: str, start_date: date, end_date: date) -> str:
+        """Generate usage analytics CSV report"""
+        filename = f"usage_report_{makerspace_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.csv"
         filepath = os.path.join("/tmp", filename)
-        
-        with open(filepath, 'w') as f:
-            f.write("# USAGE ANALYTICS REPORT\n")
-            f.write(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"# Makerspace ID: {makerspace_id}\n")
-            f.write(f"# Period: {start_date} to {end_date}\n")
-            f.write("\n# SUMMARY\n")
-            for summary_item in summary_data:
-                f.write(f"# {summary_item[0]}: {summary_item[1]}\n")
-            f.write("\n")
-        
-        df.to_csv(filepath, mode='a', index=False)
+
+        with open(filepath, 'w', newline='') as f:
+            for chunk in self.iter_usage_report_csv(makerspace_id, start_date, end_date):
+                f.write(chunk)
         return filepath
 
     def generate_inventory_report_xlsx(self, makerspace_id: str, start_date: date, end_date: date) -> str:
         """Generate inventory analytics Excel report"""
         from models.analytics import InventoryAnalytics
-        
-        # Query inventory data
-        inventory_data = self.db.query(InventoryAnalytics).filter(
+
+        inventory_query = self.db.query(InventoryAnalytics).filter(
             InventoryAnalytics.makerspace_id == makerspace_id,
             InventoryAnalytics.date >= start_date,
-            InventoryAnalytics.date <= end_date
-        ).all()
-        
-        filename = f"inventory_report_{makerspace_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            InventoryAnalytics.date < end_date + timedelta(days=1)
+        )
+
+        filename = f"inventory_report_{makerspace_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.xlsx"
         filepath = os.path.join("/tmp", filename)
-        
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            # Summary sheet
-            summary_data = {
-                'Metric': ['Total Items Tracked', 'Total Consumed', 'Total Cost', 'Average Daily Consumption'],
-                'Value': [
-                    len(set(item.inventory_item_id for item in inventory_data)),
-                    sum(item.consumed_quantity for item in inventory_data),
-                    f"${sum(item.total_cost_consumed or 0 for item in inventory_data):.2f}",
-                    f"{sum(item.consumed_quantity for item in inventory_data) / max(len(set(item.date for item in inventory_data)), 1):.2f}"
+
+        # Summary and top consumers are aggregated in the database so the
+        # detailed sheet can be streamed straight from the cursor
+        items_tracked, total_consumed, total_cost, days_tracked = inventory_query.with_entities(
+            func.count(func.distinct(InventoryAnalytics.inventory_item_id)),
+            func.coalesce(func.sum(InventoryAnalytics.consumed_quantity), 0),
+            func.coalesce(func.sum(InventoryAnalytics.total_cost_consumed), 0),
+            func.count(func.distinct(InventoryAnalytics.date))
+        ).one()
+
+        consumed_sum = func.coalesce(func.sum(InventoryAnalytics.consumed_quantity), 0).label('consumed')
+        top_consumers = inventory_query.with_entities(
+            InventoryAnalytics.inventory_item_id,
+            consumed_sum,
+            func.coalesce(func.sum(InventoryAnalytics.total_cost_consumed), 0).label('cost')
+        ).group_by(InventoryAnalytics.inventory_item_id).order_by(desc('consumed')).limit(20).all()
+
+        with XlsxStreamWriter(filepath) as writer:
+            writer.add_sheet('Summary', ['Metric', 'Value'], [
+                ['Total Items Tracked', items_tracked],
+                ['Total Consumed', total_consumed],
+                ['Total Cost', f"${total_cost:.2f}"],
+                ['Average Daily Consumption', f"{total_consumed / max(days_tracked, 1):.2f}"],
+            ])
+
+            writer.add_sheet(
+                'Detailed Data',
+                INVENTORY_DETAIL_COLUMNS,
+                stream_query(inventory_query.order_by(InventoryAnalytics.date)),
+                row_mapper=lambda item: [
+                    item.date,
+                    str(item.inventory_item_id),
+                    item.starting_quantity,
+                    item.consumed_quantity,
+                    item.restocked_quantity,
+                    item.ending_quantity,
+                    item.cost_per_unit or 0,
+                    item.total_cost_consumed or 0,
+                    item.consumption_rate or 0,
+                    item.projects_using,
+                    item.reorder_triggered
                 ]
-            }
-            pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
-            
-            # Detailed data sheet
-            detailed_data = []
-            for item in inventory_data:
-                detailed_data.append({
-                    'Date': item.date,
-                    'Item ID': str(item.inventory_item_id),
-                    'Starting Quantity': item.starting_quantity,
-                    'Consumed': item.consumed_quantity,
-                    'Restocked': item.restocked_quantity,
-                    'Ending Quantity': item.ending_quantity,
-                    'Cost per Unit': item.cost_per_unit or 0,
-                    'Total Cost Consumed': item.total_cost_consumed or 0,
-                    'Consumption Rate': item.consumption_rate or 0,
-                    'Projects Using': item.projects_using,
-                    'Reorder Triggered': item.reorder_triggered
-                })
-            
-            pd.DataFrame(detailed_data).to_excel(writer, sheet_name='Detailed Data', index=False)
-            
-            # Top consumers sheet
-            consumption_by_item = {}
-            for item in inventory_data:
-                item_id = str(item.inventory_item_id)
-                if item_id not in consumption_by_item:
-                    consumption_by_item[item_id] = {'consumed': 0, 'cost': 0}
-                consumption_by_item[item_id]['consumed'] += item.consumed_quantity
-                consumption_by_item[item_id]['cost'] += item.total_cost_consumed or 0
-            
-            top_consumers = sorted(consumption_by_item.items(), key=lambda x: x[1]['consumed'], reverse=True)[:20]
-            top_consumer_data = [
-                {'Item ID': item_id, 'Total Consumed': data['consumed'], 'Total Cost': f"${data['cost']:.2f}"}
-                for item_id, data in top_consumers
-            ]
-            pd.DataFrame(top_consumer_data).to_excel(writer, sheet_name='Top Consumers', index=False)
-        
+            )
+
+            writer.add_sheet('Top Consumers', ['Item ID', 'Total Consumed', 'Total Cost'], [
+                [str(item_id), consumed, f"${cost:.2f}"]
+                for item_id, consumed, cost in top_consumers
+            ])
+
         return filepath
 
     def generate_revenue_report_pdf(self, makerspace_id: str, start_date: date, end_date: date) -> str:
@@ -158,10 +219,10 @@ class ReportGenerator:
         revenue_data = self.db.query(RevenueAnalytics).filter(
             RevenueAnalytics.makerspace_id == makerspace_id,
             RevenueAnalytics.date >= start_date,
-            RevenueAnalytics.date <= end_date
+            RevenueAnalytics.date < end_date + timedelta(days=1)
         ).all()
         
-        filename = f"revenue_report_{makerspace_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        filename = f"revenue_report_{makerspace_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.pdf"
         filepath = os.path.join("/tmp", filename)
         
         doc = SimpleDocTemplate(filepath, pagesize=A4)
@@ -280,131 +341,166 @@ class ReportGenerator:
     def generate_equipment_report_xlsx(self, makerspace_id: str, start_date: date, end_date: date) -> str:
         """Generate equipment metrics Excel report"""
         from models.analytics import EquipmentUsageLog
-        
-        usage_logs = self.db.query(EquipmentUsageLog).filter(
+
+        usage_query = self.db.query(EquipmentUsageLog).filter(
             EquipmentUsageLog.makerspace_id == makerspace_id,
             EquipmentUsageLog.session_start >= start_date,
-            EquipmentUsageLog.session_start <= end_date
-        ).all()
-        
-        filename = f"equipment_report_{makerspace_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            EquipmentUsageLog.session_start < end_date + timedelta(days=1)
+        )
+
+        filename = f"equipment_report_{makerspace_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.xlsx"
         filepath = os.path.join("/tmp", filename)
-        
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            # Summary by equipment
-            equipment_summary = {}
-            for log in usage_logs:
-                eq_id = str(log.equipment_id)
-                if eq_id not in equipment_summary:
-                    equipment_summary[eq_id] = {
-                        'total_sessions': 0,
-                        'total_minutes': 0,
-                        'total_power': 0,
-                        'maintenance_required': 0,
-                        'avg_success_rate': []
-                    }
-                
-                equipment_summary[eq_id]['total_sessions'] += 1
-                equipment_summary[eq_id]['total_minutes'] += log.duration_minutes or 0
-                equipment_summary[eq_id]['total_power'] += log.power_consumption_kwh or 0
-                if log.maintenance_required:
-                    equipment_summary[eq_id]['maintenance_required'] += 1
-                if log.success_rate is not None:
-                    equipment_summary[eq_id]['avg_success_rate'].append(log.success_rate)
-            
-            summary_data = []
-            for eq_id, data in equipment_summary.items():
-                avg_success = sum(data['avg_success_rate']) / len(data['avg_success_rate']) if data['avg_success_rate'] else 0
-                summary_data.append({
-                    'Equipment ID': eq_id,
-                    'Total Sessions': data['total_sessions'],
-                    'Total Hours': round(data['total_minutes'] / 60, 2),
-                    'Total Power (kWh)': round(data['total_power'], 2),
-                    'Maintenance Alerts': data['maintenance_required'],
-                    'Average Success Rate': f"{avg_success:.1f}%"
-                })
-            
-            pd.DataFrame(summary_data).to_excel(writer, sheet_name='Equipment Summary', index=False)
-            
-            # Detailed usage logs
-            detailed_data = []
-            for log in usage_logs:
-                detailed_data.append({
-                    'Equipment ID': str(log.equipment_id),
-                    'User ID': str(log.user_id),
-                    'Session Start': log.session_start,
-                    'Session End': log.session_end,
-                    'Duration (minutes)': log.duration_minutes,
-                    'Job ID': str(log.job_id) if log.job_id else 'N/A',
-                    'Success Rate': f"{log.success_rate:.1f}%" if log.success_rate else 'N/A',
-                    'Power Consumption (kWh)': log.power_consumption_kwh,
-                    'Maintenance Required': log.maintenance_required,
-                    'Notes': log.notes or ''
-                })
-            
-            pd.DataFrame(detailed_data).to_excel(writer, sheet_name='Usage Logs', index=False)
-        
+
+        equipment_summary = usage_query.with_entities(
+            EquipmentUsageLog.equipment_id,
+            func.count(EquipmentUsageLog.id),
+            func.coalesce(func.sum(EquipmentUsageLog.duration_minutes), 0),
+            func.coalesce(func.sum(EquipmentUsageLog.power_consumption_kwh), 0),
+            func.sum(case((EquipmentUsageLog.maintenance_required == True, 1), else_=0)),
+            func.avg(EquipmentUsageLog.success_rate)
+        ).group_by(EquipmentUsageLog.equipment_id).all()
+
+        with XlsxStreamWriter(filepath) as writer:
+            writer.add_sheet('Equipment Summary', EQUIPMENT_SUMMARY_COLUMNS, [
+                [
+                    str(eq_id),
+                    sessions,
+                    round(total_minutes / 60, 2),
+                    round(total_power, 2),
+                    maintenance or 0,
+                    f"{avg_success or 0:.1f}%"
+                ]
+                for eq_id, sessions, total_minutes, total_power, maintenance, avg_success in equipment_summary
+            ])
+
+            writer.add_sheet(
+                'Usage Logs',
+                EQUIPMENT_LOG_COLUMNS,
+                stream_query(usage_query.order_by(EquipmentUsageLog.session_start)),
+                row_mapper=lambda log: [
+                    str(log.equipment_id),
+                    str(log.user_id),
+                    log.session_start,
+                    log.session_end,
+                    log.duration_minutes,
+                    str(log.job_id) if log.job_id else 'N/A',
+                    f"{log.success_rate:.1f}%" if log.success_rate else 'N/A',
+                    log.power_consumption_kwh,
+                    log.maintenance_required,
+                    log.notes or ''
+                ]
+            )
+
         return filepath
 
     def generate_projects_report_csv(self, makerspace_id: str, start_date: date, end_date: date) -> str:
         """Generate project analytics CSV report"""
         from models.analytics import ProjectAnalytics
-        
-        projects = self.db.query(ProjectAnalytics).filter(
+
+        projects_query = self.db.query(ProjectAnalytics).filter(
             ProjectAnalytics.makerspace_id == makerspace_id,
             ProjectAnalytics.created_at >= start_date,
-            ProjectAnalytics.created_at <= end_date
-        ).all()
-        
-        data = []
-        for project in projects:
-            data.append({
-                'Project ID': str(project.project_id),
-                'Created By': str(project.created_by),
-                'Total Cost': project.total_cost or 0,
-                'BOM Items Count': project.bom_items_count,
-                'External Items Count': project.external_items_count,
-                'Print Time (hours)': project.print_time_hours or 0,
-                'Material Efficiency (%)': project.material_efficiency or 0,
-                'Completion Rate (%)': project.completion_rate or 0,
-                'Equipment Hours Used': project.equipment_hours_used or 0,
-                'Collaboration Count': project.collaboration_count,
-                'Complexity Score': project.complexity_score or 0,
-                'Created At': project.created_at,
-                'Updated At': project.updated_at
-            })
-        
-        df = pd.DataFrame(data)
-        
-        filename = f"projects_report_{makerspace_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        filepath = os.path.join("/tmp", filename)
-        
+            ProjectAnalytics.created_at < end_date + timedelta(days=1)
+        )
+
+        total_projects, avg_cost, avg_bom, avg_completion = projects_query.with_entities(
+            func.count(ProjectAnalytics.id),
+            func.avg(func.coalesce(ProjectAnalytics.total_cost, 0)),
+            func.avg(func.coalesce(ProjectAnalytics.bom_items_count, 0)),
+            func.avg(func.coalesce(ProjectAnalytics.completion_rate, 0))
+        ).one()
+
         # Add summary header
-        with open(filepath, 'w') as f:
-            f.write("# PROJECT ANALYTICS REPORT\n")
-            f.write(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"# Period: {start_date} to {end_date}\n")
-            f.write(f"# Total Projects: {len(df)}\n")
-            if not df.empty:
-                f.write(f"# Average Cost: ${df['Total Cost'].mean():.2f}\n")
-                f.write(f"# Average BOM Size: {df['BOM Items Count'].mean():.1f}\n")
-                f.write(f"# Average Completion: {df['Completion Rate (%)'].mean():.1f}%\n")
-            f.write("\n")
-        
-        df.to_csv(filepath, mode='a', index=False)
-        return filepath
+        preamble = [
+            "# PROJECT ANALYTICS REPORT",
+            f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"# Period: {start_date} to {end_date}",
+            f"# Total Projects: {total_projects}",
+        ]
+        if total_projects:
+            preamble.extend([
+                f"# Average Cost: ${avg_cost:.2f}",
+                f"# Average BOM Size: {avg_bom:.1f}",
+                f"# Average Completion: {avg_completion:.1f}%",
+            ])
+        preamble.append("")
+
+        rows = (
+            [
+                str(project.project_id),
+                str(project.created_by),
+                project.total_cost or 0,
+                project.bom_items_count,
+                project.external_items_count,
+                project.print_time_hours or 0,
+                project.material_efficiency or 0,
+                project.completion_rate or 0,
+                project.equipment_hours_used or 0,
+                project.collaboration_count,
+                project.complexity_score or 0,
+                project.created_at,
+                project.updated_at
+            ]
+            for project in stream_query(projects_query.order_by(ProjectAnalytics.created_at))
+        )
 
-    def cleanup_old_reports(self, days_old: int = 7):
-        """Clean up old report files"""
+        filename = f"projects_report_{makerspace_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.csv"
+        filepath = os.path.join("/tmp", filename)
+        return write_csv_file(filepath, PROJECT_REPORT_COLUMNS, rows, preamble=preamble)
+
+    def render(self, report_type: str, makerspace_id: str, start_date: date, end_date: date) -> str:
+        """Render a report by type and return the generated file path"""
+        method_name, _ = REPORT_RENDERERS[report_type]
+        return getattr(self, method_name)(makerspace_id, start_date, end_date)
+
+    def get_data_version(self, report_type: str, makerspace_id: str, start_date: date, end_date: date) -> str:
+        """Cheap fingerprint of the rows a report covers.
+
+        Row count plus the latest ``updated_at`` changes whenever a row in the
+        range is added, edited or removed, which is what invalidates a cached
+        artifact.
+        """
+        from models.analytics import (
+            UsageEvent, InventoryAnalytics, RevenueAnalytics, EquipmentUsageLog, ProjectAnalytics
+        )
+
+        sources = {
+            'usage': (UsageEvent, UsageEvent.timestamp, UsageEvent.updated_at),
+            'inventory': (InventoryAnalytics, InventoryAnalytics.date, InventoryAnalytics.updated_at),
+            'revenue': (RevenueAnalytics, RevenueAnalytics.date, RevenueAnalytics.updated_at),
+            'equipment': (EquipmentUsageLog, EquipmentUsageLog.session_start, EquipmentUsageLog.updated_at),
+            'projects': (ProjectAnalytics, ProjectAnalytics.created_at, ProjectAnalytics.updated_at),
+        }
+        model, range_column, version_column = sources[report_type]
+
+        row_count, last_write = self.db.query(
+            func.count(model.id), func.max(version_column)
+        ).filter(
+            model.makerspace_id == makerspace_id,
+            range_column >= start_date,
+            range_column < end_date + timedelta(days=1)
+        ).one()
+        return f"{row_count}:{last_write.isoformat() if last_write else '-'}"
+
+    def cleanup_old_reports(self, days_old: int = 7, max_total_mb: Optional[int] = None) -> int:
+        """Clean up old report files left in /tmp, then evict cached artifacts
+        by age and total size (LRU). Returns the number of files removed."""
         import glob
         import time
-        
+
         cutoff_time = time.time() - (days_old * 24 * 60 * 60)
-        report_files = glob.glob("/tmp/*_report_*.{csv,xlsx,pdf}")
-        
-        for file_path in report_files:
-            if os.path.getctime(file_path) < cutoff_time:
+        removed = 0
+        for extension in ('csv', 'xlsx', 'pdf'):
+            for file_path in glob.glob(f"/tmp/*_report_*.{extension}"):
                 try:
-                    os.remove(file_path)
+                    if os.path.getctime(file_path) < cutoff_time:
+                        os.remove(file_path)
+                        removed += 1
                 except OSError:
                     pass  # File already deleted or permission issue
+
+        cache = get_report_cache()
+        return removed + cache.evict(
+            max_age_seconds=days_old * 24 * 60 * 60,
+            max_bytes=max_total_mb * 1024 * 1024 if max_total_mb is not None else None
+        )
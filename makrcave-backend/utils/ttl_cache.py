@@ -0,0 +1,74 @@
+"""Small thread-safe in-process cache with per-entry TTLs"""
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Dict-backed cache where every entry carries its own expiry.
+
+    Expired entries are dropped lazily on access and during ``set`` once the
+    cache grows past ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        """Return ``(expires_at, value)`` for a live entry, else None.
+
+        ``expires_at`` is a ``time.time()`` timestamp.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        return default if entry is None else entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float) -> float:
+        """Store ``value`` for ``ttl_seconds``; returns the expiry timestamp"""
+        expires_at = time.time() + ttl_seconds
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                self._purge_expired_locked()
+                if len(self._entries) >= self.max_entries:
+                    # Still full: drop the entry closest to expiry
+                    oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                    del self._entries[oldest]
+            self._entries[key] = (expires_at, value)
+        return expires_at
+
+    def invalidate(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._entries.pop(key, _MISSING) is not _MISSING
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """Drop every string key starting with ``prefix``"""
+        with self._lock:
+            keys = [k for k in self._entries if isinstance(k, str) and k.startswith(prefix)]
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _purge_expired_locked(self) -> None:
+        now = time.time()
+        for k in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[k]
+
+    def __len__(self) -> int:
+        return len(self._entries)
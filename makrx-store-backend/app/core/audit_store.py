@@ -0,0 +1,185 @@
+"""
+Append-only, hash-chained audit store on SQLite
+
+Every record is one row. ``chain_hash = sha256(previous chain_hash + checksum)``
+links each row to the one before it, so editing, inserting or deleting a row
+in the middle breaks verification from that point on. An UPDATE trigger
+rejects in-place edits. Only the retention purge deletes rows, and always from
+the oldest end; the surviving first row's ``prev_hash`` then anchors the chain.
+
+Rows are indexed by ``audit_id`` and by timestamp. Lookups and compliance
+reports are indexed queries and range scans, and memory use does not grow
+with the size of the trail.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+GENESIS_HASH = "0" * 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_records (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    audit_id TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    actor_id TEXT,
+    success INTEGER NOT NULL,
+    record_json TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    prev_hash TEXT NOT NULL,
+    chain_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_audit_records_timestamp ON audit_records (timestamp);
+CREATE TRIGGER IF NOT EXISTS audit_records_no_update
+BEFORE UPDATE ON audit_records
+BEGIN
+    SELECT RAISE(ABORT, 'audit records are append-only');
+END;
+"""
+
+
+def chain_hash(prev_hash: str, checksum: str) -> str:
+    return hashlib.sha256(f"{prev_hash}{checksum}".encode()).hexdigest()
+
+
+class SQLiteAuditStore:
+    """Thread-safe append-only audit store backed by one SQLite file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]) -> Tuple[int, str]:
+        """Store a record that already carries its ``checksum``.
+
+        Returns ``(sequence, chain_hash)``.
+        """
+        record_json = json.dumps(
+            record, sort_keys=True, separators=(",", ":"), default=str
+        )
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT chain_hash FROM audit_records ORDER BY seq DESC LIMIT 1"
+                ).fetchone()
+                prev_hash = row["chain_hash"] if row else GENESIS_HASH
+                new_hash = chain_hash(prev_hash, record["checksum"])
+                cursor = self._conn.execute(
+                    "INSERT INTO audit_records (audit_id, timestamp, event_type, "
+                    "actor_id, success, record_json, checksum, prev_hash, chain_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        record["audit_id"],
+                        record["timestamp"],
+                        record["event_type"],
+                        record.get("actor_id"),
+                        1 if record.get("success") else 0,
+                        record_json,
+                        record["checksum"],
+                        prev_hash,
+                        new_hash,
+                    ),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.lastrowid, new_hash
+
+    def get(self, audit_id: str) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT * FROM audit_records WHERE audit_id = ?", (audit_id,)
+            ).fetchone()
+
+    def previous_chain_hash(self, seq: int) -> Optional[str]:
+        """``chain_hash`` of the row before ``seq``, or None if it was purged"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chain_hash FROM audit_records WHERE seq < ? "
+                "ORDER BY seq DESC LIMIT 1",
+                (seq,),
+            ).fetchone()
+        return row["chain_hash"] if row else None
+
+    def seq_range(self, start: str, end: str) -> Optional[Tuple[int, int]]:
+        """``(first, last)`` sequence numbers of rows timestamped in the range.
+
+        Timestamps are taken before the insert lock, so they are not strictly
+        ordered by ``seq``. Verification walks the whole sequence span,
+        including rows whose timestamps fall just outside the range.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(seq) AS first, MAX(seq) AS last FROM audit_records "
+                "WHERE timestamp >= ? AND timestamp <= ?",
+                (start, end),
+            ).fetchone()
+        if row is None or row["first"] is None:
+            return None
+        return row["first"], row["last"]
+
+    def iter_seq_range(
+        self, first: int, last: int, batch_size: int = 1000
+    ) -> Iterator[sqlite3.Row]:
+        """Every row with ``first <= seq <= last`` in order, fetched in batches"""
+        last_seq = first - 1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT * FROM audit_records WHERE seq > ? AND seq <= ? "
+                    "ORDER BY seq LIMIT ?",
+                    (last_seq, last, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last_seq = rows[-1]["seq"]
+
+    def event_type_summary(self, start: str, end: str) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT event_type, COUNT(*) AS count, SUM(success) AS successes "
+                "FROM audit_records WHERE timestamp >= ? AND timestamp <= ? "
+                "GROUP BY event_type",
+                (start, end),
+            ).fetchall()
+
+    def actor_summary(self, start: str, end: str) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT actor_id, COUNT(*) AS total_actions, SUM(CASE WHEN "
+                "LOWER(event_type) LIKE '%admin%' THEN 1 ELSE 0 END) AS admin_actions "
+                "FROM audit_records WHERE timestamp >= ? AND timestamp <= ? "
+                "GROUP BY actor_id",
+                (start, end),
+            ).fetchall()
+
+    def purge_before(self, cutoff: str) -> int:
+        """Delete the oldest rows with ``timestamp < cutoff`` (retention)"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM audit_records WHERE seq <= ("
+                "SELECT MAX(seq) FROM audit_records WHERE timestamp < ?)",
+                (cutoff,),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -38,12 +38,73 @@ class Settings(BaseSettings):
         description="PostgreSQL database URL",
     )
     DB_ECHO: bool = Field(False, description="Enable SQLAlchemy query logging")
+    REPLICA_DATABASE_URL: Optional[str] = Field(
+        None,
+        description="Read replica URL for analytics queries (unset reads from primary)",
+    )
+    REPLICA_MAX_LAG_SECONDS: float = Field(
+        30.0, description="Replica replay lag above which reads fall back to primary"
+    )
+    REPLICA_LAG_CHECK_INTERVAL: float = Field(
+        10.0, description="Seconds a replica lag check is trusted before re-probing"
+    )
+    REPLICA_CONNECT_TIMEOUT: float = Field(
+        2.0, description="Seconds a replica connection may take before the probe fails"
+    )
+    SLOW_QUERY_MS: float = Field(
+        500.0, description="Statements slower than this are captured with their plan"
+    )
+    SLOW_QUERY_LOG_SIZE: int = Field(
+        200, description="Slow-query and N+1 entries kept for the admin endpoint"
+    )
+    SLOW_QUERY_EXPLAIN: bool = Field(
+        True, description="Run EXPLAIN on captured slow read statements"
+    )
+    SLOW_QUERY_EXPLAIN_INTERVAL: float = Field(
+        300.0, description="Minimum seconds between EXPLAINs of the same statement"
+    )
+    N_PLUS_ONE_THRESHOLD: int = Field(
+        10, description="Repeats of one statement per request before it is flagged N+1"
+    )
+
+    # Sampling profiler (admin endpoints under /monitoring/profiler)
+    PROFILER_INTERVAL_MS: float = Field(
+        10.0, description="Base stack sampling interval"
+    )
+    PROFILER_MAX_OVERHEAD: float = Field(
+        0.01, description="Share of wall time the sampler may use before backing off"
+    )
+    PROFILER_MAX_SECONDS: float = Field(
+        600.0, description="Profiling sessions stop on their own after this long"
+    )
+    PROFILER_MAX_STACKS: int = Field(
+        20000, description="Distinct stacks kept per profile"
+    )
+    PROFILER_REQUEST_SAMPLE_N: int = Field(
+        0, description="Profile one request in N (0 disables the middleware)"
+    )
 
     # Redis
     REDIS_URL: str = Field(
         "redis://localhost:6379/0",
         description="Redis URL for caching and rate limiting",
     )
+    IDEMPOTENCY_BACKEND: str = Field(
+        "redis",
+        description="Idempotency key store: redis (shared) or memory (per process)",
+    )
+    IDEMPOTENCY_TTL_SECONDS: int = Field(
+        86400, description="How long completed results are replayed"
+    )
+    IDEMPOTENCY_LOCK_SECONDS: int = Field(
+        60, description="Expiry of an in-flight claim"
+    )
+    IDEMPOTENCY_WAIT_SECONDS: float = Field(
+        30.0, description="How long duplicates wait for the in-flight call"
+    )
+    IDEMPOTENCY_MAX_ENTRIES: int = Field(
+        10000, description="LRU bound of the in-memory store"
+    )
 
     # Authentication (Keycloak)
     KEYCLOAK_ISSUER: str = Field(
@@ -121,6 +182,29 @@ class Settings(BaseSettings):
 
     # Logging
     LOG_LEVEL: str = Field("INFO", regex="^(DEBUG|INFO|WARNING|ERROR|CRITICAL)$")
+    SECURITY_LOG_PATH: str = Field(
+        "security_audit.log", description="Security event log file"
+    )
+    PERFORMANCE_LOG_PATH: str = Field(
+        "performance_metrics.log", description="Per-request metric log file"
+    )
+    LOG_QUEUE_SIZE: int = Field(
+        10000, description="Max log records buffered before dropping"
+    )
+    LOG_BATCH_SIZE: int = Field(500, description="Max records written per batch")
+    LOG_FLUSH_INTERVAL: float = Field(
+        0.5, description="Max seconds a record waits before flush"
+    )
+    LOG_MAX_BYTES: int = Field(
+        100 * 1024 * 1024, description="Rotate log files at this size"
+    )
+    LOG_BACKUP_COUNT: int = Field(
+        10, description="Compressed rotated log files to keep"
+    )
+    AUDIT_DB_PATH: str = Field(
+        "audit_trail.sqlite3", description="Append-only audit trail database"
+    )
+    LOG_CONSOLE_ECHO: bool = Field(True, description="Echo sink output to stderr")
 
     # Celery (for future async tasks)
     CELERY_BROKER: str = Field(
@@ -6,10 +6,13 @@ SQLAlchemy with async PostgreSQL support
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, text
+from typing import Optional
 import logging
+import time
 
 from app.core.config import settings
+from app.core.query_stats import instrument_engine
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +26,9 @@ engine = create_async_engine(
     max_overflow=20
 )
 
+# Attribute statement counts and DB time to the current request
+instrument_engine(engine)
+
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -30,6 +36,103 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+# Optional read replica for analytics queries; see get_read_db. A short connect
+# timeout keeps an unreachable replica from stalling the request that probes it.
+replica_engine = create_async_engine(
+    settings.REPLICA_DATABASE_URL,
+    echo=settings.DB_ECHO,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    pool_size=5,
+    max_overflow=10,
+    connect_args={"timeout": settings.REPLICA_CONNECT_TIMEOUT}
+) if settings.REPLICA_DATABASE_URL else None
+
+if replica_engine is not None:
+    instrument_engine(replica_engine)
+
+ReplicaSessionLocal = async_sessionmaker(
+    replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+) if replica_engine is not None else None
+
+# Seconds the replica is behind the primary (0 on a primary or when fully replayed)
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+class ReplicaHealth:
+    """
+    Cached verdict on whether the replica is fresh enough to read from
+    """
+
+    def __init__(self, max_lag_seconds: float, check_interval: float):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.usable = False
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._checked_at: Optional[float] = None
+
+    def claim_check(self) -> bool:
+        """
+        True when the verdict is stale; concurrent callers keep the old verdict
+        """
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        return True
+
+    def record(self, lag_seconds: Optional[float], error: Optional[str] = None) -> bool:
+        usable = error is None and lag_seconds is not None and lag_seconds <= self.max_lag_seconds
+        if usable != self.usable:
+            if usable:
+                logger.info(f"Read replica back in rotation (lag {lag_seconds:.1f}s)")
+            else:
+                logger.warning(
+                    f"Read replica out of rotation, reads fall back to primary "
+                    f"(lag={lag_seconds}, error={error})"
+                )
+        self.usable = usable
+        self.lag_seconds = lag_seconds
+        self.last_error = error
+        return usable
+
+    def status(self) -> dict:
+        return {
+            "configured": replica_engine is not None,
+            "usable": self.usable,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "last_error": self.last_error,
+        }
+
+replica_health = ReplicaHealth(settings.REPLICA_MAX_LAG_SECONDS, settings.REPLICA_LAG_CHECK_INTERVAL)
+
+async def replica_is_usable() -> bool:
+    """
+    Probe replica reachability and lag, at most once per check interval
+    """
+    if replica_engine is None:
+        return False
+    if not replica_health.claim_check():
+        return replica_health.usable
+    try:
+        async with replica_engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                lag = (await conn.execute(REPLICA_LAG_QUERY)).scalar()
+            else:
+                lag = 0
+        return replica_health.record(float(lag or 0))
+    except Exception as e:
+        return replica_health.record(None, str(e))
+
 # Base class for all models
 Base = declarative_base()
 
@@ -54,6 +157,29 @@ async def get_db() -> AsyncSession:
         finally:
             await session.close()
 
+async def get_read_db() -> AsyncSession:
+    """
+    Dependency for read-only analytics queries.
+
+    Uses the replica while it is reachable and within REPLICA_MAX_LAG_SECONDS,
+    otherwise the primary. Anything that writes or must read its own writes
+    uses get_db.
+    """
+    session_factory = ReplicaSessionLocal if await replica_is_usable() else AsyncSessionLocal
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def dispose_engines():
+    """
+    Close pooled connections on shutdown
+    """
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
 async def create_tables():
     """
     Create all database tables
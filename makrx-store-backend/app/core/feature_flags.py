@@ -9,13 +9,15 @@ Implements API guards and decorators per specification:
 
 import json
 import logging
-from typing import Optional, Dict, Any, List, Callable
+from typing import Optional, Dict, Any, Iterable, List, Callable
 from functools import wraps
 from fastapi import HTTPException, status, Depends, Request
 from fastapi.responses import JSONResponse
-import hashlib
+import zlib
 from datetime import datetime, timedelta
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 # ==========================================
@@ -49,6 +51,8 @@ class FlagContext:
         self.user_agent = user_agent
         self.completed_jobs = completed_jobs
         self.ip_address = ip_address
+        # Per-request memo of flag results, filled by FeatureFlagEngine.evaluate
+        self.evaluations: Dict[str, Dict[str, Any]] = {}
 
 class FlagDefinition:
     """Backend flag definition (simplified)"""
@@ -80,13 +84,78 @@ class FlagDefinition:
         self.percentage_rollout = percentage_rollout
         self.config_value = config_value
 
+INTERNAL_ROLES = frozenset({"superadmin", "store_admin", "makerspace_admin"})
+
+class CompiledFlag:
+    """
+    Evaluation-ready form of a FlagDefinition: targeting lists become
+    frozensets, the bucketing hash prefix is precomputed, and flags whose
+    result cannot depend on the context carry that result up front
+    """
+    __slots__ = (
+        "source", "key", "flag_type", "scope", "default_value", "rollout_state",
+        "roles", "users", "spaces", "countries", "pincodes",
+        "percentage_rollout", "config_value", "bucket_seed", "static_result"
+    )
+    
+    def __init__(self, flag: FlagDefinition):
+        self.source = flag
+        self.key = flag.key
+        self.flag_type = flag.flag_type
+        self.scope = flag.scope
+        self.default_value = flag.default_value
+        self.rollout_state = flag.rollout_state
+        self.roles = frozenset(flag.enabled_for_roles)
+        self.users = frozenset(flag.enabled_for_users)
+        self.spaces = frozenset(flag.enabled_for_spaces)
+        self.countries = frozenset(flag.enabled_for_countries)
+        self.pincodes = frozenset(flag.enabled_for_pincodes)
+        self.percentage_rollout = flag.percentage_rollout
+        self.config_value = flag.config_value
+        self.bucket_seed = zlib.crc32(f"{flag.key}:".encode())
+        self.static_result = self._static_result()
+    
+    def _static_result(self) -> Optional[Dict[str, Any]]:
+        if self.rollout_state == "off":
+            return {"enabled": False, "value": self.default_value, "reason": "rollout_off"}
+        if self.rollout_state == "internal" or self.scope != "global":
+            return None
+        if self.flag_type == "boolean":
+            return {"enabled": True, "value": True, "reason": "enabled"}
+        if self.flag_type == "config":
+            return {"enabled": True, "value": self.config_value or self.default_value, "reason": "config_value"}
+        if self.flag_type != "percentage":
+            return {"enabled": False, "value": self.default_value, "reason": "unknown_type"}
+        return None
+    
+    def bucket(self, identifier: str) -> int:
+        """Stable 0-99 rollout bucket (CRC32; no cryptographic strength needed)"""
+        return zlib.crc32(identifier.encode(), self.bucket_seed) % 100
+
 class FeatureFlagEngine:
     """Backend feature flag engine"""
     
     def __init__(self):
         self.flags: Dict[str, FlagDefinition] = {}
+        self._compiled: Dict[str, CompiledFlag] = {}
         self._load_default_flags()
     
+    def set_flag(self, flag: FlagDefinition):
+        """Add or replace a flag definition"""
+        self.flags[flag.key] = flag
+        self._compiled[flag.key] = CompiledFlag(flag)
+    
+    def _compiled_flag(self, flag_key: str) -> Optional[CompiledFlag]:
+        flag = self.flags.get(flag_key)
+        if flag is None:
+            return None
+        compiled = self._compiled.get(flag_key)
+        # Recompile when a definition was swapped in through ``flags`` directly
+        if compiled is None or compiled.source is not flag:
+            compiled = CompiledFlag(flag)
+            self._compiled[flag_key] = compiled
+        return compiled
+    
     def _load_default_flags(self):
         """Load default flags from configuration"""
         # Key flags for API protection
@@ -225,12 +294,15 @@ class FeatureFlagEngine:
         ]
         
         for flag in default_flags:
-            self.flags[flag.key] = flag
+            self.set_flag(flag)
     
     def evaluate(self, flag_key: str, context: FlagContext, default_value: Any = None) -> Dict[str, Any]:
-        """Evaluate a feature flag"""
-        flag = self.flags.get(flag_key)
+        """Evaluate a feature flag (memoized on the context for its request)"""
+        cached = context.evaluations.get(flag_key)
+        if cached is not None:
+            return dict(cached)
         
+        flag = self._compiled_flag(flag_key)
         if not flag:
             return {
                 "enabled": False,
@@ -238,25 +310,31 @@ class FeatureFlagEngine:
                 "reason": "flag_not_found"
             }
         
-        # Check rollout state
-        if flag.rollout_state == "off":
+        result = flag.static_result or self._evaluate_compiled(flag, context)
+        context.evaluations[flag_key] = result
+        return dict(result)
+    
+    def evaluate_all(
+        self, context: FlagContext, flag_keys: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate several flags for one context in a single pass (frontend
+        bootstrap). ``flag_keys`` limits the result to an allow-list, which is
+        what any unauthenticated caller should get; undefined keys evaluate as
+        ``flag_not_found``. Without it every defined flag is evaluated.
+        """
+        keys = self.flags if flag_keys is None else flag_keys
+        return {flag_key: self.evaluate(flag_key, context) for flag_key in keys}
+    
+    def _evaluate_compiled(self, flag: CompiledFlag, context: FlagContext) -> Dict[str, Any]:
+        # Internal rollout - only for admins
+        if flag.rollout_state == "internal" and INTERNAL_ROLES.isdisjoint(context.roles):
             return {
                 "enabled": False,
                 "value": flag.default_value,
-                "reason": "rollout_off"
+                "reason": "internal_only"
             }
         
-        # Internal rollout - only for admins
-        if flag.rollout_state == "internal":
-            is_internal = any(role in ["superadmin", "store_admin", "makerspace_admin"] 
-                            for role in context.roles)
-            if not is_internal:
-                return {
-                    "enabled": False,
-                    "value": flag.default_value,
-                    "reason": "internal_only"
-                }
-        
         # Evaluate targeting
         if not self._evaluate_targeting(flag, context):
             return {
@@ -292,47 +370,44 @@ class FeatureFlagEngine:
             "reason": "unknown_type"
         }
     
-    def _evaluate_targeting(self, flag: FlagDefinition, context: FlagContext) -> bool:
+    def _evaluate_targeting(self, flag: CompiledFlag, context: FlagContext) -> bool:
         """Evaluate targeting rules"""
         if flag.scope == "global":
             return True
         
-        if flag.scope == "role" and flag.enabled_for_roles:
-            return any(role in flag.enabled_for_roles for role in context.roles)
+        if flag.scope == "role" and flag.roles:
+            return not flag.roles.isdisjoint(context.roles)
         
-        if flag.scope == "user" and flag.enabled_for_users:
-            return context.user_id in flag.enabled_for_users
+        if flag.scope == "user" and flag.users:
+            return context.user_id in flag.users
         
-        if flag.scope == "space" and flag.enabled_for_spaces:
+        if flag.scope == "space" and flag.spaces:
             if not context.makerspace_id:
                 return False
-            return context.makerspace_id in flag.enabled_for_spaces
+            return context.makerspace_id in flag.spaces
         
         if flag.scope == "audience":
             # Country targeting
-            if flag.enabled_for_countries and context.country:
-                if context.country not in flag.enabled_for_countries:
+            if flag.countries and context.country:
+                if context.country not in flag.countries:
                     return False
             
             # Pincode targeting
-            if flag.enabled_for_pincodes and context.pincode:
-                if context.pincode not in flag.enabled_for_pincodes:
+            if flag.pincodes and context.pincode:
+                if context.pincode not in flag.pincodes:
                     return False
             
             return True
         
         return False
     
-    def _evaluate_percentage(self, flag: FlagDefinition, context: FlagContext) -> bool:
+    def _evaluate_percentage(self, flag: CompiledFlag, context: FlagContext) -> bool:
         """Evaluate percentage rollout"""
         if not flag.percentage_rollout:
             return False
         
         identifier = context.user_id or context.session_id or "anonymous"
-        hash_val = int(hashlib.md5(f"{flag.key}:{identifier}".encode()).hexdigest(), 16)
-        percentage = hash_val % 100
-        
-        return percentage < flag.percentage_rollout
+        return flag.bucket(identifier) < flag.percentage_rollout
 
 # Global flag engine instance
 flag_engine = FeatureFlagEngine()
@@ -342,7 +417,26 @@ flag_engine = FeatureFlagEngine()
 # ==========================================
 
 def build_flag_context(request: Request, user_info: Optional[Dict[str, Any]] = None) -> FlagContext:
-    """Build flag context from request and user info"""
+    """
+    Build flag context from request and user info.
+    The context is cached on ``request.state`` per user, so every guard and
+    check in one request shares it along with its memoized flag results.
+    """
+    contexts = getattr(request.state, "flag_contexts", None)
+    if contexts is None:
+        contexts = {}
+        request.state.flag_contexts = contexts
+    cache_key = (
+        (user_info.get("user_id"), tuple(user_info.get("roles", [])), user_info.get("makerspace_id"))
+        if user_info else None
+    )
+    context = contexts.get(cache_key)
+    if context is None:
+        context = _new_flag_context(request, user_info)
+        contexts[cache_key] = context
+    return context
+
+def _new_flag_context(request: Request, user_info: Optional[Dict[str, Any]]) -> FlagContext:
     return FlagContext(
         user_id=user_info.get("user_id") if user_info else None,
         session_id=request.headers.get("X-Session-ID"),
@@ -514,8 +608,7 @@ def require_space_flag(flag_key: str, makerspace_id: str):
             if not request:
                 raise HTTPException(status_code=500, detail="Request not found")
             
-            context = build_flag_context(request)
-            context.makerspace_id = makerspace_id
+            context = build_flag_context(request, {"makerspace_id": makerspace_id})
             
             if not check_flag(flag_key, context):
                 raise HTTPException(
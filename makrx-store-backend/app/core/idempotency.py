@@ -0,0 +1,342 @@
+"""
+Shared idempotency store for webhooks and API mutations
+
+A key moves through two states: *pending* while one caller runs the
+operation, then *completed* with the JSON-encoded result until its TTL
+expires. ``claim`` is atomic. Exactly one caller acquires a fresh key, later
+callers get the cached result, and callers that arrive while the first one is
+still running wait for it instead of executing a second time. A failed
+operation releases its claim so a retry can run it again. A crashed worker's
+claim expires after ``lock_seconds``.
+
+The Redis backend shares keys across all workers and pods. The in-process
+backend is an LRU bounded by ``max_entries`` with the same TTL semantics, for
+single-process deployments and development.
+
+If Redis is unreachable, the Redis backend degrades to an in-process store
+instead of failing the request. Duplicates are then only caught within one
+worker until Redis recovers, which keeps payment webhooks and order creation
+available during an outage at the cost of cross-worker deduplication.
+"""
+import abc
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ACQUIRED = "acquired"
+COMPLETED = "completed"
+IN_PROGRESS = "in_progress"
+
+_PENDING_PREFIX = "pending:"
+_DONE_PREFIX = "done:"
+# Marks claim tokens issued by the local fallback while Redis is down
+_LOCAL_TOKEN_PREFIX = "local-"
+
+
+class IdempotencyInProgress(Exception):
+    """Another caller still holds the key after the wait timed out"""
+
+    def __init__(self, key: str):
+        super().__init__(f"Operation for idempotency key {key!r} is still in progress")
+        self.key = key
+
+
+@dataclass
+class Claim:
+    status: str
+    token: Optional[str] = None
+    result: Any = None
+
+
+def _encode(result: Any) -> str:
+    return json.dumps(result, separators=(",", ":"), default=str)
+
+
+class IdempotencyStore(abc.ABC):
+    """Base class: backends implement ``claim``/``complete``/``release``/``wait``"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.IDEMPOTENCY_TTL_SECONDS,
+        lock_seconds: float = settings.IDEMPOTENCY_LOCK_SECONDS,
+        wait_seconds: float = settings.IDEMPOTENCY_WAIT_SECONDS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+
+    @abc.abstractmethod
+    async def claim(self, key: str) -> Claim:
+        """Acquire ``key``, or report that it is completed or in progress"""
+
+    @abc.abstractmethod
+    async def complete(self, key: str, token: str, result: Any) -> None:
+        """Store ``result`` if ``token`` still owns the claim"""
+
+    @abc.abstractmethod
+    async def release(self, key: str, token: str) -> None:
+        """Drop the claim so a retry can run the operation again"""
+
+    @abc.abstractmethod
+    async def wait(self, key: str, timeout: float) -> None:
+        """Return once ``key`` may have changed state, or after ``timeout``"""
+
+    @abc.abstractmethod
+    async def get_result(self, key: str) -> Optional[Any]:
+        """Cached result of a completed key, without claiming it"""
+
+    async def run_once(self, key: str, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``operation`` at most once per key and return its (cached) result"""
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            claim = await self.claim(key)
+            if claim.status == COMPLETED:
+                return claim.result
+            if claim.status == ACQUIRED:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyInProgress(key)
+            await self.wait(key, remaining)
+
+        try:
+            result = await operation()
+        except BaseException:
+            await self.release(key, claim.token)
+            raise
+        await self.complete(key, claim.token, result)
+        return result
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value: str, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """In-process LRU with TTLs.
+
+    Every method runs without awaiting between reading and writing an entry,
+    so claims are atomic within one event loop without a lock.
+    """
+
+    def __init__(self, max_entries: int = settings.IDEMPOTENCY_MAX_ENTRIES, **kwargs):
+        super().__init__(**kwargs)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._waiters: Dict[str, asyncio.Event] = {}
+
+    def _live(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self._notify(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _set(self, key: str, value: str, ttl: float) -> None:
+        self._entries[key] = _Entry(value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._notify(evicted)
+
+    def _notify(self, key: str) -> None:
+        event = self._waiters.pop(key, None)
+        if event is not None:
+            event.set()
+
+    async def claim(self, key: str) -> Claim:
+        entry = self._live(key)
+        if entry is None:
+            token = uuid.uuid4().hex
+            self._set(key, _PENDING_PREFIX + token, self.lock_seconds)
+            return Claim(ACQUIRED, token=token)
+        if entry.value.startswith(_DONE_PREFIX):
+            return Claim(COMPLETED, result=json.loads(entry.value[len(_DONE_PREFIX):]))
+        return Claim(IN_PROGRESS)
+
+    async def complete(self, key: str, token: str, result: Any) -> None:
+        entry = self._live(key)
+        if entry is None or entry.value != _PENDING_PREFIX + token:
+            logger.warning(f"Idempotency claim for {key} expired before the operation completed")
+            return
+        self._set(key, _DONE_PREFIX + _encode(result), self.ttl_seconds)
+        self._notify(key)
+
+    async def release(self, key: str, token: str) -> None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.value == _PENDING_PREFIX + token:
+            del self._entries[key]
+        self._notify(key)
+
+    async def wait(self, key: str, timeout: float) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        # Wake up no later than the pending claim's expiry
+        timeout = min(timeout, max(0.0, entry.expires_at - time.monotonic()))
+        event = self._waiters.setdefault(key, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def get_result(self, key: str) -> Optional[Any]:
+        entry = self._live(key)
+        if entry is None or not entry.value.startswith(_DONE_PREFIX):
+            return None
+        return json.loads(entry.value[len(_DONE_PREFIX):])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Replace/delete only while the caller still owns the pending claim
+_COMPLETE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """Idempotency keys shared by every worker through Redis.
+
+    Claims use ``SET NX PX``. Completion and release are compare-and-set Lua
+    scripts keyed on the claim token, so a worker whose claim expired cannot
+    overwrite the result of the worker that took over. Waiters poll with
+    backoff. Claims made while Redis is unreachable go to ``fallback``, and
+    their tokens are prefixed so completion finds the same backend.
+    """
+
+    def __init__(
+        self,
+        client: "aioredis.Redis",
+        prefix: str = "idempotency:",
+        fallback: Optional[IdempotencyStore] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.client = client
+        self.prefix = prefix
+        self.fallback = fallback or MemoryIdempotencyStore(**kwargs)
+        self._complete = client.register_script(_COMPLETE_SCRIPT)
+        self._release = client.register_script(_RELEASE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisIdempotencyStore":
+        return cls(aioredis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    async def claim(self, key: str) -> Claim:
+        try:
+            return await self._claim(key)
+        except (RedisError, OSError) as e:
+            logger.warning(f"Redis unavailable for idempotency key {key}, using the local store: {e}")
+        claim = await self.fallback.claim(key)
+        if claim.token is not None:
+            claim.token = _LOCAL_TOKEN_PREFIX + claim.token
+        return claim
+
+    async def _claim(self, key: str) -> Claim:
+        redis_key = self.prefix + key
+        while True:
+            token = uuid.uuid4().hex
+            if await self.client.set(
+                redis_key, _PENDING_PREFIX + token, nx=True, px=int(self.lock_seconds * 1000)
+            ):
+                return Claim(ACQUIRED, token=token)
+            value = await self.client.get(redis_key)
+            if value is None:
+                continue  # Expired or released between SET and GET
+            if value.startswith(_DONE_PREFIX):
+                return Claim(COMPLETED, result=json.loads(value[len(_DONE_PREFIX):]))
+            return Claim(IN_PROGRESS)
+
+    async def complete(self, key: str, token: str, result: Any) -> None:
+        if token.startswith(_LOCAL_TOKEN_PREFIX):
+            return await self.fallback.complete(key, token[len(_LOCAL_TOKEN_PREFIX):], result)
+        try:
+            stored = await self._complete(
+                keys=[self.prefix + key],
+                args=[_PENDING_PREFIX + token, _DONE_PREFIX + _encode(result), int(self.ttl_seconds * 1000)],
+            )
+        except (RedisError, OSError) as e:
+            # The claim lapses after lock_seconds; a retry then runs the operation again
+            logger.error(f"Could not store idempotency result for {key}: {e}")
+            return
+        if not stored:
+            logger.warning(f"Idempotency claim for {key} expired before the operation completed")
+
+    async def release(self, key: str, token: str) -> None:
+        if token.startswith(_LOCAL_TOKEN_PREFIX):
+            return await self.fallback.release(key, token[len(_LOCAL_TOKEN_PREFIX):])
+        try:
+            await self._release(keys=[self.prefix + key], args=[_PENDING_PREFIX + token])
+        except (RedisError, OSError) as e:
+            logger.error(f"Could not release idempotency claim for {key}: {e}")
+
+    async def wait(self, key: str, timeout: float) -> None:
+        try:
+            await self._wait(key, timeout)
+        except (RedisError, OSError):
+            await self.fallback.wait(key, timeout)
+
+    async def _wait(self, key: str, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(delay, remaining))
+            value = await self.client.get(self.prefix + key)
+            if value is None or value.startswith(_DONE_PREFIX):
+                return
+            delay = min(delay * 2, 1.0)
+
+    async def get_result(self, key: str) -> Optional[Any]:
+        try:
+            value = await self.client.get(self.prefix + key)
+        except (RedisError, OSError):
+            value = None
+        if value is None or not value.startswith(_DONE_PREFIX):
+            return await self.fallback.get_result(key)
+        return json.loads(value[len(_DONE_PREFIX):])
+
+
+def create_idempotency_store() -> IdempotencyStore:
+    if settings.IDEMPOTENCY_BACKEND == "redis" and settings.REDIS_URL:
+        return RedisIdempotencyStore.from_url(settings.REDIS_URL)
+    return MemoryIdempotencyStore()
+
+
+# Global idempotency store
+idempotency_store = create_idempotency_store()
@@ -0,0 +1,249 @@
+"""
+Non-blocking structured log sink
+
+Request handlers only append a log record to a bounded in-memory queue. A
+background writer thread drains the queue in batches, formats the records,
+writes each batch with a single ``write`` call, rotates the file by size and
+gzips rotated files. When the queue is full, records are dropped and counted
+(``log_sink_dropped_total``) instead of blocking the request.
+
+Messages wrapped in ``JsonMessage`` are serialized on the writer thread too,
+so ``json.dumps`` leaves the request path as well.
+"""
+import atexit
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, List, Optional
+
+from app.core.metrics import registry
+
+SINK_DROPPED = registry.counter(
+    "log_sink_dropped_total", "Log records dropped because the sink queue was full", ("sink",)
+)
+SINK_WRITTEN = registry.counter(
+    "log_sink_written_total", "Log records written by the sink", ("sink",)
+)
+SINK_QUEUE_DEPTH = registry.gauge(
+    "log_sink_queue_depth", "Log records waiting to be written", ("sink",)
+)
+
+_STOP = object()
+_sinks: List["AsyncLogSink"] = []
+
+
+class JsonMessage:
+    """Log message serialized to JSON only when it is formatted"""
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+
+    def __str__(self) -> str:
+        return json.dumps(self.payload, default=str)
+
+
+class AsyncLogSink:
+    """Bounded queue plus a background thread that batches writes to one file"""
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        formatter: Optional[logging.Formatter] = None,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        max_bytes: int = 100 * 1024 * 1024,
+        backup_count: int = 10,
+        echo_stream=None,
+    ):
+        self.name = name
+        self.path = path
+        self.formatter = formatter or logging.Formatter("%(message)s")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.echo_stream = echo_stream
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._dropped = SINK_DROPPED.labels(name)
+        self._written = SINK_WRITTEN.labels(name)
+        self._depth = SINK_QUEUE_DEPTH.labels(name)
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        _sinks.append(self)
+
+    # Producer side
+
+    def submit(self, record: logging.LogRecord) -> bool:
+        """Enqueue a record without blocking; returns False if it was dropped"""
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self._dropped.inc()
+            return False
+
+    @property
+    def dropped(self) -> int:
+        return int(self._dropped.value)
+
+    # Writer side
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=f"log-sink-{self.name}", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush everything queued so far and stop the writer"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[logging.LogRecord] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+            self._depth.set(self._queue.qsize())
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _format(self, record: logging.LogRecord) -> Optional[str]:
+        try:
+            return self.formatter.format(record)
+        except Exception:
+            # A bad record must not take the writer down with it
+            return None
+
+    def _write_batch(self, batch: List[logging.LogRecord]) -> None:
+        lines = [line for line in map(self._format, batch) if line is not None]
+        data = "\n".join(lines) + "\n"
+        try:
+            self._ensure_file(len(data.encode("utf-8")))
+            self._file.write(data)
+            self._file.flush()
+            self._written.inc(len(lines))
+        except OSError as e:
+            sys.stderr.write(f"log sink {self.name} write failed: {e}\n")
+            self._dropped.inc(len(lines))
+        if self.echo_stream is not None:
+            try:
+                self.echo_stream.write(data)
+                self.echo_stream.flush()
+            except Exception:
+                pass
+
+    def _ensure_file(self, incoming_bytes: int) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        if self.max_bytes and self._file.tell() > 0 and self._file.tell() + incoming_bytes > self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        """Move the current file aside, gzip it and prune old backups"""
+        self._file.close()
+        self._file = None
+        stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+        rotated = f"{self.path}.{stamp}"
+        try:
+            os.replace(self.path, rotated)
+            with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        except OSError as e:
+            sys.stderr.write(f"log sink {self.name} rotation failed: {e}\n")
+
+        backups = sorted(glob.glob(f"{glob.escape(self.path)}.*.gz"))
+        for old in backups[:-self.backup_count] if self.backup_count else backups:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        self._file = open(self.path, "a", encoding="utf-8")
+
+
+class SinkHandler(logging.Handler):
+    """``logging`` handler that hands records to an ``AsyncLogSink``.
+
+    Formatting is deferred to the sink's writer thread, so ``emit`` only
+    enqueues. Exception info is rendered eagerly because the traceback
+    objects do not survive past the ``except`` block.
+    """
+
+    def __init__(self, sink: AsyncLogSink, level=logging.NOTSET):
+        super().__init__(level)
+        self.sink = sink
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.sink.submit(record)
+
+
+def create_sink_logger(
+    logger_name: str,
+    path: str,
+    fmt: str = "%(message)s",
+    **sink_options,
+) -> logging.Logger:
+    """Logger whose only handler is a new ``AsyncLogSink`` writing to ``path``"""
+    logger = logging.getLogger(logger_name)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        if isinstance(handler, SinkHandler):
+            logger.removeHandler(handler)
+    sink = AsyncLogSink(logger_name, path, formatter=logging.Formatter(fmt), **sink_options)
+    logger.addHandler(SinkHandler(sink))
+    return logger
+
+
+def close_sinks(timeout: float = 5.0) -> None:
+    """Flush and stop every sink (called on shutdown and at exit)"""
+    for sink in list(_sinks):
+        sink.close(timeout)
+
+
+atexit.register(close_sinks)
@@ -21,6 +21,7 @@ import razorpay
 from dataclasses import dataclass
 
 from app.core.config import settings
+from app.core.idempotency import IdempotencyStore, idempotency_store
 
 logger = logging.getLogger(__name__)
 
@@ -172,33 +173,27 @@ class IdempotentPaymentProcessor:
     - Prevent double-processing of payments
     """
     
-    def __init__(self):
-        self.processed_events = {}  # In production, use Redis
+    def __init__(self, store: Optional[IdempotencyStore] = None):
+        self.store = store or idempotency_store  # Shared across workers
         self.payment_intents = {}   # Track payment intent states
     
+    @staticmethod
+    def _event_key(event_id: str, provider: PaymentProvider) -> str:
+        return f"payment_event:{provider.value}:{event_id}"
+    
     async def is_duplicate_event(self, event_id: str, provider: PaymentProvider) -> bool:
         """Check if webhook event was already processed"""
-        event_key = f"{provider.value}:{event_id}"
-        return event_key in self.processed_events
-    
-    async def mark_event_processed(self, event_id: str, provider: PaymentProvider, 
-                                 result: Dict[str, Any]):
-        """Mark webhook event as processed"""
-        event_key = f"{provider.value}:{event_id}"
-        self.processed_events[event_key] = {
-            "processed_at": datetime.utcnow().isoformat(),
-            "result": result
-        }
+        return await self.get_cached_result(event_id, provider) is not None
     
     async def get_cached_result(self, event_id: str, provider: PaymentProvider) -> Optional[Dict[str, Any]]:
         """Get cached result for duplicate event"""
-        event_key = f"{provider.value}:{event_id}"
-        cached = self.processed_events.get(event_key)
-        return cached["result"] if cached else None
+        return await self.store.get_result(self._event_key(event_id, provider))
     
     async def process_payment_event(self, webhook_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Process payment webhook event idempotently
+        Process payment webhook event idempotently.
+        Retries of an event return the first result; a retry that arrives
+        while the first delivery is still processing waits for it.
         """
         try:
             provider = webhook_data["provider"]
@@ -208,23 +203,16 @@ class IdempotentPaymentProcessor:
             if not event_id:
                 raise Exception("Missing event ID")
             
-            # Check for duplicate
-            if await self.is_duplicate_event(event_id, provider):
-                logger.info(f"Duplicate webhook event ignored: {event_id}")
-                return await self.get_cached_result(event_id, provider)
-            
-            # Process based on provider and event type
             if provider == PaymentProvider.STRIPE:
-                result = await self._process_stripe_event(event)
+                handler = self._process_stripe_event
             elif provider == PaymentProvider.RAZORPAY:
-                result = await self._process_razorpay_event(event)
+                handler = self._process_razorpay_event
             else:
                 raise Exception(f"Unsupported provider: {provider}")
             
-            # Mark as processed
-            await self.mark_event_processed(event_id, provider, result)
-            
-            return result
+            return await self.store.run_once(
+                self._event_key(event_id, provider), lambda: handler(event)
+            )
             
         except Exception as e:
             logger.error(f"Payment event processing failed: {e}")
@@ -0,0 +1,317 @@
+"""
+Sampling profiler for the running API process
+
+- A daemon thread snapshots every thread's Python stack via
+  sys._current_frames() each PROFILER_INTERVAL_MS. Nothing is hooked into the
+  interpreter, so the only cost is the snapshot itself.
+- That cost is measured every tick. The interval stretches whenever it would
+  exceed PROFILER_MAX_OVERHEAD of wall time (1%), so a session is safe to run
+  in production.
+- "wall" sessions keep every sample. "cpu" sessions drop threads parked in
+  idle waits: the event loop selector, condition waits, idle pool workers.
+- ProfilingMiddleware samples one request in PROFILER_REQUEST_SAMPLE_N.
+  While such a request is in flight, stacks running inside a route handler
+  are recorded from the handler down and labelled with the route.
+- Output is collapsed stacks, for flamegraph.pl or speedscope.
+"""
+
+import inspect
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+
+PROFILER_INTERVAL_MS = settings.PROFILER_INTERVAL_MS
+PROFILER_MAX_OVERHEAD = settings.PROFILER_MAX_OVERHEAD
+PROFILER_MAX_SECONDS = settings.PROFILER_MAX_SECONDS
+PROFILER_MAX_STACKS = settings.PROFILER_MAX_STACKS
+PROFILER_REQUEST_SAMPLE_N = settings.PROFILER_REQUEST_SAMPLE_N
+
+MODES = ("wall", "cpu")
+# Innermost frames of a thread that is waiting rather than running
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("socket.py", "accept"),
+}
+_TRUNCATED = "[truncated]"
+_MAX_INTERVAL = 1.0
+
+
+class ProfilerBusy(Exception):
+    """A profiling session is already running"""
+
+
+def _frame_label(code) -> str:
+    parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    return f"{code.co_name} ({'/'.join(parts[-2:])}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Sampling profiler with an on-demand session and per-request sampling"""
+
+    def __init__(
+        self,
+        interval_ms: float = PROFILER_INTERVAL_MS,
+        max_overhead: float = PROFILER_MAX_OVERHEAD,
+        max_stacks: int = PROFILER_MAX_STACKS,
+    ):
+        self.base_interval = interval_ms / 1000
+        self.interval = self.base_interval
+        self.max_overhead = max_overhead
+        self.max_stacks = max_stacks
+        self._lock = threading.Lock()
+        self._wanted = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[Any, str] = {}
+        self._endpoints: Dict[Any, str] = {}
+
+        self.mode = "wall"
+        self._session_active = False
+        self._session_deadline = 0.0
+        self._session_started: Optional[datetime] = None
+        self._session_stopped: Optional[datetime] = None
+        self._session_counts: Dict[Tuple, int] = {}
+        self._session_samples = 0
+
+        self._inflight_requests = 0
+        self._request_counts: Dict[Tuple, int] = {}
+        self._request_samples = 0
+
+        self._busy = 0.0
+        self._ticks = 0
+        self._overhead = 0.0
+
+    # ---- control -------------------------------------------------------
+
+    def register_routes(self, routes: Iterable[Any]) -> None:
+        """Map route handlers' code objects to labels for request sampling"""
+        endpoints = {}
+        for route in routes:
+            endpoint = getattr(route, "endpoint", None)
+            code = (
+                getattr(inspect.unwrap(endpoint), "__code__", None)
+                if endpoint
+                else None
+            )
+            if code is None:
+                continue
+            methods = ",".join(sorted(getattr(route, "methods", None) or ()))
+            endpoints[code] = f"{methods} {route.path}".strip()
+        self._endpoints = endpoints
+
+    def start(
+        self, mode: str = "wall", duration_seconds: float = PROFILER_MAX_SECONDS
+    ) -> Dict[str, Any]:
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        duration_seconds = min(max(duration_seconds, 1), PROFILER_MAX_SECONDS)
+        with self._lock:
+            if self._session_active:
+                raise ProfilerBusy("A profiling session is already running")
+            self.mode = mode
+            self._session_counts = {}
+            self._session_samples = 0
+            self._session_started = datetime.now(timezone.utc)
+            self._session_stopped = None
+            self._session_deadline = time.monotonic() + duration_seconds
+            self._session_active = True
+            self._update_wanted()
+        self._ensure_thread()
+        return self.status()
+
+    def stop(self) -> Dict[str, Any]:
+        with self._lock:
+            self._end_session()
+        return self.status()
+
+    def request_started(self) -> None:
+        with self._lock:
+            self._inflight_requests += 1
+            self._update_wanted()
+        self._ensure_thread()
+
+    def request_finished(self) -> None:
+        with self._lock:
+            self._inflight_requests -= 1
+            self._update_wanted()
+
+    def clear_requests(self) -> None:
+        with self._lock:
+            self._request_counts = {}
+            self._request_samples = 0
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._end_session()
+            self._inflight_requests = 0
+            self._update_wanted()
+
+    # ---- reporting -----------------------------------------------------
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self._session_active,
+                "mode": self.mode,
+                "started_at": self._session_started.isoformat()
+                if self._session_started
+                else None,
+                "stopped_at": self._session_stopped.isoformat()
+                if self._session_stopped
+                else None,
+                "samples": self._session_samples,
+                "distinct_stacks": len(self._session_counts),
+                "request_samples": self._request_samples,
+                "request_distinct_stacks": len(self._request_counts),
+                "interval_ms": round(self.interval * 1000, 2),
+                "overhead_percent": round(self._overhead * 100, 3),
+                "max_overhead_percent": self.max_overhead * 100,
+            }
+
+    def collapsed(self, source: str = "session") -> str:
+        """frame;frame;... count lines, heaviest first"""
+        with self._lock:
+            counts = dict(
+                self._request_counts if source == "requests" else self._session_counts
+            )
+        lines = []
+        for stack, count in sorted(
+            counts.items(), key=lambda item: item[1], reverse=True
+        ):
+            frames = (
+                item if isinstance(item, str) else self._label(item) for item in stack
+            )
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    # ---- sampling ------------------------------------------------------
+
+    def _end_session(self) -> None:
+        if self._session_active:
+            self._session_active = False
+            self._session_stopped = datetime.now(timezone.utc)
+            self._update_wanted()
+
+    def _update_wanted(self) -> None:
+        if self._session_active or self._inflight_requests > 0:
+            self._wanted.set()
+        else:
+            self._wanted.clear()
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="sampling-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = _frame_label(code)
+        return label
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while True:
+            self._wanted.wait()
+            started = time.perf_counter()
+            self._sample(own_ident)
+            self._account(time.perf_counter() - started)
+            time.sleep(self.interval)
+
+    def _sample(self, own_ident: int) -> None:
+        frames = sys._current_frames()
+        with self._lock:
+            if self._session_active and time.monotonic() >= self._session_deadline:
+                self._end_session()
+            session = self._session_active
+            requests = self._inflight_requests > 0 and bool(self._endpoints)
+            cpu_only = self.mode == "cpu"
+            if session:
+                self._session_samples += 1
+            if requests:
+                self._request_samples += 1
+        if not session and not requests:
+            return
+
+        for ident, frame in frames.items():
+            if ident == own_ident:
+                continue
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            codes.reverse()
+            leaf = codes[-1]
+            if session and not (cpu_only and self._is_idle(leaf)):
+                self._count(self._session_counts, tuple(codes))
+            if requests:
+                for index, code in enumerate(codes):
+                    route = self._endpoints.get(code)
+                    if route is not None:
+                        self._count(self._request_counts, (route, *codes[index:]))
+                        break
+
+    def _is_idle(self, code) -> bool:
+        filename = code.co_filename.replace("\\", "/").rsplit("/", 1)[-1]
+        return (filename, code.co_name) in _IDLE_LEAVES
+
+    def _count(self, counts: Dict[Tuple, int], stack: Tuple) -> None:
+        with self._lock:
+            if stack not in counts and len(counts) >= self.max_stacks:
+                stack = (_TRUNCATED,)
+            counts[stack] = counts.get(stack, 0) + 1
+
+    def _account(self, busy: float) -> None:
+        """Track the sampler's share of wall time and back off when over budget"""
+        share = busy / (busy + self.interval)
+        self._overhead = (
+            share if self._ticks == 0 else 0.9 * self._overhead + 0.1 * share
+        )
+        self._ticks += 1
+        if self._overhead > self.max_overhead:
+            self.interval = min(self.interval * 1.25, _MAX_INTERVAL)
+        elif (
+            self._overhead < self.max_overhead / 4
+            and self.interval > self.base_interval
+        ):
+            self.interval = max(self.interval / 1.25, self.base_interval)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles one HTTP request in every_n"""
+
+    def __init__(
+        self,
+        app,
+        profiler: "SamplingProfiler",
+        every_n: int = PROFILER_REQUEST_SAMPLE_N,
+    ):
+        self.app = app
+        self.profiler = profiler
+        self.every_n = max(every_n, 1)
+        self._seen = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        self._seen += 1
+        if self._seen % self.every_n:
+            return await self.app(scope, receive, send)
+        self.profiler.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.request_finished()
+
+
+profiler = SamplingProfiler()
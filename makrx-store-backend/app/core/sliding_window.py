@@ -0,0 +1,84 @@
+"""
+Keyed sliding-window event counters
+
+Each key (for example ``("auth_failure", ip)``) owns a small ring of
+sub-window buckets. Recording an event touches only that key's ring, and
+reading the count sums a fixed number of buckets, so both are O(1) no matter
+how many events or keys are live. Keys whose newest bucket has left the window
+are swept at most once per bucket interval, so idle keys do not accumulate.
+
+The counters do no locking. They are meant to be used from a single event
+loop: ``hit`` and ``count`` never await, so no other task can interleave with
+an update.
+"""
+import time
+from typing import Dict, Hashable, List, Optional
+
+
+class _KeyWindow:
+    __slots__ = ("epochs", "counts", "last_epoch")
+
+    def __init__(self, num_buckets: int):
+        self.epochs: List[int] = [-1] * num_buckets
+        self.counts: List[int] = [0] * num_buckets
+        self.last_epoch = -1
+
+
+class SlidingWindowCounter:
+    """Counts events per key over the last ``window_seconds``"""
+
+    def __init__(self, window_seconds: float, num_buckets: int = 5):
+        self.window_seconds = window_seconds
+        self.num_buckets = num_buckets
+        self.bucket_seconds = window_seconds / num_buckets
+        self._windows: Dict[Hashable, _KeyWindow] = {}
+        self._last_sweep_epoch = -1
+
+    def _epoch(self, now: Optional[float]) -> int:
+        return int((time.time() if now is None else now) // self.bucket_seconds)
+
+    def hit(self, key: Hashable, amount: int = 1, now: Optional[float] = None) -> int:
+        """Record ``amount`` events for ``key``; returns the key's count in the window"""
+        epoch = self._epoch(now)
+        if epoch != self._last_sweep_epoch:
+            self._sweep(epoch)
+
+        window = self._windows.get(key)
+        if window is None:
+            window = _KeyWindow(self.num_buckets)
+            self._windows[key] = window
+
+        index = epoch % self.num_buckets
+        if window.epochs[index] != epoch:
+            window.epochs[index] = epoch
+            window.counts[index] = 0
+        window.counts[index] += amount
+        window.last_epoch = epoch
+        return self._sum(window, epoch)
+
+    def count(self, key: Hashable, now: Optional[float] = None) -> int:
+        window = self._windows.get(key)
+        if window is None:
+            return 0
+        return self._sum(window, self._epoch(now))
+
+    def _sum(self, window: _KeyWindow, epoch: int) -> int:
+        oldest = epoch - self.num_buckets + 1
+        return sum(
+            count for bucket_epoch, count in zip(window.epochs, window.counts)
+            if oldest <= bucket_epoch <= epoch
+        )
+
+    def reset(self, key: Hashable) -> None:
+        self._windows.pop(key, None)
+
+    def _sweep(self, epoch: int) -> None:
+        """Drop keys with no events inside the window"""
+        self._last_sweep_epoch = epoch
+        oldest = epoch - self.num_buckets + 1
+        expired = [key for key, window in self._windows.items() if window.last_epoch < oldest]
+        for key in expired:
+            del self._windows[key]
+
+    def __len__(self) -> int:
+        return len(self._windows)
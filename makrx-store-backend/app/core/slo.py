@@ -0,0 +1,216 @@
+"""
+Rolling-window SLO tracking on time-bucketed ring buffers
+
+Each request lands in the current bucket of a fixed-size ring (one bucket per
+``bucket_seconds``). A bucket holds request/error/slow counters and a
+fixed-bucket latency histogram that serves as the quantile sketch. Recording
+is O(1), and a window query sums at most ``window / bucket_seconds`` buckets,
+independent of request volume. Stale slots are reset lazily when the ring
+wraps around to them.
+
+One ring covers all traffic and one more is kept per endpoint. Endpoint rings
+allocate a slot only on first use, so idle endpoints cost almost nothing.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.metrics import quantile_from_counts
+
+# Milliseconds; the 500ms latency SLO sits on a bucket edge
+LATENCY_BUCKETS_MS = (
+    10, 25, 50, 100, 200, 300, 500, 750, 1000, 2000, 5000, 10000
+)
+
+# Burn-rate windows reported by the SLO report, in seconds
+BURN_RATE_WINDOWS = {
+    "5m": 300,
+    "30m": 1800,
+    "1h": 3600,
+    "6h": 6 * 3600,
+    "24h": 24 * 3600,
+}
+
+
+class _Bucket:
+    __slots__ = ("epoch", "requests", "errors", "slow", "latency_counts", "latency_sum_ms")
+
+    def __init__(self, epoch: int):
+        self.epoch = epoch
+        self.requests = 0
+        self.errors = 0
+        self.slow = 0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_sum_ms = 0.0
+
+
+class WindowStats:
+    """Aggregated counters and latency sketch over a time window"""
+
+    __slots__ = ("requests", "errors", "slow", "latency_counts", "latency_sum_ms")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.slow = 0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_sum_ms = 0.0
+
+    def add(self, bucket: _Bucket) -> None:
+        self.requests += bucket.requests
+        self.errors += bucket.errors
+        self.slow += bucket.slow
+        self.latency_sum_ms += bucket.latency_sum_ms
+        for i, count in enumerate(bucket.latency_counts):
+            self.latency_counts[i] += count
+
+    @property
+    def error_ratio(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    @property
+    def slow_ratio(self) -> float:
+        return self.slow / self.requests if self.requests else 0.0
+
+    def quantile_ms(self, q: float) -> Optional[float]:
+        return quantile_from_counts(LATENCY_BUCKETS_MS, self.latency_counts, q)
+
+
+class RollingWindow:
+    """Ring of time buckets covering ``bucket_seconds * num_buckets`` seconds"""
+
+    def __init__(self, bucket_seconds: int, num_buckets: int, latency_slo_ms: float):
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = num_buckets
+        self.latency_slo_ms = latency_slo_ms
+        self._slots: List[Optional[_Bucket]] = [None] * num_buckets
+
+    @property
+    def span_seconds(self) -> int:
+        return self.bucket_seconds * self.num_buckets
+
+    def record(self, duration_ms: float, is_error: bool, now: float) -> None:
+        epoch = int(now // self.bucket_seconds)
+        index = epoch % self.num_buckets
+        bucket = self._slots[index]
+        if bucket is None or bucket.epoch != epoch:
+            bucket = _Bucket(epoch)
+            self._slots[index] = bucket
+
+        bucket.requests += 1
+        if is_error:
+            bucket.errors += 1
+        if duration_ms > self.latency_slo_ms:
+            bucket.slow += 1
+        bucket.latency_sum_ms += duration_ms
+        bucket.latency_counts[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def stats(self, window_seconds: int, now: float) -> WindowStats:
+        """Sum the buckets that overlap the last ``window_seconds``"""
+        current = int(now // self.bucket_seconds)
+        count = min(self.num_buckets, max(1, -(-window_seconds // self.bucket_seconds)))
+        stats = WindowStats()
+        for epoch in range(current - count + 1, current + 1):
+            bucket = self._slots[epoch % self.num_buckets]
+            if bucket is not None and bucket.epoch == epoch:
+                stats.add(bucket)
+        return stats
+
+
+class SLOEngine:
+    """Tracks availability and latency SLOs overall and per endpoint"""
+
+    def __init__(
+        self,
+        availability_target_percent: float,
+        latency_slo_ms: float,
+        latency_target_percent: float = 95.0,
+        bucket_seconds: int = 60,
+        retention_seconds: int = 24 * 3600,
+        max_endpoints: int = 500,
+    ):
+        self.availability_target_percent = availability_target_percent
+        self.latency_slo_ms = latency_slo_ms
+        self.latency_target_percent = latency_target_percent
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(1, retention_seconds // bucket_seconds)
+        self.max_endpoints = max_endpoints
+        self.overall = RollingWindow(bucket_seconds, self.num_buckets, latency_slo_ms)
+        self.endpoints: Dict[Tuple[str, str], RollingWindow] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def error_budget(self) -> float:
+        return 1 - self.availability_target_percent / 100
+
+    @property
+    def latency_budget(self) -> float:
+        return 1 - self.latency_target_percent / 100
+
+    def record(self, endpoint: str, method: str, duration_ms: float, status_code: int,
+               now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        is_error = status_code >= 500
+        key = (method, endpoint)
+        with self._lock:
+            self.overall.record(duration_ms, is_error, now)
+            window = self.endpoints.get(key)
+            if window is None:
+                if len(self.endpoints) >= self.max_endpoints:
+                    # Unbounded paths (ids in the URL) must not grow memory forever
+                    key = (method, "__other__")
+                    window = self.endpoints.get(key)
+                if window is None:
+                    window = RollingWindow(self.bucket_seconds, self.num_buckets, self.latency_slo_ms)
+                    self.endpoints[key] = window
+            window.record(duration_ms, is_error, now)
+
+    def window_stats(self, window_seconds: int, now: Optional[float] = None) -> WindowStats:
+        now = time.time() if now is None else now
+        with self._lock:
+            return self.overall.stats(window_seconds, now)
+
+    def burn_rates(self, stats: WindowStats) -> Dict[str, float]:
+        """How many times faster than sustainable each budget is being spent"""
+        return {
+            "availability": stats.error_ratio / self.error_budget if self.error_budget else 0.0,
+            "latency": stats.slow_ratio / self.latency_budget if self.latency_budget else 0.0,
+        }
+
+    def _summarize(self, stats: WindowStats) -> Dict[str, object]:
+        availability = (1 - stats.error_ratio) * 100 if stats.requests else None
+        fast_percent = (1 - stats.slow_ratio) * 100 if stats.requests else None
+        return {
+            "requests": stats.requests,
+            "errors": stats.errors,
+            "slow_requests": stats.slow,
+            "availability_percent": availability,
+            "fast_percent": fast_percent,
+            "p50_ms": stats.quantile_ms(0.5),
+            "p95_ms": stats.quantile_ms(0.95),
+            "p99_ms": stats.quantile_ms(0.99),
+            "burn_rate": self.burn_rates(stats),
+        }
+
+    def report(self, windows: Iterable[str] = BURN_RATE_WINDOWS, top_endpoints: int = 10,
+               endpoint_window: str = "24h", now: Optional[float] = None) -> Dict[str, object]:
+        now = time.time() if now is None else now
+        with self._lock:
+            window_reports = {
+                name: self._summarize(self.overall.stats(BURN_RATE_WINDOWS[name], now))
+                for name in windows
+            }
+            endpoint_stats = [
+                (key, window.stats(BURN_RATE_WINDOWS[endpoint_window], now))
+                for key, window in self.endpoints.items()
+            ]
+
+        endpoint_stats = [item for item in endpoint_stats if item[1].requests]
+        # Worst offenders first: most errors, then most slow requests
+        endpoint_stats.sort(key=lambda item: (item[1].errors, item[1].slow), reverse=True)
+        endpoints = [
+            {"method": method, "endpoint": endpoint, **self._summarize(stats)}
+            for (method, endpoint), stats in endpoint_stats[:top_endpoints]
+        ]
+        return {"windows": window_reports, "endpoints": endpoints}
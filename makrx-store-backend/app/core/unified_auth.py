@@ -7,11 +7,12 @@ import json
 import logging
 import uuid
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 import httpx
 import jwt
 from app.core.config import settings
+from app.core.idempotency import IdempotencyStore, idempotency_store
 from app.schemas.auth_error import AuthError
 from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -399,28 +400,23 @@ async def get_idempotency_key(
 class IdempotencyChecker:
     """Check and store idempotency keys to prevent duplicate operations"""
 
-    def __init__(self):
-        # In production, use Redis for distributed idempotency
-        self.cache = {}
+    def __init__(self, store: Optional[IdempotencyStore] = None):
+        # Redis-backed by default, so duplicates are caught across workers
+        self.store = store or idempotency_store
+
+    async def run_once(
+        self, key: str, operation: str, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run ``func`` once per key; duplicates get the first result"""
+        return await self.store.run_once(f"{operation}:{key}", func)
 
     async def is_duplicate(self, key: str, operation: str) -> bool:
         """Check if this operation was already performed"""
-        cache_key = f"{operation}:{key}"
-        return cache_key in self.cache
-
-    async def record_operation(self, key: str, operation: str, result: Any):
-        """Record that this operation was completed"""
-        cache_key = f"{operation}:{key}"
-        self.cache[cache_key] = {
-            "result": result,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+        return await self.get_cached_result(key, operation) is not None
 
     async def get_cached_result(self, key: str, operation: str) -> Optional[Any]:
         """Get cached result for duplicate request"""
-        cache_key = f"{operation}:{key}"
-        cached = self.cache.get(cache_key)
-        return cached["result"] if cached else None
+        return await self.store.get_result(f"{operation}:{key}")
 
 
 # Global idempotency checker
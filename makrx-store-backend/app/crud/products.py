@@ -4,16 +4,35 @@ Database operations for product management
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc, text
+from sqlalchemy import select, func, and_, or_, desc, text
 from sqlalchemy.orm import selectinload
 from typing import List, Optional, Tuple, Dict, Any
 import logging
 
+from app.utils.pagination import SortKey, paginate
 from app.models.commerce import Product, Category, OrderItem
 from app.schemas import ProductCreate, ProductUpdate, ProductSearch, ProductFilter, ProductSort
 
 logger = logging.getLogger(__name__)
 
+def _effective_price(product: Product):
+    return product.sale_price if product.sale_price is not None else product.price
+
+def _product_sort_keys(sort: ProductSort) -> List[SortKey]:
+    """Keyset ordering for a product sort; id breaks ties"""
+    if sort in (ProductSort.NAME_ASC, ProductSort.NAME_DESC):
+        descending = sort == ProductSort.NAME_DESC
+        primary = SortKey(Product.name, descending)
+    elif sort in (ProductSort.PRICE_ASC, ProductSort.PRICE_DESC):
+        descending = sort == ProductSort.PRICE_DESC
+        primary = SortKey(
+            func.coalesce(Product.sale_price, Product.price), descending, value=_effective_price
+        )
+    else:  # created_asc/created_desc; other sorts default to created_desc
+        descending = sort != ProductSort.CREATED_ASC
+        primary = SortKey(Product.created_at, descending, nullable=True)
+    return [primary, SortKey(Product.id, descending)]
+
 class ProductCRUD:
     """CRUD operations for products"""
     
@@ -90,8 +109,13 @@ class ProductCRUD:
             logger.error(f"Failed to delete product {product_id}: {e}")
             return False
     
-    async def search_products(self, db: AsyncSession, search: ProductSearch) -> Tuple[List[Product], int]:
-        """Search products with filtering, sorting, and pagination"""
+    async def search_products(
+        self, db: AsyncSession, search: ProductSearch
+    ) -> Tuple[List[Product], int, Optional[str]]:
+        """Search products with filtering, sorting, and pagination.
+
+        Returns ``(products, total, next_cursor)``.
+        """
         try:
             # Base query
             query = select(Product).options(
@@ -200,39 +224,17 @@ class ProductCRUD:
                 query = query.where(search_filter)
                 count_query = count_query.where(search_filter)
             
-            # Apply sorting
-            if search.sort == ProductSort.NAME_ASC:
-                query = query.order_by(asc(Product.name))
-            elif search.sort == ProductSort.NAME_DESC:
-                query = query.order_by(desc(Product.name))
-            elif search.sort == ProductSort.PRICE_ASC:
-                query = query.order_by(
-                    asc(func.coalesce(Product.sale_price, Product.price))
-                )
-            elif search.sort == ProductSort.PRICE_DESC:
-                query = query.order_by(
-                    desc(func.coalesce(Product.sale_price, Product.price))
-                )
-            elif search.sort == ProductSort.CREATED_ASC:
-                query = query.order_by(asc(Product.created_at))
-            elif search.sort == ProductSort.CREATED_DESC:
-                query = query.order_by(desc(Product.created_at))
-            else:  # Default to created_desc
-                query = query.order_by(desc(Product.created_at))
-            
             # Get total count
             count_result = await db.execute(count_query)
             total = count_result.scalar()
             
-            # Apply pagination
-            offset = (search.page - 1) * search.per_page
-            query = query.offset(offset).limit(search.per_page)
-            
-            # Execute query
-            result = await db.execute(query)
-            products = result.scalars().all()
+            # Apply sorting and pagination; a cursor seeks instead of skipping rows
+            offset = 0 if search.cursor else (search.page - 1) * search.per_page
+            products, next_cursor = await paginate(
+                db, query, _product_sort_keys(search.sort), search.per_page, search.cursor, offset
+            )
             
-            return list(products), total
+            return products, total, next_cursor
             
         except Exception as e:
             logger.error(f"Failed to search products: {e}")
@@ -11,6 +11,9 @@ from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 import uuid
 
+from app.core.metrics import MetricsRegistry, registry
+from app.core import query_stats
+
 # Configure JSON logging as specified
 logging.basicConfig(
     format='%(message)s',  # Pure JSON, no extra formatting
@@ -19,6 +22,17 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Request metrics, labelled by route template (not raw path) to bound cardinality
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled"
+)
+
 # ==========================================
 # 5) Observability handshakes
 # Request-ID header propagated across services; logged in JSON
@@ -37,32 +51,53 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
         
         # Start timing
         start_time = time.time()
+        timer_start = time.perf_counter()
+        HTTP_REQUESTS_IN_PROGRESS.inc()
         
         # Log request start
         self._log_request_start(request, request_id)
         
+        # Charge database statements to this request; outer middleware reads it from state
+        db_stats, db_token = query_stats.begin_request(request_id)
+        request.state.query_stats = db_stats
+        
         # Process request
         try:
             response = await call_next(request)
+            query_stats.end_request(db_token)
             process_time = time.time() - start_time
+            self._record_request_metrics(request, response.status_code, timer_start)
             
             # Add request ID to response headers for client tracking
             response.headers['X-Request-ID'] = request_id
             response.headers['X-Process-Time'] = f"{process_time:.4f}"
             
             # Log successful request
-            self._log_request_success(request, response, request_id, process_time)
+            self._log_request_success(request, response, request_id, process_time, db_stats)
             
             return response
             
         except Exception as e:
+            query_stats.end_request(db_token)
             process_time = time.time() - start_time
+            self._record_request_metrics(request, 500, timer_start)
             
             # Log error with structured format
-            self._log_request_error(request, e, request_id, process_time)
+            self._log_request_error(request, e, request_id, process_time, db_stats)
             
             # Re-raise for FastAPI error handlers
             raise e
+        
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+    
+    def _record_request_metrics(self, request: Request, status_code: int, timer_start: float):
+        """Record latency and status against the matched route template"""
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", None) or "unmatched"
+        elapsed = time.perf_counter() - timer_start
+        HTTP_REQUEST_DURATION.labels(request.method, route_path).observe(elapsed)
+        HTTP_REQUESTS.labels(request.method, route_path, str(status_code)).inc()
     
     def _log_request_start(self, request: Request, request_id: str):
         """Log request start with structured JSON"""
@@ -86,7 +121,8 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
         
         logger.info(json.dumps(log_data))
     
-    def _log_request_success(self, request: Request, response: Response, request_id: str, process_time: float):
+    def _log_request_success(self, request: Request, response: Response, request_id: str, process_time: float,
+                             db_stats: query_stats.QueryStats):
         """Log successful request completion"""
         log_data = {
             "timestamp": datetime.utcnow().isoformat(),
@@ -98,11 +134,14 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
             "status_code": response.status_code,
             "process_time_seconds": round(process_time, 4),
             "response_size": response.headers.get("content-length"),
+            "db_queries": db_stats.count,
+            "db_time_ms": round(db_stats.total_ms, 2),
         }
         
         logger.info(json.dumps(log_data))
     
-    def _log_request_error(self, request: Request, error: Exception, request_id: str, process_time: float):
+    def _log_request_error(self, request: Request, error: Exception, request_id: str, process_time: float,
+                           db_stats: query_stats.QueryStats):
         """Log request errors with structured format"""
         log_data = {
             "timestamp": datetime.utcnow().isoformat(),
@@ -114,6 +153,8 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
             "error_type": type(error).__name__,
             "error_message": str(error),
             "process_time_seconds": round(process_time, 4),
+            "db_queries": db_stats.count,
+            "db_time_ms": round(db_stats.total_ms, 2),
         }
         
         logger.error(json.dumps(log_data))
@@ -233,30 +274,41 @@ class MetricsCollector:
     cave.job_accept_time_seconds  
     cave.material_variance_g (logged vs estimated)
     store.webhook_retry_total
+
+    Thin compatibility layer over ``app.core.metrics.registry``. Hot paths
+    should declare their metric once and keep the bound child from
+    ``labels(...)``; these helpers resolve the child on every call.
     """
     
-    def __init__(self):
-        self.metrics = {}
+    def __init__(self, metrics_registry: MetricsRegistry = registry):
+        self.registry = metrics_registry
+    
+    @staticmethod
+    def _labelnames(labels: Optional[Dict[str, str]]):
+        return tuple(sorted(labels)) if labels else ()
     
-    def increment_counter(self, name: str, labels: Optional[Dict[str, str]] = None):
+    @staticmethod
+    def _child(metric, labels: Optional[Dict[str, str]]):
+        return metric.labels(**(labels or {}))
+    
+    def increment_counter(self, name: str, labels: Optional[Dict[str, str]] = None, amount: float = 1.0):
         """Increment counter metric"""
-        key = f"{name}:{json.dumps(labels or {}, sort_keys=True)}"
-        self.metrics[key] = self.metrics.get(key, 0) + 1
+        counter = self.registry.counter(name, labelnames=self._labelnames(labels))
+        self._child(counter, labels).inc(amount)
     
     def record_gauge(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
         """Record gauge value"""
-        key = f"{name}:{json.dumps(labels or {}, sort_keys=True)}"
-        self.metrics[key] = value
+        gauge = self.registry.gauge(name, labelnames=self._labelnames(labels))
+        self._child(gauge, labels).set(value)
     
-    def record_histogram(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+    def record_histogram(self, name: str, value: float, labels: Optional[Dict[str, str]] = None, buckets=None):
         """Record histogram value (timing, sizes, etc.)"""
-        # In production, this would update histogram buckets
-        # For now, just track average
-        key = f"{name}_avg:{json.dumps(labels or {}, sort_keys=True)}"
-        current = self.metrics.get(key, {"sum": 0, "count": 0})
-        current["sum"] += value
-        current["count"] += 1
-        self.metrics[key] = current
+        kwargs = {"buckets": buckets} if buckets else {}
+        histogram = self.registry.histogram(name, labelnames=self._labelnames(labels), **kwargs)
+        self._child(histogram, labels).observe(value)
+    
+    def render_prometheus(self) -> str:
+        return self.registry.render_prometheus()
     
     def log_metric(self, name: str, value: Any, metric_type: str = "counter", labels: Optional[Dict[str, str]] = None):
         """Log metric in structured format"""
@@ -306,14 +358,25 @@ def track_webhook_retry(provider: str, event_type: str, attempt: int, success: b
         }
     )
 
+# Service orders take hours to days, not milliseconds
+SERVICE_ORDER_DURATION = registry.histogram(
+    "store_service_order_duration_seconds",
+    "Time from service order creation to completion",
+    buckets=(3600, 4 * 3600, 12 * 3600, 86400, 2 * 86400, 3 * 86400, 7 * 86400, 14 * 86400)
+)
+
 def track_service_order_sla(order_id: str, created_at: datetime, completed_at: datetime, request_id: str):
     """Track service order completion time"""
     duration_seconds = (completed_at - created_at).total_seconds()
     
-    metrics.record_histogram(
-        "store_service_order_duration_seconds",
+    # Order id stays out of the labels: one series per order would grow without bound
+    SERVICE_ORDER_DURATION.observe(duration_seconds)
+    
+    metrics.log_metric(
+        "store.service_order_duration_seconds",
         duration_seconds,
-        {"order_id": order_id}
+        "histogram",
+        {"order_id": order_id, "request_id": request_id}
     )
 
 # ==========================================
@@ -363,7 +426,7 @@ def get_service_health() -> Dict[str, Any]:
         "timestamp": datetime.utcnow().isoformat(),
         "service": "makrx_store",
         "version": "1.0.0",
-        "request_count": len(metrics.metrics),
+        "request_count": int(HTTP_REQUESTS.total()),
         "uptime_seconds": time.time() - start_time
     }
 
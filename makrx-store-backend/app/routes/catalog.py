@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import logging
 
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.core.security import get_current_user, AuthUser
 from app.schemas import (
     Product, ProductCreate, ProductUpdate, ProductList, ProductSearch, ProductFilter,
@@ -16,7 +16,7 @@ from app.schemas import (
 )
 from app.crud.products import product_crud
 from app.crud.categories import category_crud
-from app.utils.pagination import paginate_query
+from app.utils.pagination import InvalidCursor
 
 logger = logging.getLogger(__name__)
 
@@ -92,6 +92,7 @@ async def get_products(
     sort: str = Query("created_desc", description="Sort order"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides page"),
     db: AsyncSession = Depends(get_db)
 ):
     """Get products with filtering, searching, and pagination"""
@@ -113,19 +114,23 @@ async def get_products(
             filters=filters,
             sort=sort,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            cursor=cursor
         )
         
-        products, total = await product_crud.search_products(db, search)
+        products, total, next_cursor = await product_crud.search_products(db, search)
         
         return ProductList(
             products=products,
             total=total,
             page=page,
             per_page=per_page,
-            pages=(total + per_page - 1) // per_page
+            pages=(total + per_page - 1) // per_page,
+            next_cursor=next_cursor
         )
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to search products: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve products")
@@ -157,6 +162,7 @@ async def get_products_by_category(
     category_id: int = Path(..., description="Category ID"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides page"),
     sort: str = Query("created_desc", description="Sort order"),
     db: AsyncSession = Depends(get_db)
 ):
@@ -172,21 +178,25 @@ async def get_products_by_category(
             filters=ProductFilter(category_id=category_id),
             sort=sort,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            cursor=cursor
         )
         
-        products, total = await product_crud.search_products(db, search)
+        products, total, next_cursor = await product_crud.search_products(db, search)
         
         return ProductList(
             products=products,
             total=total,
             page=page,
             per_page=per_page,
-            pages=(total + per_page - 1) // per_page
+            pages=(total + per_page - 1) // per_page,
+            next_cursor=next_cursor
         )
         
     except HTTPException:
         raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get products by category: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve products")
@@ -274,7 +284,7 @@ async def get_popular_products(
     category_id: Optional[int] = Query(None, description="Filter by category"),
     limit: int = Query(10, ge=1, le=50, description="Number of products"),
     days: int = Query(30, ge=1, le=365, description="Time period in days"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get popular products based on order data"""
     try:
@@ -292,7 +302,7 @@ async def get_popular_products(
 @router.get("/categories/{category_id}/stats")
 async def get_category_stats(
     category_id: int = Path(..., description="Category ID"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get category statistics"""
     try:
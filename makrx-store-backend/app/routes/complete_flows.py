@@ -11,6 +11,7 @@ import httpx
 import json
 
 from app.core.db import get_db
+from app.core.idempotency import IdempotencyInProgress
 from app.core.unified_auth import get_current_user, get_idempotency_key, idempotency
 from app.middleware.observability import audit, metrics, track_quote_to_order_conversion
 from app.models.commerce import Order, Product
@@ -357,90 +358,92 @@ async def create_service_order_from_quote(
     Implements: Quote → Payment → Service Order → Cave Job Pipeline
     """
     try:
-        # Check for duplicate requests
-        if idempotency_key:
-            cached_result = await idempotency.get_cached_result(
-                idempotency_key, "create_service_order"
+        async def create_order() -> Dict[str, Any]:
+            # Validate quote
+            quote = db.query(Quote).filter(
+                Quote.id == request.quote_id,
+                Quote.user_id == current_user["keycloak_id"]
+            ).first()
+        
+            if not quote:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Quote not found"
+                )
+        
+            if quote.expires_at < datetime.utcnow():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Quote has expired"
+                )
+        
+            # Get upload info for Cave routing
+            upload = db.query(Upload).filter(Upload.id == quote.upload_id).first()
+            if not upload:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Associated upload not found"
+                )
+        
+            # Create service order
+            service_order = ServiceOrder(
+                user_id=current_user["keycloak_id"],
+                quote_id=quote.id,
+                upload_id=upload.id,
+                status="pending_payment",
+                total_price=quote.price,
+                currency=quote.currency,
+                estimated_delivery=datetime.utcnow() + timedelta(days=7),
+                shipping_address=request.shipping_address,
+                delivery_mode=request.delivery_mode,
+                special_instructions=request.special_instructions,
+                created_at=datetime.utcnow()
             )
-            if cached_result:
-                return cached_result
-        
-        # Validate quote
-        quote = db.query(Quote).filter(
-            Quote.id == request.quote_id,
-            Quote.user_id == current_user["keycloak_id"]
-        ).first()
         
-        if not quote:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Quote not found"
-            )
-        
-        if quote.expires_at < datetime.utcnow():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Quote has expired"
-            )
-        
-        # Get upload info for Cave routing
-        upload = db.query(Upload).filter(Upload.id == quote.upload_id).first()
-        if not upload:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Associated upload not found"
-            )
-        
-        # Create service order
-        service_order = ServiceOrder(
-            user_id=current_user["keycloak_id"],
-            quote_id=quote.id,
-            upload_id=upload.id,
-            status="pending_payment",
-            total_price=quote.price,
-            currency=quote.currency,
-            estimated_delivery=datetime.utcnow() + timedelta(days=7),
-            shipping_address=request.shipping_address,
-            delivery_mode=request.delivery_mode,
-            special_instructions=request.special_instructions,
-            created_at=datetime.utcnow()
-        )
-        
-        db.add(service_order)
-        db.commit()
-        db.refresh(service_order)
+            db.add(service_order)
+            db.commit()
+            db.refresh(service_order)
+        
+            # Prepare for payment
+            payment_metadata = {
+                "service_order_id": service_order.id,
+                "quote_id": quote.id,
+                "upload_file_key": upload.file_key,
+                "material": quote.material,
+                "quality": quote.quality,
+                "estimated_time_minutes": quote.estimated_time_minutes,
+                "user_id": current_user["keycloak_id"]
+            }
         
-        # Prepare for payment
-        payment_metadata = {
-            "service_order_id": service_order.id,
-            "quote_id": quote.id,
-            "upload_file_key": upload.file_key,
-            "material": quote.material,
-            "quality": quote.quality,
-            "estimated_time_minutes": quote.estimated_time_minutes,
-            "user_id": current_user["keycloak_id"]
-        }
+            result = {
+                "service_order_id": service_order.id,
+                "status": "pending_payment",
+                "payment_amount": quote.price,
+                "currency": quote.currency,
+                "payment_metadata": payment_metadata,
+                "next_step": "complete_payment"
+            }
         
-        result = {
-            "service_order_id": service_order.id,
-            "status": "pending_payment",
-            "payment_amount": quote.price,
-            "currency": quote.currency,
-            "payment_metadata": payment_metadata,
-            "next_step": "complete_payment"
-        }
+            # Track quote conversion
+            track_quote_to_order_conversion(request.quote_id, True, "unknown")
         
-        # Cache result for idempotency
+            return result
+
+        # Duplicate requests replay the first result; concurrent ones wait for it.
+        # Keys are per user, so one client's key can never replay another's order.
         if idempotency_key:
-            await idempotency.record_operation(
-                idempotency_key, "create_service_order", result
+            return await idempotency.run_once(
+                f"{current_user['keycloak_id']}:{idempotency_key}",
+                "create_service_order",
+                create_order
             )
+        return await create_order()
         
-        # Track quote conversion
-        track_quote_to_order_conversion(request.quote_id, True, "unknown")
-        
-        return result
-        
+    except IdempotencyInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
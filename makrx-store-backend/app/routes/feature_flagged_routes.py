@@ -18,6 +18,7 @@ from app.core.feature_flags import (
     feature_not_available_response,
     store_feature_required,
     admin_feature_required,
+    flag_engine,
     FlagContext
 )
 from app.schemas.admin import MessageResponse
@@ -334,9 +335,12 @@ async def get_flag_status(request: Request):
         "store.reviews.enabled"
     ]
     
-    flag_status = {}
-    for flag_key in flags_to_check:
-        flag_status[flag_key] = check_flag(flag_key, context)
+    # Only the frontend allow-list is exposed; undefined keys report False
+    results = flag_engine.evaluate_all(context, flags_to_check)
+    flag_status = {
+        flag_key: result["enabled"] and bool(result["value"])
+        for flag_key, result in results.items()
+    }
     
     return {
         "flags": flag_status,
@@ -9,7 +9,7 @@ import logging
 
 from app.schemas import HealthCheck, ServiceHealth
 from app.core.config import settings
-from app.core.db import check_database
+from app.core.db import check_database, replica_engine, replica_health, replica_is_usable
 from app.core.storage import check_storage_health
 from app.core.payments import check_payment_health
 
@@ -52,6 +52,16 @@ async def detailed_health_check():
         ).dict()
         overall_status = "unhealthy"
     
+    # Check read replica; reads fall back to primary, so it never degrades overall status
+    if replica_engine is not None:
+        replica_usable = await replica_is_usable()
+        services["database_replica"] = ServiceHealth(
+            name="PostgreSQL replica",
+            status="healthy" if replica_usable else "unhealthy",
+            last_check=datetime.utcnow(),
+            details=replica_health.status()
+        ).dict()
+
     # Check storage
     try:
         storage_healthy = await check_storage_health()
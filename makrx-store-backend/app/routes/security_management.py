@@ -6,7 +6,8 @@ Provides administrative access to security features:
 - Audit trail access
 - Compliance reporting
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from fastapi.responses import PlainTextResponse
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import json
@@ -22,6 +23,8 @@ from app.core.security_monitoring import (
     security_logger, security_monitor, performance_monitor, audit_trail
 )
 from app.core.operational_security import secrets_manager, mfa_manager, access_control
+from app.core.query_stats import query_insights
+from app.core.profiler import PROFILER_MAX_SECONDS, ProfilerBusy, profiler
 from app.core.payment_security import payment_processor
 from app.schemas.admin import MessageResponse
 
@@ -202,6 +205,98 @@ async def get_slo_report(
             detail=f"Failed to generate SLO report: {str(e)}"
         )
 
+@router.get("/monitoring/slow-queries", response_model=Dict[str, Any])
+async def get_slow_queries(
+    current_user: SecurityContext = Depends(require_admin)
+):
+    """Recent slow statements with EXPLAIN plans, and N+1 patterns, newest first"""
+    insights = query_insights.snapshot()
+    
+    await security_logger.log_admin_action(
+        admin_user_id=current_user.user_id,
+        action="slow_queries_accessed",
+        resource="monitoring",
+        success=True
+    )
+    
+    return insights
+
+@router.delete("/monitoring/slow-queries", response_model=MessageResponse)
+async def clear_slow_queries(
+    current_user: SecurityContext = Depends(require_admin)
+):
+    """Empty the slow-query and N+1 buffers, e.g. after shipping a fix"""
+    query_insights.clear()
+    
+    await security_logger.log_admin_action(
+        admin_user_id=current_user.user_id,
+        action="slow_queries_cleared",
+        resource="monitoring",
+        success=True
+    )
+    
+    return MessageResponse(message="Slow-query log cleared")
+
+@router.get("/monitoring/profiler", response_model=Dict[str, Any])
+async def get_profiler_status(
+    current_user: SecurityContext = Depends(require_admin)
+):
+    """Current profiling session, sample counts and measured overhead"""
+    return profiler.status()
+
+@router.post("/monitoring/profiler/start", response_model=Dict[str, Any])
+async def start_profiler(
+    mode: str = Query("wall", regex="^(wall|cpu)$", description="wall: every sample; cpu: skip idle waits"),
+    duration_seconds: float = Query(60, gt=0, le=PROFILER_MAX_SECONDS),
+    current_user: SecurityContext = Depends(require_admin)
+):
+    """Start a sampling session; it stops on its own after duration_seconds"""
+    try:
+        status_report = profiler.start(mode=mode, duration_seconds=duration_seconds)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    
+    await security_logger.log_admin_action(
+        admin_user_id=current_user.user_id,
+        action="profiler_started",
+        resource="monitoring",
+        success=True,
+        details={"mode": mode, "duration_seconds": duration_seconds}
+    )
+    
+    return status_report
+
+@router.post("/monitoring/profiler/stop", response_model=Dict[str, Any])
+async def stop_profiler(
+    current_user: SecurityContext = Depends(require_admin)
+):
+    """Stop the running session early; its samples stay available for export"""
+    status_report = profiler.stop()
+    
+    await security_logger.log_admin_action(
+        admin_user_id=current_user.user_id,
+        action="profiler_stopped",
+        resource="monitoring",
+        success=True
+    )
+    
+    return status_report
+
+@router.get("/monitoring/profiler/collapsed", response_class=PlainTextResponse)
+async def export_profile(
+    source: str = Query("session", regex="^(session|requests)$"),
+    clear: bool = Query(False, description="Reset the request profile after export"),
+    current_user: SecurityContext = Depends(require_admin)
+):
+    """Collapsed stacks for flamegraph.pl or speedscope"""
+    collapsed = profiler.collapsed(source)
+    if clear and source == "requests":
+        profiler.clear_requests()
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": f"attachment; filename=makrx-store-{source}.collapsed"}
+    )
+
 @router.get("/monitoring/security-events", response_model=Dict[str, Any])
 async def get_security_events(
     start_date: Optional[str] = None,
@@ -150,6 +150,7 @@ class ProductList(BaseModel):
     page: int
     per_page: int
     pages: int
+    next_cursor: Optional[str] = None
 
 # Cart schemas
 class CartItemBase(BaseModel):
@@ -342,6 +343,7 @@ class ProductSearch(BaseModel):
     sort: ProductSort = ProductSort.CREATED_DESC
     page: int = Field(1, ge=1)
     per_page: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = None  # next_cursor of the previous page; overrides page
 
 # Update forward references
 Category.update_forward_refs()
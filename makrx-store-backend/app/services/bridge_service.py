@@ -3,15 +3,24 @@ import os
 import asyncio
 import aiohttp
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from enum import Enum
 from pydantic import BaseModel, Field
 import logging
 from app.services.notification_service import notification_service, NotificationRequest, NotificationType, NotificationCategory
+from app.services.provider_index import PROVIDER_SEARCH_RADIUS_KM, ProviderIndex, proximity_score
 
 logger = logging.getLogger(__name__)
 
+PROVIDER_CACHE_TTL_SECONDS = float(os.getenv("PROVIDER_CACHE_TTL_SECONDS", "900"))
+# Past the TTL, cached providers are still served while a refresh runs
+PROVIDER_CACHE_STALE_SECONDS = float(os.getenv("PROVIDER_CACHE_STALE_SECONDS", "86400"))
+# A cold lookup waits at most this long for MakrCave before using fallbacks
+PROVIDER_COLD_FETCH_TIMEOUT = float(os.getenv("PROVIDER_COLD_FETCH_TIMEOUT", "2"))
+BRIDGE_HTTP_POOL_SIZE = int(os.getenv("BRIDGE_HTTP_POOL_SIZE", "20"))
+
 # Bridge models
 class ServiceType(str, Enum):
     PRINTING_3D = "3d_printing"
@@ -67,6 +76,13 @@ class BridgeResponse(BaseModel):
     search_criteria: Dict[str, Any]
     alternatives: List[str] = []  # Alternative suggestions
 
+class _ProviderCacheEntry:
+    __slots__ = ("providers", "fetched_at")
+
+    def __init__(self, providers: List[Provider], fetched_at: float):
+        self.providers = providers
+        self.fetched_at = fetched_at
+
 class BridgeService:
     """Service to bridge Store orders with MakrCave providers"""
     
@@ -75,9 +91,13 @@ class BridgeService:
         self.api_key = os.getenv("BRIDGE_API_KEY", "")
         self.timeout = 30  # seconds
         
-        # Provider cache
-        self._provider_cache = {}
-        self._cache_expiry = None
+        # Long-lived pooled HTTP client, created on first use
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Provider cache: one entry per service type, refreshed in the background
+        self._provider_cache: Dict[str, _ProviderCacheEntry] = {}
+        self._refreshes: Dict[str, asyncio.Task] = {}
+        self._provider_indexes: Dict[str, ProviderIndex] = {}
         
         # Service type mapping
         self.service_mapping = {
@@ -112,15 +132,13 @@ class BridgeService:
                     alternatives=["No providers available for this service type"]
                 )
             
-            # Score and match providers
-            matches = []
-            for provider in providers:
-                match = await self._evaluate_provider_match(provider, service_request)
-                if match and match.compatibility_score > 50:  # Minimum threshold
-                    matches.append(match)
-            
-            # Sort by compatibility score
-            matches.sort(key=lambda x: x.compatibility_score, reverse=True)
+            # Prune by capability and radius, then score the survivors in one pass
+            scored = self._score_candidates(self._get_index(service_request.service_type, providers), service_request)
+            scored.sort(key=lambda x: x[0], reverse=True)
+            matches = [
+                await self._build_match(provider, capability, service_request, score)
+                for score, provider, capability in scored[:10]  # Top 10 matches
+            ]
             
             # Generate alternatives if no good matches
             alternatives = []
@@ -128,8 +146,8 @@ class BridgeService:
                 alternatives = await self._generate_alternatives(service_request)
             
             return BridgeResponse(
-                matches=matches[:10],  # Top 10 matches
-                total_matches=len(matches),
+                matches=matches,
+                total_matches=len(scored),
                 search_criteria=service_request.dict(),
                 alternatives=alternatives
             )
@@ -138,46 +156,92 @@ class BridgeService:
             logger.error(f"Provider search failed: {e}")
             raise
     
-    async def _get_providers(self, service_type: ServiceType) -> List[Provider]:
-        """Get providers from MakrCave API with caching"""
-        try:
-            # Check cache
-            if (self._cache_expiry and 
-                datetime.now() < self._cache_expiry and 
-                service_type in self._provider_cache):
-                return self._provider_cache[service_type]
-            
-            # Fetch from MakrCave API
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
-                headers = {
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared session so MakrCave calls reuse pooled keep-alive connections"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=BRIDGE_HTTP_POOL_SIZE, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json"
                 }
-                
-                async with session.get(
-                    f"{self.makrcave_api_base}/api/v1/providers",
-                    headers=headers,
-                    params={"service_type": service_type, "active_only": True}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        providers = [Provider(**provider) for provider in data.get("providers", [])]
-                        
-                        # Cache results
-                        self._provider_cache[service_type] = providers
-                        self._cache_expiry = datetime.now() + timedelta(minutes=15)
-                        
-                        return providers
-                    else:
-                        logger.warning(f"Failed to fetch providers: {response.status}")
-                        return []
-                        
+            )
+        return self._session
+    
+    async def close(self):
+        """Cancel background refreshes and close the HTTP session"""
+        for task in list(self._refreshes.values()):
+            task.cancel()
+        self._refreshes.clear()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def warm_cache(self, service_types: Optional[List[ServiceType]] = None):
+        """Prefetch providers (e.g. at startup) so lookups never start cold"""
+        await asyncio.gather(
+            *(self._refresh(service_type) for service_type in (service_types or list(ServiceType))),
+            return_exceptions=True
+        )
+    
+    async def _get_providers(self, service_type: ServiceType) -> List[Provider]:
+        """
+        Get providers from MakrCave API with stale-while-revalidate caching.
+        Fresh entries are returned directly, stale ones are returned while a
+        background refresh runs, and concurrent cold misses share one fetch.
+        """
+        entry = self._provider_cache.get(service_type)
+        now = time.monotonic()
+        if entry is not None:
+            age = now - entry.fetched_at
+            if age < PROVIDER_CACHE_TTL_SECONDS:
+                return entry.providers
+            if age < PROVIDER_CACHE_TTL_SECONDS + PROVIDER_CACHE_STALE_SECONDS:
+                self._refresh(service_type)
+                return entry.providers
+        
+        # Cold miss: wait (briefly) for the single in-flight fetch
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(self._refresh(service_type)), timeout=PROVIDER_COLD_FETCH_TIMEOUT
+            )
         except asyncio.TimeoutError:
             logger.warning("Provider API timeout - using fallback")
-            return await self._get_fallback_providers(service_type)
         except Exception as e:
             logger.error(f"Provider fetch error: {e}")
-            return await self._get_fallback_providers(service_type)
+        if entry is not None:
+            return entry.providers
+        return await self._get_fallback_providers(service_type)
+    
+    def _refresh(self, service_type: ServiceType) -> asyncio.Task:
+        """Start a fetch for ``service_type`` unless one is already running"""
+        task = self._refreshes.get(service_type)
+        if task is None or task.done():
+            task = asyncio.create_task(self._fetch_providers(service_type))
+            task.add_done_callback(lambda t: self._refresh_done(service_type, t))
+            self._refreshes[service_type] = task
+        return task
+    
+    def _refresh_done(self, service_type: ServiceType, task: asyncio.Task):
+        if self._refreshes.get(service_type) is task:
+            del self._refreshes[service_type]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Provider refresh for {service_type} failed: {task.exception()}")
+    
+    async def _fetch_providers(self, service_type: ServiceType) -> List[Provider]:
+        """Fetch from MakrCave and update the cache entry"""
+        async with self._get_session().get(
+            f"{self.makrcave_api_base}/api/v1/providers",
+            params={"service_type": str(service_type.value), "active_only": "true"}
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to fetch providers: {response.status}")
+            data = await response.json()
+        
+        providers = [Provider(**provider) for provider in data.get("providers", [])]
+        self._provider_cache[service_type] = _ProviderCacheEntry(providers, time.monotonic())
+        return providers
     
     async def _get_fallback_providers(self, service_type: ServiceType) -> List[Provider]:
         """Get fallback/mock providers when API is unavailable"""
@@ -240,47 +304,60 @@ class BridgeService:
         return [p for p in mock_providers 
                 if any(cap.service_type == service_type for cap in p.capabilities)]
     
-    async def _evaluate_provider_match(self, provider: Provider, request: ServiceRequest) -> Optional[ProviderMatch]:
-        """Evaluate how well a provider matches the request"""
-        try:
-            # Find matching capabilities
-            matching_capabilities = [
-                cap for cap in provider.capabilities 
-                if cap.service_type == request.service_type
-            ]
-            
-            if not matching_capabilities:
-                return None
-            
+    def _get_index(self, service_type: ServiceType, providers: List[Provider]) -> ProviderIndex:
+        """Index for the current provider list, rebuilt only when the list changes"""
+        index = self._provider_indexes.get(service_type)
+        if index is None or index.source is not providers:
+            index = ProviderIndex(providers)
+            self._provider_indexes[service_type] = index
+        return index
+    
+    def _score_candidates(self, index: ProviderIndex, request: ServiceRequest) -> List[tuple]:
+        """(score, provider, best capability) for candidates above the threshold"""
+        dimensions = request.file_analysis.get("dimensions") or {}
+        part_dims = None
+        if dimensions:
+            part_dims = (
+                dimensions.get("length_mm", 0),
+                dimensions.get("width_mm", 0),
+                dimensions.get("height_mm", 0),
+            )
+        radius_km = request.delivery_requirements.get("max_distance_km") or PROVIDER_SEARCH_RADIUS_KM
+        candidates = index.candidates(
+            request.service_type,
+            material=request.requirements.get("material"),
+            dimensions=part_dims,
+            location=request.customer_location,
+            radius_km=radius_km,
+        )
+        
+        scored = []
+        for candidate in candidates:
             # Use best matching capability
-            capability = max(matching_capabilities, key=lambda x: self._score_capability(x, request))
-            
-            # Calculate compatibility score
-            score = await self._calculate_compatibility_score(provider, capability, request)
-            
-            if score < 50:  # Minimum threshold
-                return None
-            
-            # Estimate cost and delivery
-            estimated_cost = await self._estimate_cost(capability, request)
-            estimated_delivery = await self._estimate_delivery_time(provider, capability, request)
-            
-            # Generate reasons and constraints
-            reasons = self._generate_match_reasons(provider, capability, request, score)
-            constraints = self._identify_constraints(capability, request)
-            
-            return ProviderMatch(
-                provider=provider,
-                compatibility_score=score,
-                estimated_cost=estimated_cost,
-                estimated_delivery=estimated_delivery,
-                reasons=reasons,
-                constraints=constraints
+            capability_score, capability = max(
+                ((self._score_capability(cap, request), cap) for cap in candidate.capabilities),
+                key=lambda x: x[0]
             )
-            
-        except Exception as e:
-            logger.error(f"Provider evaluation failed: {e}")
-            return None
+            # Capability 40%, reputation/experience/success 50% (precomputed), proximity 10%
+            score = capability_score * 0.4 + index.base_scores[candidate.slot]
+            if request.customer_location:
+                score += proximity_score(candidate.distance_km) * 0.1
+            score = min(100, score)
+            if score > 50:  # Minimum threshold
+                scored.append((score, candidate.provider, capability))
+        return scored
+    
+    async def _build_match(self, provider: Provider, capability: ProviderCapability,
+                           request: ServiceRequest, score: float) -> ProviderMatch:
+        """Cost, delivery and explanations for a provider that made the cut"""
+        return ProviderMatch(
+            provider=provider,
+            compatibility_score=score,
+            estimated_cost=await self._estimate_cost(capability, request),
+            estimated_delivery=await self._estimate_delivery_time(provider, capability, request),
+            reasons=self._generate_match_reasons(provider, capability, request, score),
+            constraints=self._identify_constraints(capability, request)
+        )
     
     def _score_capability(self, capability: ProviderCapability, request: ServiceRequest) -> float:
         """Score a capability against request requirements"""
@@ -325,65 +402,6 @@ class BridgeService:
         
         return score
     
-    async def _calculate_compatibility_score(self, provider: Provider, capability: ProviderCapability, request: ServiceRequest) -> float:
-        """Calculate overall compatibility score"""
-        score = 0.0
-        
-        # Base capability score
-        capability_score = self._score_capability(capability, request)
-        score += capability_score * 0.4  # 40% weight
-        
-        # Provider reputation
-        reputation_score = (provider.rating / 5.0) * 100
-        score += reputation_score * 0.2  # 20% weight
-        
-        # Experience score
-        experience_score = min(100, provider.total_orders / 10)  # 1 point per 10 orders, max 100
-        score += experience_score * 0.15  # 15% weight
-        
-        # Success rate
-        success_score = provider.success_rate * 100
-        score += success_score * 0.15  # 15% weight
-        
-        # Location proximity (if customer location provided)
-        if request.customer_location:
-            proximity_score = await self._calculate_proximity_score(provider, request.customer_location)
-            score += proximity_score * 0.1  # 10% weight
-        
-        return min(100, score)
-    
-    async def _calculate_proximity_score(self, provider: Provider, customer_location: Dict[str, Any]) -> float:
-        """Calculate proximity score based on distance"""
-        try:
-            # Get coordinates
-            provider_coords = provider.location.get("coordinates", {})
-            customer_coords = customer_location.get("coordinates", {})
-            
-            if not (provider_coords and customer_coords):
-                return 50  # Neutral score if coordinates missing
-            
-            # Calculate approximate distance (simplified)
-            lat_diff = abs(provider_coords["lat"] - customer_coords["lat"])
-            lng_diff = abs(provider_coords["lng"] - customer_coords["lng"])
-            
-            # Rough distance calculation (not accurate, but good enough for scoring)
-            distance_km = ((lat_diff ** 2 + lng_diff ** 2) ** 0.5) * 111  # 111 km per degree
-            
-            # Score based on distance (closer = higher score)
-            if distance_km < 10:
-                return 100
-            elif distance_km < 50:
-                return 80
-            elif distance_km < 200:
-                return 60
-            elif distance_km < 500:
-                return 40
-            else:
-                return 20
-                
-        except Exception:
-            return 50  # Neutral score on error
-    
     async def _estimate_cost(self, capability: ProviderCapability, request: ServiceRequest) -> float:
         """Estimate cost based on capability and request"""
         try:
@@ -559,35 +577,28 @@ class BridgeService:
     async def create_service_order(self, provider_id: str, quote_data: Dict[str, Any], customer_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a service order with selected provider"""
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                order_data = {
-                    "provider_id": provider_id,
-                    "quote_data": quote_data,
-                    "customer_data": customer_data,
-                    "created_via": "store_bridge",
-                    "priority": quote_data.get("urgency", "normal")
-                }
-                
-                async with session.post(
-                    f"{self.makrcave_api_base}/api/v1/service-orders",
-                    headers=headers,
-                    json=order_data
-                ) as response:
-                    if response.status == 201:
-                        order = await response.json()
-                        
-                        # Send notifications
-                        await self._notify_order_created(order, customer_data)
-                        
-                        return order
-                    else:
-                        error = await response.text()
-                        raise Exception(f"Service order creation failed: {error}")
+            order_data = {
+                "provider_id": provider_id,
+                "quote_data": quote_data,
+                "customer_data": customer_data,
+                "created_via": "store_bridge",
+                "priority": quote_data.get("urgency", "normal")
+            }
+            
+            async with self._get_session().post(
+                f"{self.makrcave_api_base}/api/v1/service-orders",
+                json=order_data
+            ) as response:
+                if response.status == 201:
+                    order = await response.json()
+                    
+                    # Send notifications
+                    await self._notify_order_created(order, customer_data)
+                    
+                    return order
+                else:
+                    error = await response.text()
+                    raise Exception(f"Service order creation failed: {error}")
                         
         except Exception as e:
             logger.error(f"Service order creation failed: {e}")
@@ -637,20 +648,13 @@ class BridgeService:
     async def get_order_status(self, order_id: str) -> Dict[str, Any]:
         """Get status of a service order"""
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                async with session.get(
-                    f"{self.makrcave_api_base}/api/v1/service-orders/{order_id}",
-                    headers=headers
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        raise Exception(f"Order not found: {order_id}")
+            async with self._get_session().get(
+                f"{self.makrcave_api_base}/api/v1/service-orders/{order_id}"
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                else:
+                    raise Exception(f"Order not found: {order_id}")
                         
         except Exception as e:
             logger.error(f"Order status check failed: {e}")
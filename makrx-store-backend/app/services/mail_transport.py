@@ -0,0 +1,306 @@
+"""Pooled mail transports for NotificationService
+
+smtplib and boto3 both block, so every send runs on a small dedicated thread
+pool instead of the event loop. The SMTP transport keeps a bounded pool of
+authenticated connections. Each worker takes one connection and sends a
+whole batch of messages over it, with no reconnect, STARTTLS or login per
+message. Both transports share an async token bucket, so a bulk run never
+exceeds the relay's (or SES's) send rate.
+"""
+
+import abc
+import asyncio
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.message import Message
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_BATCH_SIZE = int(os.getenv("SMTP_BATCH_SIZE", "50"))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(
+    os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "500")
+)
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+MAIL_RATE_PER_SECOND = float(os.getenv("MAIL_RATE_PER_SECOND", "20"))
+SES_MAX_CONCURRENCY = int(os.getenv("SES_MAX_CONCURRENCY", "8"))
+SES_MAX_SEND_RATE = float(os.getenv("SES_MAX_SEND_RATE", "14"))
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """True when the session is unusable (SMTPException subclasses OSError too)"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421  # Service closing transmission channel
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+@dataclass
+class MailResult:
+    """Outcome of one message; ``error`` is None on success"""
+
+    message_id: Optional[str] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AsyncRateLimiter:
+    """Token bucket shared by all senders on one event loop"""
+
+    def __init__(self, rate_per_second: float, burst: Optional[float] = None):
+        self.rate = rate_per_second
+        self.capacity = burst if burst is not None else max(1.0, rate_per_second)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                # A batch larger than the bucket may go once the bucket is full
+                needed = min(tokens, self.capacity)
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((needed - self._tokens) / self.rate)
+
+
+class _PooledConnection:
+    __slots__ = ("smtp", "last_used", "sent")
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.sent = 0
+
+
+class SMTPConnectionPool:
+    """Bounded pool of logged-in SMTP connections (thread-safe)"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = True,
+        max_connections: int = SMTP_POOL_SIZE,
+        max_messages_per_connection: int = SMTP_MAX_MESSAGES_PER_CONNECTION,
+        idle_timeout: float = SMTP_IDLE_TIMEOUT,
+        timeout: float = SMTP_TIMEOUT,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_connections = max_connections
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def _connect(self) -> _PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        smtp.ehlo()
+        if self.use_tls:
+            smtp.starttls()
+            smtp.ehlo()
+        if self.username:
+            smtp.login(self.username, self.password)
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    def _close(conn: _PooledConnection) -> None:
+        try:
+            conn.smtp.quit()
+        except Exception:
+            try:
+                conn.smtp.close()
+            except Exception:
+                pass
+
+    def _acquire(self) -> _PooledConnection:
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                if time.monotonic() - conn.last_used <= self.idle_timeout:
+                    return conn
+                # Relays drop idle sessions; don't find out mid-batch
+                self._close(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn: Optional[_PooledConnection]) -> None:
+        try:
+            if conn is not None:
+                if conn.sent < self.max_messages_per_connection:
+                    conn.last_used = time.monotonic()
+                    self._idle.put(conn)
+                else:
+                    self._close(conn)
+        finally:
+            self._slots.release()
+
+    def send_batch(self, messages: List[Message]) -> List[MailResult]:
+        """Send ``messages`` over one pooled connection (blocking)"""
+        results: List[MailResult] = []
+        try:
+            conn: Optional[_PooledConnection] = self._acquire()
+        except Exception as e:
+            # Relay unreachable: fail this batch without failing the caller
+            logger.warning(f"SMTP connection to {self.host}:{self.port} failed: {e}")
+            return [MailResult(error=e) for _ in messages]
+        try:
+            for msg in messages:
+                try:
+                    if conn is None:
+                        conn = self._connect()
+                    try:
+                        conn.smtp.send_message(msg)
+                    except Exception as e:
+                        if not _is_connection_error(e):
+                            raise
+                        # Stale or dropped session: reconnect once and retry
+                        self._close(conn)
+                        conn = None
+                        conn = self._connect()
+                        conn.smtp.send_message(msg)
+                    conn.sent += 1
+                    if conn.sent >= self.max_messages_per_connection:
+                        self._close(conn)
+                        conn = None
+                    results.append(MailResult(message_id=msg.get("Message-ID")))
+                except Exception as e:
+                    if conn is not None and _is_connection_error(e):
+                        self._close(conn)
+                        conn = None
+                    # Otherwise (refused recipient/sender) the session is still usable
+                    results.append(MailResult(error=e))
+        finally:
+            self._release(conn)
+        return results
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+class MailTransport(abc.ABC):
+    """Async facade: ``send`` one message or ``send_many`` in order"""
+
+    async def send(self, msg: Message) -> MailResult:
+        return (await self.send_many([msg]))[0]
+
+    @abc.abstractmethod
+    async def send_many(self, messages: List[Message]) -> List[MailResult]:
+        """One result per message, in the same order"""
+
+    def close(self) -> None:
+        pass
+
+
+class SMTPTransport(MailTransport):
+    """Batches messages across a pool of persistent SMTP connections"""
+
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        batch_size: int = SMTP_BATCH_SIZE,
+    ):
+        self.pool = pool
+        self.rate_limiter = rate_limiter or AsyncRateLimiter(MAIL_RATE_PER_SECOND)
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool.max_connections, thread_name_prefix="smtp"
+        )
+
+    async def _send_batch(self, batch: List[Message]) -> List[MailResult]:
+        await self.rate_limiter.acquire(len(batch))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.pool.send_batch, batch)
+
+    async def send_many(self, messages: List[Message]) -> List[MailResult]:
+        batches = [
+            messages[i : i + self.batch_size]
+            for i in range(0, len(messages), self.batch_size)
+        ]
+        # At most pool.max_connections batches run at once (executor size)
+        batch_results = await asyncio.gather(
+            *(self._send_batch(batch) for batch in batches)
+        )
+        return [result for results in batch_results for result in results]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.pool.close()
+
+
+class SESTransport(MailTransport):
+    """Raw SES sends on a bounded thread pool, paced to the account send rate.
+
+    Messages are already rendered MIME (possibly with attachments), which
+    ``send_bulk_templated_email`` cannot carry, so bulk runs fan out
+    ``send_raw_email`` calls instead of using SES-side templates.
+    """
+
+    def __init__(
+        self,
+        client,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        max_concurrency: int = SES_MAX_CONCURRENCY,
+    ):
+        if client is None:
+            raise ValueError("SESTransport needs a boto3 SES client")
+        self.client = client
+        self.rate_limiter = rate_limiter or AsyncRateLimiter(SES_MAX_SEND_RATE)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="ses"
+        )
+
+    def _send_raw(self, msg: Message) -> MailResult:
+        try:
+            response = self.client.send_raw_email(RawMessage={"Data": msg.as_string()})
+            return MailResult(message_id=response.get("MessageId"))
+        except Exception as e:
+            return MailResult(error=e)
+
+    async def _send_one(self, msg: Message) -> MailResult:
+        await self.rate_limiter.acquire()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._send_raw, msg)
+
+    async def send_many(self, messages: List[Message]) -> List[MailResult]:
+        return list(await asyncio.gather(*(self._send_one(msg) for msg in messages)))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,376 @@
+"""Durable notification delay queue and delivery status store
+
+Scheduled notifications are rows in a SQLite table indexed by
+``(status, due_at)``, so they survive restarts. One dispatcher task runs per
+process. It sleeps until the earliest due time, which the index serves
+directly, so a day with thousands of reminders still needs one timer, not
+one per message. New work that is due sooner wakes the dispatcher early.
+
+Delivery is at-least-once. A worker claims due rows with a lease, and a
+process that dies mid-send leaves its rows to be claimed again once the
+lease expires. Failed sends are retried with exponential backoff until
+``max_attempts`` is reached. The same table records the final status of
+immediate sends, so ``get_status`` covers every notification. Rows in a
+terminal status are pruned once they are older than the retention window.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_QUEUE_DB = os.getenv("NOTIFICATION_QUEUE_DB", "notification_queue.sqlite3")
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+NOTIFICATION_RETRY_BASE_SECONDS = float(
+    os.getenv("NOTIFICATION_RETRY_BASE_SECONDS", "30")
+)
+NOTIFICATION_RETRY_MAX_SECONDS = float(
+    os.getenv("NOTIFICATION_RETRY_MAX_SECONDS", "3600")
+)
+NOTIFICATION_LEASE_SECONDS = float(os.getenv("NOTIFICATION_LEASE_SECONDS", "300"))
+NOTIFICATION_DISPATCH_BATCH = int(os.getenv("NOTIFICATION_DISPATCH_BATCH", "200"))
+# Upper bound on a dispatcher sleep, so rows added by other processes are noticed
+NOTIFICATION_MAX_IDLE_SECONDS = float(os.getenv("NOTIFICATION_MAX_IDLE_SECONDS", "60"))
+# Delivered/failed/expired/skipped rows are kept this long for get_status
+NOTIFICATION_RETENTION_DAYS = float(os.getenv("NOTIFICATION_RETENTION_DAYS", "30"))
+NOTIFICATION_PRUNE_INTERVAL_SECONDS = float(
+    os.getenv("NOTIFICATION_PRUNE_INTERVAL_SECONDS", "3600")
+)
+
+TERMINAL_STATUSES = ("delivered", "failed", "expired", "skipped")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    notification_id TEXT PRIMARY KEY,
+    payload TEXT,
+    status TEXT NOT NULL,
+    due_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    delivered_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_notifications_status_due
+    ON notifications (status, due_at);
+"""
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff after ``attempts`` failed deliveries"""
+    return min(
+        NOTIFICATION_RETRY_MAX_SECONDS,
+        NOTIFICATION_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)),
+    )
+
+
+class NotificationQueueStore:
+    """SQLite-backed delay queue plus per-notification status (thread-safe)"""
+
+    def __init__(
+        self,
+        path: str = NOTIFICATION_QUEUE_DB,
+        max_attempts: int = NOTIFICATION_MAX_ATTEMPTS,
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def enqueue(self, notification_id: str, payload: str, due_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO notifications (notification_id, payload, "
+                "status, due_at, attempts, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, 'scheduled', ?, 0, ?, ?, ?)",
+                (notification_id, payload, due_at, self.max_attempts, now, now),
+            )
+
+    def record_status(self, entries: List[Dict[str, Any]]) -> None:
+        """Upsert final statuses of immediate sends (no payload is kept)"""
+        now = time.time()
+        rows = [
+            (
+                entry["notification_id"],
+                entry["status"],
+                entry.get("attempts", 1),
+                self.max_attempts,
+                entry.get("error"),
+                now,
+                now,
+                entry.get("delivered_at"),
+            )
+            for entry in entries
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO notifications (notification_id, status, attempts, "
+                "max_attempts, last_error, created_at, updated_at, delivered_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(notification_id) DO UPDATE SET "
+                "status = excluded.status, attempts = excluded.attempts, "
+                "last_error = excluded.last_error, updated_at = excluded.updated_at, "
+                "delivered_at = excluded.delivered_at",
+                rows,
+            )
+
+    def next_due_at(self) -> Optional[float]:
+        """Earliest time any pending or leased row becomes claimable"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(t) AS next_due FROM ("
+                " SELECT MIN(due_at) AS t FROM notifications"
+                " WHERE status IN ('scheduled', 'retrying')"
+                " UNION ALL"
+                " SELECT MIN(lease_until) AS t FROM notifications"
+                " WHERE status = 'processing'"
+                ")"
+            ).fetchone()
+        return row["next_due"] if row else None
+
+    def claim_due(
+        self,
+        now: Optional[float] = None,
+        limit: int = NOTIFICATION_DISPATCH_BATCH,
+        lease_seconds: float = NOTIFICATION_LEASE_SECONDS,
+    ) -> List[sqlite3.Row]:
+        """Lease up to ``limit`` due rows (including ones whose lease expired)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT * FROM notifications WHERE "
+                    "(status IN ('scheduled', 'retrying') AND due_at <= ?) "
+                    "OR (status = 'processing' AND lease_until <= ?) "
+                    "ORDER BY due_at LIMIT ?",
+                    (now, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE notifications SET status = 'processing', lease_until = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE notification_id = ?",
+                    [
+                        (now + lease_seconds, now, row["notification_id"])
+                        for row in rows
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def mark_delivered(self, notification_id: str) -> None:
+        """Settle a claimed row as delivered (no-op if it was settled otherwise)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE notifications SET status = 'delivered', delivered_at = ?, "
+                "lease_until = NULL, last_error = NULL, updated_at = ? "
+                "WHERE notification_id = ? AND status = 'processing'",
+                (now, now, notification_id),
+            )
+
+    def mark_failed(
+        self, notification_id: str, attempts: int, max_attempts: int, error: str
+    ) -> str:
+        """Schedule a retry with backoff, or give up; returns the new status"""
+        now = time.time()
+        status = "failed" if attempts >= max_attempts else "retrying"
+        due_at = None if status == "failed" else now + retry_delay(attempts)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE notifications SET status = ?, due_at = ?, lease_until = NULL, "
+                "last_error = ?, updated_at = ? WHERE notification_id = ?",
+                (status, due_at, error[:1000], now, notification_id),
+            )
+        return status
+
+    def mark_status(
+        self, notification_id: str, status: str, error: Optional[str] = None
+    ) -> None:
+        """Terminal status other than delivered/failed (skipped, expired)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE notifications SET status = ?, lease_until = NULL, "
+                "last_error = ?, updated_at = ? WHERE notification_id = ?",
+                (status, error, now, notification_id),
+            )
+
+    def get_status(self, notification_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT notification_id, status, due_at, attempts, last_error, "
+                "created_at, updated_at, delivered_at FROM notifications "
+                "WHERE notification_id = ?",
+                (notification_id,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def prune(self, older_than: float) -> int:
+        """Delete terminal rows last updated before ``older_than``; returns the count"""
+        placeholders = ", ".join("?" for _ in TERMINAL_STATUSES)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM notifications WHERE status IN ({placeholders}) "
+                "AND updated_at < ?",
+                (*TERMINAL_STATUSES, older_than),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass(frozen=True)
+class Settled:
+    """Deliver outcome for a row that ends without being sent (expired, skipped)"""
+
+    status: str
+    reason: Optional[str] = None
+
+
+DeliverFn = Callable[[str, str], Awaitable[Union[None, str, Settled]]]
+
+
+class NotificationDispatcher:
+    """Single-timer dispatcher draining the store as rows come due.
+
+    ``deliver(notification_id, payload)`` returns None on success, an error
+    message, or a ``Settled`` outcome for rows that should not be sent.
+    Exceptions count as failures.
+    """
+
+    def __init__(
+        self,
+        store: NotificationQueueStore,
+        deliver: DeliverFn,
+        concurrency: int = 20,
+        retention_seconds: float = NOTIFICATION_RETENTION_DAYS * 86400,
+    ):
+        self.store = store
+        self.deliver = deliver
+        self.concurrency = concurrency
+        self.retention_seconds = retention_seconds
+        self._wakeup: Optional[asyncio.Event] = None
+        self._next_wake: Optional[float] = None
+        self._next_prune = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self, due_at: float) -> None:
+        """Wake the dispatcher if ``due_at`` is earlier than its current timer"""
+        if self._wakeup is not None and (
+            self._next_wake is None or due_at < self._next_wake
+        ):
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.dispatch_due()
+                await self.prune_if_due()
+                next_due = await asyncio.to_thread(self.store.next_due_at)
+                now = time.time()
+                sleep_for = NOTIFICATION_MAX_IDLE_SECONDS
+                if next_due is not None:
+                    sleep_for = min(sleep_for, max(0.0, next_due - now))
+                self._next_wake = now + sleep_for
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_for)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification dispatcher error: {e}")
+                await asyncio.sleep(5)
+
+    async def prune_if_due(self) -> int:
+        """Drop settled rows past retention, at most once per prune interval"""
+        now = time.time()
+        if now < self._next_prune:
+            return 0
+        self._next_prune = now + NOTIFICATION_PRUNE_INTERVAL_SECONDS
+        removed = await asyncio.to_thread(
+            self.store.prune, now - self.retention_seconds
+        )
+        if removed:
+            logger.info(f"Pruned {removed} settled notifications past retention")
+        return removed
+
+    async def dispatch_due(self) -> int:
+        """Deliver everything currently due; returns the number of rows handled"""
+        handled = 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while True:
+            rows = await asyncio.to_thread(self.store.claim_due)
+            if not rows:
+                return handled
+
+            async def run(row) -> None:
+                async with semaphore:
+                    await self._deliver_row(row)
+
+            await asyncio.gather(*(run(row) for row in rows))
+            handled += len(rows)
+
+    async def _deliver_row(self, row) -> None:
+        notification_id = row["notification_id"]
+        attempts = row["attempts"] + 1  # claim_due incremented the stored value
+        try:
+            error = await self.deliver(notification_id, row["payload"])
+        except Exception as e:
+            error = str(e)
+        if isinstance(error, Settled):
+            await asyncio.to_thread(
+                self.store.mark_status, notification_id, error.status, error.reason
+            )
+            return
+        if error is None:
+            await asyncio.to_thread(self.store.mark_delivered, notification_id)
+            return
+        status = await asyncio.to_thread(
+            self.store.mark_failed,
+            notification_id,
+            attempts,
+            row["max_attempts"],
+            error,
+        )
+        logger.warning(
+            f"Scheduled notification {notification_id} attempt {attempts} failed "
+            f"({status}): {error}"
+        )
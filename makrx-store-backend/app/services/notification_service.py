@@ -1,8 +1,8 @@
 """Comprehensive notification service for MakrX ecosystem"""
 import os
-import smtplib
 import json
 import asyncio
+import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union
 from enum import Enum
@@ -10,15 +10,24 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
+from email.utils import make_msgid
 import aiohttp
 import boto3
 from twilio.rest import Client as TwilioClient
 from pydantic import BaseModel, Field
 import logging
-from jinja2 import Template
+
+from app.services.mail_transport import (
+    MailResult, MailTransport, SMTPConnectionPool, SMTPTransport, SESTransport
+)
+from app.services.template_registry import NotificationTemplateRegistry
+from app.services.notification_queue import NotificationDispatcher, NotificationQueueStore, Settled
 
 logger = logging.getLogger(__name__)
 
+# Concurrent non-email sends during a bulk run (SMS, push, webhooks)
+BULK_CHANNEL_CONCURRENCY = int(os.getenv("BULK_CHANNEL_CONCURRENCY", "20"))
+
 # Notification models
 class NotificationType(str, Enum):
     EMAIL = "email"
@@ -127,13 +136,14 @@ class NotificationService:
         # Initialize clients
         self.twilio_client = self._init_twilio()
         self.ses_client = self._init_ses()
+        self.mail_transport = self._init_mail_transport()
         
-        # Template cache
+        # Compiled template registry (shared Jinja environment)
         self.templates = self._load_templates()
         
-        # Delivery tracking
-        self.delivery_queue = []
-        self.failed_notifications = []
+        # Durable delay queue and per-notification delivery status
+        self.queue_store = NotificationQueueStore()
+        self.dispatcher = NotificationDispatcher(self.queue_store, self._deliver_scheduled)
     
     def _load_email_config(self) -> EmailConfig:
         """Load email configuration"""
@@ -188,7 +198,22 @@ class NotificationService:
             logger.warning(f"SES initialization failed: {e}")
         return None
     
-    def _load_templates(self) -> Dict[str, str]:
+    def _init_mail_transport(self) -> MailTransport:
+        """Pick SES or pooled SMTP (EMAIL_TRANSPORT=auto|ses|smtp)"""
+        transport = os.getenv("EMAIL_TRANSPORT", "auto").lower()
+        if transport == "ses" and not self.ses_client:
+            logger.warning("EMAIL_TRANSPORT=ses but the SES client is unavailable; falling back to SMTP")
+        elif transport in ("ses", "auto") and self.ses_client:
+            return SESTransport(self.ses_client)
+        return SMTPTransport(SMTPConnectionPool(
+            host=self.email_config.smtp_host,
+            port=self.email_config.smtp_port,
+            username=self.email_config.username,
+            password=self.email_config.password,
+            use_tls=self.email_config.use_tls
+        ))
+    
+    def _load_templates(self) -> NotificationTemplateRegistry:
         """Load notification templates"""
         templates = {
             "order_confirmation": """
@@ -233,42 +258,58 @@ class NotificationService:
             """
         }
         
-        # Load custom templates from file system
-        template_dir = os.getenv("TEMPLATE_DIR", "templates/notifications")
-        if os.path.exists(template_dir):
-            for filename in os.listdir(template_dir):
-                if filename.endswith(".html"):
-                    template_name = filename[:-5]  # Remove .html
-                    with open(os.path.join(template_dir, filename), 'r') as f:
-                        templates[template_name] = f.read()
+        # Custom templates in TEMPLATE_DIR override these and hot-reload on change
+        return NotificationTemplateRegistry(templates)
+    
+    def _new_notification_id(self, request: NotificationRequest) -> str:
+        # Unique per send: the id keys the status store and scheduled retries
+        return f"notif_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}"
+    
+    async def _precheck(self, notification_id: str, request: NotificationRequest) -> Optional[NotificationResponse]:
+        """Preference, schedule and expiry checks; returns a response if not sending now"""
+        # Check user preferences
+        if not self._check_user_preferences(request):
+            return NotificationResponse(
+                notification_id=notification_id,
+                status="skipped",
+                message="Blocked by user preferences"
+            )
+        
+        # Schedule if needed
+        if request.scheduled_at and request.scheduled_at > datetime.now():
+            return await self._schedule_notification(notification_id, request)
         
-        return templates
+        # Check if expired
+        if request.expires_at and request.expires_at < datetime.now():
+            return NotificationResponse(
+                notification_id=notification_id,
+                status="expired",
+                message="Notification expired"
+            )
+        return None
     
     async def send_notification(self, request: NotificationRequest) -> NotificationResponse:
         """Send notification via specified channel"""
+        notification_id = self._new_notification_id(request)
+        try:
+            response = await self._precheck(notification_id, request)
+            if response is None:
+                response = await self._dispatch(notification_id, request)
+        except Exception as e:
+            logger.error(f"Notification failed: {e}")
+            response = NotificationResponse(
+                notification_id=notification_id,
+                status="failed",
+                message=str(e),
+                error_details=str(e)
+            )
+        if response.status != "scheduled":
+            await self._record_statuses([response])
+        return response
+    
+    async def _dispatch(self, notification_id: str, request: NotificationRequest) -> NotificationResponse:
+        """Route to the channel handler"""
         try:
-            notification_id = f"notif_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(request.recipient) % 10000:04d}"
-            
-            # Check user preferences
-            if not self._check_user_preferences(request):
-                return NotificationResponse(
-                    notification_id=notification_id,
-                    status="skipped",
-                    message="Blocked by user preferences"
-                )
-            
-            # Schedule if needed
-            if request.scheduled_at and request.scheduled_at > datetime.now():
-                return await self._schedule_notification(notification_id, request)
-            
-            # Check if expired
-            if request.expires_at and request.expires_at < datetime.now():
-                return NotificationResponse(
-                    notification_id=notification_id,
-                    status="expired",
-                    message="Notification expired"
-                )
-            
             # Route to appropriate handler
             if request.notification_type == NotificationType.EMAIL:
                 return await self._send_email(notification_id, request)
@@ -290,40 +331,43 @@ class NotificationService:
                 error_details=str(e)
             )
     
+    def _build_email_message(self, request: NotificationRequest, content: str) -> MIMEMultipart:
+        """Build the MIME message for an email notification"""
+        # Create message
+        msg = MIMEMultipart()
+        msg['From'] = f"{self.email_config.from_name} <{self.email_config.from_email}>"
+        msg['To'] = request.recipient
+        msg['Subject'] = request.subject
+        msg['Message-ID'] = make_msgid(domain=self.email_config.from_email.split("@")[-1])
+        
+        # Add content
+        html_part = MIMEText(content, 'html')
+        msg.attach(html_part)
+        
+        # Add attachments
+        for attachment_path in request.attachments:
+            if os.path.exists(attachment_path):
+                with open(attachment_path, 'rb') as f:
+                    part = MIMEBase('application', 'octet-stream')
+                    part.set_payload(f.read())
+                    encoders.encode_base64(part)
+                    part.add_header(
+                        'Content-Disposition',
+                        f'attachment; filename= {os.path.basename(attachment_path)}'
+                    )
+                    msg.attach(part)
+        return msg
+    
     async def _send_email(self, notification_id: str, request: NotificationRequest) -> NotificationResponse:
         """Send email notification"""
         try:
             # Render template if specified
             content = self._render_template(request)
+            msg = self._build_email_message(request, content)
             
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = f"{self.email_config.from_name} <{self.email_config.from_email}>"
-            msg['To'] = request.recipient
-            msg['Subject'] = request.subject
-            
-            # Add content
-            html_part = MIMEText(content, 'html')
-            msg.attach(html_part)
-            
-            # Add attachments
-            for attachment_path in request.attachments:
-                if os.path.exists(attachment_path):
-                    with open(attachment_path, 'rb') as f:
-                        part = MIMEBase('application', 'octet-stream')
-                        part.set_payload(f.read())
-                        encoders.encode_base64(part)
-                        part.add_header(
-                            'Content-Disposition',
-                            f'attachment; filename= {os.path.basename(attachment_path)}'
-                        )
-                        msg.attach(part)
-            
-            # Send via SMTP or SES
-            if self.ses_client:
-                return await self._send_via_ses(notification_id, msg, request)
-            else:
-                return await self._send_via_smtp(notification_id, msg, request)
+            # Send through the pooled SMTP or SES transport
+            result = await self.mail_transport.send(msg)
+            return self._email_response(notification_id, result)
                 
         except Exception as e:
             logger.error(f"Email sending failed: {e}")
@@ -334,47 +378,21 @@ class NotificationService:
                 error_details=str(e)
             )
     
-    async def _send_via_smtp(self, notification_id: str, msg: MIMEMultipart, request: NotificationRequest) -> NotificationResponse:
-        """Send email via SMTP"""
-        try:
-            server = smtplib.SMTP(self.email_config.smtp_host, self.email_config.smtp_port)
-            
-            if self.email_config.use_tls:
-                server.starttls()
-            
-            server.login(self.email_config.username, self.email_config.password)
-            server.send_message(msg)
-            server.quit()
-            
-            return NotificationResponse(
-                notification_id=notification_id,
-                status="sent",
-                message="Email sent successfully",
-                delivered_at=datetime.now()
-            )
-            
-        except Exception as e:
-            logger.error(f"SMTP sending failed: {e}")
-            raise
-    
-    async def _send_via_ses(self, notification_id: str, msg: MIMEMultipart, request: NotificationRequest) -> NotificationResponse:
-        """Send email via AWS SES"""
-        try:
-            response = self.ses_client.send_raw_email(
-                RawMessage={'Data': msg.as_string()}
-            )
-            
+    def _email_response(self, notification_id: str, result: MailResult) -> NotificationResponse:
+        if not result.ok:
+            logger.error(f"Email sending failed: {result.error}")
             return NotificationResponse(
                 notification_id=notification_id,
-                status="sent",
-                message="Email sent via SES",
-                delivered_at=datetime.now(),
-                metadata={"message_id": response['MessageId']}
+                status="failed",
+                message=f"Email failed: {str(result.error)}",
+                error_details=str(result.error)
             )
-            
-        except Exception as e:
-            logger.error(f"SES sending failed: {e}")
-            raise
+        return NotificationResponse(
+            notification_id=notification_id,
+            status="sent",
+            message="Email sent successfully",
+            delivered_at=datetime.now()
+        )
     
     async def _send_sms(self, notification_id: str, request: NotificationRequest) -> NotificationResponse:
         """Send SMS notification"""
@@ -500,16 +518,39 @@ class NotificationService:
                 error_details=str(e)
             )
     
+    def _resolve_template_name(self, request: NotificationRequest) -> Optional[str]:
+        """Explicit template first, then the category's default template"""
+        if request.template_name and request.template_name in self.templates:
+            return request.template_name
+        category = getattr(request.category, "value", request.category)
+        if category in self.templates:
+            return category
+        return None
+    
     def _render_template(self, request: NotificationRequest) -> str:
         """Render notification template"""
-        if request.template_name and request.template_name in self.templates:
-            template = Template(self.templates[request.template_name])
-            return template.render(**request.template_data)
-        elif request.category in self.templates:
-            template = Template(self.templates[request.category])
-            return template.render(**request.template_data)
-        else:
+        template_name = self._resolve_template_name(request)
+        if template_name is None:
             return request.message
+        return self.templates.render(template_name, request.template_data)
+    
+    def _render_templates(self, requests: List[NotificationRequest]) -> List[str]:
+        """Render many requests, one batch per distinct template"""
+        contents: List[Optional[str]] = [None] * len(requests)
+        groups: Dict[Optional[str], List[int]] = {}
+        for index, request in enumerate(requests):
+            groups.setdefault(self._resolve_template_name(request), []).append(index)
+        for template_name, indexes in groups.items():
+            if template_name is None:
+                for index in indexes:
+                    contents[index] = requests[index].message
+                continue
+            rendered = self.templates.render_many(
+                template_name, (requests[index].template_data for index in indexes)
+            )
+            for index, content in zip(indexes, rendered):
+                contents[index] = content
+        return contents
     
     def _check_user_preferences(self, request: NotificationRequest) -> bool:
         """Check if user allows this type of notification"""
@@ -544,12 +585,11 @@ class NotificationService:
     
     async def _schedule_notification(self, notification_id: str, request: NotificationRequest) -> NotificationResponse:
         """Schedule notification for later delivery"""
-        # In production, use a proper job queue like Celery or RQ
-        self.delivery_queue.append({
-            "notification_id": notification_id,
-            "request": request,
-            "scheduled_at": request.scheduled_at
-        })
+        due_at = request.scheduled_at.timestamp()
+        await asyncio.to_thread(
+            self.queue_store.enqueue, notification_id, request.model_dump_json(), due_at
+        )
+        self.dispatcher.notify(due_at)
         
         return NotificationResponse(
             notification_id=notification_id,
@@ -557,19 +597,134 @@ class NotificationService:
             message=f"Notification scheduled for {request.scheduled_at}"
         )
     
+    async def _deliver_scheduled(self, notification_id: str, payload: str) -> Union[None, str, Settled]:
+        """Dispatcher callback: send a due notification; returns an error, Settled or None"""
+        request = NotificationRequest.model_validate_json(payload)
+        request.scheduled_at = None
+        
+        if request.expires_at and request.expires_at < datetime.now():
+            return Settled("expired")
+        
+        response = await self._dispatch(notification_id, request)
+        if response.status == "sent":
+            return None
+        return response.error_details or response.message
+    
+    async def _record_statuses(self, responses: List[NotificationResponse]) -> None:
+        """Persist final statuses so get_delivery_status reflects real outcomes"""
+        entries = [
+            {
+                "notification_id": response.notification_id,
+                "status": "delivered" if response.status == "sent" else response.status,
+                "error": response.error_details,
+                "delivered_at": response.delivered_at.timestamp() if response.delivered_at else None,
+                "attempts": 1 if response.status in ("sent", "failed") else 0
+            }
+            for response in responses
+        ]
+        try:
+            await asyncio.to_thread(self.queue_store.record_status, entries)
+        except Exception as e:
+            logger.error(f"Failed to record notification status: {e}")
+    
+    def start_scheduler(self) -> None:
+        """Start draining scheduled notifications (call from the running event loop)"""
+        self.dispatcher.start()
+    
+    async def stop_scheduler(self) -> None:
+        await self.dispatcher.stop()
+    
     async def send_bulk_notifications(self, requests: List[NotificationRequest]) -> List[NotificationResponse]:
-        """Send multiple notifications efficiently"""
-        tasks = [self.send_notification(request) for request in requests]
-        return await asyncio.gather(*tasks, return_exceptions=True)
+        """Send multiple notifications efficiently.
+
+        Emails due now are rendered up front (one batch per template) and
+        handed to the mail transport in one call, which batches them over
+        pooled connections at a capped rate. Other channels run with bounded
+        concurrency. Responses are returned in request order.
+        """
+        responses: List[Optional[NotificationResponse]] = [None] * len(requests)
+        email_slots: List[int] = []
+        email_ids: List[str] = []
+        email_messages: List[MIMEMultipart] = []
+        other_slots: List[int] = []
+        due_slots: List[int] = []
+        due_ids: List[str] = []
+        
+        for index, request in enumerate(requests):
+            if request.notification_type != NotificationType.EMAIL:
+                other_slots.append(index)
+                continue
+            notification_id = self._new_notification_id(request)
+            early_response = await self._precheck(notification_id, request)
+            if early_response is not None:
+                responses[index] = early_response
+                continue
+            due_slots.append(index)
+            due_ids.append(notification_id)
+        
+        # Each distinct template is looked up once and rendered for its whole group
+        due_requests = [requests[index] for index in due_slots]
+        try:
+            contents: List[Optional[str]] = self._render_templates(due_requests)
+        except Exception:
+            contents = [None] * len(due_requests)
+        
+        for index, notification_id, request, content in zip(due_slots, due_ids, due_requests, contents):
+            try:
+                if content is None:
+                    content = self._render_template(request)
+                email_messages.append(self._build_email_message(request, content))
+                email_slots.append(index)
+                email_ids.append(notification_id)
+            except Exception as e:
+                logger.error(f"Email preparation failed: {e}")
+                responses[index] = NotificationResponse(
+                    notification_id=notification_id,
+                    status="failed",
+                    message=f"Email failed: {str(e)}",
+                    error_details=str(e)
+                )
+        
+        semaphore = asyncio.Semaphore(BULK_CHANNEL_CONCURRENCY)
+        
+        async def send_limited(request: NotificationRequest) -> NotificationResponse:
+            async with semaphore:
+                return await self.send_notification(request)
+        
+        email_results, other_responses = await asyncio.gather(
+            self.mail_transport.send_many(email_messages),
+            asyncio.gather(*(send_limited(requests[index]) for index in other_slots))
+        )
+        for index, notification_id, result in zip(email_slots, email_ids, email_results):
+            responses[index] = self._email_response(notification_id, result)
+        for index, response in zip(other_slots, other_responses):
+            responses[index] = response
+        
+        # Non-email sends recorded their own status in send_notification
+        other_set = set(other_slots)
+        await self._record_statuses([
+            response for index, response in enumerate(responses)
+            if index not in other_set and response.status != "scheduled"
+        ])
+        return responses
     
     def get_delivery_status(self, notification_id: str) -> Dict[str, Any]:
         """Get delivery status of a notification"""
-        # In production, query from database
+        record = self.queue_store.get_status(notification_id)
+        if record is None:
+            return {"notification_id": notification_id, "status": "unknown"}
+        
+        def iso(timestamp: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+        
         return {
             "notification_id": notification_id,
-            "status": "delivered",
-            "delivered_at": datetime.now().isoformat(),
-            "delivery_attempts": 1
+            "status": record["status"],
+            "scheduled_for": iso(record["due_at"]),
+            "delivered_at": iso(record["delivered_at"]),
+            "delivery_attempts": record["attempts"],
+            "last_error": record["last_error"],
+            "updated_at": iso(record["updated_at"])
         }
 
 # Global notification service instance
@@ -0,0 +1,239 @@
+"""Spatial and capability index over MakrCave providers
+
+Providers are bucketed into a fixed lat/lng grid (equivalent to a fixed-
+precision geohash), so a radius query only computes great-circle distances
+for providers in the cells that overlap the search circle. Capabilities are
+indexed by service type and by (service type, material). Each list is sorted
+by build volume, so capabilities too small for the part are cut off with a
+bisect before any per-capability checks run.
+
+The index is immutable. It is built once per provider fetch and shared by
+every search until the provider list is refreshed.
+"""
+
+import math
+import os
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+PROVIDER_GRID_CELL_DEGREES = float(os.getenv("PROVIDER_GRID_CELL_DEGREES", "0.5"))
+# Default search radius when the request does not give one; 0 means unlimited
+PROVIDER_SEARCH_RADIUS_KM = float(os.getenv("PROVIDER_SEARCH_RADIUS_KM", "0"))
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.2
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def proximity_score(distance_km: Optional[float]) -> float:
+    """Tiered proximity score; neutral when either location is unknown"""
+    if distance_km is None:
+        return 50
+    if distance_km < 10:
+        return 100
+    elif distance_km < 50:
+        return 80
+    elif distance_km < 200:
+        return 60
+    elif distance_km < 500:
+        return 40
+    return 20
+
+
+def _coordinates(location: Optional[Dict[str, Any]]) -> Optional[Tuple[float, float]]:
+    coords = (location or {}).get("coordinates") or {}
+    try:
+        return float(coords["lat"]), float(coords["lng"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class IndexedCapability:
+    """One provider capability with its targeting data precomputed"""
+
+    __slots__ = ("slot", "capability", "materials", "max_dims", "max_volume")
+
+    def __init__(self, slot: int, capability):
+        self.slot = slot
+        self.capability = capability
+        self.materials = frozenset(m.upper() for m in capability.materials)
+        self.max_dims = (
+            capability.max_dimensions.get("length", math.inf),
+            capability.max_dimensions.get("width", math.inf),
+            capability.max_dimensions.get("height", math.inf),
+        )
+        self.max_volume = self.max_dims[0] * self.max_dims[1] * self.max_dims[2]
+
+    def fits(self, dims: Tuple[float, float, float]) -> bool:
+        return (
+            dims[0] <= self.max_dims[0]
+            and dims[1] <= self.max_dims[1]
+            and dims[2] <= self.max_dims[2]
+        )
+
+
+class _CapabilityList:
+    """Capabilities sorted by build volume for bisect pruning"""
+
+    __slots__ = ("entries", "volumes")
+
+    def __init__(self, entries: List[IndexedCapability]):
+        self.entries = sorted(entries, key=lambda entry: entry.max_volume)
+        self.volumes = [entry.max_volume for entry in self.entries]
+
+    def at_least(self, volume: float) -> List[IndexedCapability]:
+        return self.entries[bisect_left(self.volumes, volume) :]
+
+
+class Candidate:
+    """A provider that passed pruning, with its usable capabilities"""
+
+    __slots__ = ("slot", "provider", "capabilities", "distance_km")
+
+    def __init__(self, slot: int, provider, distance_km: Optional[float]):
+        self.slot = slot
+        self.provider = provider
+        self.capabilities: List[Any] = []
+        self.distance_km = distance_km
+
+
+class ProviderIndex:
+    """Grid + inverted capability index over one provider list"""
+
+    def __init__(
+        self, providers: List[Any], cell_degrees: float = PROVIDER_GRID_CELL_DEGREES
+    ):
+        self.source = providers
+        self.providers = [p for p in providers if p.is_active]
+        self.cell_degrees = cell_degrees
+        self.coordinates: List[Optional[Tuple[float, float]]] = []
+        # Reputation, experience and success-rate parts of the compatibility score
+        self.base_scores: List[float] = []
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+
+        by_service: Dict[str, List[IndexedCapability]] = {}
+        by_material: Dict[Tuple[str, str], List[IndexedCapability]] = {}
+        for slot, provider in enumerate(self.providers):
+            coords = _coordinates(provider.location)
+            self.coordinates.append(coords)
+            if coords is not None:
+                self._cells.setdefault(self._cell(*coords), []).append(slot)
+            self.base_scores.append(
+                (provider.rating / 5.0) * 100 * 0.2
+                + min(100, provider.total_orders / 10) * 0.15
+                + provider.success_rate * 100 * 0.15
+            )
+            for capability in provider.capabilities:
+                entry = IndexedCapability(slot, capability)
+                service = str(
+                    getattr(capability.service_type, "value", capability.service_type)
+                )
+                by_service.setdefault(service, []).append(entry)
+                for material in entry.materials:
+                    by_material.setdefault((service, material), []).append(entry)
+
+        self._by_service = {
+            key: _CapabilityList(entries) for key, entries in by_service.items()
+        }
+        self._by_material = {
+            key: _CapabilityList(entries) for key, entries in by_material.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.providers)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        row = int(math.floor(lat / self.cell_degrees))
+        column = int(math.floor(lng / self.cell_degrees))
+        return row, column
+
+    def within_radius(
+        self, lat: float, lng: float, radius_km: float
+    ) -> Dict[int, float]:
+        """Provider slots within ``radius_km`` of a point, mapped to their distance"""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        cos_lat = math.cos(math.radians(min(89.0, abs(lat) + dlat)))
+        dlng = min(180.0, radius_km / (KM_PER_DEGREE_LAT * cos_lat))
+
+        lat_lo, lng_lo = self._cell(lat - dlat, lng - dlng)
+        lat_hi, lng_hi = self._cell(lat + dlat, lng + dlng)
+        lng_cells = int(round(360 / self.cell_degrees))
+        half = lng_cells // 2
+        # Cell columns wrap across the antimeridian
+        columns = {
+            (column + half) % lng_cells - half for column in range(lng_lo, lng_hi + 1)
+        }
+
+        found: Dict[int, float] = {}
+        for cell_lat in range(lat_lo, lat_hi + 1):
+            for cell_lng in columns:
+                for slot in self._cells.get((cell_lat, cell_lng), ()):
+                    p_lat, p_lng = self.coordinates[slot]
+                    distance = haversine_km(lat, lng, p_lat, p_lng)
+                    if distance <= radius_km:
+                        found[slot] = distance
+        return found
+
+    def candidates(
+        self,
+        service_type: Any,
+        material: Optional[str] = None,
+        dimensions: Optional[Tuple[float, float, float]] = None,
+        location: Optional[Dict[str, Any]] = None,
+        radius_km: Optional[float] = None,
+    ) -> List[Candidate]:
+        """Providers offering ``service_type`` (and ``material``) that fit the
+        part and, when a radius is given, lie within it of ``location``"""
+        service = str(getattr(service_type, "value", service_type))
+        if material:
+            capability_list = self._by_material.get((service, material.upper()))
+        else:
+            capability_list = self._by_service.get(service)
+        if capability_list is None:
+            return []
+
+        if dimensions:
+            entries = [
+                entry
+                for entry in capability_list.at_least(math.prod(dimensions))
+                if entry.fits(dimensions)
+            ]
+        else:
+            entries = capability_list.entries
+
+        origin = _coordinates(location)
+        in_radius: Optional[Dict[int, float]] = None
+        if radius_km and origin is not None:
+            in_radius = self.within_radius(origin[0], origin[1], radius_km)
+
+        by_slot: Dict[int, Candidate] = {}
+        for entry in entries:
+            candidate = by_slot.get(entry.slot)
+            if candidate is None:
+                if in_radius is not None:
+                    if entry.slot not in in_radius:
+                        continue
+                    distance = in_radius[entry.slot]
+                else:
+                    coords = self.coordinates[entry.slot]
+                    distance = (
+                        haversine_km(origin[0], origin[1], *coords)
+                        if origin and coords
+                        else None
+                    )
+                candidate = Candidate(entry.slot, self.providers[entry.slot], distance)
+                by_slot[entry.slot] = candidate
+            candidate.capabilities.append(entry.capability)
+        return list(by_slot.values())
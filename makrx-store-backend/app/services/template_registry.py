@@ -0,0 +1,112 @@
+"""Compiled notification template registry
+
+All notification templates share one Jinja ``Environment``, so each template
+is compiled once and then served from the environment's template cache.
+Compiled bytecode is also written to a ``FileSystemBytecodeCache``, so new
+worker processes skip the compile step as well. Templates from
+``TEMPLATE_DIR`` override the built-in ones of the same name. With
+``auto_reload`` on, an edited file is picked up on its next use, after one
+``stat`` per lookup.
+"""
+
+import os
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional
+
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, TemplateNotFound
+
+TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", "templates/notifications")
+TEMPLATE_BYTECODE_CACHE_DIR = os.getenv(
+    "TEMPLATE_BYTECODE_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "makrx_template_cache"),
+)
+TEMPLATE_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", "400"))
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "true").lower() == "true"
+
+
+class NotificationTemplateLoader(BaseLoader):
+    """Loads ``<name>.html`` from the template directory, else a built-in source"""
+
+    def __init__(self, template_dir: Optional[str], builtin_templates: Dict[str, str]):
+        self.template_dir = template_dir
+        self.builtin_templates = builtin_templates
+
+    def _path(self, name: str) -> Optional[str]:
+        if not self.template_dir:
+            return None
+        path = os.path.join(self.template_dir, f"{name}.html")
+        # Template names come from requests; never leave the template directory
+        if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.template_dir):
+            return None
+        return path
+
+    def get_source(self, environment: Environment, template: str):
+        path = self._path(template)
+        if path and os.path.isfile(path):
+            mtime = os.path.getmtime(path)
+            with open(path, "r", encoding="utf-8") as f:
+                source = f.read()
+
+            def uptodate() -> bool:
+                try:
+                    return os.path.getmtime(path) == mtime
+                except OSError:
+                    return False
+
+            return source, path, uptodate
+
+        if template in self.builtin_templates:
+            return self.builtin_templates[template], None, lambda: True
+        raise TemplateNotFound(template)
+
+    def list_templates(self) -> List[str]:
+        names = set(self.builtin_templates)
+        if self.template_dir and os.path.isdir(self.template_dir):
+            names.update(
+                f[:-5] for f in os.listdir(self.template_dir) if f.endswith(".html")
+            )
+        return sorted(names)
+
+
+class NotificationTemplateRegistry:
+    """Shared, cached Jinja environment for notification templates"""
+
+    def __init__(
+        self,
+        builtin_templates: Dict[str, str],
+        template_dir: Optional[str] = TEMPLATE_DIR,
+        bytecode_cache_dir: Optional[str] = TEMPLATE_BYTECODE_CACHE_DIR,
+        auto_reload: bool = TEMPLATE_AUTO_RELOAD,
+        cache_size: int = TEMPLATE_CACHE_SIZE,
+    ):
+        self.loader = NotificationTemplateLoader(template_dir, builtin_templates)
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+        self.environment = Environment(
+            loader=self.loader,
+            bytecode_cache=bytecode_cache,
+            auto_reload=auto_reload,
+            cache_size=cache_size,
+        )
+
+    def __contains__(self, name: Any) -> bool:
+        if not name:
+            return False
+        try:
+            self.environment.get_template(str(name))
+            return True
+        except TemplateNotFound:
+            return False
+
+    def list_templates(self) -> List[str]:
+        return self.loader.list_templates()
+
+    def render(self, name: str, context: Dict[str, Any]) -> str:
+        return self.environment.get_template(name).render(**context)
+
+    def render_many(self, name: str, contexts: Iterable[Dict[str, Any]]) -> List[str]:
+        """Render one template against many contexts (one lookup for the batch)"""
+        template = self.environment.get_template(name)
+        return [template.render(**context) for context in contexts]
@@ -0,0 +1,149 @@
+"""
+Keyset (cursor) pagination for async SQLAlchemy ``select()`` statements
+
+A page is the ``limit`` rows that come after the previous page's last row in
+a total ordering. The ordering is the requested sort plus a unique
+tiebreaker. That row's sort-key tuple is encoded into an opaque cursor, and
+the next page filters on ``(k1, k2, ...) > cursor``. The database seeks
+through the sort index instead of counting past skipped rows, so deep pages
+cost the same as the first one, and concurrent inserts neither skip nor
+repeat rows.
+
+Keys may be SQL expressions (e.g. the effective price
+``coalesce(sale_price, price)``) as long as a ``value`` function reads the
+same value off a loaded row. Nullable keys sort last in both directions.
+The cursor format matches MakrCave's ``utils.pagination``.
+"""
+import base64
+import enum
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, false, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or was issued for a different sort"""
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One column (or expression) of the keyset ordering"""
+    column: Any
+    descending: bool = False
+    nullable: bool = False
+    value: Optional[Callable[[Any], Any]] = None
+
+    def value_of(self, row: Any) -> Any:
+        return self.value(row) if self.value else getattr(row, self.column.key)
+
+    def order_by(self):
+        ordered = self.column.desc() if self.descending else self.column.asc()
+        return ordered.nulls_last() if self.nullable else ordered
+
+    def after(self, value: Any):
+        """Rows strictly after ``value`` in this key's order"""
+        if value is None:
+            return false()  # NULLs sort last; ties are broken by later keys
+        condition = self.column < value if self.descending else self.column > value
+        return or_(condition, self.column.is_(None)) if self.nullable else condition
+
+    def equals(self, value: Any):
+        return self.column.is_(None) if value is None else self.column == value
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"uuid": str(value)}
+    if isinstance(value, enum.Enum):
+        return value.name  # SQLAlchemy Enum columns bind member names
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        if "uuid" in value:
+            return uuid.UUID(value["uuid"])
+        raise InvalidCursor("Unknown cursor value")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: Optional[int] = None) -> List[Any]:
+    """Decode a cursor; ``size`` checks it matches the number of sort keys"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if not isinstance(values, list) or (size is not None and len(values) != size):
+        raise InvalidCursor("Cursor does not match the requested sort")
+    try:
+        return [_decode_value(v) for v in values]
+    except ValueError as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+
+def keyset_condition(keys: Sequence[SortKey], values: Sequence[Any]):
+    """``(k1, k2, ...) > values`` expanded for mixed directions and NULLs"""
+    clauses = []
+    for i, key in enumerate(keys):
+        prefix = [keys[j].equals(values[j]) for j in range(i)]
+        clauses.append(and_(*prefix, key.after(values[i])))
+    return or_(*clauses)
+
+
+def row_cursor(row: Any, keys: Sequence[SortKey]) -> str:
+    return encode_cursor([key.value_of(row) for key in keys])
+
+
+def apply_keyset(stmt, keys: Sequence[SortKey], cursor: Optional[str] = None):
+    """Order ``stmt`` by ``keys`` and seek past ``cursor``"""
+    if cursor:
+        stmt = stmt.where(keyset_condition(keys, decode_cursor(cursor, len(keys))))
+    return stmt.order_by(*(key.order_by() for key in keys))
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt,
+    keys: Sequence[SortKey],
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """Fetch one page of ORM rows; returns ``(rows, next_cursor)``.
+
+    The last key must be unique (normally the primary key). ``offset`` serves
+    legacy page-number requests and should only be used without a cursor.
+    """
+    stmt = apply_keyset(stmt, keys, cursor)
+    if offset:
+        stmt = stmt.offset(offset)
+    result = await db.execute(stmt.limit(limit + 1))
+    rows = list(result.scalars().all())
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, row_cursor(rows[-1], keys)
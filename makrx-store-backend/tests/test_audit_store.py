@@ -0,0 +1,71 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.core.audit_store import GENESIS_HASH, SQLiteAuditStore, chain_hash  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteAuditStore(str(tmp_path / "audit.sqlite3"))
+    yield store
+    store.close()
+
+
+def _record(audit_id, timestamp):
+    return {
+        "audit_id": audit_id,
+        "timestamp": timestamp,
+        "event_type": "admin_action",
+        "actor_id": "admin-1",
+        "success": True,
+        "checksum": f"checksum-{audit_id}",
+    }
+
+
+def test_append_chains_each_row_to_the_previous(store):
+    first_seq, first_hash = store.append(_record("a", "2026-01-01T10:00:00"))
+    second_seq, second_hash = store.append(_record("b", "2026-01-01T10:00:01"))
+
+    assert first_hash == chain_hash(GENESIS_HASH, "checksum-a")
+    assert second_hash == chain_hash(first_hash, "checksum-b")
+    assert store.previous_chain_hash(second_seq) == first_hash
+    assert store.previous_chain_hash(first_seq) is None
+
+
+def test_rows_cannot_be_updated(store):
+    store.append(_record("a", "2026-01-01T10:00:00"))
+    with pytest.raises(Exception, match="append-only"):
+        store._conn.execute("UPDATE audit_records SET actor_id = 'someone-else'")
+
+
+def test_seq_range_spans_rows_committed_out_of_timestamp_order(store):
+    store.append(_record("a", "2026-01-01T10:00:01"))
+    store.append(_record("b", "2026-01-01T10:00:05"))  # Outside the range below
+    store.append(_record("c", "2026-01-01T10:00:03"))  # Stamped before "b" committed
+
+    span = store.seq_range("2026-01-01T10:00:00", "2026-01-01T10:00:04")
+
+    assert span == (1, 3)
+    assert [row["audit_id"] for row in store.iter_seq_range(*span)] == ["a", "b", "c"]
+    assert store.seq_range("2027-01-01T00:00:00", "2027-12-31T00:00:00") is None
+
+
+def test_iter_seq_range_reads_in_batches(store):
+    for i in range(5):
+        store.append(_record(f"r{i}", f"2026-01-01T10:00:0{i}"))
+
+    rows = list(store.iter_seq_range(2, 5, batch_size=2))
+
+    assert [row["seq"] for row in rows] == [2, 3, 4, 5]
+
+
+def test_purge_keeps_the_newest_rows(store):
+    for i in range(3):
+        store.append(_record(f"r{i}", f"2026-01-0{i + 1}T00:00:00"))
+
+    assert store.purge_before("2026-01-02T12:00:00") == 2
+    assert store.get("r2") is not None
+    assert store.get("r0") is None
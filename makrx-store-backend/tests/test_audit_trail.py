@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.core.audit_store import SQLiteAuditStore  # noqa: E402
+from app.core.security_monitoring import AuditTrailManager  # noqa: E402
+
+
+@pytest.fixture
+def manager(tmp_path):
+    store = SQLiteAuditStore(str(tmp_path / "audit.sqlite3"))
+    yield AuditTrailManager(store)
+    store.close()
+
+
+def _append(manager, audit_id, timestamp):
+    record = {
+        "audit_id": audit_id,
+        "timestamp": timestamp,
+        "event_type": "admin_action",
+        "actor_id": "admin-1",
+        "resource": "orders",
+        "action": "refund",
+        "success": True,
+        "before_state": None,
+        "after_state": None,
+        "details": {},
+        "checksum": None,
+    }
+    record["checksum"] = manager._calculate_checksum(record)
+    manager.store.append(record)
+
+
+def test_created_records_verify(manager):
+    record = asyncio.run(
+        manager.create_audit_record("admin_action", "admin-1", "orders", "refund", True)
+    )
+    assert asyncio.run(manager.verify_audit_integrity(record["audit_id"])) is True
+
+
+def test_range_with_out_of_order_timestamps_is_not_reported_as_tampered(manager):
+    _append(manager, "a", "2026-01-01T10:00:01")
+    _append(manager, "b", "2026-01-01T10:00:05")
+    _append(manager, "c", "2026-01-01T10:00:03")
+
+    integrity = manager._verify_range("2026-01-01T10:00:00", "2026-01-01T10:00:04")
+
+    assert integrity == {"verified_records": 3, "first_invalid_audit_id": None}
+
+
+def test_range_reports_a_forged_row(manager):
+    _append(manager, "a", "2026-01-01T10:00:01")
+    _append(manager, "b", "2026-01-01T10:00:02")
+    manager.store._conn.execute("DROP TRIGGER audit_records_no_update")
+    manager.store._conn.execute(
+        "UPDATE audit_records SET record_json = REPLACE(record_json, 'refund', 'grant')"
+        " WHERE audit_id = 'b'"
+    )
+
+    integrity = manager._verify_range("2026-01-01T10:00:00", "2026-01-01T10:00:09")
+
+    assert integrity == {"verified_records": 1, "first_invalid_audit_id": "b"}
+
+
+def test_manager_opens_its_store_lazily():
+    manager = AuditTrailManager()
+    assert manager._store is None
@@ -0,0 +1,124 @@
+import os
+import sys
+import zlib
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.core.feature_flags import (  # noqa: E402
+    CompiledFlag,
+    FeatureFlagEngine,
+    FlagContext,
+    FlagDefinition,
+)
+
+CONTEXTS = [
+    FlagContext(),
+    FlagContext(user_id="u-1", roles=["user"], country="IN", pincode="560001"),
+    FlagContext(session_id="s-9", roles=["superadmin"], makerspace_id="ms-1"),
+]
+
+
+def _flag(key, flag_type="boolean", scope="global", rollout_state="on", **kwargs):
+    return FlagDefinition(
+        key=key,
+        flag_type=flag_type,
+        scope=scope,
+        default_value=kwargs.pop("default_value", False),
+        rollout_state=rollout_state,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize(
+    "definition",
+    [
+        _flag("global.on"),
+        _flag("global.off", rollout_state="off", default_value="fallback"),
+        _flag("role.off", scope="role", rollout_state="off", enabled_for_roles=["x"]),
+        _flag("global.config", flag_type="config", config_value={"limit": 3}),
+        _flag("global.config.default", flag_type="config", default_value="d"),
+        _flag("global.mystery", flag_type="mystery"),
+    ],
+    ids=lambda definition: definition.key,
+)
+def test_static_result_matches_full_evaluation(definition):
+    engine = FeatureFlagEngine()
+    compiled = CompiledFlag(definition)
+
+    assert compiled.static_result is not None
+    for context in CONTEXTS:
+        if definition.rollout_state == "off":
+            # Rollout off never reaches the evaluator; it short-circuits
+            assert compiled.static_result["enabled"] is False
+            assert compiled.static_result["value"] == definition.default_value
+        else:
+            assert compiled.static_result == engine._evaluate_compiled(
+                compiled, context
+            )
+
+
+@pytest.mark.parametrize(
+    "definition",
+    [
+        _flag("global.internal", rollout_state="internal"),
+        _flag("role.on", scope="role", enabled_for_roles=["superadmin"]),
+        _flag("global.pct", flag_type="percentage", percentage_rollout=50),
+    ],
+    ids=lambda definition: definition.key,
+)
+def test_context_dependent_flags_have_no_static_result(definition):
+    assert CompiledFlag(definition).static_result is None
+
+
+def test_bucket_is_stable_crc32_of_key_and_identifier():
+    compiled = CompiledFlag(_flag("store.pct", flag_type="percentage"))
+
+    for identifier in ("u-1", "u-2", "anonymous", "ü-unicode"):
+        expected = zlib.crc32(f"store.pct:{identifier}".encode()) % 100
+        assert compiled.bucket(identifier) == expected
+        assert 0 <= compiled.bucket(identifier) < 100
+
+
+def test_percentage_rollout_follows_the_bucket():
+    engine = FeatureFlagEngine()
+    engine.set_flag(_flag("store.pct", flag_type="percentage", percentage_rollout=30))
+    compiled = engine._compiled_flag("store.pct")
+
+    for user_id in (f"user-{i}" for i in range(50)):
+        result = engine.evaluate("store.pct", FlagContext(user_id=user_id))
+        assert result["enabled"] is (compiled.bucket(user_id) < 30)
+
+
+def test_evaluation_is_memoized_per_context():
+    engine = FeatureFlagEngine()
+    engine.set_flag(_flag("store.beta", rollout_state="internal"))
+    context = FlagContext(roles=["superadmin"])
+
+    first = engine.evaluate("store.beta", context)
+    first["enabled"] = False  # Callers get copies; the memo is untouched
+    engine.set_flag(_flag("store.beta", rollout_state="off"))
+
+    assert engine.evaluate("store.beta", context)["enabled"] is True
+    assert engine.evaluate("store.beta", FlagContext())["enabled"] is False
+
+
+def test_flags_swapped_in_directly_are_recompiled():
+    engine = FeatureFlagEngine()
+    engine.flags["store.upload.enabled"] = _flag(
+        "store.upload.enabled", rollout_state="off"
+    )
+
+    assert engine.evaluate("store.upload.enabled", FlagContext())["enabled"] is False
+
+
+def test_evaluate_all_respects_the_allow_list():
+    engine = FeatureFlagEngine()
+    allowed = ["store.catalog.enabled", "store.reviews.enabled"]
+
+    results = engine.evaluate_all(FlagContext(), allowed)
+
+    assert list(results) == allowed
+    assert results["store.catalog.enabled"]["enabled"] is True
+    assert results["store.reviews.enabled"]["reason"] == "flag_not_found"
+    assert set(engine.evaluate_all(FlagContext())) == set(engine.flags)
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.core.idempotency import (  # noqa: E402
+    ACQUIRED,
+    COMPLETED,
+    IN_PROGRESS,
+    IdempotencyStore,
+    MemoryIdempotencyStore,
+    RedisIdempotencyStore,
+)
+
+
+def _store(**kwargs):
+    options = {"ttl_seconds": 60, "lock_seconds": 5, "wait_seconds": 1}
+    options.update(kwargs)
+    return MemoryIdempotencyStore(**options)
+
+
+def test_base_store_is_abstract():
+    with pytest.raises(TypeError):
+        IdempotencyStore()
+
+
+def test_claim_complete_and_replay():
+    async def scenario():
+        store = _store()
+        claim = await store.claim("order-1")
+        assert claim.status == ACQUIRED
+        assert (await store.claim("order-1")).status == IN_PROGRESS
+
+        await store.complete("order-1", claim.token, {"order_id": 7})
+        replay = await store.claim("order-1")
+        assert replay.status == COMPLETED
+        assert replay.result == {"order_id": 7}
+        assert await store.get_result("order-1") == {"order_id": 7}
+
+    asyncio.run(scenario())
+
+
+def test_run_once_runs_concurrent_duplicates_once():
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"status": "created"}
+
+    async def scenario():
+        store = _store()
+        return await asyncio.gather(
+            *(store.run_once("webhook-1", operation) for _ in range(5))
+        )
+
+    assert asyncio.run(scenario()) == [{"status": "created"}] * 5
+    assert len(calls) == 1
+
+
+def test_failed_operation_releases_the_key():
+    async def fail():
+        raise RuntimeError("gateway timeout")
+
+    async def succeed():
+        return "ok"
+
+    async def scenario():
+        store = _store()
+        with pytest.raises(RuntimeError):
+            await store.run_once("payment-1", fail)
+        return await store.run_once("payment-1", succeed)
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+class _UnreachableRedis:
+    def register_script(self, script):
+        async def run(keys, args):
+            raise RedisConnectionError("connection refused")
+
+        return run
+
+    async def set(self, *args, **kwargs):
+        raise RedisConnectionError("connection refused")
+
+    async def get(self, *args, **kwargs):
+        raise RedisConnectionError("connection refused")
+
+
+def test_redis_outage_falls_back_to_the_local_store():
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        return {"order_id": 9}
+
+    async def scenario():
+        store = RedisIdempotencyStore(
+            _UnreachableRedis(), ttl_seconds=60, lock_seconds=5, wait_seconds=1
+        )
+        first = await store.run_once("order-9", operation)
+        second = await store.run_once("order-9", operation)
+        return first, second, await store.get_result("order-9")
+
+    assert asyncio.run(scenario()) == (
+        {"order_id": 9},
+        {"order_id": 9},
+        {"order_id": 9},
+    )
+    assert len(calls) == 1
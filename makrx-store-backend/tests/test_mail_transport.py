@@ -0,0 +1,48 @@
+import asyncio
+import os
+import socket
+import sys
+from email.message import EmailMessage
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.services.mail_transport import (  # noqa: E402
+    AsyncRateLimiter,
+    SMTPConnectionPool,
+    SMTPTransport,
+)
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _message(recipient: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["To"] = recipient
+    msg["Subject"] = "Order shipped"
+    msg.set_content("On its way")
+    return msg
+
+
+def test_unreachable_relay_fails_each_message_without_raising():
+    pool = SMTPConnectionPool("127.0.0.1", _closed_port(), use_tls=False, timeout=2)
+    transport = SMTPTransport(pool, rate_limiter=AsyncRateLimiter(0), batch_size=2)
+    messages = [_message(f"user{i}@example.com") for i in range(3)]
+    try:
+        results = asyncio.run(transport.send_many(messages))
+    finally:
+        transport.close()
+
+    assert len(results) == 3
+    assert all(not result.ok for result in results)
+    assert all(isinstance(result.error, OSError) for result in results)
+
+
+def test_failed_connect_returns_the_pool_slot():
+    pool = SMTPConnectionPool(
+        "127.0.0.1", _closed_port(), use_tls=False, max_connections=1, timeout=2
+    )
+    for _ in range(3):
+        assert not pool.send_batch([_message("a@example.com")])[0].ok
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.services.notification_queue import (  # noqa: E402
+    NotificationDispatcher,
+    NotificationQueueStore,
+    Settled,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = NotificationQueueStore(str(tmp_path / "queue.sqlite3"), max_attempts=3)
+    yield store
+    store.close()
+
+
+def _dispatch(store, deliver):
+    return asyncio.run(NotificationDispatcher(store, deliver).dispatch_due())
+
+
+def test_due_notification_is_delivered(store):
+    store.enqueue("n-1", "{}", time.time() - 1)
+
+    async def deliver(notification_id, payload):
+        return None
+
+    assert _dispatch(store, deliver) == 1
+    status = store.get_status("n-1")
+    assert status["status"] == "delivered"
+    assert status["delivered_at"] is not None
+
+
+def test_expired_notification_is_not_marked_delivered(store):
+    store.enqueue("n-2", "{}", time.time() - 1)
+
+    async def deliver(notification_id, payload):
+        return Settled("expired")
+
+    assert _dispatch(store, deliver) == 1
+    status = store.get_status("n-2")
+    assert status["status"] == "expired"
+    assert status["delivered_at"] is None
+    assert store.next_due_at() is None
+
+
+def test_failed_send_is_retried_with_backoff(store):
+    store.enqueue("n-3", "{}", time.time() - 1)
+
+    async def deliver(notification_id, payload):
+        raise RuntimeError("smtp down")
+
+    _dispatch(store, deliver)
+    status = store.get_status("n-3")
+    assert status["status"] == "retrying"
+    assert status["last_error"] == "smtp down"
+    assert status["due_at"] > time.time()
+
+
+def test_mark_delivered_leaves_settled_rows_alone(store):
+    store.enqueue("n-4", "{}", time.time() - 1)
+    store.claim_due()
+    store.mark_status("n-4", "expired")
+    store.mark_delivered("n-4")
+    assert store.get_status("n-4")["status"] == "expired"
+
+
+def test_prune_removes_only_old_settled_rows(store):
+    now = time.time()
+    store.record_status([
+        {"notification_id": "old-delivered", "status": "delivered"},
+        {"notification_id": "old-failed", "status": "failed"},
+    ])
+    store.enqueue("pending", "{}", now + 3600)
+
+    assert store.prune(now + 1) == 2
+    assert store.get_status("old-delivered") is None
+    assert store.get_status("pending")["status"] == "scheduled"
+    assert store.prune(now + 1) == 0
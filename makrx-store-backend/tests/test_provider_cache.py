@@ -0,0 +1,153 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.services import bridge_service as bridge  # noqa: E402
+from app.services.bridge_service import (  # noqa: E402
+    BridgeService,
+    ServiceType,
+    _ProviderCacheEntry,
+)
+
+SERVICE = ServiceType.PRINTING_3D
+
+
+def _payload(name):
+    return {
+        "provider_id": name,
+        "makerspace_id": f"ms-{name}",
+        "name": name,
+        "location": {},
+        "capabilities": [],
+        "contact_info": {},
+    }
+
+
+class _Response:
+    def __init__(self, status, names):
+        self.status = status
+        self._names = names
+
+    async def json(self):
+        return {"providers": [_payload(name) for name in self._names]}
+
+
+class _Session:
+    """Stands in for the pooled aiohttp session; counts provider fetches"""
+
+    def __init__(self, names=("fresh",), status=200, delay=0.0):
+        self.names = list(names)
+        self.status = status
+        self.delay = delay
+        self.calls = 0
+
+    def get(self, url, params=None):
+        self.calls += 1
+        return _Delayed(self)
+
+
+class _Delayed:
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        await asyncio.sleep(self.session.delay)
+        return _Response(self.session.status, self.session.names)
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = BridgeService()
+    session = _Session()
+    monkeypatch.setattr(service, "_get_session", lambda: session)
+    monkeypatch.setattr(bridge, "PROVIDER_CACHE_TTL_SECONDS", 60)
+    monkeypatch.setattr(bridge, "PROVIDER_CACHE_STALE_SECONDS", 600)
+    monkeypatch.setattr(bridge, "PROVIDER_COLD_FETCH_TIMEOUT", 1)
+    return service, session
+
+
+def _names(providers):
+    return [provider.name for provider in providers]
+
+
+def _cache(service, names, age):
+    providers = [bridge.Provider(**_payload(name)) for name in names]
+    service._provider_cache[SERVICE] = _ProviderCacheEntry(
+        providers, time.monotonic() - age
+    )
+
+
+def test_fresh_entries_are_served_without_a_fetch(service):
+    service, session = service
+    _cache(service, ["cached"], age=10)
+
+    assert _names(asyncio.run(service._get_providers(SERVICE))) == ["cached"]
+    assert session.calls == 0
+
+
+def test_concurrent_cold_misses_share_one_fetch(service):
+    service, session = service
+    session.delay = 0.05
+
+    async def scenario():
+        return await asyncio.gather(
+            *(service._get_providers(SERVICE) for _ in range(5))
+        )
+
+    results = asyncio.run(scenario())
+
+    assert [_names(providers) for providers in results] == [["fresh"]] * 5
+    assert session.calls == 1
+
+
+def test_stale_entries_are_served_while_refreshing(service):
+    service, session = service
+    _cache(service, ["stale"], age=120)
+
+    async def scenario():
+        first = await service._get_providers(SERVICE)
+        second = await service._get_providers(SERVICE)
+        await asyncio.gather(*service._refreshes.values())
+        return first, second, await service._get_providers(SERVICE)
+
+    first, second, after = asyncio.run(scenario())
+
+    assert _names(first) == _names(second) == ["stale"]
+    assert _names(after) == ["fresh"]
+    assert session.calls == 1
+
+
+def test_slow_cold_fetch_falls_back_and_still_fills_the_cache(service, monkeypatch):
+    service, session = service
+    session.delay = 0.1
+    monkeypatch.setattr(bridge, "PROVIDER_COLD_FETCH_TIMEOUT", 0.01)
+
+    async def scenario():
+        first = await service._get_providers(SERVICE)
+        await asyncio.sleep(0.2)
+        return first, await service._get_providers(SERVICE)
+
+    first, later = asyncio.run(scenario())
+
+    assert "fresh" not in _names(first)  # Fallback providers
+    assert _names(later) == ["fresh"]
+    assert session.calls == 1
+
+
+def test_expired_entry_outlives_a_failed_refresh(service):
+    service, session = service
+    session.status = 503
+    _cache(service, ["old"], age=10_000)
+
+    providers = asyncio.run(service._get_providers(SERVICE))
+
+    assert _names(providers) == ["old"]
+    assert session.calls == 1
+    assert not service._refreshes
@@ -0,0 +1,122 @@
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.services.provider_index import ProviderIndex, haversine_km  # noqa: E402
+
+
+def _capability(service="printing_3d", materials=("PLA",), dims=(200, 200, 200)):
+    length, width, height = dims
+    return SimpleNamespace(
+        service_type=service,
+        materials=list(materials),
+        max_dimensions={"length": length, "width": width, "height": height},
+    )
+
+
+def _provider(provider_id, lat=None, lng=None, capabilities=None, is_active=True):
+    location = {"coordinates": {"lat": lat, "lng": lng}} if lat is not None else {}
+    return SimpleNamespace(
+        id=provider_id,
+        is_active=is_active,
+        location=location,
+        rating=4.0,
+        total_orders=100,
+        success_rate=0.9,
+        capabilities=capabilities if capabilities is not None else [_capability()],
+    )
+
+
+def _ids(candidates):
+    return sorted(candidate.provider.id for candidate in candidates)
+
+
+@pytest.mark.parametrize("radius_km", [5, 50, 400, 3000])
+def test_radius_query_matches_brute_force(radius_km):
+    rng = random.Random(radius_km)
+    providers = [
+        _provider(i, rng.uniform(-80, 80), rng.uniform(-180, 180)) for i in range(400)
+    ]
+    index = ProviderIndex(providers, cell_degrees=0.5)
+
+    for _ in range(20):
+        lat, lng = rng.uniform(-75, 75), rng.uniform(-180, 180)
+        expected = {
+            slot
+            for slot, provider in enumerate(index.providers)
+            if haversine_km(lat, lng, *index.coordinates[slot]) <= radius_km
+        }
+        assert set(index.within_radius(lat, lng, radius_km)) == expected
+
+
+def test_radius_query_wraps_across_the_antimeridian():
+    providers = [
+        _provider("east", -17.8, 179.9),
+        _provider("west", -17.8, -179.9),
+        _provider("far", -17.8, 170.0),
+    ]
+    index = ProviderIndex(providers)
+
+    found = index.within_radius(-17.8, 179.95, 50)
+
+    assert sorted(index.providers[slot].id for slot in found) == ["east", "west"]
+    assert found[1] < 20  # 0.15 degrees of longitude, not 359.85
+
+
+def test_dimensions_prune_by_volume_and_per_axis_fit():
+    providers = [
+        _provider("small", capabilities=[_capability(dims=(100, 100, 100))]),
+        _provider("flat", capabilities=[_capability(dims=(1000, 1000, 50))]),
+        _provider("large", capabilities=[_capability(dims=(300, 300, 300))]),
+    ]
+    index = ProviderIndex(providers)
+
+    # "flat" has the volume but is too short; "small" is cut off by the bisect
+    assert _ids(index.candidates("printing_3d", dimensions=(150, 150, 150))) == [
+        "large"
+    ]
+    assert _ids(index.candidates("printing_3d", dimensions=(50, 50, 40))) == [
+        "flat",
+        "large",
+        "small",
+    ]
+
+
+def test_candidates_filter_service_material_and_activity():
+    providers = [
+        _provider("pla", capabilities=[_capability(materials=("pla",))]),
+        _provider("abs", capabilities=[_capability(materials=("ABS",))]),
+        _provider("cnc", capabilities=[_capability(service="cnc", materials=("PLA",))]),
+        _provider("inactive", is_active=False),
+    ]
+    index = ProviderIndex(providers)
+
+    assert len(index) == 3
+    assert _ids(index.candidates("printing_3d", material="Pla")) == ["pla"]
+    assert _ids(index.candidates("printing_3d")) == ["abs", "pla"]
+    assert index.candidates("laser_cutting") == []
+
+
+def test_candidates_carry_distance_and_respect_radius():
+    providers = [
+        _provider("near", 12.97, 77.59),
+        _provider("far", 28.61, 77.21),
+        _provider("unknown"),
+    ]
+    index = ProviderIndex(providers)
+    origin = {"coordinates": {"lat": 12.98, "lng": 77.6}}
+
+    everyone = {
+        c.provider.id: c.distance_km
+        for c in index.candidates("printing_3d", location=origin)
+    }
+    nearby = index.candidates("printing_3d", location=origin, radius_km=100)
+
+    assert everyone["near"] < 2
+    assert everyone["far"] > 1500
+    assert everyone["unknown"] is None
+    assert _ids(nearby) == ["near"]
@@ -0,0 +1,75 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.services.template_registry import NotificationTemplateRegistry  # noqa: E402
+
+BUILTINS = {"welcome": "Hello {{ name }}", "receipt": "Order {{ order_id }}"}
+
+
+def _registry(tmp_path, **kwargs):
+    template_dir = tmp_path / "templates"
+    template_dir.mkdir(exist_ok=True)
+    options = {
+        "template_dir": str(template_dir),
+        "bytecode_cache_dir": str(tmp_path / "bytecode"),
+    }
+    options.update(kwargs)
+    return NotificationTemplateRegistry(BUILTINS, **options), template_dir
+
+
+def test_builtin_templates_render(tmp_path):
+    registry, _ = _registry(tmp_path)
+
+    assert registry.render("welcome", {"name": "Asha"}) == "Hello Asha"
+    assert registry.list_templates() == ["receipt", "welcome"]
+
+
+def test_directory_templates_override_builtins(tmp_path):
+    registry, template_dir = _registry(tmp_path)
+    (template_dir / "welcome.html").write_text("Hi {{ name }}!")
+    (template_dir / "shipped.html").write_text("Shipped")
+
+    assert registry.render("welcome", {"name": "Asha"}) == "Hi Asha!"
+    assert registry.list_templates() == ["receipt", "shipped", "welcome"]
+
+
+def test_templates_compile_once_and_write_bytecode(tmp_path, monkeypatch):
+    registry, _ = _registry(tmp_path)
+    loads = []
+    get_source = registry.loader.get_source
+
+    def counting_get_source(environment, template):
+        loads.append(template)
+        return get_source(environment, template)
+
+    monkeypatch.setattr(registry.loader, "get_source", counting_get_source)
+    rendered = registry.render_many("receipt", [{"order_id": i} for i in range(3)])
+    registry.render("receipt", {"order_id": 9})
+
+    assert rendered == ["Order 0", "Order 1", "Order 2"]
+    assert loads == ["receipt"]
+    assert os.listdir(tmp_path / "bytecode")
+
+
+def test_edited_files_are_picked_up_with_auto_reload(tmp_path):
+    registry, template_dir = _registry(tmp_path, auto_reload=True)
+    path = template_dir / "welcome.html"
+    path.write_text("v1 {{ name }}")
+    assert registry.render("welcome", {"name": "A"}) == "v1 A"
+
+    path.write_text("v2 {{ name }}")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+    assert registry.render("welcome", {"name": "A"}) == "v2 A"
+
+
+def test_names_outside_the_template_directory_are_not_found(tmp_path):
+    registry, _ = _registry(tmp_path)
+    (tmp_path / "secret.html").write_text("do not serve")
+
+    assert "../secret" not in registry
+    assert "" not in registry
+    assert None not in registry
+    assert "welcome" in registry